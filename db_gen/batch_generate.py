@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Пакетна генерація PLC коду для багатьох конфігурацій (по одній на PLC)
+
+Приймає список xlsx-файлів та/або каталогів (шукає в них elevator_config*.xlsx
+рекурсивно), запускає load/validate/generate для кожної конфігурації у пулі
+процесів і пише результати в окремі дерева:
+
+    sites/A/plc1/elevator_config.xlsx  ->  <output>/A/plc1/
+    sites/A/plc2/elevator_config.xlsx  ->  <output>/A/plc2/elevator_config/
+    sites/A/plc2/line3.xlsx            ->  <output>/A/plc2/line3/
+
+Кілька конфігурацій в одному каталозі отримують сусідні підкаталоги за
+іменем файлу — жодне дерево не вкладається в інше.
+--tags-baseline задає один знімок, тому дозволений лише для однієї конфігурації.
+
+Наприкінці друкує зведення та записує <output>/batch_report.json
+(успішні конфігурації, помилки валідації, несподівані збої з traceback).
+
+Використання:
+    python batch_generate.py sites/ -o build/ -j 8 --deterministic
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import argparse
+import traceback
+import contextlib
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List
+
+from generate_plc_config import PLCCodeGenerator, add_generator_arguments, generator_options
+
+DEFAULT_PATTERN = 'elevator_config*.xlsx'
+DEFAULT_CONFIG_NAME = 'elevator_config.xlsx'
+REPORT_NAME = 'batch_report.json'
+
+
+def discover_configs(inputs: List[str], pattern: str = DEFAULT_PATTERN) -> List[Path]:
+    """Знайти конфігурації: файли як є, каталоги — рекурсивно за шаблоном"""
+    found = []
+    for item in inputs:
+        path = Path(item)
+        if path.is_dir():
+            for candidate in sorted(path.rglob(pattern)):
+                # тимчасові файли Excel (~$...) та кеш пропускаємо
+                if candidate.name.startswith('~$') or '.plc_cache' in candidate.parts:
+                    continue
+                found.append(candidate)
+        else:
+            found.append(path)
+
+    unique = []
+    seen = set()
+    for path in found:
+        key = path.resolve()
+        if key not in seen:
+            seen.add(key)
+            unique.append(path)
+    return unique
+
+
+def plan_outputs(configs: List[Path], output_root: Path) -> Dict[Path, Path]:
+    """Окремий вихідний каталог для кожної конфігурації (відносно спільного кореня)
+    
+    Лише elevator_config.xlsx у своєму каталозі пишеться прямо в <output>/<rel>/;
+    інакше кожна конфігурація — у сусідній <output>/<rel>/<stem>/.
+    """
+    if not configs:
+        return {}
+    parents = [str(c.resolve().parent) for c in configs]
+    base = Path(os.path.commonpath(parents))
+    shared = {p for p in parents if parents.count(p) > 1}
+
+    plan = {}
+    for config in configs:
+        parent = config.resolve().parent
+        out = output_root / parent.relative_to(base)
+        if config.name != DEFAULT_CONFIG_NAME or str(parent) in shared:
+            out = out / config.stem
+        plan[config] = out
+    return plan
+
+
+def _generate_one(job: dict) -> dict:
+    """Робоча функція пулу: load/validate/generate для однієї конфігурації"""
+    log = io.StringIO()
+    result = {
+        'excel': job['excel'],
+        'output': job['output'],
+        'status': 'ok',
+        'error': '',
+        'traceback': '',
+        'counts': {},
+        'tags': 0,
+    }
+    started = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(log):
+            generator = PLCCodeGenerator(job['excel'], **job['options'])
+            generator.load_excel()
+            result['counts'] = generator.mech_counts()
+            generator.validate_excel()
+            generator.generate_all(job['output'], incremental=job['incremental'])
+            result['tags'] = len(generator.tags)
+    except FileNotFoundError as e:
+        result.update(status='failed', error=f"файл не знайдено: {e}")
+    except ValueError as e:
+        result.update(status='invalid', error=str(e))
+    except Exception as e:
+        result.update(status='failed', error=f"{type(e).__name__}: {e}",
+                      traceback=traceback.format_exc())
+    result['seconds'] = round(time.perf_counter() - started, 3)
+    result['log'] = log.getvalue()
+    return result
+
+
+def run_batch(configs: List[Path], output_root: Path, jobs: int = 0,
+              incremental: bool = True, options: dict = None) -> dict:
+    """Згенерувати всі конфігурації; повертає зведений звіт
+    
+    options — аргументи конструктора PLCCodeGenerator (див. generator_options).
+    """
+    plan = plan_outputs(configs, output_root)
+    job_list = [{
+        'excel': str(config),
+        'output': str(out),
+        'incremental': incremental,
+        'options': options or {},
+    } for config, out in plan.items()]
+
+    workers = jobs or os.cpu_count() or 1
+    workers = max(1, min(workers, len(job_list) or 1))
+
+    print(f"🏭 Пакетна генерація: {len(job_list)} конфігурацій, процесів: {workers}")
+    started = time.perf_counter()
+    results = []
+
+    def _report(res):
+        mark = {'ok': '✅', 'invalid': '⚠️ ', 'failed': '❌'}[res['status']]
+        print(f"{mark} [{len(results)}/{len(job_list)}] {res['excel']} ({res['seconds']:.2f} с)")
+
+    if workers == 1:
+        for job in job_list:
+            results.append(_generate_one(job))
+            _report(results[-1])
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_generate_one, job) for job in job_list]
+            for future in as_completed(futures):
+                results.append(future.result())
+                _report(results[-1])
+
+    results.sort(key=lambda r: r['excel'])
+    failures = [r for r in results if r['status'] != 'ok']
+    return {
+        'total': len(results),
+        'ok': len(results) - len(failures),
+        'invalid': sum(1 for r in failures if r['status'] == 'invalid'),
+        'failed': sum(1 for r in failures if r['status'] == 'failed'),
+        'workers': workers,
+        'seconds': round(time.perf_counter() - started, 3),
+        'results': results,
+        'failures': [{k: r[k] for k in ('excel', 'status', 'error', 'traceback', 'log')}
+                     for r in failures],
+    }
+
+
+def print_summary(report: dict):
+    """Зведення пакетної генерації"""
+    print("\n" + "=" * 70)
+    print(f"📊 Зведення: {report['ok']}/{report['total']} успішно, "
+          f"помилок валідації: {report['invalid']}, збоїв: {report['failed']} "
+          f"({report['seconds']:.2f} с, процесів: {report['workers']})")
+    print("=" * 70)
+
+    for r in report['results']:
+        if r['status'] == 'ok':
+            counts = ' '.join(f"{sheet[0].upper()}{n}" for sheet, n in r['counts'].items())
+            print(f"   ✓ {r['excel']} -> {r['output']}: {counts}, тегів {r['tags']}")
+
+    if report['failures']:
+        print("\n❌ Невдалі конфігурації:")
+        for f in report['failures']:
+            print(f"   ✗ {f['excel']}: {f['error']}")
+            # повідомлення валідації друкуються генератором у лог
+            for line in f['log'].splitlines():
+                if line.startswith('❌'):
+                    print(f"       {line}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Пакетна генерація PLC коду для багатьох конфігурацій")
+    parser.add_argument('inputs', nargs='+', help="xlsx-файли або каталоги з конфігураціями")
+    parser.add_argument('-o', '--output', default='./generated_batch',
+                        help="корінь для вихідних дерев")
+    parser.add_argument('-j', '--jobs', type=int, default=0,
+                        help="кількість процесів (0 = кількість ядер)")
+    parser.add_argument('--pattern', default=DEFAULT_PATTERN,
+                        help=f"шаблон пошуку в каталогах (за замовчуванням {DEFAULT_PATTERN})")
+    add_generator_arguments(parser)
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    configs = discover_configs(args.inputs, args.pattern)
+    if not configs:
+        print("❌ Не знайдено жодної конфігурації")
+        return 2
+    if args.tags_baseline and len(configs) > 1:
+        print(f"❌ --tags-baseline задає один знімок, а конфігурацій {len(configs)}; "
+              f"запустіть його для кожної конфігурації окремо")
+        return 2
+
+    output_root = Path(args.output)
+    output_root.mkdir(parents=True, exist_ok=True)
+
+    report = run_batch(configs, output_root, jobs=args.jobs, incremental=not args.full,
+                       options=generator_options(args))
+    print_summary(report)
+
+    report_path = output_root / REPORT_NAME
+    report_path.write_text(json.dumps(report, indent=2, ensure_ascii=False) + '\n', encoding='utf-8')
+    print(f"\n📄 Звіт: {report_path.absolute()}")
+
+    return 0 if not report['failures'] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
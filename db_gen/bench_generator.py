@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Бенчмарк PLCCodeGenerator на синтетичних конфігураціях
+
+- синтезує elevator_config.xlsx на 16 / 64 / 256 механізмів (усі 4 типи)
+  у різних розкладках слотів: 'blocks' (типи суцільними діапазонами, як у
+  робочій книзі), 'interleaved' (типи по черзі), 'sparse' (випадкові слоти);
+  кожна книга має аркуш ROUTES (до 12 маршрутів)
+- окремо міряє load_excel (без знімка та зі знімком .plc_cache/),
+  validate_excel, run_mechanism_pass (один прохід для DB_Mechs, FC_InitMechs,
+  FC_DeviceRunner, HAL і тегів), build_route_index, кожен generate_*
+  та запис PLC_Tags.xlsx; найкращий час і медіана з --repeat повторів
+- набір з кількох PLC проганяється через batch_generate.run_batch
+- результати — JSON; --save-baseline зберігає базову лінію, --baseline
+  порівнює з нею і завершується з кодом 1 при регресії
+
+Базову лінію слід записувати на еталонній машині (не в CI-контейнері):
+абсолютні часи між машинами не порівнюються.
+
+Використання:
+    python bench_generator.py                                # 16/64/256, blocks + interleaved
+    python bench_generator.py --sizes 256 --layouts sparse --repeat 10
+    python bench_generator.py --save-baseline bench_baseline.json
+    python bench_generator.py --baseline bench_baseline.json --tolerance 0.25
+"""
+
+import io
+import sys
+import json
+import math
+import time
+import random
+import argparse
+import platform
+import tempfile
+import contextlib
+from pathlib import Path
+from statistics import median
+from typing import Callable, Dict, List, Optional, Tuple
+
+from batch_generate import run_batch
+from generate_plc_config import PLCCodeGenerator, add_generator_arguments, generator_options
+from mech_types import MECH_SHEETS, load_registry
+
+BENCH_VERSION = 1
+SIZES = (16, 64, 256)
+LAYOUTS = ('blocks', 'interleaved', 'sparse')
+DEFAULT_LAYOUTS = ('blocks', 'interleaved')
+
+# Частка механізмів кожного типу (REDLERS, NORIAS, GATES, FANS)
+TYPE_SHARES = (0.35, 0.15, 0.35, 0.15)
+MAX_ROUTES = 12
+ROUTE_LENGTH = 4
+
+
+# ============================================================================
+# Синтетичні конфігурації
+# ============================================================================
+def _type_counts(total: int) -> List[int]:
+    """Кількість механізмів кожного типу (кожен тип — хоча б один)"""
+    counts = [max(1, int(total * share)) for share in TYPE_SHARES]
+    counts[0] += total - sum(counts)
+    return counts
+
+
+def plan_slots(total: int, layout: str, rng: random.Random) -> List[Tuple[str, int]]:
+    """[(аркуш, слот)] для total механізмів у заданій розкладці"""
+    if not 1 <= total <= PLCCodeGenerator.MECHS_SLOTS:
+        raise ValueError(f"❌ Кількість механізмів має бути 1..{PLCCodeGenerator.MECHS_SLOTS}: {total}")
+    if layout not in LAYOUTS:
+        raise ValueError(f"❌ Невідома розкладка: {layout}")
+    counts = _type_counts(total)
+    sheets = [sheet for sheet, count in zip(MECH_SHEETS, counts) for _ in range(count)]
+    if layout == 'blocks':
+        # типи суцільними діапазонами, діапазони рівномірно по 0..255
+        plan = []
+        stride = PLCCodeGenerator.MECHS_SLOTS // len(MECH_SHEETS)
+        start = 0
+        for k, (sheet, count) in enumerate(zip(MECH_SHEETS, counts)):
+            base = min(k * stride, PLCCodeGenerator.MECHS_SLOTS - total + start)
+            base = max(base, start)
+            plan.extend((sheet, base + i) for i in range(count))
+            start = base + count
+        return plan
+    if layout == 'interleaved':
+        order = []
+        pools = {sheet: count for sheet, count in zip(MECH_SHEETS, counts)}
+        while len(order) < total:
+            for sheet in MECH_SHEETS:
+                if pools[sheet]:
+                    order.append(sheet)
+                    pools[sheet] -= 1
+        return [(sheet, slot) for slot, sheet in enumerate(order)]
+    slots = sorted(rng.sample(range(PLCCodeGenerator.MECHS_SLOTS), total))
+    rng.shuffle(sheets)
+    return list(zip(sheets, slots))
+
+
+class _IoAllocator:
+    """Послідовні унікальні адреси %I / %Q"""
+
+    def __init__(self):
+        self.next = {'I': 0, 'Q': 0}
+
+    def take(self, area: str) -> str:
+        n = self.next[area]
+        self.next[area] = n + 1
+        return f"%{area}{n // 8}.{n % 8}"
+
+
+def synthesize_workbook(path, total: int, layout: str = 'blocks', seed: int = 1,
+                        routes: int = MAX_ROUTES) -> Path:
+    """Записати синтетичну книгу (CONFIG, аркуші механізмів MECH_SHEETS, ROUTES)
+
+    Колонки сигналів — з реєстру mech_types (поля UDT_*.scl репозиторію).
+    """
+    from openpyxl import Workbook
+
+    rng = random.Random(seed)
+    plan = plan_slots(total, layout, rng)
+    io_alloc = _IoAllocator()
+    wb = Workbook(write_only=True)
+
+    config = wb.create_sheet('CONFIG')
+    config.append(['Parameter', 'Value'])
+    config.append(['ProjectName', f'Bench_{total}_{layout}'])
+    config.append(['Version', '1.0.0'])
+    config.append(['Author', 'bench_generator'])
+
+    registry = load_registry(Path(__file__).resolve().parent.parent)
+    by_sheet = {sheet: [slot for s, slot in plan if s == sheet] for sheet in MECH_SHEETS}
+    for sheet in MECH_SHEETS:
+        signals = registry[sheet].columns
+        ws = wb.create_sheet(sheet)
+        ws.append(['Slot', 'TypedIdx', 'Name', 'Location', 'Enabled'] + list(signals))
+        for typed_idx, slot in enumerate(by_sheet[sheet]):
+            row = [slot, typed_idx, f"{sheet.title()}_{typed_idx + 1}", f"Зона {slot // 16}", True]
+            row += [io_alloc.take('I' if s.startswith('DI_') else 'Q') for s in signals]
+            ws.append(row)
+
+    # Маршрути: редлер -> норія -> засувка -> ... з різних слотів (частина спільних)
+    ws = wb.create_sheet('ROUTES')
+    ws.append(['RouteId', 'Name', 'Enabled', 'Slots'])
+    mapped = sorted(slot for _, slot in plan)
+    for route_id in range(1, min(routes, MAX_ROUTES) + 1):
+        slots = rng.sample(mapped, min(ROUTE_LENGTH, len(mapped)))
+        ws.append([route_id, f"Маршрут {route_id}", True, ', '.join(str(s) for s in slots)])
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    wb.save(path)
+    return path
+
+
+# ============================================================================
+# Вимірювання
+# ============================================================================
+def generate_methods() -> List[str]:
+    """Усі generate_* генератора, крім generate_all (запис файлів)"""
+    return sorted(name for name in dir(PLCCodeGenerator)
+                  if name.startswith('generate_') and name != 'generate_all'
+                  and callable(getattr(PLCCodeGenerator, name)))
+
+
+def _timed(fn: Callable) -> float:
+    started = time.perf_counter()
+    fn()
+    return (time.perf_counter() - started) * 1000.0
+
+
+def bench_config(excel: Path, options: dict, repeat: int, workdir: Path,
+                 warmup: int = 1) -> Dict[str, List[float]]:
+    """Часи (мс) кожного етапу генерації однієї книги за repeat повторів
+
+    Перші warmup прогонів відкидаються (ліниві імпорти pandas/openpyxl, знімок .plc_cache/).
+    """
+    samples = {}
+
+    def add(stage: str, ms: float):
+        if iteration >= warmup:
+            samples.setdefault(stage, []).append(ms)
+
+    options = dict(options, cycle_budget_ms=None)
+    for iteration in range(warmup + repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            cold = PLCCodeGenerator(str(excel), **dict(options, use_cache=False))
+            add('load_excel', _timed(cold.load_excel))
+            gen = PLCCodeGenerator(str(excel), **dict(options, use_cache=True))
+            gen.load_excel()    # перший виклик записує знімок, другий — міряється
+            add('load_excel_cached', _timed(gen.load_excel))
+            add('validate_excel', _timed(gen.validate_excel))
+            add('run_mechanism_pass', _timed(gen.run_mechanism_pass))
+            add('build_tags_table', _timed(gen.build_tags_table))
+            if gen.routes:
+                add('build_route_index', _timed(gen.build_route_index))
+            for name in generate_methods():
+                add(name, _timed(getattr(gen, name)))
+            tags_path = workdir / 'PLC_Tags.xlsx'
+            add('write_plc_tags_xlsx', _timed(lambda: tags_path.write_bytes(gen._render_plc_tags_xlsx())))
+    return samples
+
+
+def summarize(samples: Dict[str, List[float]]) -> Dict[str, Dict[str, float]]:
+    return {stage: {'min_ms': round(min(values), 4), 'median_ms': round(median(values), 4)}
+            for stage, values in samples.items()}
+
+
+def bench_multi_plc(plcs: int, total: int, layout: str, options: dict, repeat: int,
+                    workdir: Path, seed: int) -> Dict[str, List[float]]:
+    """Набір з plcs книг через run_batch (один процес — стабільні часи)"""
+    configs = [synthesize_workbook(workdir / 'sites' / f'plc{k + 1}' / 'elevator_config.xlsx',
+                                   total, layout, seed + k) for k in range(plcs)]
+    samples = {}
+    options = dict(options, cycle_budget_ms=None)
+    for iteration in range(1 + repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            started = time.perf_counter()
+            report = run_batch(configs, workdir / 'out', jobs=1, incremental=False, options=options)
+            elapsed = (time.perf_counter() - started) * 1000.0
+        if report['failures']:
+            raise ValueError(f"❌ Пакетна генерація не вдалась: {report['failures'][0]['error']}")
+        if not iteration:
+            continue    # прогрів
+        samples.setdefault('batch_total', []).append(elapsed)
+        samples.setdefault('batch_per_plc', []).append(elapsed / plcs)
+    return samples
+
+
+def run_suite(sizes=SIZES, layouts=DEFAULT_LAYOUTS, repeat: int = 5, plcs: int = 4,
+              plc_size: int = 64, options: dict = None, seed: int = 1, workdir=None) -> dict:
+    """Прогнати всі кейси; повертає JSON-сумісні результати"""
+    options = dict(options or {}, deterministic=True)
+    results = {
+        'version': BENCH_VERSION,
+        'python': platform.python_version(),
+        'machine': f"{platform.system()} {platform.machine()}",
+        'repeat': repeat,
+        'options': {k: options.get(k) for k in PLCCodeGenerator.OUTPUT_OPTIONS},
+        'cases': {},
+    }
+    with tempfile.TemporaryDirectory(prefix='plc_bench_') as tmp:
+        root = Path(workdir or tmp)
+        for layout in layouts:
+            for size in sizes:
+                name = f"{layout}_{size}"
+                case_dir = root / name
+                excel = synthesize_workbook(case_dir / 'elevator_config.xlsx', size, layout, seed)
+                print(f"⏱️  {name}...", flush=True)
+                results['cases'][name] = summarize(bench_config(excel, options, repeat, case_dir))
+        if plcs:
+            name = f"multi_{plcs}x{plc_size}"
+            print(f"⏱️  {name}...", flush=True)
+            samples = bench_multi_plc(plcs, plc_size, layouts[0] if layouts else 'blocks', options,
+                                      repeat, root / name, seed)
+            results['cases'][name] = summarize(samples)
+    return results
+
+
+# ============================================================================
+# Звіт і базова лінія
+# ============================================================================
+def scaling(results: dict, layout: str) -> Dict[str, float]:
+    """Показник степеня t ~ N^k між найменшим і найбільшим розміром (по min_ms)"""
+    cases = {int(name.rsplit('_', 1)[1]): data for name, data in results['cases'].items()
+             if name.startswith(layout + '_')}
+    if len(cases) < 2:
+        return {}
+    lo, hi = min(cases), max(cases)
+    exponents = {}
+    for stage, stats in cases[hi].items():
+        base = cases[lo].get(stage, {}).get('min_ms')
+        if base and stats['min_ms'] > 0:
+            exponents[stage] = round(math.log(stats['min_ms'] / base) / math.log(hi / lo), 2)
+    return exponents
+
+
+def print_results(results: dict, layouts=()):
+    names = list(results['cases'])
+    stages = []
+    for data in results['cases'].values():
+        stages.extend(s for s in data if s not in stages)
+    print(f"\n📊 Бенчмарк генератора (мін. мс з {results['repeat']} повторів; "
+          f"Python {results['python']}, {results['machine']})")
+    print(f"   {'Етап':<38}" + ''.join(f"{name:>16}" for name in names))
+    for stage in stages:
+        row = ''.join(f"{results['cases'][n][stage]['min_ms']:>16.3f}" if stage in results['cases'][n]
+                      else f"{'-':>16}" for n in names)
+        print(f"   {stage:<38}{row}")
+    for layout in layouts:
+        exponents = scaling(results, layout)
+        if exponents:
+            worst = sorted(exponents.items(), key=lambda kv: -kv[1])[:5]
+            print(f"📈 Масштабування {layout} (t ~ N^k): " +
+                  ', '.join(f"{stage} k={k:g}" for stage, k in worst))
+
+
+def compare_baseline(results: dict, baseline: dict, tolerance: float = 0.2,
+                     min_delta_ms: float = 1.0) -> Tuple[List[str], List[str]]:
+    """(регресії, покращення): min_ms гірше за базову лінію більш ніж на tolerance
+
+    min_delta_ms — поріг шуму: різниця меншої величини не рахується.
+    """
+    if baseline.get('version') != BENCH_VERSION:
+        raise ValueError(f"❌ Базова лінія версії {baseline.get('version')}, очікується {BENCH_VERSION}")
+    regressions, improvements = [], []
+    for case, stages in results['cases'].items():
+        for stage, stats in stages.items():
+            base = baseline.get('cases', {}).get(case, {}).get(stage)
+            if base is None:
+                continue
+            now, then = stats['min_ms'], base['min_ms']
+            line = f"{case}/{stage}: {then:.3f} -> {now:.3f} мс"
+            if now > then * (1 + tolerance) and now - then >= min_delta_ms:
+                regressions.append(f"{line} (+{(now / then - 1) * 100:.0f}%)")
+            elif now < then * (1 - tolerance) and then - now >= min_delta_ms:
+                improvements.append(f"{line} ({(now / then - 1) * 100:.0f}%)")
+    return regressions, improvements
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Бенчмарк PLCCodeGenerator на синтетичних книгах")
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(SIZES), help="кількість механізмів")
+    parser.add_argument('--layouts', nargs='+', default=list(DEFAULT_LAYOUTS), choices=LAYOUTS)
+    parser.add_argument('--repeat', type=int, default=5, help="повторів кожного кейса")
+    parser.add_argument('--plcs', type=int, default=4, help="книг у наборі multi-PLC (0 — без набору)")
+    parser.add_argument('--plc-size', type=int, default=64, help="механізмів у кожній книзі набору")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--workdir', default=None, help="каталог для синтетичних книг (за замовчуванням тимчасовий)")
+    parser.add_argument('--json', default=None, metavar='PATH', help="записати результати")
+    parser.add_argument('--save-baseline', default=None, metavar='PATH', help="записати як базову лінію")
+    parser.add_argument('--baseline', default=None, metavar='PATH', help="порівняти з базовою лінією")
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help="допустиме уповільнення відносно базової лінії (0.2 = 20%%)")
+    parser.add_argument('--min-delta', type=float, default=1.0, metavar='MS',
+                        help="поріг шуму: менша різниця не вважається регресією")
+    add_generator_arguments(parser)
+    args = parser.parse_args(argv)
+    if args.repeat < 1:
+        parser.error("--repeat має бути >= 1")
+
+    try:
+        results = run_suite(args.sizes, args.layouts, args.repeat, args.plcs, args.plc_size,
+                            generator_options(args), args.seed, args.workdir)
+    except ValueError as e:
+        print(e)
+        return 2
+    print_results(results, args.layouts)
+
+    text = json.dumps(results, indent=2, ensure_ascii=False) + '\n'
+    for path in (args.json, args.save_baseline):
+        if path:
+            Path(path).write_text(text, encoding='utf-8')
+            print(f"💾 Результати: {path}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding='utf-8'))
+        try:
+            regressions, improvements = compare_baseline(results, baseline, args.tolerance, args.min_delta)
+        except ValueError as e:
+            print(e)
+            return 2
+        for line in improvements:
+            print(f"🚀 {line}")
+        if regressions:
+            print(f"❌ Регресії відносно {args.baseline} (допуск {args.tolerance:.0%}):")
+            for line in regressions:
+                print(f"   - {line}")
+            return 1
+        print(f"✅ Без регресій відносно {args.baseline} (допуск {args.tolerance:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
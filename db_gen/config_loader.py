@@ -0,0 +1,362 @@
+# -*- coding: utf-8 -*-
+"""
+Швидкий завантажувач elevator_config.xlsx (без pandas)
+
+- читає книгу через openpyxl у потоковому режимі (read_only, data_only)
+- нормалізує записи механізмів і маршрутів (ROUTES) у типізовані __slots__ об'єкти
+- зберігає скомпільований знімок (pickle) у .plc_cache/, ключ — SHA-256 книги;
+  якщо книга не змінилась, знімок завантажується за мілісекунди
+- sheet_digests / reload_config — хеші окремих аркушів прямо з zip і
+  перечитування лише змінених аркушів (режим --watch)
+
+Записи зберігають dict-подібний інтерфейс (r['Slot'], r.get('DI_Speed'), r.items()),
+тому генератор працює з ними так само, як раніше з to_dict('records').
+"""
+
+import re
+import pickle
+import hashlib
+import zipfile
+import posixpath
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from mech_types import MECH_SHEETS
+
+SNAPSHOT_VERSION = 4
+CACHE_DIR_NAME = '.plc_cache'
+
+INT_COLUMNS = ('Slot', 'TypedIdx', 'RouteId')
+
+
+class SheetRecord:
+    """Рядок аркуша з відомими колонками у __slots__ (dict-подібний інтерфейс)"""
+
+    __slots__ = ('_extra',)
+    COLUMNS = ()
+
+    def __init__(self, row: Dict[str, object]):
+        extra = {}
+        for key, value in row.items():
+            if key in self.COLUMNS:
+                object.__setattr__(self, key, value)
+            else:
+                extra[key] = value  # невідомі колонки не губимо
+        for key in self.COLUMNS:
+            if key not in row:
+                object.__setattr__(self, key, '')
+        self._extra = extra
+
+    # --- dict-подібний інтерфейс ---
+    def keys(self) -> List[str]:
+        return list(self.COLUMNS) + list(self._extra)
+
+    def items(self):
+        return [(k, self[k]) for k in self.keys()]
+
+    def __getitem__(self, key):
+        if key in self._extra:
+            return self._extra[key]
+        if key in self.COLUMNS:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key in self.COLUMNS:
+            setattr(self, key, value)
+        else:
+            self._extra[key] = value
+
+    def __contains__(self, key) -> bool:
+        return key in self.COLUMNS or key in self._extra
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def to_dict(self) -> Dict[str, object]:
+        return dict(self.items())
+
+    def __eq__(self, other) -> bool:
+        return type(self) is type(other) and self.to_dict() == other.to_dict()
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+    # __slots__ + pickle без __dict__
+    def __getstate__(self):
+        return self.to_dict()
+
+    def __setstate__(self, state):
+        self.__init__(state)
+
+
+class MechRecord(SheetRecord):
+    """Запис механізму будь-якого аркуша: спільні колонки у __slots__
+
+    Колонки сигналів DI_*/DO_* лишаються в _extra як є: які з них мапляться
+    в HAL, визначає реєстр mech_types (поля UDT), решта — лише теги PLC Tags.
+    """
+
+    __slots__ = ('Slot', 'TypedIdx', 'Name', 'Location', 'Enabled')
+    COLUMNS = __slots__
+
+
+# Аркуші, які читає завантажувач (ROUTES — необов'язковий)
+SHEET_NAMES = ('CONFIG',) + MECH_SHEETS + ('ROUTES',)
+
+_SLOT_SPLIT_RE = re.compile(r'[,;\s]+')
+_SLOT_RANGE_RE = re.compile(r'^(\d+)\s*(?:\.\.|-)\s*(\d+)$')
+
+
+def parse_slot_list(value) -> tuple:
+    """'0, 50, 100' / '0..3; 7' / 5 -> (0, 50, 100) / (0, 1, 2, 3, 7) / (5,) у порядку запису"""
+    if isinstance(value, (list, tuple)):
+        return tuple(int(v) for v in value)
+    if isinstance(value, bool):
+        raise ValueError(f"❌ Некоректний список слотів: {value!r}")
+    if isinstance(value, (int, float)):
+        if isinstance(value, float) and not value.is_integer():
+            raise ValueError(f"❌ Некоректний слот: {value!r}")
+        return (int(value),)
+    slots = []
+    text = str(value or '').strip()
+    for token in _SLOT_SPLIT_RE.split(text) if text else ():
+        m = _SLOT_RANGE_RE.match(token)
+        if m:
+            lo, hi = int(m.group(1)), int(m.group(2))
+            if hi < lo:
+                raise ValueError(f"❌ Некоректний діапазон слотів: {token!r}")
+            slots.extend(range(lo, hi + 1))
+        elif token.isdigit():
+            slots.append(int(token))
+        else:
+            raise ValueError(f"❌ Некоректний слот: {token!r}")
+    return tuple(slots)
+
+
+class RouteRecord(SheetRecord):
+    """Маршрут з аркуша ROUTES: RouteId (1..12) і слоти, які він займає"""
+
+    __slots__ = ('RouteId', 'Name', 'Enabled', 'Slots')
+    COLUMNS = __slots__
+
+    def __init__(self, row: Dict[str, object]):
+        super().__init__(row)
+        try:
+            self.Slots = parse_slot_list(self.Slots)
+        except ValueError as e:
+            raise ValueError(f"{e} (маршрут {self.RouteId or '?'} '{self.Name}')") from None
+
+
+class LoadedConfig:
+    """Результат завантаження книги"""
+
+    __slots__ = ('source_hash', 'config', 'sheets', 'routes', 'from_cache')
+
+    def __init__(self, source_hash: str, config: Dict[str, object],
+                 sheets: Dict[str, List[MechRecord]], routes: List[RouteRecord] = None,
+                 from_cache: bool = False):
+        self.source_hash = source_hash
+        self.config = config
+        self.sheets = sheets          # аркуш механізмів (MECH_SHEETS) -> записи
+        self.routes = routes or []
+        self.from_cache = from_cache
+
+
+def file_sha256(path: Path) -> str:
+    """SHA-256 вмісту файлу"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _normalize_cell(column: str, value):
+    """Порожні клітинки -> '' (як fillna('')), цілі числа з float -> int"""
+    if value is None:
+        return ''
+    if isinstance(value, str):
+        value = value.strip()
+        if column in INT_COLUMNS and value.lstrip('-').isdigit():
+            return int(value)
+        return value
+    if isinstance(value, float) and value.is_integer() and column in INT_COLUMNS:
+        return int(value)
+    return value
+
+
+def _iter_sheet_rows(ws):
+    """Рядки аркуша як dict (заголовок — перший рядок), порожні рядки пропускаються"""
+    rows = ws.iter_rows(values_only=True)
+    header = next(rows, None)
+    if header is None:
+        return
+    columns = [str(h).strip() if h is not None else '' for h in header]
+    for values in rows:
+        if values is None or all(v is None or v == '' for v in values):
+            continue
+        row = {}
+        for column, value in zip(columns, values):
+            if column:
+                row[column] = _normalize_cell(column, value)
+        for column in columns[len(values):]:
+            if column:
+                row[column] = ''
+        yield row
+
+
+def _parse_sheet(wb, sheet: str, path: Path):
+    """CONFIG -> dict параметрів; аркуш механізмів / ROUTES -> записи з Enabled=TRUE"""
+    if sheet not in wb.sheetnames:
+        if sheet == 'ROUTES':
+            return []  # ROUTES — необов'язковий аркуш (старі книги без маршрутів)
+        raise ValueError(f"❌ Аркуш {sheet} відсутній у {path}")
+    if sheet == 'CONFIG':
+        config = {}
+        for row in _iter_sheet_rows(wb['CONFIG']):
+            if row.get('Parameter', '') != '':
+                config[row['Parameter']] = row.get('Value', '')
+        return config
+    record_type = RouteRecord if sheet == 'ROUTES' else MechRecord
+    # Тільки Enabled=TRUE
+    return [record_type(row) for row in _iter_sheet_rows(wb[sheet]) if row.get('Enabled') == True]
+
+
+def parse_sheets(path: Path, sheets: Iterable[str]) -> Dict[str, object]:
+    """Розібрати лише вказані аркуші (openpyxl read_only не читає решту)"""
+    from openpyxl import load_workbook
+
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        return {sheet: _parse_sheet(wb, sheet, path) for sheet in sheets}
+    finally:
+        wb.close()
+
+
+def parse_workbook(path: Path, source_hash: Optional[str] = None) -> LoadedConfig:
+    """Розібрати книгу без кешу (потоковий режим openpyxl)"""
+    parsed = parse_sheets(path, SHEET_NAMES)
+    return LoadedConfig(source_hash or file_sha256(path), parsed['CONFIG'],
+                        {sheet: parsed[sheet] for sheet in MECH_SHEETS}, parsed['ROUTES'])
+
+
+# ============================================================================
+# Хеші аркушів (без openpyxl) і часткове перечитування
+# ============================================================================
+_REL_NS = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}id'
+_SHARED_CELL_RE = re.compile(rb'(<c\b[^>]*\bt="s"[^>]*>\s*<v>)(\d+)(</v>)')
+_SHARED_ITEM_RE = re.compile(rb'<si\b[^>]*?(?:/>|>(.*?)</si>)', re.S)
+_SHEET_VIEWS_RE = re.compile(rb'<sheetViews\b.*?</sheetViews>', re.S)
+
+
+def _sheet_parts(zf: zipfile.ZipFile) -> Dict[str, str]:
+    """Ім'я аркуша -> шлях його XML усередині xlsx"""
+    rels = ET.fromstring(zf.read('xl/_rels/workbook.xml.rels'))
+    targets = {}
+    for rel in rels:
+        target = rel.get('Target', '')
+        targets[rel.get('Id')] = target.lstrip('/') if target.startswith('/') \
+            else posixpath.normpath(posixpath.join('xl', target))
+    parts = {}
+    for node in ET.fromstring(zf.read('xl/workbook.xml')).iter():
+        if node.tag.endswith('}sheet') and node.get(_REL_NS) in targets:
+            parts[node.get('name')] = targets[node.get(_REL_NS)]
+    return parts
+
+
+def sheet_digests(path) -> Dict[str, str]:
+    """SHA-256 вмісту кожного аркуша прямо з zip (мілісекунди, без openpyxl)
+
+    Індекси спільних рядків підставляються самими рядками: Excel при
+    збереженні перебудовує sharedStrings.xml, і без цього "змінювались" би
+    всі аркуші. Стан вікна (виділення, прокрутка) у хеш не входить.
+    """
+    with zipfile.ZipFile(path) as zf:
+        strings = []
+        if 'xl/sharedStrings.xml' in zf.namelist():
+            strings = [m.group(1) or b'' for m in _SHARED_ITEM_RE.finditer(zf.read('xl/sharedStrings.xml'))]
+
+        def resolve(m):
+            index = int(m.group(2))
+            return m.group(1) + (strings[index] if index < len(strings) else m.group(2)) + m.group(3)
+
+        digests = {}
+        for sheet, part in _sheet_parts(zf).items():
+            data = _SHEET_VIEWS_RE.sub(b'', zf.read(part))
+            digests[sheet] = hashlib.sha256(_SHARED_CELL_RE.sub(resolve, data)).hexdigest()
+    return digests
+
+
+def reload_config(excel_path, previous: LoadedConfig, sheets: Iterable[str],
+                  use_cache: bool = True) -> LoadedConfig:
+    """Нова конфігурація: аркуші sheets перечитуються, решта береться з previous"""
+    path = Path(excel_path)
+    parsed = parse_sheets(path, [s for s in SHEET_NAMES if s in set(sheets)])
+    loaded = LoadedConfig(file_sha256(path), parsed.get('CONFIG', previous.config),
+                          {sheet: parsed.get(sheet, previous.sheets[sheet]) for sheet in MECH_SHEETS},
+                          parsed.get('ROUTES', previous.routes))
+    if use_cache:
+        _write_snapshot(snapshot_path(path), loaded)
+    return loaded
+
+
+def snapshot_path(path: Path) -> Path:
+    """Шлях до знімка книги у .plc_cache/ поруч з нею"""
+    return path.parent / CACHE_DIR_NAME / f"{path.name}.snapshot"
+
+
+def _read_snapshot(snap: Path, source_hash: str) -> Optional[LoadedConfig]:
+    try:
+        with open(snap, 'rb') as f:
+            data = pickle.load(f)
+    except Exception:
+        return None  # відсутній/битий/старий знімок — просто перечитуємо книгу
+    if not isinstance(data, dict) or data.get('version') != SNAPSHOT_VERSION \
+            or data.get('source_hash') != source_hash:
+        return None
+    return LoadedConfig(source_hash, data['config'], data['sheets'], data['routes'], from_cache=True)
+
+
+def _write_snapshot(snap: Path, loaded: LoadedConfig):
+    try:
+        snap.parent.mkdir(exist_ok=True)
+        tmp = snap.with_suffix('.tmp')
+        with open(tmp, 'wb') as f:
+            pickle.dump({
+                'version': SNAPSHOT_VERSION,
+                'source_hash': loaded.source_hash,
+                'config': loaded.config,
+                'sheets': loaded.sheets,
+                'routes': loaded.routes,
+            }, f, protocol=pickle.HIGHEST_PROTOCOL)
+        tmp.replace(snap)
+    except OSError:
+        pass  # каталог лише для читання — працюємо без кешу
+
+
+def load_config(excel_path, use_cache: bool = True) -> LoadedConfig:
+    """Завантажити конфігурацію: зі знімка, якщо книга не змінилась, інакше з xlsx"""
+    path = Path(excel_path)
+    if not path.exists():
+        raise FileNotFoundError(str(path))
+
+    if not use_cache:
+        return parse_workbook(path)
+
+    source_hash = file_sha256(path)
+    snap = snapshot_path(path)
+    cached = _read_snapshot(snap, source_hash)
+    if cached is not None:
+        return cached
+
+    loaded = parse_workbook(path, source_hash)
+    _write_snapshot(snap, loaded)
+    return loaded
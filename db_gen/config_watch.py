@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Режим спостереження (--watch): генератор лишається в пам'яті й оновлює
+артефакти після кожного збереження книги
+
+- зміна файлу — опитування os.stat (mtime/розмір) кожні interval с: однаково
+  працює на Windows (робоче місце з TIA Portal) і Linux, без залежностей
+- Excel зберігає через тимчасовий файл і перейменування — подія обробляється,
+  коли mtime/розмір стабільні settle с і zip читається
+- хеші аркушів (config_loader.sheet_digests) — перечитуються лише змінені
+  аркуші, решта записів береться з пам'яті
+- generate_all(incremental=True): маніфест перебудовує лише артефакти,
+  вхідні колонки яких змінились
+- помилки валідації друкуються одразу, сесія чекає наступного збереження
+
+Використання:
+    python generate_plc_config.py --watch
+    python generate_plc_config.py site.xlsx -o build --watch --watch-interval 0.1
+"""
+
+import os
+import copy
+import time
+import zipfile
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from config_loader import LoadedConfig, SHEET_NAMES, load_config, reload_config, sheet_digests
+
+DEFAULT_INTERVAL = 0.2   # с між опитуваннями
+SETTLE_SECONDS = 0.1     # файл має бути незмінним стільки часу перед читанням
+READ_RETRIES = 10        # спроб прочитати книгу, яку Excel ще дописує
+
+
+class WorkbookWatcher:
+    """Очікування зміни файлу опитуванням os.stat"""
+
+    def __init__(self, path, interval: float = DEFAULT_INTERVAL, settle: float = SETTLE_SECONDS):
+        self.path = Path(path)
+        self.interval = interval
+        self.settle = settle
+        self.last = self._stat()
+
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None  # файл тимчасово зник (збереження через перейменування)
+        return st.st_mtime_ns, st.st_size
+
+    def wait_change(self, timeout: Optional[float] = None) -> bool:
+        """Чекати, доки файл зміниться і стабілізується; False — вийшов timeout"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            current = self._stat()
+            if current is not None and current != self.last:
+                time.sleep(self.settle)
+                if self._stat() == current:
+                    self.last = current
+                    return True
+                continue
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(self.interval)
+
+
+def _copy_loaded(loaded: LoadedConfig) -> LoadedConfig:
+    """Копії записів для генератора (compact_typed_idx змінює TypedIdx на місці)"""
+    sheets = {sheet: [copy.copy(m) for m in mechs] for sheet, mechs in loaded.sheets.items()}
+    return LoadedConfig(loaded.source_hash, dict(loaded.config), sheets, list(loaded.routes))
+
+
+class WatchSession:
+    """Генератор у пам'яті + перегенерація за змінами книги"""
+
+    def __init__(self, generator, output_dir: str, interval: float = DEFAULT_INTERVAL,
+                 full: bool = False):
+        self.generator = generator
+        self.output_dir = output_dir
+        self.full = full                # перша збірка без маніфесту (--full)
+        self.watcher = WorkbookWatcher(generator.excel_path, interval)
+        self.loaded: Optional[LoadedConfig] = None   # незмінені записи (без ущільнення)
+        self.digests: Dict[str, str] = {}
+        self.builds = 0
+
+    def _digests(self) -> Dict[str, str]:
+        digests = sheet_digests(self.generator.excel_path)
+        return {sheet: digests.get(sheet, '') for sheet in SHEET_NAMES}
+
+    def _build(self, changed: List[str]) -> bool:
+        """Застосувати self.loaded, валідувати і згенерувати; False — помилка валідації/генерації"""
+        gen = self.generator
+        started = time.perf_counter()
+        gen.apply_config(_copy_loaded(self.loaded))
+        try:
+            gen.validate_excel()
+        except ValueError as e:
+            print(f"❌ Помилка валідації: {e}  ({(time.perf_counter() - started) * 1000:.0f} мс)")
+            return False
+        try:
+            gen.generate_all(self.output_dir, incremental=self.builds > 0 or not self.full)
+        except ValueError as e:  # бюджет циклу, немає Main.scl для --cycle-diag, ...
+            print(f"❌ Помилка генерації: {e}  ({(time.perf_counter() - started) * 1000:.0f} мс)")
+            return False
+        self.builds += 1
+        written = [name for name, st in gen.artifact_stats.items() if st['status'] == 'written']
+        print(f"⏱️  {datetime.now().strftime('%H:%M:%S')} аркуші: {', '.join(changed) or '—'}; "
+              f"перезаписано {len(written)} файлів за {(time.perf_counter() - started) * 1000:.0f} мс")
+        return True
+
+    def start(self) -> bool:
+        """Холодне завантаження (зі знімком .plc_cache/) і перша збірка"""
+        print(f"📖 Завантаження {self.generator.excel_path}...")
+        digests = self._digests()
+        try:
+            self.loaded = load_config(self.generator.excel_path, use_cache=self.generator.use_cache)
+        except ValueError as e:
+            print(f"❌ Помилка у книзі: {e}")
+            return False  # self.digests порожні — наступне збереження перечитає все
+        self.digests = digests
+        return self._build(list(SHEET_NAMES))
+
+    def refresh(self) -> Optional[bool]:
+        """Перечитати змінені аркуші й перегенерувати
+
+        None — дані аркушів не змінились (лише формат/вигляд). OSError /
+        BadZipFile — книгу ще дописують (повтор у _refresh_with_retry).
+        """
+        digests = self._digests()
+        changed = [sheet for sheet in SHEET_NAMES if digests[sheet] != self.digests.get(sheet)]
+        if not changed:
+            print("💤 Дані аркушів не змінились")
+            return None
+        print(f"\n🔄 Змінені аркуші: {', '.join(changed)}")
+        try:
+            if self.loaded is None:
+                self.loaded = load_config(self.generator.excel_path, use_cache=self.generator.use_cache)
+            else:
+                self.loaded = reload_config(self.generator.excel_path, self.loaded, changed,
+                                            use_cache=self.generator.use_cache)
+        except ValueError as e:
+            self.digests = digests  # помилка в даних — чекаємо наступного збереження
+            print(f"❌ Помилка у книзі: {e}")
+            return False
+        self.digests = digests
+        return self._build(changed)
+
+    def _refresh_with_retry(self):
+        for _ in range(READ_RETRIES):
+            try:
+                self.refresh()
+                return
+            except (OSError, KeyError, zipfile.BadZipFile):
+                time.sleep(self.watcher.interval)  # Excel ще зберігає книгу
+            except Exception as e:  # сесія не повинна падати від однієї невдалої збірки
+                print(f"❌ Несподівана помилка: {type(e).__name__}: {e}")
+                return
+        print("⚠️  Книгу не вдалося прочитати — чекаю наступного збереження")
+
+    def run(self, max_events: Optional[int] = None) -> int:
+        """Цикл спостереження до Ctrl+C (або max_events змін файлу)"""
+        try:
+            self.start()
+        except (OSError, zipfile.BadZipFile) as e:
+            print(f"❌ Не вдалося прочитати {self.generator.excel_path}: {e}")
+            return 1
+        print(f"\n👀 Спостереження за {self.generator.excel_path} "
+              f"(опитування {self.watcher.interval:g} с, Ctrl+C — вихід)")
+        events = 0
+        try:
+            while max_events is None or events < max_events:
+                self.watcher.wait_change()
+                events += 1
+                self._refresh_with_retry()
+        except KeyboardInterrupt:
+            print("\n👋 Спостереження зупинено")
+        return 0
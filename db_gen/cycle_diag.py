@@ -0,0 +1,504 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Діагностика часу циклу OB1: інструментований Main + DB_CycleDiag та аналізатор знімків
+
+Генератор (опція --cycle-diag) додає до збірки:
+- UDT_CycleDiagStat — Last/Min/Max/Avg (мкс), Count, SumUs і гістограма з
+  фіксованими кошиками BUCKET_EDGES_US
+- DB_CycleDiag — стандартний (не оптимізований) доступ, щоб образ DB, знятий
+  з PLC (PUT/GET, snap7 db_read, ...), декодувався db_layout без TIA;
+  запис на кожен виклик верхнього рівня Main + Period (старт -> старт OB1)
+  і Body (усе тіло Main разом з вимірюванням)
+- FC_CycleDiagUpdate — оновлення статистики одним виміром
+- Main.scl — копія Main з кореня репозиторію: навколо кожного виклику
+  верхнього рівня (також усередині REGION) RUNTIME() з мітками в VAR_TEMP;
+  виклики всередині IF/CASE/циклів не вимірюються
+
+Reset := TRUE (HMI / watch table) обнуляє статистику; Main скидає прапорець
+наприкінці скану.
+
+Аналізатор: знімок DB (.bin — сирий образ, .json — {шлях: значення}) ->
+min/avg/max, перцентилі з гістограми та частка тіла Main кожного блока
+відносно бюджету OB1 10-20 мс (контракт 2.2). З --baseline (попередній
+знімок або звіт --report) — хто з'їв запас між конфігураціями.
+
+Використання:
+    python generate_plc_config.py elevator_config.xlsx --cycle-diag
+    python cycle_diag.py DB_CycleDiag.bin --scl-dir generated
+    python cycle_diag.py snap_v2.bin --baseline cycle_v1.json --report cycle_v2.json
+"""
+
+import re
+import sys
+import json
+import argparse
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from db_layout import DbLayout, StructCodec, check_standard_access, parse_db_access, parse_db_source
+from scl_parser import CallStmt, Region, parse_source
+from udt_layout import LayoutCalculator, _strip_comment, parse_udt_source
+
+DIAG_DB = 'DB_CycleDiag'
+DIAG_UDT = 'UDT_CycleDiagStat'
+DIAG_FC = 'FC_CycleDiagUpdate'
+
+# Межі кошиків гістограми, мкс: кошик k — BUCKET_EDGES_US[k-1] <= t < BUCKET_EDGES_US[k],
+# останній — t >= 20 мс (понад бюджет контракту)
+BUCKET_EDGES_US = (250, 500, 1000, 2000, 5000, 10000, 15000, 20000)
+BUDGET_MS = (10.0, 20.0)  # контракт 2.2: "OB1 Cycle (10-20 мс)"
+
+PERIOD = 'Period'   # період OB1: від старту попереднього скану
+BODY = 'Body'       # тіло Main: усі виклики + вимірювання
+PERCENTILES = (50, 95, 99)
+
+_CALL_INDENT_RE = re.compile(r'^(\s*)')
+
+
+# ============================================================================
+# Генерація SCL
+# ============================================================================
+def main_calls(text: str, source: str = 'Main.scl') -> List[Tuple[str, int, int]]:
+    """Виклики верхнього рівня OB Main: [(ім'я запису DB, перший рядок, останній рядок)]
+
+    Рядки 0-based; кінець виклику — рядок з ';' після закритої дужки.
+    """
+    blocks = [b for b in parse_source(text, source) if b.kind == 'ORGANIZATION_BLOCK']
+    if not blocks:
+        raise ValueError(f"❌ {source}: ORGANIZATION_BLOCK не знайдено")
+
+    stmts = []
+    pending = list(blocks[0].body)
+    while pending:
+        stmt = pending.pop(0)
+        if isinstance(stmt, Region):
+            pending[:0] = stmt.body
+        elif isinstance(stmt, CallStmt):
+            stmts.append(stmt)
+
+    lines = text.splitlines()
+    calls = []
+    used = {PERIOD, BODY}
+    for stmt in stmts:
+        base = re.sub(r'\W', '_', stmt.call.name)
+        name, k = base, 1
+        while name in used:
+            k += 1
+            name = f"{base}_{k}"
+        used.add(name)
+        calls.append((name, stmt.line - 1, _statement_end(lines, stmt.line - 1, source)))
+    return calls
+
+
+def _statement_end(lines: List[str], start: int, source: str) -> int:
+    depth = 0
+    opened = False
+    for n in range(start, len(lines)):
+        for ch in _strip_comment(lines[n]):
+            if ch == '(':
+                depth += 1
+                opened = True
+            elif ch == ')':
+                depth -= 1
+            elif ch == ';' and opened and depth == 0:
+                return n
+    raise ValueError(f"❌ {source}:{start + 1}: не знайдено кінець виклику")
+
+
+def _update(indent: str, stat: str) -> str:
+    return (f'{indent}"{DIAG_FC}"(Us := #CD_Sec * 1.0E6, Reset := "{DIAG_DB}".Reset,\n'
+            f'{indent}    Stat := "{DIAG_DB}".{stat});\n')
+
+
+def instrument_main(text: str, source: str = 'Main.scl') -> Tuple[str, List[str]]:
+    """Main з RUNTIME навколо викликів верхнього рівня -> (текст, записи DB по викликах)
+
+    RUNTIME(MEM) повертає секунди від попереднього виклику з тим самим MEM і
+    записує в MEM нову мітку, тож ланцюжок на одній CD_Mem міряє кожен виклик.
+    """
+    text = text.lstrip('﻿')
+    calls = main_calls(text, source)
+    if not calls:
+        raise ValueError(f"❌ {source}: у Main немає викликів для вимірювання")
+    lines = [line + '\n' for line in text.splitlines()]
+    ends = {end: name for name, _, end in calls}
+    indent = _CALL_INDENT_RE.match(lines[calls[0][1]]).group(1)
+
+    out = []
+    temps_done = False
+    for n, line in enumerate(lines):
+        upper = line.strip().upper()
+        if upper == 'BEGIN' and not temps_done:
+            out.append('VAR_TEMP\n' + _temps() + 'END_VAR\n\n')
+            temps_done = True
+        if upper == 'END_ORGANIZATION_BLOCK':
+            out.append(f'{indent}\n{indent}// --- {DIAG_DB}: тіло Main ---\n'
+                       f'{indent}#CD_Sec := RUNTIME(#CD_BodyMem);\n'
+                       + _update(indent, BODY) +
+                       f'{indent}"{DIAG_DB}".Reset := FALSE;\n')
+        out.append(line)
+        if upper == 'VAR_TEMP' and not temps_done:
+            out.append(_temps())
+            temps_done = True
+        elif upper == 'BEGIN':
+            out.append(f'{indent}// --- {DIAG_DB}: період OB1 (від старту попереднього скану) ---\n'
+                       f'{indent}#CD_Sec := RUNTIME("{DIAG_DB}".PeriodMem);\n'
+                       f'{indent}IF "{DIAG_DB}".Primed THEN\n'
+                       + _update(indent + '    ', PERIOD) +
+                       f'{indent}END_IF;\n'
+                       f'{indent}"{DIAG_DB}".Primed := TRUE;\n'
+                       f'{indent}#CD_Sec := RUNTIME(#CD_BodyMem);    // старт відліку тіла\n'
+                       f'{indent}#CD_Sec := RUNTIME(#CD_Mem);        // старт відліку виклику\n')
+        elif n in ends:
+            call_indent = _CALL_INDENT_RE.match(lines[_start_of(calls, n)]).group(1)
+            out.append(f'{call_indent}#CD_Sec := RUNTIME(#CD_Mem);\n'
+                       + _update(call_indent, ends[n]) +
+                       f'{call_indent}#CD_Sec := RUNTIME(#CD_Mem);    '
+                       f'// оновлення статистики — поза виміром\n')
+    return ''.join(out), [name for name, _, _ in calls]
+
+
+def _start_of(calls: List[Tuple[str, int, int]], end: int) -> int:
+    return next(start for _, start, last in calls if last == end)
+
+
+def _temps() -> str:
+    return ('  CD_Mem : LReal;       // RUNTIME: мітка початку поточного виклику\n'
+            '  CD_BodyMem : LReal;   // RUNTIME: мітка початку тіла Main\n'
+            '  CD_Sec : LReal;       // виміряна тривалість, с\n')
+
+
+def udt_source() -> str:
+    buckets = len(BUCKET_EDGES_US)
+    return f'''
+TYPE "{DIAG_UDT}"
+{{ S7_Optimized_Access := 'FALSE' }}
+VERSION : 1.0
+STRUCT
+  LastUs : UDINT;                       // останній вимір, мкс
+  MinUs  : UDINT;
+  MaxUs  : UDINT;
+  AvgUs  : UDINT;                       // SumUs / Count
+  Count  : UDINT;                       // вимірів від пуску / Reset
+  SumUs  : LREAL;
+  Hist   : ARRAY[0..{buckets}] OF UDINT;     // кошик k: BucketEdgeUs[k-1] <= t < BucketEdgeUs[k]
+END_STRUCT;
+END_TYPE
+'''
+
+
+def db_source(entries: List[str]) -> str:
+    rows = [('Reset', 'BOOL', "TRUE з HMI: обнулити статистику (скидає Main)"),
+            ('Primed', 'BOOL', "PeriodMem вже має мітку попереднього скану"),
+            ('PeriodMem', 'LREAL', "RUNTIME: старт попереднього OB1"),
+            ('BucketEdgeUs', f'ARRAY[0..{len(BUCKET_EDGES_US) - 1}] OF UDINT', "межі кошиків, мкс"),
+            (PERIOD, f'"{DIAG_UDT}"', "старт -> старт OB1 (бюджет 10-20 мс)"),
+            (BODY, f'"{DIAG_UDT}"', "усе тіло Main")]
+    rows += [(name, f'"{DIAG_UDT}"', "") for name in entries]
+    width = max(len(name) for name, _, _ in rows)
+    type_width = max(len(type_) for _, type_, _ in rows) + 1
+    fields = ''.join(f'    {name:<{width}} : {type_ + ";":<{type_width}}'
+                     f'{"  // " + comment if comment else ""}'.rstrip() + '\n'
+                     for name, type_, comment in rows)
+    edges = ''.join(f'    BucketEdgeUs[{k}] := {edge};\n' for k, edge in enumerate(BUCKET_EDGES_US))
+    return f'''
+DATA_BLOCK "{DIAG_DB}"
+{{ S7_Optimized_Access := 'FALSE' }}
+VERSION : 1.0
+
+VAR
+{fields}END_VAR
+
+BEGIN
+{edges}END_DATA_BLOCK
+'''
+
+
+def fc_source() -> str:
+    last = len(BUCKET_EDGES_US)
+    return f'''
+FUNCTION "{DIAG_FC}" : VOID
+{{ S7_Optimized_Access := 'TRUE' }}
+VERSION : 1.0
+VAR_INPUT
+  Us    : LREAL;                        // тривалість, мкс
+  Reset : BOOL;                         // обнулити статистику перед записом виміру
+END_VAR
+VAR_IN_OUT
+  Stat : "{DIAG_UDT}";
+END_VAR
+VAR_TEMP
+  Value  : UDINT;
+  Bucket : INT;
+  i      : INT;
+END_VAR
+
+BEGIN
+  IF #Reset THEN
+    #Stat.Count := 0;
+    #Stat.SumUs := 0.0;
+    #Stat.MinUs := 0;
+    #Stat.MaxUs := 0;
+    #Stat.AvgUs := 0;
+    FOR #i := 0 TO {last} DO
+      #Stat.Hist[#i] := 0;
+    END_FOR;
+  END_IF;
+
+  #Value := LREAL_TO_UDINT(#Us);
+  #Stat.LastUs := #Value;
+  IF #Stat.Count = 0 OR #Value < #Stat.MinUs THEN
+    #Stat.MinUs := #Value;
+  END_IF;
+  IF #Value > #Stat.MaxUs THEN
+    #Stat.MaxUs := #Value;
+  END_IF;
+  #Stat.Count := #Stat.Count + 1;
+  #Stat.SumUs := #Stat.SumUs + #Us;
+  #Stat.AvgUs := LREAL_TO_UDINT(#Stat.SumUs / UDINT_TO_LREAL(#Stat.Count));
+
+  // кошик: перша межа, більша за вимір; інакше останній (>= {BUCKET_EDGES_US[-1]} мкс)
+  #Bucket := {last};
+  FOR #i := 0 TO {last - 1} DO
+    IF #Value < "{DIAG_DB}".BucketEdgeUs[#i] THEN
+      #Bucket := #i;
+      EXIT;
+    END_IF;
+  END_FOR;
+  #Stat.Hist[#Bucket] := #Stat.Hist[#Bucket] + 1;
+END_FUNCTION
+'''
+
+
+# ============================================================================
+# Аналіз знімка DB
+# ============================================================================
+def load_layout(scl_dir) -> DbLayout:
+    """Розкладка DB_CycleDiag із згенерованих UDT_CycleDiagStat.scl + DB_CycleDiag.scl"""
+    directory = Path(scl_dir)
+    try:
+        udts = parse_udt_source((directory / f"{DIAG_UDT}.scl").read_text(encoding='utf-8-sig'))
+        db_text = (directory / f"{DIAG_DB}.scl").read_text(encoding='utf-8-sig')
+    except OSError as e:
+        raise ValueError(f"❌ {directory}: немає SCL діагностики циклу ({e}); "
+                         f"згенеруйте з --cycle-diag") from e
+    dbs = parse_db_source(db_text)
+    check_standard_access(DIAG_DB, parse_db_access(db_text).get(DIAG_DB, True))
+    return DbLayout(DIAG_DB, dbs[DIAG_DB], LayoutCalculator(udts))
+
+
+def read_snapshot(path, layout: DbLayout) -> Dict[str, object]:
+    """.bin — сирий образ DB (big-endian); .json — {шлях: значення}"""
+    path = Path(path)
+    if path.suffix.lower() == '.json':
+        values = json.loads(path.read_text(encoding='utf-8'))
+        if not isinstance(values, dict) or 'blocks' in values:
+            raise ValueError(f"❌ {path}: очікувався знімок {{шлях: значення}}")
+        return values
+    data = path.read_bytes()
+    if len(data) < layout.size:
+        raise ValueError(f"❌ {path}: {len(data)} B, образ {DIAG_DB} має {layout.size} B "
+                         f"(інша збірка Main?)")
+    return StructCodec(layout).unpack(data)
+
+
+def stat_entries(layout: DbLayout) -> List[str]:
+    """Записи UDT_CycleDiagStat у порядку DB (Period, Body, виклики Main)"""
+    return [f.name for f in layout.fields if f.type == DIAG_UDT]
+
+
+class BlockStats:
+    """Статистика одного запису DB_CycleDiag (час у мс)"""
+
+    __slots__ = ('name', 'count', 'last', 'min', 'max', 'avg', 'hist')
+
+    def __init__(self, name: str, values: Dict[str, object], buckets: int):
+        def us(field):
+            return values.get(f"{name}.{field}", 0) / 1000.0
+        self.name = name
+        self.count = int(values.get(f"{name}.Count", 0))
+        self.last, self.min, self.max, self.avg = (us(f) for f in ('LastUs', 'MinUs', 'MaxUs', 'AvgUs'))
+        self.hist = [int(values.get(f"{name}.Hist[{k}]", 0)) for k in range(buckets)]
+
+    def percentile(self, q: float, edges_ms: List[float]) -> float:
+        """Верхня межа кошика з q-м перцентилем (обмежена min/max)"""
+        total = sum(self.hist)
+        if not total:
+            return 0.0
+        need = total * q / 100.0
+        seen = 0
+        for k, n in enumerate(self.hist):
+            seen += n
+            if n and seen >= need:
+                upper = edges_ms[k] if k < len(edges_ms) else self.max
+                return min(max(upper, self.min), self.max)
+        return self.max
+
+    def to_dict(self, edges_ms: List[float]) -> dict:
+        out = {'count': self.count, 'last_ms': self.last, 'min_ms': self.min,
+               'avg_ms': self.avg, 'max_ms': self.max, 'hist': self.hist}
+        out.update({f"p{q}_ms": self.percentile(q, edges_ms) for q in PERCENTILES})
+        return out
+
+
+class CycleReport:
+    """Декодований знімок: статистика по записах + оцінка відносно бюджету"""
+
+    def __init__(self, values: Dict[str, object], entries: List[str], source: str = ''):
+        self.source = source
+        buckets = len(BUCKET_EDGES_US) + 1
+        edges = [values.get(f"BucketEdgeUs[{k}]", edge) for k, edge in enumerate(BUCKET_EDGES_US)]
+        self.edges_ms = [edge / 1000.0 for edge in edges]
+        self.blocks = {name: BlockStats(name, values, buckets) for name in entries}
+        self.reset_pending = bool(values.get('Reset', False))
+
+    @property
+    def calls(self) -> List[BlockStats]:
+        return [b for name, b in self.blocks.items() if name not in (PERIOD, BODY)]
+
+    @property
+    def cycle(self) -> BlockStats:
+        """Період OB1, якщо вже виміряний, інакше тіло Main"""
+        period = self.blocks.get(PERIOD)
+        return period if period is not None and period.count else self.blocks[BODY]
+
+    def share(self, block: BlockStats) -> float:
+        body = self.blocks[BODY].avg
+        return block.avg / body if body else 0.0
+
+    def verdict(self, budget: Tuple[float, float] = BUDGET_MS) -> Tuple[str, str]:
+        p99 = self.cycle.percentile(99, self.edges_ms)
+        low, high = budget
+        if p99 <= low:
+            return 'ok', f"✅ p99 {p99:.2f} мс у межах {low:g} мс"
+        if p99 <= high:
+            return 'warn', f"⚠️  p99 {p99:.2f} мс між {low:g} і {high:g} мс (запас {high - p99:.2f} мс)"
+        return 'over', f"❌ p99 {p99:.2f} мс перевищує {high:g} мс"
+
+    def to_dict(self, budget: Tuple[float, float] = BUDGET_MS) -> dict:
+        status, message = self.verdict(budget)
+        return {
+            'source': self.source,
+            'budget_ms': list(budget),
+            'cycle': self.cycle.name,
+            'status': status,
+            'verdict': message,
+            'bucket_edges_ms': self.edges_ms,
+            'blocks': {name: b.to_dict(self.edges_ms) for name, b in self.blocks.items()},
+        }
+
+
+def load_baseline(path, layout: DbLayout) -> Dict[str, dict]:
+    """Попередня конфігурація: звіт --report або знімок DB -> {запис: статистика}"""
+    path = Path(path)
+    if path.suffix.lower() == '.json':
+        data = json.loads(path.read_text(encoding='utf-8'))
+        if isinstance(data, dict) and 'blocks' in data:
+            return data['blocks']
+    values = read_snapshot(path, layout)
+    entries = sorted({key.split('.')[0] for key in values if key.endswith('.Count')})
+    return CycleReport(values, entries, str(path)).to_dict()['blocks']
+
+
+def margin_delta(report: CycleReport, baseline: Dict[str, dict]) -> List[Tuple[str, float, float]]:
+    """[(запис, Δavg мс, Δp99 мс)] для викликів, від найбільшого приросту avg"""
+    rows = []
+    for block in report.calls:
+        old = baseline.get(block.name)
+        if old is None:
+            rows.append((block.name, block.avg, block.percentile(99, report.edges_ms)))
+            continue
+        rows.append((block.name, block.avg - old['avg_ms'],
+                     block.percentile(99, report.edges_ms) - old['p99_ms']))
+    return sorted(rows, key=lambda row: -row[1])
+
+
+def check_cycle(report: CycleReport, budget: Tuple[float, float] = BUDGET_MS):
+    """ValueError, якщо p99 циклу перевищує верхню межу бюджету"""
+    status, message = report.verdict(budget)
+    if status == 'over':
+        top = ', '.join(f"{b.name} {b.avg:.2f} мс" for b in
+                        sorted(report.calls, key=lambda b: -b.avg)[:3])
+        raise ValueError(f"{message}; найдорожчі в середньому: {top}")
+
+
+def _bucket_labels(edges_ms: List[float]) -> List[str]:
+    labels = [f"<{edges_ms[0]:g}"]
+    labels += [f"{lo:g}-{hi:g}" for lo, hi in zip(edges_ms, edges_ms[1:])]
+    labels.append(f">={edges_ms[-1]:g}")
+    return labels
+
+
+def print_report(report: CycleReport, budget: Tuple[float, float] = BUDGET_MS,
+                 baseline: Dict[str, dict] = None):
+    """Звіт у стилі scan_cost.print_estimate"""
+    cycle = report.cycle
+    print(f"\n⏱️  Час циклу OB1 за {DIAG_DB} ({report.source or 'знімок'}): "
+          f"{cycle.count} вимірів {cycle.name}, бюджет контракту {budget[0]:g}-{budget[1]:g} мс")
+    if report.reset_pending:
+        print("   ⚠️  Reset = TRUE: знімок зроблено до обнулення статистики")
+    print(f"   {'Запис':<26} {'вимірів':>9} {'min':>8} {'avg':>8} {'max':>8} "
+          f"{'p95':>8} {'p99':>8} {'тіла':>6}")
+    for block in report.blocks.values():
+        share = '' if block.name in (PERIOD, BODY) else f"{report.share(block):6.1%}"
+        print(f"   {block.name:<26} {block.count:>9} {block.min:>8.3f} {block.avg:>8.3f} "
+              f"{block.max:>8.3f} {block.percentile(95, report.edges_ms):>8.3f} "
+              f"{block.percentile(99, report.edges_ms):>8.3f} {share:>6}")
+    labels = _bucket_labels(report.edges_ms)
+    print(f"   гістограма {cycle.name}, мс: "
+          + ' | '.join(f"{label}: {n}" for label, n in zip(labels, cycle.hist)))
+    print(f"   {report.verdict(budget)[1]}")
+    if baseline:
+        rows = margin_delta(report, baseline)
+        print("\n🔀 Відносно базової конфігурації (Δavg / Δp99, мс):")
+        for name, d_avg, d_p99 in rows:
+            mark = '' if name in baseline else '  (новий)'
+            print(f"   {name:<26} {d_avg:>+8.3f} {d_p99:>+8.3f}{mark}")
+        old_cycle = baseline.get(cycle.name)
+        if old_cycle:
+            print(f"   {cycle.name:<26} {cycle.avg - old_cycle['avg_ms']:>+8.3f} "
+                  f"{cycle.percentile(99, report.edges_ms) - old_cycle['p99_ms']:>+8.3f}")
+        if rows and rows[0][1] > 0:
+            print(f"   найбільше запасу з'їв {rows[0][0]} (+{rows[0][1]:.3f} мс у середньому)")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Звіт часу циклу OB1 зі знімка DB_CycleDiag")
+    parser.add_argument('snapshot', help="знімок DB: .bin (сирий образ) або .json {шлях: значення}")
+    parser.add_argument('--scl-dir', default='generated',
+                        help="каталог з UDT_CycleDiagStat.scl / DB_CycleDiag.scl (збірка --cycle-diag)")
+    parser.add_argument('--baseline', default=None, metavar='PATH',
+                        help="звіт --report попередньої конфігурації (або знімок тієї ж збірки)")
+    parser.add_argument('--budget', type=float, nargs=2, default=list(BUDGET_MS), metavar=('LOW', 'HIGH'),
+                        help="бюджет циклу, мс (за замовчуванням 10 20 — контракт 2.2)")
+    parser.add_argument('--report', default=None, metavar='PATH', help="записати JSON-звіт")
+    args = parser.parse_args(argv)
+
+    try:
+        layout = load_layout(args.scl_dir)
+        values = read_snapshot(args.snapshot, layout)
+        baseline = load_baseline(args.baseline, layout) if args.baseline else None
+    except ValueError as e:
+        print(e)
+        return 1
+    budget = tuple(args.budget)
+    report = CycleReport(values, stat_entries(layout), args.snapshot)
+    print_report(report, budget, baseline)
+
+    if args.report:
+        path = Path(args.report)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(report.to_dict(budget), indent=2, ensure_ascii=False) + '\n',
+                        encoding='utf-8')
+        print(f"💾 Звіт: {path}")
+    try:
+        check_cycle(report, budget)
+    except ValueError as e:
+        print(e)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
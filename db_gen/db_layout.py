@@ -0,0 +1,516 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Компілятор розкладки UDT/DB -> NumPy dtype та struct-кодеки образів DB
+
+- розбирає UDT_*.scl (udt_layout.parse_udt_source) та DB_*.scl (VAR ... END_VAR)
+- рахує зміщення за правилами стандартного доступу S7 (udt_layout.LayoutCalculator)
+- будує вкладений NumPy structured dtype (big-endian, як у PLC): образ DB
+  декодується одним np.frombuffer без копіювання, поле — memoryview-зріз
+- BOOL: поле 'u1' на байті з бітом (кілька BOOL одного байта перекриваються),
+  читання/запис — через DbLayout.get()/set() або маску біта з bool_bits
+- StructCodec: плаский struct.Struct для коду без NumPy
+- лише DB зі стандартним доступом ({ S7_Optimized_Access := 'FALSE' }):
+  в оптимізованих DB (атрибут 'TRUE' або відсутній — типово для S7-1200/1500)
+  зміщення призначає TIA, сталих адрес немає — такі DB відхиляються
+- кеш розкладок у .plc_cache/layouts.json за SHA-256 джерел; при зміні
+  джерел — diff полів (додано / видалено / зсунуто / змінено тип, розмір)
+
+Використання:
+    python db_layout.py .. --db DB_ScadaToPlc_RouteCmd --fields
+    python db_layout.py .. --diff          # зміни відносно попередньої збірки
+"""
+
+import re
+import sys
+import json
+import struct
+import hashlib
+import argparse
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from config_loader import CACHE_DIR_NAME
+from udt_layout import Field, LayoutCalculator, _parse_type, _strip_comment, parse_udt_source
+
+LAYOUT_CACHE_NAME = 'layouts.json'
+LAYOUT_CACHE_VERSION = 2
+
+# Елементарний тип S7 -> (NumPy, struct); порядок байтів — big-endian
+S7_CODECS = {
+    'BYTE': ('u1', 'B'), 'CHAR': ('u1', 'B'), 'SINT': ('i1', 'b'), 'USINT': ('u1', 'B'),
+    'WORD': ('>u2', 'H'), 'INT': ('>i2', 'h'), 'UINT': ('>u2', 'H'), 'DATE': ('>u2', 'H'),
+    'S5TIME': ('>u2', 'H'), 'WCHAR': ('>u2', 'H'),
+    'DWORD': ('>u4', 'I'), 'DINT': ('>i4', 'i'), 'UDINT': ('>u4', 'I'), 'REAL': ('>f4', 'f'),
+    'TIME': ('>i4', 'i'), 'TOD': ('>u4', 'I'), 'TIME_OF_DAY': ('>u4', 'I'),
+    'LWORD': ('>u8', 'Q'), 'LINT': ('>i8', 'q'), 'ULINT': ('>u8', 'Q'), 'LREAL': ('>f8', 'd'),
+    'LTIME': ('>i8', 'q'), 'DT': ('V8', '8s'), 'DATE_AND_TIME': ('V8', '8s'),
+}
+
+_DB_RE = re.compile(r'^\s*DATA_BLOCK\s+"([^"]+)"', re.IGNORECASE)
+_FIELD_RE = re.compile(r'^\s*([A-Za-z_]\w*)\s*:\s*(.+?)\s*;?\s*$')
+_PATH_RE = re.compile(r'([A-Za-z_]\w*)((?:\[-?\d+\])*)')
+_ACCESS_RE = re.compile(r"S7_Optimized_Access\s*:=\s*'(TRUE|FALSE)'", re.IGNORECASE)
+
+
+def parse_db_source(text: str) -> Dict[str, List[Field]]:
+    """DATA_BLOCK "X" ... VAR ... END_VAR -> {X: поля} (для DB з VAR-секцією)"""
+    blocks = {}
+    name = None
+    stack = []
+    for raw in text.replace('\t', ' ').splitlines():
+        line = _strip_comment(raw).strip()
+        if not line:
+            continue
+        m = _DB_RE.match(line)
+        if m:
+            name = m.group(1)
+            stack = []
+            continue
+        if name is None or line.startswith('{'):
+            continue
+        upper = line.upper().rstrip(';').strip()
+        if upper == 'VAR' and not stack:
+            stack.append([])
+            continue
+        if upper in ('END_VAR', 'END_STRUCT') and stack:
+            fields = stack.pop()
+            if stack:
+                stack[-1][-1].type = fields
+            else:
+                blocks[name] = fields
+            continue
+        if upper in ('BEGIN', 'END_DATA_BLOCK'):
+            name = None if upper == 'END_DATA_BLOCK' else name
+            stack = []
+            continue
+        m = _FIELD_RE.match(line)
+        if m and stack:
+            declared = m.group(2).split(':=')[0].strip()
+            if declared.upper() == 'STRUCT':
+                stack[-1].append(Field(m.group(1), []))
+                stack.append([])
+            else:
+                stack[-1].append(Field(m.group(1), _parse_type(declared)))
+    return blocks
+
+
+def parse_db_access(text: str) -> Dict[str, bool]:
+    """DATA_BLOCK "X" -> True, якщо доступ оптимізований (немає S7_Optimized_Access := 'FALSE')"""
+    access = {}
+    name = None
+    for raw in text.splitlines():
+        line = _strip_comment(raw).strip()
+        m = _DB_RE.match(line)
+        if m:
+            name = m.group(1)
+            access[name] = True
+            continue
+        if name is None:
+            continue
+        m = _ACCESS_RE.search(line)
+        if m:
+            access[name] = m.group(1).upper() == 'TRUE'
+        elif line.upper().startswith(('VAR', 'BEGIN', 'END_DATA_BLOCK', 'NON_RETAIN')):
+            name = None  # атрибути блоку — лише у заголовку
+    return access
+
+
+def check_standard_access(name: str, optimized: bool):
+    """ValueError для оптимізованого DB: фіксовані зміщення кодека були б хибними"""
+    if optimized:
+        raise ValueError(f"❌ {name}: S7_Optimized_Access := 'TRUE' (або не задано) — у "
+                         f"оптимізованого DB немає сталих зміщень; для образу потрібен "
+                         f"{{ S7_Optimized_Access := 'FALSE' }}")
+
+
+def _type_name(type_) -> str:
+    if isinstance(type_, list):
+        return 'STRUCT'
+    if isinstance(type_, tuple):
+        return f"ARRAY[{type_[1]}..{type_[2]}] OF {_type_name(type_[3])}"
+    return type_
+
+
+class DbLayout:
+    """Розкладка одного UDT/DB: NumPy dtype, плоскі поля, доступ за шляхом"""
+
+    def __init__(self, name: str, fields: List[Field], calc: LayoutCalculator):
+        self.name = name
+        self.calc = calc
+        self.fields = fields
+        self.size = calc.layout(fields)
+        self._dtypes = {}
+        self.dtype = self._struct_dtype(fields, self.size)
+
+    # --- NumPy ---
+    def _field_dtype(self, type_):
+        if isinstance(type_, list):
+            return self._struct_dtype(type_, self.calc.struct_size(type_))
+        if isinstance(type_, tuple):
+            _, lo, hi, elem = type_
+            count = hi - lo + 1
+            if elem == 'BOOL':
+                return np.dtype(('u1', (self.calc.size_of(type_)[0] // 8,)))
+            return np.dtype((self._field_dtype(elem), (count,)))
+        if type_ == 'BOOL':
+            return np.dtype('u1')
+        if type_ in S7_CODECS:
+            return np.dtype(S7_CODECS[type_][0])
+        if type_ in self.calc.udts:
+            if type_ not in self._dtypes:
+                fields = self.calc.udts[type_]
+                self._dtypes[type_] = self._struct_dtype(fields, self.calc.udt_size(type_))
+            return self._dtypes[type_]
+        return np.dtype(('u1', (self.calc.size_of(type_)[0] // 8,)))  # STRING — сирі байти
+
+    def _struct_dtype(self, fields: List[Field], size: int) -> np.dtype:
+        self.calc.layout(fields)
+        formats = [self._field_dtype(f.type) for f in fields]  # вкладені layout() до зміщень
+        self.calc.layout(fields)
+        return np.dtype({'names': [f.name for f in fields], 'formats': formats,
+                         'offsets': [f.byte for f in fields], 'itemsize': size})
+
+    def view(self, buffer) -> np.ndarray:
+        """Образ DB як запис NumPy без копіювання (bytearray/memoryview — із записом)"""
+        if len(buffer) < self.size:
+            raise ValueError(f"❌ {self.name}: буфер {len(buffer)} B, потрібно {self.size} B")
+        return np.frombuffer(buffer, dtype=self.dtype, count=1)[0]
+
+    def new_image(self) -> bytearray:
+        return bytearray(self.size)
+
+    # --- плоскі поля ---
+    def leaves(self) -> List[Tuple[str, str, int, int, int]]:
+        """[(шлях, тип, байт, біт, бітів)] для всіх елементарних полів (масиви розгорнуто)"""
+        out = []
+        self._walk(self.fields, '', 0, out)
+        return out
+
+    def _walk(self, fields: List[Field], prefix: str, base: int, out: list):
+        self.calc.layout(fields)
+        for f in fields:
+            self._walk_type(f.type, prefix + f.name, base * 8 + f.byte * 8 + f.bit, out)
+            self.calc.layout(fields)  # вкладені типи могли переставити спільні Field
+
+    def _walk_type(self, type_, path: str, bit_pos: int, out: list):
+        if isinstance(type_, list):
+            self._walk(type_, path + '.', bit_pos // 8, out)
+        elif isinstance(type_, tuple):
+            _, lo, hi, elem = type_
+            if elem == 'BOOL':
+                for k in range(hi - lo + 1):
+                    pos = bit_pos + k
+                    out.append((f"{path}[{lo + k}]", 'BOOL', pos // 8, pos % 8, 1))
+                return
+            elem_bytes = self.calc.size_of(elem)[0] // 8
+            for k in range(hi - lo + 1):
+                self._walk_type(elem, f"{path}[{lo + k}]", bit_pos + k * elem_bytes * 8, out)
+        elif type_ in self.calc.udts:
+            self._walk(self.calc.udts[type_], path + '.', bit_pos // 8, out)
+        else:
+            bits = self.calc.size_of(type_)[0]
+            out.append((path, type_, bit_pos // 8, bit_pos % 8, bits))
+
+    def field_layout(self) -> Dict[str, List]:
+        """Верхній рівень: ім'я -> [тип, байт, біт, бітів] (для кешу та diff)"""
+        self.calc.layout(self.fields)
+        out = {}
+        for f in self.fields:
+            self.calc.layout(self.fields)
+            out[f.name] = [_type_name(f.type), f.byte, f.bit, f.size_bits]
+        return out
+
+    # --- доступ за шляхом ---
+    def locate(self, path: str) -> Tuple[str, int, int, int]:
+        """'BUF0_Routes[1].RC_Steps[0].RS_Slot' -> (тип, байт, біт, бітів)"""
+        fields = self.fields
+        byte = 0
+        type_ = None
+        bit = 0
+        for name, indexes in _PATH_RE.findall(path):
+            if fields is None:
+                raise ValueError(f"❌ {self.name}: '{path}' — '{name}' не є полем STRUCT")
+            self.calc.layout(fields)
+            field = next((f for f in fields if f.name == name), None)
+            if field is None:
+                raise ValueError(f"❌ {self.name}: поле '{name}' не знайдено ({path})")
+            byte += field.byte
+            bit = field.bit
+            type_ = field.type
+            for index in re.findall(r'-?\d+', indexes):
+                if not isinstance(type_, tuple):
+                    raise ValueError(f"❌ {self.name}: '{name}' не масив ({path})")
+                _, lo, hi, elem = type_
+                k = int(index) - lo
+                if not 0 <= k <= hi - lo:
+                    raise ValueError(f"❌ {self.name}: індекс {index} поза [{lo}..{hi}] ({path})")
+                if elem == 'BOOL':
+                    byte, bit = byte + k // 8, k % 8
+                else:
+                    byte += k * (self.calc.size_of(elem)[0] // 8)
+                type_ = elem
+            fields = type_ if isinstance(type_, list) else self.calc.udts.get(type_) \
+                if isinstance(type_, str) else None
+        return _type_name(type_), byte, bit, self.calc.size_of(type_)[0] if type_ != 'BOOL' else 1
+
+    def get(self, buffer, path: str):
+        type_, byte, bit, bits = self.locate(path)
+        if type_ == 'BOOL':
+            return bool(buffer[byte] >> bit & 1)
+        if type_ in S7_CODECS:
+            return struct.unpack_from('>' + S7_CODECS[type_][1], buffer, byte)[0]
+        return memoryview(buffer)[byte:byte + bits // 8]
+
+    def set(self, buffer, path: str, value):
+        type_, byte, bit, bits = self.locate(path)
+        if type_ == 'BOOL':
+            buffer[byte] = (buffer[byte] | 1 << bit) if value else (buffer[byte] & ~(1 << bit) & 0xFF)
+        elif type_ in S7_CODECS:
+            struct.pack_into('>' + S7_CODECS[type_][1], buffer, byte, value)
+        else:
+            memoryview(buffer)[byte:byte + bits // 8] = value
+
+    def slice(self, buffer, path: str) -> memoryview:
+        """memoryview на байти поля (UDT, масив, елемент) без копіювання"""
+        _, byte, _, bits = self.locate(path)
+        return memoryview(buffer)[byte:byte + max(bits // 8, 1)]
+
+
+class StructCodec:
+    """Плаский struct-кодек образу: dict шлях -> значення (BOOL — окремі біти)"""
+
+    def __init__(self, layout: DbLayout):
+        self.layout = layout
+        leaves = layout.leaves()
+        parts = []
+        self.names = []
+        self.bools = {}     # індекс байта BOOL у розпакованому кортежі -> [(шлях, біт)]
+        pos = 0
+        bool_slot = {}
+        for path, type_, byte, bit, bits in sorted(leaves, key=lambda x: (x[2], x[3])):
+            if type_ == 'BOOL':
+                if byte not in bool_slot:
+                    if byte > pos:
+                        parts.append(f'{byte - pos}x')
+                    parts.append('B')
+                    bool_slot[byte] = len(self.names)
+                    self.names.append(None)
+                    self.bools[bool_slot[byte]] = []
+                    pos = byte + 1
+                self.bools[bool_slot[byte]].append((path, bit))
+                continue
+            if byte > pos:
+                parts.append(f'{byte - pos}x')
+            code = S7_CODECS[type_][1] if type_ in S7_CODECS else f'{bits // 8}s'
+            parts.append(code)
+            self.names.append(path)
+            pos = byte + bits // 8
+        if layout.size > pos:
+            parts.append(f'{layout.size - pos}x')
+        self.struct = struct.Struct('>' + ''.join(parts))
+
+    def unpack(self, buffer) -> Dict[str, object]:
+        values = self.struct.unpack_from(buffer)
+        out = {}
+        for k, (name, value) in enumerate(zip(self.names, values)):
+            if name is None:
+                for path, bit in self.bools[k]:
+                    out[path] = bool(value >> bit & 1)
+            else:
+                out[name] = value
+        return out
+
+    def pack(self, values: Dict[str, object], buffer=None) -> bytearray:
+        buffer = buffer if buffer is not None else bytearray(self.layout.size)
+        current = self.unpack(buffer)
+        current.update(values)
+        items = []
+        for k, name in enumerate(self.names):
+            if name is None:
+                items.append(sum(1 << bit for path, bit in self.bools[k] if current[path]))
+            else:
+                items.append(current[name])
+        self.struct.pack_into(buffer, 0, *items)
+        return buffer
+
+
+# ============================================================================
+# Компіляція з кешем та diff
+# ============================================================================
+def source_hash(paths: List[Path]) -> str:
+    digest = hashlib.sha256()
+    for path in sorted(paths):
+        digest.update(path.name.encode('utf-8'))
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def diff_layouts(old: Dict[str, dict], new: Dict[str, dict]) -> List[str]:
+    """Зміни розкладок: тип/блок додано або видалено, розмір, поля (тип, зміщення)"""
+    lines = []
+    for name in sorted(set(old) | set(new)):
+        if name not in new:
+            lines.append(f"- {name}: видалено")
+            continue
+        if name not in old:
+            lines.append(f"+ {name}: {new[name]['size']} B")
+            continue
+        a, b = old[name], new[name]
+        if a == b:
+            continue
+        if a['size'] != b['size']:
+            lines.append(f"~ {name}: {a['size']} B -> {b['size']} B")
+        else:
+            lines.append(f"~ {name}:")
+        fa, fb = a['fields'], b['fields']
+        for field in fa:
+            if field not in fb:
+                lines.append(f"    - {field} ({fa[field][0]} @ {fa[field][1]}.{fa[field][2]})")
+        for field in fb:
+            if field not in fa:
+                lines.append(f"    + {field} ({fb[field][0]} @ {fb[field][1]}.{fb[field][2]})")
+            elif fa[field] != fb[field]:
+                (ta, ba, bia, sa), (tb, bb, bib, sb) = fa[field], fb[field]
+                change = []
+                if ta != tb:
+                    change.append(f"{ta} -> {tb}")
+                if (ba, bia) != (bb, bib):
+                    change.append(f"@ {ba}.{bia} -> {bb}.{bib}")
+                if sa != sb:
+                    change.append(f"{sa // 8} B -> {sb // 8} B")
+                lines.append(f"    ~ {field}: {', '.join(change)}")
+    return lines
+
+
+class LayoutCompiler:
+    """Усі UDT_*.scl + DB_*.scl каталогу -> DbLayout за ім'ям (кеш за хешем джерел)"""
+
+    def __init__(self, directory, use_cache: bool = True):
+        self.directory = Path(directory)
+        self.paths = sorted(self.directory.glob('UDT_*.scl')) + sorted(self.directory.glob('DB_*.scl'))
+        if not self.paths:
+            raise ValueError(f"❌ UDT_*.scl / DB_*.scl не знайдено у {self.directory}")
+        self.source_hash = source_hash(self.paths)
+        self.cache_path = self.directory / CACHE_DIR_NAME / LAYOUT_CACHE_NAME
+        self.from_cache = False
+        self.diff = []
+        self.udts = {}
+        self.dbs = {}
+        self.optimized = set()  # DB з оптимізованим доступом: розкладки не будуються
+        for path in self.paths:
+            text = path.read_text(encoding='utf-8-sig')
+            if path.name.startswith('UDT_'):
+                self.udts.update(parse_udt_source(text))
+            else:
+                self.dbs.update(parse_db_source(text))
+                self.optimized.update(db for db, opt in parse_db_access(text).items() if opt)
+        self.calc = LayoutCalculator(self.udts)
+        self._layouts = {}
+        self.summary = self._load_or_build(use_cache)
+
+    def layout(self, name: str) -> DbLayout:
+        """DbLayout для UDT або DB з таким ім'ям"""
+        if name not in self._layouts:
+            if name in self.dbs:
+                check_standard_access(name, name in self.optimized)
+                fields = self.dbs[name]
+            elif name in self.udts:
+                fields = self.udts[name]
+            else:
+                raise ValueError(f"❌ UDT/DB '{name}' не знайдено у {self.directory}")
+            self._layouts[name] = DbLayout(name, fields, self.calc)
+        return self._layouts[name]
+
+    def names(self) -> List[str]:
+        """UDT + DB зі стандартним доступом (оптимізовані — у self.optimized)"""
+        return sorted(self.udts) + sorted(db for db in self.dbs if db not in self.optimized)
+
+    def _build_summary(self) -> Dict[str, dict]:
+        summary = {}
+        for name in self.names():
+            layout = self.layout(name)
+            summary[name] = {'size': layout.size, 'fields': layout.field_layout()}
+        return summary
+
+    def _load_or_build(self, use_cache: bool) -> Dict[str, dict]:
+        cached = {}
+        if use_cache:
+            try:
+                cached = json.loads(self.cache_path.read_text(encoding='utf-8'))
+            except (OSError, ValueError):
+                cached = {}
+            if cached.get('version') != LAYOUT_CACHE_VERSION:
+                cached = {}
+        if cached.get('source_hash') == self.source_hash:
+            self.from_cache = True
+            return cached['layouts']
+
+        summary = self._build_summary()
+        if cached.get('layouts'):
+            self.diff = diff_layouts(cached['layouts'], summary)
+        if use_cache:
+            try:
+                self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+                self.cache_path.write_text(json.dumps({
+                    'version': LAYOUT_CACHE_VERSION,
+                    'source_hash': self.source_hash,
+                    'layouts': summary,
+                }, indent=1, sort_keys=True) + '\n', encoding='utf-8')
+            except OSError:
+                pass  # кеш — лише прискорення
+        return summary
+
+
+def print_fields(layout: DbLayout, limit: int = 0):
+    leaves = layout.leaves()
+    print(f"📐 {layout.name}: {layout.size} B, {len(leaves)} елементарних полів")
+    for path, type_, byte, bit, bits in leaves[:limit or None]:
+        print(f"   {byte:6d}.{bit}  {path:<40} {type_}")
+    if limit and len(leaves) > limit:
+        print(f"   ... ще {len(leaves) - limit}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Розкладка UDT/DB S7 -> NumPy dtype / struct")
+    parser.add_argument('directory', nargs='?', default='..', help="каталог з UDT_*.scl та DB_*.scl")
+    parser.add_argument('--db', action='append', default=[], help="показати розкладку UDT/DB")
+    parser.add_argument('--fields', type=int, nargs='?', const=40, default=0, metavar='N',
+                        help="перші N елементарних полів (за замовчуванням 40)")
+    parser.add_argument('--diff', action='store_true', help="показати зміни відносно кешу")
+    parser.add_argument('--no-cache', action='store_true')
+    args = parser.parse_args(argv)
+
+    compiler = LayoutCompiler(args.directory, use_cache=not args.no_cache)
+    source = 'кеш' if compiler.from_cache else 'розбір джерел'
+    print(f"📦 {len(compiler.udts)} UDT, {len(compiler.dbs)} DB ({source}, "
+          f"{compiler.source_hash[:12]})")
+    if compiler.optimized:
+        print(f"⚠️  Оптимізований доступ, розкладку не побудовано: {', '.join(sorted(compiler.optimized))}")
+    for name in args.db or []:
+        try:
+            layout = compiler.layout(name)
+        except ValueError as e:
+            print(e)
+            return 1
+        if args.fields:
+            print_fields(layout, args.fields)
+        else:
+            print(f"   - {name:<34} {layout.size:6d} B  dtype itemsize {layout.dtype.itemsize}")
+    if not args.db:
+        for name, entry in compiler.summary.items():
+            print(f"   - {name:<34} {entry['size']:6d} B")
+    if args.diff or compiler.diff:
+        if compiler.diff:
+            print("🔀 Зміни розкладки відносно попередньої збірки:")
+            for line in compiler.diff:
+                print(f"   {line}")
+        elif args.diff:
+            print("✅ Розкладка не змінилась")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
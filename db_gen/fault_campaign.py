@@ -0,0 +1,581 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Кампанія інжекції аварій: тисячі випадкових сценаріїв маршрутів у пулі процесів
+
+Кейс — 1..3 маршрути (FB_RouteFSM, "імпульсні": START по черзі -> STOP у
+зворотному порядку) над 2..6 механізмами і розклад подій:
+- аварії заліза (vplc_sim.SimHardware — семантика FB_SimRedler: StartupTime_ms,
+  StopTime_ms, SimFault_* з часом від пуску, латч до ремонту)
+- повільний розгін (StartupTime_ms > таймауту FC -> FLT_NO_RUNFB / FLT_NO_FEEDBACK)
+- LocalManual / зняття Enable_OK на слоті на певний час
+- RT_CMD_STOP_OP оператора
+Ремонт (--repair-s): через заданий час після латча залізо ремонтується, а
+аварія механізму скидається з місцевого поста.
+
+Засувки в кроки маршрутів не потрапляють: FB_RouteFSM передає через арбітр
+CmdParam1 = 0, тож FC_Gate2P не рушає (SimHardware моделює їх для інших стендів).
+
+Виконання: кейси пакуються у 256 слотів одного VirtualPlc (FC механізмів
+векторно), кожен кейс — свій RouteEngine на спільній MechBus; пакети
+розподіляються по процесах. Результат кейса: стан/код маршруту, причина
+аварійної зупинки (ROUTE_ABRT_BY_FAULT/LOCAL/OPERATOR), час від події до
+безпечної зупинки (усі DO_* маршруту зняті) і до фіналу, owner-и, що лишились
+заблокованими (маршрут у фіналі або так і не дійшов до нього).
+
+Використання:
+    python fault_campaign.py --cases 2000 -j 8 --seed 1
+    python fault_campaign.py --cases 2000 --repair-s 0 --report campaign.json
+    python fault_campaign.py --case 137 --seed 1     # один кейс з хронологією
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List
+
+import numpy as np
+
+from scada_standin import percentiles
+from vplc_core import load_constants
+from vplc_mechs import SLOTS, VirtualPlc
+from vplc_routes import MechBus, RouteEngine, RouteStep
+from vplc_sim import SIM_PROFILES, SimHardware
+
+MOTOR_ARRAYS = ('Redler', 'Noria', 'Fan')
+ROUTE_FINAL = ('ROUTE_STS_DONE', 'ROUTE_STS_REJECTED', 'ROUTE_STS_ABORTED')
+BUS_INPUTS = ('Cmd', 'CmdParam1', 'OwnerCur', 'OwnerCurId', 'Enable_OK', 'LocalManual')
+BUS_OUTPUTS = ('Status', 'FLTCode', 'OwnerCur', 'OwnerCurId', 'LastCmd')
+# таймаут пуску FC (для аварії "повільний розгін")
+START_TIMEOUTS = {'Redler': 'TimeoutMs_Redler_Start', 'Noria': 'TimeoutMs_Noria_Start',
+                  'Fan': 'TimeoutMs_Fan_Feedback'}
+
+DEFAULT_HORIZON_S = 90
+DEFAULT_REPAIR_S = 20
+DEFAULT_CYCLE_MS = 10
+
+
+# ============================================================================
+# Розклади
+# ============================================================================
+def make_schedule(case: int, seed: int = 0) -> dict:
+    """Випадковий кейс (детерміновано від seed і номера кейса)"""
+    rng = random.Random(f"{seed}:{case}")
+    mechs, startup, routes = [], [], []
+    for _ in range(rng.choice((1, 1, 2, 2, 3))):
+        slots = []
+        for _ in range(rng.randint(2, 6)):
+            slots.append(len(mechs))
+            mechs.append(rng.choice(MOTOR_ARRAYS))
+            startup.append(rng.randint(500, 3500))
+        if routes and rng.random() < 0.2:
+            slots[0] = rng.choice(routes[-1]['slots'])   # спільний механізм -> конфлікт owner
+        routes.append({'start_ms': rng.randint(0, 5000), 'slots': slots})
+
+    faults, events = [], []
+    for _ in range(rng.choice((0, 1, 1, 1, 2, 3))):
+        route_no = rng.randrange(len(routes))
+        route = routes[route_no]
+        slot = rng.choice(route['slots'])
+        horizon = route['start_ms'] + sum(startup[s] for s in route['slots']) + 2000
+        roll = rng.random()
+        if roll < 0.55:
+            kind = rng.choice(list(SIM_PROFILES[mechs[slot]][1]))
+            faults.append((slot, kind, rng.randint(0, horizon - route['start_ms'])))
+        elif roll < 0.65:
+            faults.append((slot, 'SlowStart', 0))
+        elif roll < 0.8:
+            events.append((rng.randint(route['start_ms'], horizon), 'local', slot,
+                           rng.randint(1000, 10000)))
+        elif roll < 0.9:
+            events.append((rng.randint(route['start_ms'], horizon), 'disable', slot,
+                           rng.randint(1000, 10000)))
+        else:
+            events.append((rng.randint(route['start_ms'], horizon), 'operator', route_no, 0))
+    return {'case': case, 'seed': seed, 'mechs': mechs, 'startup_ms': startup,
+            'routes': routes, 'faults': faults, 'events': sorted(events)}
+
+
+def pack_batches(schedules: List[dict], slots: int = SLOTS) -> List[List[dict]]:
+    """Кейси -> пакети, що вміщаються в slots слотів одного VirtualPlc"""
+    batches, current, used = [], [], 0
+    for sched in schedules:
+        need = len(sched['mechs'])
+        if current and used + need > slots:
+            batches.append(current)
+            current, used = [], 0
+        current.append(sched)
+        used += need
+    if current:
+        batches.append(current)
+    return batches
+
+
+# ============================================================================
+# Виконання пакета
+# ============================================================================
+class _Route:
+    """Спостереження за одним маршрутом кейса"""
+
+    __slots__ = ('case', 'engine', 'no', 'slots', 'start_ms', 'started', 'trigger', 'trigger_ms',
+                 'abort_ms', 'safe_ms', 'final_ms')
+
+    def __init__(self, case: '_Case', engine: RouteEngine, no: int, slots: List[int], start_ms: int):
+        self.case = case
+        self.engine = engine
+        self.no = no                # RouteIdx у RouteEngine кейса (1..)
+        self.slots = slots          # глобальні слоти кроків
+        self.start_ms = start_ms
+        self.started = False
+        self.trigger = None         # перша подія, що зачепила маршрут під час виконання
+        self.trigger_ms = None
+        self.abort_ms = None
+        self.safe_ms = None
+        self.final_ms = None
+
+    @property
+    def fsm(self):
+        return self.engine.routes[self.no - 1].Fsm
+
+
+class _Case:
+    __slots__ = ('sched', 'base', 'engine', 'routes', 'events', 'log')
+
+    def __init__(self, sched: dict, base: int, engine: RouteEngine):
+        self.sched = sched
+        self.base = base
+        self.engine = engine
+        self.routes: List[_Route] = []
+        self.events = []            # (мс, дія, аргументи)
+        self.log: List[str] = []
+
+
+class CampaignBatch:
+    """Пакет кейсів: один VirtualPlc + SimHardware, по RouteEngine на кейс"""
+
+    def __init__(self, schedules: List[dict], constants=None, cycle_ms: int = DEFAULT_CYCLE_MS,
+                 repair_ms: int = DEFAULT_REPAIR_S * 1000, trace: bool = False):
+        c = self.c = constants or load_constants()
+        self.repair_ms = repair_ms
+        self.trace = trace
+        self.route_final = tuple(c[name] for name in ROUTE_FINAL)
+        self.route_names = {c[k]: k for k in c if k.startswith('ROUTE_STS_')}
+        self.flt_names = {c[k]: k for k in c if k.startswith('FLT_')}
+
+        mapping, counters, bases = {}, {array: 0 for array in SIM_PROFILES}, []
+        base = 0
+        for sched in schedules:
+            bases.append(base)
+            for i, array in enumerate(sched['mechs']):
+                mapping[base + i] = (array, counters[array])
+                counters[array] += 1
+            base += len(sched['mechs'])
+        self.plc = VirtualPlc(mapping, constants=c, cycle_ms=cycle_ms)
+        self.plc.make_healthy()
+        self.hw = SimHardware(self.plc)
+        self.bus = MechBus.from_arrays(self.plc.mechs)
+        self._synced = {name: self.plc.mechs[name].copy() for name in BUS_OUTPUTS}
+        self.typed_of = {slot: entry for slot, entry in mapping.items()}
+        self.slot_routes: Dict[int, List[_Route]] = {}
+
+        self.cases: List[_Case] = []
+        for sched, base in zip(schedules, bases):
+            engine = RouteEngine(self.bus, c, routes=len(sched['routes']), mechanisms=False)
+            case = _Case(sched, base, engine)
+            for no, route in enumerate(sched['routes'], 1):
+                slots = [base + s for s in route['slots']]
+                r = _Route(case, engine, no, slots, route['start_ms'])
+                case.routes.append(r)
+                for slot in slots:
+                    self.slot_routes.setdefault(slot, []).append(r)
+                steps = [RouteStep(s, c.RS_ACT_START, c.RS_WAIT_RUNNING) for s in slots]
+                steps += [RouteStep(s, c.RS_ACT_STOP, c.RS_WAIT_STOPPED) for s in reversed(slots)]
+                case.events.append((route['start_ms'], 'start', (r, steps)))
+            for local, array in enumerate(sched['mechs']):
+                self.hw.configure(array, mapping[base + local][1], startup_ms=sched['startup_ms'][local])
+            for local, kind, fault_ms in sched['faults']:
+                array, idx = mapping[base + local]
+                if kind == 'SlowStart':
+                    self.hw.configure(array, idx, startup_ms=c[START_TIMEOUTS[array]] + 2000)
+                else:
+                    self.hw.configure(array, idx, **{kind: fault_ms})
+            for at_ms, kind, target, duration in sched['events']:
+                if kind == 'operator':
+                    case.events.append((at_ms, 'operator', case.routes[target]))
+                else:
+                    field = 'LocalManual' if kind == 'local' else 'Enable_OK'
+                    value = kind == 'local'
+                    case.events.append((at_ms, kind, (base + target, field, value)))
+                    case.events.append((at_ms + duration, kind + '_end', (base + target, field, not value)))
+            case.events.sort(key=lambda e: e[0])
+            self.cases.append(case)
+        self._pending = sorted(((e[0], i, e) for i, case in enumerate(self.cases) for e in case.events),
+                               key=lambda x: (x[0], x[1]))
+        self._next_event = 0
+        self._repairs = []          # (мс, слот)
+        self._tripped_seen = np.zeros(SLOTS, dtype=np.bool_)
+        self._alarm_seen = np.zeros(SLOTS, dtype=np.bool_)
+        self.elapsed_ms = 0
+        self.scans = 0
+
+    # ------------------------------------------------------------------
+    def _note(self, case: _Case, text: str):
+        if self.trace:
+            case.log.append(f"{self.elapsed_ms / 1000:8.2f} с  {text}")
+
+    def _trigger(self, route: _Route, kind: str):
+        fsm = route.fsm
+        if route.trigger is None and route.started and fsm.RF_State not in self.route_final:
+            route.trigger, route.trigger_ms = kind, self.elapsed_ms
+            self._note(route.case, f"маршрут {route.no}: подія {kind}")
+
+    def _apply_events(self):
+        c = self.c
+        now = self.elapsed_ms
+        while self._next_event < len(self._pending) and self._pending[self._next_event][0] <= now:
+            _, i, (_, kind, arg) = self._pending[self._next_event]
+            self._next_event += 1
+            case = self.cases[i]
+            if kind == 'start':
+                route, steps = arg
+                case.engine.command(route.no, c.RT_CMD_START, steps)
+                route.started = True
+                self._note(case, f"маршрут {route.no}: START ({len(route.slots)} мех.)")
+            elif kind == 'operator':
+                case.engine.command(arg.no, c.RT_CMD_STOP_OP)
+                self._trigger(arg, 'operator')
+                self._note(case, f"маршрут {arg.no}: STOP_OP оператора")
+            else:
+                slot, field, value = arg
+                self.bus.set(field, slot, value)
+                self._note(case, f"слот {slot}: {field} := {value}")
+
+    def _sync_in(self):
+        """Записи арбітра/подій у шину -> DB_Mechs моделі FC"""
+        bus, mechs = self.bus, self.plc.mechs
+        for slot in bus.dirty:
+            for name in BUS_INPUTS:
+                mechs[name][slot] = getattr(bus, name)[slot]
+                if name in self._synced:
+                    self._synced[name][slot] = mechs[name][slot]
+        bus.dirty = set()
+
+    def _sync_out(self):
+        """Зміни FC механізмів -> шина (будять маршрути, що стежать за слотом)"""
+        bus, mechs = self.bus, self.plc.mechs
+        changed = np.zeros(SLOTS, dtype=np.bool_)
+        for name in BUS_OUTPUTS:
+            changed |= mechs[name] != self._synced[name]
+        for slot in np.nonzero(changed)[0].tolist():
+            for name in BUS_OUTPUTS:
+                getattr(bus, name)[slot] = int(mechs[name][slot])
+                self._synced[name][slot] = mechs[name][slot]
+            bus.mark(slot)
+        bus.dirty = set()
+
+    def _watch(self):
+        """Тригери маршрутів (аварія заліза, FLTCode, LocalManual, Enable_OK) і ремонти"""
+        plc, hw, c = self.plc, self.hw, self.c
+        tripped = np.zeros(SLOTS, dtype=np.bool_)
+        for array in SIM_PROFILES:
+            if plc.slots[array].size:
+                tripped[plc.slots[array]] = hw.tripped(array)[plc.index[array]]
+        mechs = plc.mechs
+        alarm = tripped | (mechs['FLTCode'] != c.FLT_NONE) | mechs['LocalManual'] | ~mechs['Enable_OK']
+        for slot in np.nonzero(alarm & ~self._alarm_seen)[0].tolist():
+            if tripped[slot]:
+                array, idx = self.typed_of[slot]
+                state = hw.state[array]
+                kind = 'trip:' + next(k for k in state['Tripped'] if state['Tripped'][k][idx])
+            elif mechs['FLTCode'][slot] != c.FLT_NONE:
+                kind = self.flt_names.get(int(mechs['FLTCode'][slot]), 'FLT_?')
+            elif mechs['LocalManual'][slot]:
+                kind = 'local'
+            else:
+                kind = 'disable'
+            for route in self.slot_routes.get(slot, ()):
+                self._trigger(route, kind)
+        self._alarm_seen = alarm
+        if self.repair_ms:
+            for slot in np.nonzero(tripped & ~self._tripped_seen)[0].tolist():
+                self._repairs.append((self.elapsed_ms + self.repair_ms, slot))
+            # FLT без латча заліза (повільний розгін) теж ремонтується
+            for slot in np.nonzero((mechs['FLTCode'] != c.FLT_NONE) & ~tripped & ~self._tripped_seen)[0].tolist():
+                if not any(s == slot for _, s in self._repairs):
+                    self._repairs.append((self.elapsed_ms + self.repair_ms, slot))
+        self._tripped_seen = tripped
+        if self._repairs:
+            due = [s for t, s in self._repairs if t <= self.elapsed_ms]
+            self._repairs = [(t, s) for t, s in self._repairs if t > self.elapsed_ms]
+            for slot in due:
+                array, idx = self.typed_of[slot]
+                hw.repair(array, idx)
+                hw.configure(array, idx, startup_ms=min(int(hw.state[array]['StartupTime_ms'][idx]),
+                                                        c[START_TIMEOUTS[array]] // 2))
+                if mechs['Status'][slot] == c.STS_FAULT:
+                    mechs['FLTCode'][slot] = c.FLT_NONE      # скидання з місцевого поста
+                    mechs['Status'][slot] = c.STS_IDLE
+                for route in self.slot_routes.get(slot, ()):
+                    self._note(route.case, f"слот {slot}: ремонт і скидання аварії")
+
+    def _powered(self) -> np.ndarray:
+        powered = np.zeros(SLOTS, dtype=np.bool_)
+        for array, fields in self.plc.typed.items():
+            if not self.plc.slots[array].size:
+                continue
+            drive = fields['DO_Open'] | fields['DO_Close'] if array == 'Gate' else fields['DO_Run']
+            powered[self.plc.slots[array]] = drive[self.plc.index[array]]
+        return powered
+
+    def _observe(self, open_routes: List[_Route]) -> List[_Route]:
+        powered = self._powered()
+        still = []
+        for route in open_routes:
+            fsm = route.fsm
+            if route.abort_ms is None and fsm.RF_AbortLatched:
+                route.abort_ms = self.elapsed_ms
+            if route.trigger_ms is not None and route.safe_ms is None and \
+                    not any(powered[s] for s in route.slots):
+                route.safe_ms = self.elapsed_ms
+                self._note(route.case, f"маршрут {route.no}: усі DO зняті")
+            if route.final_ms is None and route.started and fsm.RF_State in self.route_final:
+                route.final_ms = self.elapsed_ms
+                self._note(route.case, f"маршрут {route.no}: {self.route_names.get(fsm.RF_State)} "
+                                       f"(код {fsm.RF_ResultCode})")
+            if route.final_ms is None or (route.trigger_ms is not None and route.safe_ms is None):
+                still.append(route)
+        return still
+
+    def run(self, horizon_ms: int) -> List[dict]:
+        """Скани до horizon_ms або доки всі маршрути у фіналі й подій не лишилось"""
+        plc = self.plc
+        open_routes = [r for case in self.cases for r in case.routes]
+        last_event = self._pending[-1][0] if self._pending else 0
+        cycle = plc.clock.cycle_ms
+        while self.elapsed_ms < horizon_ms:
+            self._apply_events()
+            self.hw.step()
+            for case in self.cases:
+                case.engine.scan()
+            self._sync_in()
+            self._watch()
+            plc.scan()
+            self._sync_out()
+            self.scans += 1
+            self.elapsed_ms += cycle
+            open_routes = self._observe(open_routes)
+            if not open_routes and self.elapsed_ms > last_event and not self._repairs:
+                break
+        return [self._result(case) for case in self.cases]
+
+    def _result(self, case: _Case) -> dict:
+        c, bus = self.c, self.bus
+        routes = []
+        for r in case.routes:
+            fsm = r.fsm
+            owned = [s - case.base for s in r.slots
+                     if bus.OwnerCur[s] == c.OWNER_ROUTE and bus.OwnerCurId[s] == r.no]
+            routes.append({
+                'route': r.no,
+                'state': self.route_names.get(fsm.RF_State, str(fsm.RF_State)),
+                'result': fsm.RF_ResultCode,
+                'abort': fsm.RF_AbortLatched,
+                'trigger': r.trigger,
+                'trigger_ms': r.trigger_ms,
+                'abort_ms': None if r.abort_ms is None or r.trigger_ms is None else r.abort_ms - r.trigger_ms,
+                'safe_stop_ms': None if r.safe_ms is None or r.trigger_ms is None else r.safe_ms - r.trigger_ms,
+                'final_ms': None if r.final_ms is None or r.trigger_ms is None else r.final_ms - r.trigger_ms,
+                'owned': sorted(set(owned)),
+            })
+        out = {'case': case.sched['case'], 'seed': case.sched['seed'], 'routes': routes}
+        if self.trace:
+            out['log'] = case.log
+        return out
+
+
+def run_batch(job: dict) -> dict:
+    """Пакет у процесі пулу: розклади генеруються тут (передаються лише номери)"""
+    started = time.perf_counter()
+    schedules = [make_schedule(case, job['seed']) for case in job['cases']]
+    batch = CampaignBatch(schedules, cycle_ms=job['cycle_ms'], repair_ms=job['repair_ms'],
+                          trace=job.get('trace', False))
+    results = batch.run(job['horizon_ms'])
+    return {'results': results, 'scans': batch.scans, 'simulated_ms': batch.elapsed_ms,
+            'seconds': time.perf_counter() - started}
+
+
+# ============================================================================
+# Кампанія та звіт
+# ============================================================================
+def run_campaign(cases: int, seed: int = 0, jobs: int = 0, horizon_ms: int = DEFAULT_HORIZON_S * 1000,
+                 repair_ms: int = DEFAULT_REPAIR_S * 1000, cycle_ms: int = DEFAULT_CYCLE_MS) -> dict:
+    """Згенерувати cases кейсів, виконати пакетами в пулі процесів і агрегувати"""
+    # розміри кейсів потрібні для пакування — розклади дешеві, рахуються двічі
+    schedules = [make_schedule(case, seed) for case in range(cases)]
+    batches = pack_batches(schedules)
+    job_list = [{'cases': [s['case'] for s in batch], 'seed': seed, 'horizon_ms': horizon_ms,
+                 'repair_ms': repair_ms, 'cycle_ms': cycle_ms} for batch in batches]
+    workers = jobs or os.cpu_count() or 1
+    workers = max(1, min(workers, len(job_list) or 1))
+    print(f"🧨 Кампанія: {cases} кейсів у {len(job_list)} пакетах, процесів: {workers}")
+
+    started = time.perf_counter()
+    outputs = []
+
+    def _report(out):
+        outputs.append(out)
+        done = sum(len(o['results']) for o in outputs)
+        print(f"   [{len(outputs)}/{len(job_list)}] {done} кейсів, пакет {out['seconds']:.1f} с")
+
+    if workers == 1:
+        for job in job_list:
+            _report(run_batch(job))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(run_batch, job) for job in job_list]
+            for future in as_completed(futures):
+                _report(future.result())
+
+    results = sorted((r for o in outputs for r in o['results']), key=lambda r: r['case'])
+    report = aggregate(results)
+    report.update({
+        'cases': cases, 'seed': seed, 'workers': workers, 'batches': len(job_list),
+        'horizon_ms': horizon_ms, 'repair_ms': repair_ms, 'cycle_ms': cycle_ms,
+        'seconds': round(time.perf_counter() - started, 3),
+        'scans': sum(o['scans'] for o in outputs),
+        'simulated_hours': round(sum(o['simulated_ms'] for o in outputs) / 3_600_000, 3),
+    })
+    return report
+
+
+def aggregate(results: List[dict], constants=None, examples: int = 20) -> dict:
+    """Розподіл результатів, часи зупинки, заблоковані owner-и"""
+    c = constants or load_constants()
+    names = {c[k]: k for k in c if k.startswith(('ROUTE_ABRT_', 'ROUTE_DONE_', 'ROUTE_REJ_'))}
+    outcomes, reasons, by_trigger = {}, {}, {}
+    safe, final = [], []
+    locked, stuck = [], []
+    for res in results:
+        for r in res['routes']:
+            if r['state'] in ROUTE_FINAL:
+                outcome = names.get(r['result'], str(r['result']))
+            else:
+                outcome = 'STUCK_' + r['state'].replace('ROUTE_STS_', '')
+                stuck.append((res, r))
+            outcomes[outcome] = outcomes.get(outcome, 0) + 1
+            if r['abort']:
+                reason = names.get(r['abort'], str(r['abort']))
+                reasons[reason] = reasons.get(reason, 0) + 1
+            row = by_trigger.setdefault(r['trigger'] or 'none', {})
+            row[outcome] = row.get(outcome, 0) + 1
+            if r['safe_stop_ms'] is not None:
+                safe.append(r['safe_stop_ms'])
+            if r['final_ms'] is not None:
+                final.append(r['final_ms'])
+            if r['owned']:
+                locked.append((res, r))
+
+    def example(res, r):
+        return {'case': res['case'], 'seed': res['seed'], 'route': r['route'], 'state': r['state'],
+                'trigger': r['trigger'], 'owned': r['owned']}
+
+    return {
+        'routes': sum(len(res['routes']) for res in results),
+        'outcomes': dict(sorted(outcomes.items(), key=lambda kv: -kv[1])),
+        'abort_reasons': dict(sorted(reasons.items(), key=lambda kv: -kv[1])),
+        'by_trigger': by_trigger,
+        'safe_stop_ms': percentiles(safe),
+        'to_final_ms': percentiles(final),
+        'owners_locked': len(locked),
+        'stuck': len(stuck),
+        'locked_examples': [example(res, r) for res, r in locked[:examples]],
+        'stuck_examples': [example(res, r) for res, r in stuck[:examples]],
+    }
+
+
+def print_report(report: dict):
+    print("\n" + "=" * 70)
+    print(f"📊 {report['cases']} кейсів / {report['routes']} маршрутів за {report['seconds']:.1f} с "
+          f"(процесів {report['workers']}, {report['scans']} сканів, "
+          f"≈ {report['simulated_hours']} год PLC)")
+    print("=" * 70)
+    print("🏁 Результати маршрутів:")
+    for name, n in report['outcomes'].items():
+        print(f"   {name:<28} {n:6d}  {100 * n / max(1, report['routes']):5.1f}%")
+    print("🛑 Причини аварійної зупинки (RF_AbortLatched):")
+    for name, n in report['abort_reasons'].items():
+        print(f"   {name:<28} {n:6d}")
+    print("🔎 Подія -> результат:")
+    for trigger, row in sorted(report['by_trigger'].items()):
+        cells = ', '.join(f"{k} {v}" for k, v in sorted(row.items(), key=lambda kv: -kv[1]))
+        print(f"   {trigger:<20} {cells}")
+    for key, title in (('safe_stop_ms', 'Подія -> усі DO зняті'), ('to_final_ms', 'Подія -> фінал маршруту')):
+        p = report[key]
+        print(f"⏱️  {title}: p50 {p['p50']:.0f} мс, p90 {p['p90']:.0f}, p99 {p['p99']:.0f}, "
+              f"max {p['max']:.0f} (n={p['count']})")
+    if report['owners_locked'] or report['stuck']:
+        print(f"⚠️  Owner-и лишились заблокованими: {report['owners_locked']} маршрутів; "
+              f"не дійшли до фіналу: {report['stuck']}")
+        for ex in (report['locked_examples'] + report['stuck_examples'])[:10]:
+            print(f"   кейс {ex['case']} (--case {ex['case']} --seed {ex['seed']}): маршрут {ex['route']} "
+                  f"{ex['state']}, подія {ex['trigger']}, слоти {ex['owned']}")
+    else:
+        print("✅ Заблокованих owner-ів немає")
+
+
+def print_case(result: dict, schedule: dict):
+    print(f"🔬 Кейс {schedule['case']} (seed {schedule['seed']}): механізми {schedule['mechs']}")
+    for no, route in enumerate(schedule['routes'], 1):
+        print(f"   маршрут {no}: слоти {route['slots']}, старт {route['start_ms']} мс")
+    for slot, kind, fault_ms in schedule['faults']:
+        print(f"   аварія: слот {slot} {kind} через {fault_ms} мс від пуску")
+    for at_ms, kind, target, duration in schedule['events']:
+        print(f"   подія: {at_ms} мс {kind} {target} ({duration} мс)")
+    for line in result.get('log', ()):
+        print(f"   {line}")
+    for r in result['routes']:
+        print(f"   ➜ маршрут {r['route']}: {r['state']} код {r['result']}, abort {r['abort']}, "
+              f"подія {r['trigger']}, безпечна зупинка {r['safe_stop_ms']} мс, "
+              f"фінал {r['final_ms']} мс, owner-и {r['owned'] or '—'}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Кампанія інжекції аварій маршрутів (FB_SimRedler)")
+    parser.add_argument('--cases', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('-j', '--jobs', type=int, default=0, help="процесів (0 = кількість ядер)")
+    parser.add_argument('--horizon-s', type=float, default=DEFAULT_HORIZON_S,
+                        help="максимальна тривалість кейса, с віртуального часу")
+    parser.add_argument('--repair-s', type=float, default=DEFAULT_REPAIR_S,
+                        help="ремонт через N с після аварії (0 — латч назавжди)")
+    parser.add_argument('--cycle-ms', type=int, default=DEFAULT_CYCLE_MS)
+    parser.add_argument('--case', type=int, default=None, help="виконати один кейс з хронологією")
+    parser.add_argument('--report', default=None, help="записати звіт JSON")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    horizon_ms = int(args.horizon_s * 1000)
+    repair_ms = int(args.repair_s * 1000)
+    if args.case is not None:
+        out = run_batch({'cases': [args.case], 'seed': args.seed, 'horizon_ms': horizon_ms,
+                         'repair_ms': repair_ms, 'cycle_ms': args.cycle_ms, 'trace': True})
+        print_case(out['results'][0], make_schedule(args.case, args.seed))
+        return 0
+
+    report = run_campaign(args.cases, args.seed, args.jobs, horizon_ms, repair_ms, args.cycle_ms)
+    print_report(report)
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"💾 Звіт: {args.report}")
+    return 1 if report['owners_locked'] or report['stuck'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
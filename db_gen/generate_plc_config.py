@@ -11,55 +11,537 @@ PLC Code Generator v3.0 - З символьною адресацією (TIA Port
 - FC_DeviceRunner.scl (виконання механізмів)
 - FC_HAL_Read.scl (читання через символьні імена)
 - FC_HAL_Write.scl (запис через символьні імена)
-- PLC_Tags.xlsx (таблиця тегів для імпорту в TIA Portal)
-- Документація (Markdown, CSV)
+- PLC_Tags.xlsx (таблиця тегів для імпорту в TIA Portal; також .xml TIA Openness / .csv)
+- FC_ManualStatusRefresh.scl (+ DB_ManualStatusRefresh.scl у режимі round-robin)
+- UDT/DB/FC_RouteSummary.scl + FB_Test_RouteSummary.scl (опція --route-summary)
+- Main.scl з RUNTIME навколо викликів + UDT/DB_CycleDiag, FC_CycleDiagUpdate (опція --cycle-diag;
+  знімок DB_CycleDiag розбирає cycle_diag.py)
+- .build_manifest.json (хеші входів/артефактів для інкрементальної збірки)
+- .tags_snapshot.json + PLC_Tags_Added/Changed/Removed, PLC_Tags_Renames.csv (опція --tags-delta)
+- run_report.json (фази, пам'ять, лічильники, байти артефактів; опції --profile / --report)
+
+Режим --watch (config_watch.py): генератор у пам'яті, перегенерація після збереження книги.
 """
 
-import pandas as pd
+import re
+import sys
+import json
+import hashlib
+import argparse
+import contextlib
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Tuple
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Tuple
+
+from config_loader import LoadedConfig, load_config
+from udt_layout import LayoutCalculator, load_udts, format_bytes
+from mech_types import MECH_SHEETS, MECH_TYPE_SPECS, MechType, Signal, load_registry
+from scan_cost import CPU_TABLES, DEFAULT_CPU, check_budget, estimate_scan, print_estimate
+from route_index import RouteIndex, validate_routes, print_report as print_route_report
+from run_profile import REPORT_NAME, PhaseProfiler, build_report, print_profile
+from config_watch import DEFAULT_INTERVAL, WatchSession
+from tag_export import TAG_COLUMNS, TAG_FORMATS, TAG_TABLE_PROPERTIES, render_tags
+from tag_delta import TAGS_SNAPSHOT_NAME, diff_tags, load_snapshot, print_delta, snapshot_data, write_delta
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Від яких колонок механізмів залежить кожен артефакт.
+# 'DI_*' / 'DO_*' — усі сигнальні колонки з цим префіксом.
+# Якщо проєкція не змінилась — артефакт не перегенеровується.
+ARTIFACT_INPUTS = {
+    'DB_Mechs.scl':        ('TypedIdx',),
+    'FC_InitMechs.scl':    ('Slot', 'TypedIdx'),
+    'FC_DeviceRunner.scl': ('Slot', 'TypedIdx', 'Name'),  # dense: Array[TypedIdx] + // Name
+    'FC_HAL_Read.scl':     ('Slot', 'TypedIdx', 'Name', 'Location', 'DI_*'),
+    'FC_HAL_Write.scl':    ('Slot', 'TypedIdx', 'Name', 'Location', 'DO_*'),
+    'PLC_Tags.xlsx':       ('TypedIdx', 'Name', 'Location', 'DI_*', 'DO_*'),
+    'PLC_Tags.xml':        ('TypedIdx', 'Name', 'Location', 'DI_*', 'DO_*'),
+    'PLC_Tags.csv':        ('TypedIdx', 'Name', 'Location', 'DI_*', 'DO_*'),
+    # 'ROUTES' — артефакт залежить також від аркуша ROUTES
+    'Route_Conflicts.csv': ('ROUTES',),
+    'Route_Index.json':    ('ROUTES',),
+    'FC_ManualStatusRefresh.scl': ('Slot',),
+    'DB_ManualStatusRefresh.scl': ('Slot',),
+    'UDT_RouteSummary.scl':     (),
+    'DB_RouteSummary.scl':      (),
+    'FC_RouteSummary.scl':      (),
+    'FB_Test_RouteSummary.scl': ('Slot', 'TypedIdx', 'ROUTES'),
+    # Main.scl з кореня репозиторію входить у відбиток генератора (опція cycle_diag)
+    'UDT_CycleDiagStat.scl':    (),
+    'DB_CycleDiag.scl':         (),
+    'FC_CycleDiagUpdate.scl':   (),
+    'Main.scl':                 (),
+}
+
+
+IO_ADDRESS_RE = re.compile(r'^%([IQ])(\d+)\.([0-7])$')
+
+
+def parse_io_address(address) -> Optional[Tuple[str, int, int]]:
+    """'%I1.3' -> ('I', 1, 3); None, якщо це не бітова адреса I/Q"""
+    if not isinstance(address, str):
+        return None
+    m = IO_ADDRESS_RE.match(address.strip().upper())
+    if not m:
+        return None
+    return m.group(1), int(m.group(2)), int(m.group(3))
+
+
+def _json_default(obj):
+    """Записи механізмів (config_loader.MechRecord) серіалізуються як dict"""
+    if hasattr(obj, 'to_dict'):
+        return obj.to_dict()
+    return str(obj)
+
+
+def _sha256(data) -> str:
+    """SHA-256 від bytes/str/JSON-сумісного об'єкта"""
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    elif not isinstance(data, (bytes, bytearray)):
+        data = json.dumps(data, sort_keys=True, ensure_ascii=False, default=_json_default).encode('utf-8')
+    return hashlib.sha256(data).hexdigest()
+
+
+_IMPORT_RE = re.compile(r'^\s*(?:from|import)\s+(\w+)', re.MULTILINE)
+
+
+def _local_modules(entry: Path) -> List[Path]:
+    """entry + усі модулі db_gen, які він імпортує (транзитивно, включно з лінивими import)"""
+    seen = {}
+    stack = [entry]
+    while stack:
+        path = stack.pop()
+        if path.name in seen:
+            continue
+        seen[path.name] = path
+        for name in _IMPORT_RE.findall(path.read_text(encoding='utf-8')):
+            dep = entry.parent / f"{name}.py"
+            if dep.exists():
+                stack.append(dep)
+    return [seen[name] for name in sorted(seen)]
+
+
+# ============================================================================
+# Прохід по механізмах: потокові приймачі артефактів
+# ============================================================================
+PARAM_WIDTH = max(len('Mechs'), *(len(spec[2]) for spec in MECH_TYPE_SPECS))
+SECTION_RULE = '    // ===================================================================\n'
+
+
+def _section(title: str) -> str:
+    return f"{SECTION_RULE}    // {title}\n{SECTION_RULE}"
+
+
+def _array_params(groups) -> str:
+    """VAR_IN_OUT: масиви типів, що є у конфігурації"""
+    return ''.join(f'    {desc.array.ljust(PARAM_WIDTH)} : ARRAY[*] OF "{desc.udt}";\n'
+                   for desc, _ in groups)
+
+
+class ArtifactWriter:
+    """Приймач одного артефакту в PLCCodeGenerator.run_mechanism_pass
+    
+    Текст накопичується фрагментами у списку і з'єднується один раз у end()
+    (без квадратичного code += ...). groups — непорожні типи, механізми
+    кожного відсортовані за TypedIdx.
+    """
+    
+    artifact = ''
+    
+    def __init__(self, gen: 'PLCCodeGenerator'):
+        self.gen = gen
+        self.parts: List[str] = []
+        self.write = self.parts.append
+    
+    def begin(self, groups: List[Tuple[MechType, list]]):
+        pass
+    
+    def type_begin(self, desc: MechType, mechs: list, wired: Tuple[Signal, ...]):
+        pass
+    
+    def mech(self, desc: MechType, m, signals: List[Tuple[Signal, str, str]]):
+        """signals — заповнені сигнали механізму: (сигнал, адреса, ім'я тега)"""
+    
+    def type_end(self, desc: MechType, mechs: list):
+        pass
+    
+    def end(self):
+        return ''.join(self.parts)
+
+
+class DbMechsWriter(ArtifactWriter):
+    artifact = 'DB_Mechs.scl'
+    
+    def begin(self, groups):
+        self.write(self.gen._get_header("DB_Mechs - Масиви механізмів"))
+        self.write('''
+DATA_BLOCK "DB_Mechs"
+{ S7_Optimized_Access := 'TRUE' }
+VERSION : 1.0
+
+VAR
+    // ===================================================================
+    // Базова шина механізмів (усі слоти 0..255)
+    // ===================================================================
+    Mechs : ARRAY [0..255] OF "UDT_BaseMechanism";
+    
+''')
+    
+    def type_begin(self, desc, mechs, wired):
+        last = mechs[-1]['TypedIdx']
+        self.write(f'''    // {desc.title}: {len(mechs)} шт, масив [0..{last}]
+    {desc.array} : ARRAY [0..{last}] OF "{desc.udt}";
+    
+''')
+    
+    def end(self):
+        self.write('''END_VAR
+
+BEGIN
+END_DATA_BLOCK
+''')
+        return super().end()
+
+
+class InitMechsWriter(ArtifactWriter):
+    artifact = 'FC_InitMechs.scl'
+    
+    def begin(self, groups):
+        self.write(self.gen._get_header("FC_InitMechs - Ініціалізація мапінгу"))
+        self.write('''
+FUNCTION "FC_InitMechs" : VOID
+{ S7_Optimized_Access := 'TRUE' }
+VERSION : 1.0
+
+VAR_TEMP
+    i : INT;
+END_VAR
+
+BEGIN
+    FOR i := 0 TO 255 DO
+        "DB_Mechs".Mechs[i].DeviceType := "DB_Const".TYPE_NONE;
+        "DB_Mechs".Mechs[i].TypedIndex := UINT#16#FFFF;
+    END_FOR;
+    
+''')
+    
+    def type_begin(self, desc, mechs, wired):
+        self.write(f"    // === {desc.sheet} ===\n")
+    
+    def mech(self, desc, m, signals):
+        slot = m['Slot']
+        self.write(f'    "DB_Mechs".Mechs[{slot}].DeviceType := "DB_Const".{desc.type_const};\n'
+                   f'    "DB_Mechs".Mechs[{slot}].TypedIndex := {m["TypedIdx"]};\n\n')
+    
+    def end(self):
+        self.write('END_FUNCTION\n')
+        return super().end()
+
+
+class DeviceRunnerWriter(ArtifactWriter):
+    artifact = 'FC_DeviceRunner.scl'
+    
+    def begin(self, groups):
+        self.write(self.gen._get_header("FC_DeviceRunner - Виконання механізмів"))
+        self.write(f'''
+FUNCTION "FC_DeviceRunner" : VOID
+{{ S7_Optimized_Access := 'TRUE' }}
+VERSION : 1.0
+
+VAR_IN_OUT
+    {'Mechs'.ljust(PARAM_WIDTH)} : ARRAY[*] OF "UDT_BaseMechanism";
+''')
+        self.write(_array_params(groups))
+        self.write('END_VAR\n')
+        if self.gen.runner_layout == 'dense':
+            self.write('\nBEGIN\n')
+        else:
+            self.write('''
+VAR_TEMP
+    slot : INT;
+    idx  : INT;
+END_VAR
+
+BEGIN
+''')
+    
+    def type_end(self, desc, mechs):
+        if self.gen.runner_layout == 'dense':
+            # виклики у порядку слотів (як у циклі loop-розкладки)
+            self.write(f'    // === {desc.sheet} ({len(mechs)} шт) ===\n')
+            for m in sorted(mechs, key=lambda x: x['Slot']):
+                self.write(f'    "{desc.fc}"({desc.param} := {desc.array}[{m["TypedIdx"]}], '
+                           f'B := Mechs[{m["Slot"]}]);  // {m["Name"]}\n')
+            self.write('    \n')
+            return
+        slots = [m['Slot'] for m in mechs]
+        self.write(f'''    // === {desc.sheet} (slot {min(slots)}..{max(slots)}) ===
+    FOR slot := {min(slots)} TO {max(slots)} DO
+        IF Mechs[slot].DeviceType = "DB_Const".{desc.type_const} THEN
+            idx := Mechs[slot].TypedIndex;
+            "{desc.fc}"({desc.param} := {desc.array}[idx], B := Mechs[slot]);
+        END_IF;
+    END_FOR;
+    
+''')
+    
+    def end(self):
+        self.write('END_FUNCTION\n')
+        return super().end()
+
+
+class HalReadWriter(ArtifactWriter):
+    artifact = 'FC_HAL_Read.scl'
+    
+    def begin(self, groups):
+        gen = self.gen
+        plan = gen._hal_image_plan('DI_', 'I') if gen.hal_mode == 'packed' else None
+        gen._hal_read_plan = plan
+        self.write(gen._get_header("FC_HAL_Read - Читання HAL входів через символьні імена"))
+        self.write('''
+FUNCTION "FC_HAL_Read" : VOID
+{ S7_Optimized_Access := 'TRUE' }
+VERSION : 1.0
+
+VAR_IN_OUT
+''')
+        self.write(_array_params(groups))
+        self.write('END_VAR\n')
+        self.write(gen._hal_temp_section(plan))
+        self.write('\nBEGIN\n')
+        if plan and plan['groups']:
+            self.write(_section('Образ процесу (пакетне читання)'))
+            for g in plan['groups']:
+                self.write(f"    #{g['temp']} := {g['address']};\n")
+            self.write('\n')
+    
+    def type_begin(self, desc, mechs, wired):
+        self.write(_section(desc.sheet))
+        self.width = max((len(s.member) for s in wired if s.is_input), default=0)
+    
+    def mech(self, desc, m, signals):
+        idx = m['TypedIdx']
+        self.write(f'    // {m["Name"]} (Slot {m["Slot"]}, {m["Location"]})\n')
+        for s, address, tag_name in signals:
+            if s.is_input:
+                self.write(f'    {desc.array}[{idx}].{s.member.ljust(self.width)} := '
+                           f'{self.gen._hal_in(tag_name, address)};\n')
+        self.write('\n')
+    
+    def end(self):
+        self.write('END_FUNCTION\n')
+        return super().end()
+
+
+class HalWriteWriter(ArtifactWriter):
+    artifact = 'FC_HAL_Write.scl'
+    
+    def begin(self, groups):
+        gen = self.gen
+        plan = gen._hal_image_plan('DO_', 'Q') if gen.hal_mode == 'packed' else None
+        gen._hal_write_plan = plan
+        self.write(gen._get_header("FC_HAL_Write - Запис HAL виходів через символьні імена"))
+        self.write('''
+FUNCTION "FC_HAL_Write" : VOID
+{ S7_Optimized_Access := 'TRUE' }
+VERSION : 1.0
+
+VAR_IN_OUT
+''')
+        self.write(_array_params(groups))
+        self.write('END_VAR\n')
+        self.write(gen._hal_temp_section(plan))
+        self.write('\nBEGIN\n')
+        if plan:
+            partial = [g for g in plan['groups'] if g['used_bits'] < g['size']]
+            if partial:
+                self.write('    // Поточний образ для байтів, зайнятих частково (read-modify-write)\n')
+                for g in partial:
+                    self.write(f"    #{g['temp']} := {g['address']};\n")
+                self.write('\n')
+    
+    def type_begin(self, desc, mechs, wired):
+        self.write(_section(desc.sheet))
+    
+    def mech(self, desc, m, signals):
+        idx = m['TypedIdx']
+        self.write(f'    // {m["Name"]} (Slot {m["Slot"]}, {m["Location"]})\n')
+        for s, address, tag_name in signals:
+            if not s.is_input:
+                self.write(f'    {self.gen._hal_out(tag_name, address)} := {desc.array}[{idx}].{s.member};\n')
+        self.write('\n')
+    
+    def end(self):
+        plan = self.gen._hal_write_plan
+        if plan and plan['groups']:
+            self.write(_section('Образ процесу (пакетний запис)'))
+            for g in plan['groups']:
+                self.write(f"    {g['address']} := #{g['temp']};\n")
+            self.write('\n')
+        self.write('END_FUNCTION\n')
+        return super().end()
+
+
+class TagWriter(ArtifactWriter):
+    """Рядки таблиці PLC Tags + ідентичність тегів (аркуш, Slot, сигнал) для tag_delta"""
+    
+    artifact = 'tags'
+    
+    def __init__(self, gen: 'PLCCodeGenerator'):
+        super().__init__(gen)
+        self.tags = []
+        self.identities = {}
+    
+    def type_begin(self, desc, mechs, wired):
+        self.tag_only = desc.tag_only(mechs)
+    
+    def mech(self, desc, m, signals):
+        # входи, потім виходи; колонки без поля в UDT — після сигналів HAL свого напряму
+        extra = [(s, m.get(s.column), self.gen._create_tag_name(desc.array, m['TypedIdx'], s.column))
+                 for s in self.tag_only if m.get(s.column)]
+        ordered = [x for x in signals if x[0].is_input] + [x for x in extra if x[0].is_input] + \
+                  [x for x in signals if not x[0].is_input] + [x for x in extra if not x[0].is_input]
+        for s, address, tag_name in ordered:
+            self.tags.append(self.gen._tag(tag_name, address,
+                                           f"{m['Name']} - {s.label} ({m['Location']})"))
+            self.identities[tag_name] = (desc.sheet, m['Slot'], s.column)
+    
+    def end(self):
+        return self.tags, self.identities
+
+
+# Приймачі одного проходу run_mechanism_pass (новий артефакт — ще один клас тут)
+MECH_PASS_WRITERS = (DbMechsWriter, InitMechsWriter, DeviceRunnerWriter,
+                     HalReadWriter, HalWriteWriter, TagWriter)
+
 
 class PLCCodeGenerator:
     """Генератор PLC коду з Excel конфігурації"""
     
-    def __init__(self, excel_path: str):
+    MANIFEST_NAME = '.build_manifest.json'
+    
+    # Опції, що впливають на вміст згенерованих файлів (входять у відбиток збірки)
+    OUTPUT_OPTIONS = ('deterministic', 'runner_layout', 'hal_mode', 'typed_idx', 'route_summary',
+                      'status_slots_per_cycle', 'tag_formats', 'cycle_diag')
+    RUNNER_LAYOUTS = ('loop', 'dense')
+    HAL_MODES = ('symbolic', 'packed')
+    TYPED_IDX_MODES = ('sheet', 'compact')
+    
+    MECHS_SLOTS = 256  # Mechs[0..255] — фіксований контракт (FB_Route_FSM, FC_ManualMechCmdHandler)
+    
+    def __init__(self, excel_path: str, deterministic: bool = False, use_cache: bool = True,
+                 runner_layout: str = 'loop', hal_mode: str = 'symbolic', typed_idx: str = 'sheet',
+                 udt_dir: str = None, cycle_budget_ms: float = None, cpu: str = DEFAULT_CPU,
+                 route_summary: bool = False, status_slots_per_cycle: int = 0,
+                 tag_formats: Tuple[str, ...] = ('xlsx',), tags_delta: bool = False,
+                 tags_baseline: str = None, cycle_diag: bool = False):
+        if runner_layout not in self.RUNNER_LAYOUTS:
+            raise ValueError(f"❌ Невідомий runner_layout: {runner_layout}")
+        if hal_mode not in self.HAL_MODES:
+            raise ValueError(f"❌ Невідомий hal_mode: {hal_mode}")
+        if typed_idx not in self.TYPED_IDX_MODES:
+            raise ValueError(f"❌ Невідомий typed_idx: {typed_idx}")
+        if status_slots_per_cycle < 0:
+            raise ValueError(f"❌ status_slots_per_cycle має бути >= 0: {status_slots_per_cycle}")
+        if cpu not in CPU_TABLES:
+            raise ValueError(f"❌ Невідомий CPU: {cpu}")
+        unknown = [fmt for fmt in tag_formats if fmt not in TAG_FORMATS]
+        if unknown:
+            raise ValueError(f"❌ Невідомий формат таблиці тегів: {', '.join(unknown)}")
         self.excel_path = excel_path
+        self.deterministic = deterministic  # без мітки часу у заголовках
+        self.use_cache = use_cache          # знімок конфігурації у .plc_cache/
+        self.runner_layout = runner_layout  # 'loop' (FOR по діапазону слотів) / 'dense' (прямі виклики)
+        self.hal_mode = hal_mode            # 'symbolic' (тег на сигнал) / 'packed' (BYTE/WORD образу)
+        self.typed_idx = typed_idx          # 'sheet' (як в Excel) / 'compact' (0..N-1 без дірок)
+        self.udt_dir = Path(udt_dir) if udt_dir else Path(__file__).resolve().parent.parent
+        self.cycle_budget_ms = cycle_budget_ms  # None — без перевірки часу циклу
+        self.cpu = cpu                          # таблиця часу CPU для scan_cost.py
+        self.route_summary = route_summary      # FC_RouteSummary + FB_Test_RouteSummary
+        self.status_slots_per_cycle = status_slots_per_cycle  # 0 — усі 256 слотів щоцикла
+        self.tag_formats = tuple(dict.fromkeys(tag_formats))  # PLC_Tags.xlsx / .xml / .csv
+        self.tags_delta = tags_delta          # PLC_Tags_Added/Changed/Removed + перейменування
+        self.tags_baseline = tags_baseline    # знімок для порівняння (None — попередня збірка)
+        self.cycle_diag = cycle_diag          # Main.scl з вимірюванням викликів + DB_CycleDiag
+        self._hal_read_plan = None
+        self._hal_write_plan = None
+        self._cycle_diag_plan = None  # (інструментований Main, записи DB_CycleDiag)
+        self._mech_types = None    # аркуш -> mech_types.MechType (з UDT_*.scl)
+        self._mech_outputs = None  # результат run_mechanism_pass (скидається в load_excel)
+        self.typed_idx_map = {}  # аркуш -> {TypedIdx з Excel: згенерований TypedIdx}
         self.config = {}
-        self.redlers = []
-        self.norias = []
-        self.gates = []
-        self.fans = []
+        self.sheets = {sheet: [] for sheet in MECH_SHEETS}  # аркуш -> записи механізмів
+        self.routes = []  # аркуш ROUTES (config_loader.RouteRecord)
+        self.route_index = None
         self.tags = []  # Список тегів для таблиці
-        
+        self.profiler = None       # run_profile.PhaseProfiler (--profile / --report)
+        self.artifact_stats = {}   # артефакт -> {'status': written/unchanged/skipped/removed, 'bytes'}
+        
+    def _phase(self, name: str):
+        """Фаза для профілю запуску (без профайлера — порожній контекст)"""
+        if self.profiler is None:
+            return contextlib.nullcontext()
+        return self.profiler.phase(name)
+    
     def load_excel(self):
-        """Завантажити всі аркуші з Excel"""
+        """Завантажити всі аркуші з Excel (без pandas, зі знімком у .plc_cache/)"""
         print(f"📖 Завантаження {self.excel_path}...")
         
-        xls = pd.ExcelFile(self.excel_path)
+        loaded = load_config(self.excel_path, use_cache=self.use_cache)
+        if loaded.from_cache:
+            print("⚡ Конфігурація не змінилась — використано знімок")
+        self.apply_config(loaded)
+    
+    def apply_config(self, loaded: LoadedConfig):
+        """Прийняти завантажену конфігурацію (config_loader.LoadedConfig)
         
+        Записи механізмів використовуються як є (typed_idx='compact' змінює їх
+        TypedIdx на місці) — у --watch сесія передає копії.
+        """
         # Конфігурація
-        df_config = pd.read_excel(xls, 'CONFIG')
-        self.config = dict(zip(df_config['Parameter'], df_config['Value']))
-        
-        # Механізми (фільтруємо тільки Enabled=TRUE)
-        self.redlers = pd.read_excel(xls, 'REDLERS').fillna('').to_dict('records')
-        self.redlers = [r for r in self.redlers if r.get('Enabled') == True]
+        self.config = loaded.config
         
-        self.norias = pd.read_excel(xls, 'NORIAS').fillna('').to_dict('records')
-        self.norias = [n for n in self.norias if n.get('Enabled') == True]
-        
-        self.gates = pd.read_excel(xls, 'GATES').fillna('').to_dict('records')
-        self.gates = [g for g in self.gates if g.get('Enabled') == True]
-        
-        self.fans = pd.read_excel(xls, 'FANS').fillna('').to_dict('records')
-        self.fans = [f for f in self.fans if f.get('Enabled') == True]
+        # Механізми (тільки Enabled=TRUE, типізовані записи)
+        self.sheets = {sheet: loaded.sheets[sheet] for sheet in MECH_SHEETS}
+        self.routes = loaded.routes
         
         print(f"✅ Завантажено:")
-        print(f"   - Редлерів: {len(self.redlers)}")
-        print(f"   - Норій: {len(self.norias)}")
-        print(f"   - Засувок: {len(self.gates)}")
-        print(f"   - Вентиляторів: {len(self.fans)}")
+        for sheet, title, *_ in MECH_TYPE_SPECS:
+            print(f"   - {title}: {len(self.sheets[sheet])}")
+        
+        self._mech_outputs = None
+        self.route_index = None
+        self.typed_idx_map = {}
+        if self.typed_idx == 'compact':
+            self.compact_typed_idx()
+    
+    def compact_typed_idx(self):
+        """Перенумерувати TypedIdx кожного типу щільно (0..N-1) у порядку рядків аркуша
+        
+        Новий індекс отримує кожне унікальне значення з Excel за першою появою
+        на аркуші (не за величиною старого TypedIdx), тому дублікати лишаються
+        дублікатами і validate_excel їх так само відхиляє. Оскільки всі артефакти
+        (DB_Mechs, FC_InitMechs, FC_DeviceRunner, HAL, теги) читають TypedIdx
+        із записів, вони перебудовуються узгоджено.
+        """
+        for sheet, mechs in self._mechs_by_sheet().items():
+            old = list(dict.fromkeys(m['TypedIdx'] for m in mechs))
+            mapping = {o: n for n, o in enumerate(old)}
+            self.typed_idx_map[sheet] = mapping
+            for m in mechs:
+                m['TypedIdx'] = mapping[m['TypedIdx']]
+        
+        renamed = {sheet: {o: n for o, n in mapping.items() if o != n}
+                   for sheet, mapping in self.typed_idx_map.items()}
+        total = sum(len(r) for r in renamed.values())
+        if total:
+            print(f"🗜️  TypedIdx ущільнено: перенумеровано {total} механізмів")
+            for sheet, r in renamed.items():
+                if r:
+                    pairs = ', '.join(f"{o}->{n}" for o, n in sorted(r.items()))
+                    print(f"   - {sheet}: {pairs}")
     
     def validate_excel(self):
         """Валідація конфігурації"""
@@ -67,7 +549,7 @@ class PLCCodeGenerator:
         warnings = []
         
         # Перевірка унікальності slot
-        all_mechs = self.redlers + self.norias + self.gates + self.fans
+        all_mechs = [m for mechs in self.sheets.values() for m in mechs]
         slots = [m['Slot'] for m in all_mechs]
         
         if len(slots) != len(set(slots)):
@@ -78,12 +560,16 @@ class PLCCodeGenerator:
             errors.append(f"❌ Дублікати slot: {duplicates}")
         
         # Перевірка унікальності TypedIdx в межах типу
-        for mech_type, mechs in [('Редлери', self.redlers), ('Норії', self.norias), 
-                                  ('Засувки', self.gates), ('Вентилятори', self.fans)]:
+        for desc, mechs in self._mech_groups():
             if mechs:
                 typed_idxs = [m['TypedIdx'] for m in mechs]
                 if len(typed_idxs) != len(set(typed_idxs)):
-                    errors.append(f"❌ Дублікати TypedIdx у {mech_type}")
+                    errors.append(f"❌ Дублікати TypedIdx у {desc.title}")
+            # Колонки сигналів без поля в UDT не потрапляють у HAL і теги
+            for column, used in desc.orphan_columns(mechs).items():
+                if used:
+                    warnings.append(f"⚠️  {desc.sheet}: колонка {column} не має поля в {desc.udt} — "
+                                    f"{used} адрес лише в PLC Tags (без HAL)")
         
         # Перевірка унікальності I/O адрес
         io_addrs = {}
@@ -95,6 +581,9 @@ class PLCCodeGenerator:
                     else:
                         io_addrs[val] = m['Name']
         
+        # Маршрути: RouteId 1..12, слоти змаплені на увімкнені механізми
+        errors.extend(validate_routes(self.routes, slots))
+        
         # Перевірити помилки
         if errors:
             for e in errors:
@@ -107,15 +596,16 @@ class PLCCodeGenerator:
         print("✅ Валідація пройдена")
     
     def _get_header(self, title: str) -> str:
-        """Генерація заголовку SCL файлу"""
+        """Генерація заголовку SCL файлу (у детермінованому режимі — без мітки часу)"""
+        generated = '' if self.deterministic else \
+            f"// Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
         return f'''// ==============================================================================
 // {title}
 // ==============================================================================
 // Project  : {self.config.get('ProjectName', 'Unknown')}
 // Author   : {self.config.get('Author', 'AutoGen')}
 // Version  : {self.config.get('Version', '1.0.0')}
-// Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-// ==============================================================================
+{generated}// ==============================================================================
 '''
     
     def _create_tag_name(self, mech_type: str, typed_idx: int, signal: str) -> str:
@@ -123,9 +613,9 @@ class PLCCodeGenerator:
         # typed_idx -> 1-based для імені
         return f"{mech_type}_{typed_idx + 1}_{signal}"
     
-    def _add_tag(self, name: str, address: str, comment: str):
-        """Додати тег до списку"""
-        self.tags.append({
+    def _tag(self, name: str, address: str, comment: str) -> Dict[str, object]:
+        """Рядок таблиці тегів (колонки tag_export.TAG_COLUMNS)"""
+        return {
             'Name': name,
             'Path': 'IO_tags',
             'Data Type': 'Bool',
@@ -136,556 +626,1341 @@ class PLCCodeGenerator:
             'Hmi Writeable': True,
             'Typeobject ID': '',
             'Version ID': ''
-        })
+        }
     
     def build_tags_table(self):
-        """Побудувати таблицю тегів з усіх механізмів"""
-        self.tags = []
-        
-        # Редлери
-        for r in sorted(self.redlers, key=lambda x: x['TypedIdx']):
-            idx = r['TypedIdx']
-            name_base = r['Name'].replace(' ', '_')
-            
-            if r.get('DI_Speed'):
-                tag_name = self._create_tag_name('Redler', idx, 'DI_Speed')
-                self._add_tag(tag_name, r['DI_Speed'], f"{r['Name']} - Тахо-датчик ({r['Location']})")
-            
-            if r.get('DI_Breaker'):
-                tag_name = self._create_tag_name('Redler', idx, 'DI_Breaker')
-                self._add_tag(tag_name, r['DI_Breaker'], f"{r['Name']} - Автомат захисту ({r['Location']})")
-            
-            if r.get('DI_Overflow'):
-                tag_name = self._create_tag_name('Redler', idx, 'DI_Overflow')
-                self._add_tag(tag_name, r['DI_Overflow'], f"{r['Name']} - Переповнення ({r['Location']})")
-            
-            if r.get('DO_Run'):
-                tag_name = self._create_tag_name('Redler', idx, 'DO_Run')
-                self._add_tag(tag_name, r['DO_Run'], f"{r['Name']} - Контактор пуску ({r['Location']})")
-        
-        # Норії
-        for n in sorted(self.norias, key=lambda x: x['TypedIdx']):
-            idx = n['TypedIdx']
-            
-            if n.get('DI_Speed'):
-                tag_name = self._create_tag_name('Noria', idx, 'DI_Speed')
-                self._add_tag(tag_name, n['DI_Speed'], f"{n['Name']} - Тахо-датчик ({n['Location']})")
-            
-            if n.get('DI_Breaker'):
-                tag_name = self._create_tag_name('Noria', idx, 'DI_Breaker')
-                self._add_tag(tag_name, n['DI_Breaker'], f"{n['Name']} - Автомат захисту ({n['Location']})")
-            
-            if n.get('DI_UpperLevel'):
-                tag_name = self._create_tag_name('Noria', idx, 'DI_UpperLevel')
-                self._add_tag(tag_name, n['DI_UpperLevel'], f"{n['Name']} - Верхній рівень ({n['Location']})")
-            
-            if n.get('DI_LowerLevel'):
-                tag_name = self._create_tag_name('Noria', idx, 'DI_LowerLevel')
-                self._add_tag(tag_name, n['DI_LowerLevel'], f"{n['Name']} - Нижній рівень ({n['Location']})")
-            
-            if n.get('DO_Run'):
-                tag_name = self._create_tag_name('Noria', idx, 'DO_Run')
-                self._add_tag(tag_name, n['DO_Run'], f"{n['Name']} - Контактор пуску ({n['Location']})")
-        
-        # Засувки
-        for g in sorted(self.gates, key=lambda x: x['TypedIdx']):
-            idx = g['TypedIdx']
-            
-            if g.get('DI_Opened'):
-                tag_name = self._create_tag_name('Gate', idx, 'DI_Opened')
-                self._add_tag(tag_name, g['DI_Opened'], f"{g['Name']} - Відкрита ({g['Location']})")
-            
-            if g.get('DI_Closed'):
-                tag_name = self._create_tag_name('Gate', idx, 'DI_Closed')
-                self._add_tag(tag_name, g['DI_Closed'], f"{g['Name']} - Закрита ({g['Location']})")
-            
-            if g.get('DO_Open'):
-                tag_name = self._create_tag_name('Gate', idx, 'DO_Open')
-                self._add_tag(tag_name, g['DO_Open'], f"{g['Name']} - Відкрити ({g['Location']})")
-            
-            if g.get('DO_Close'):
-                tag_name = self._create_tag_name('Gate', idx, 'DO_Close')
-                self._add_tag(tag_name, g['DO_Close'], f"{g['Name']} - Закрити ({g['Location']})")
-        
-        # Вентилятори
-        for f in sorted(self.fans, key=lambda x: x['TypedIdx']):
-            idx = f['TypedIdx']
-            
-            if f.get('DI_Breaker'):
-                tag_name = self._create_tag_name('Fan', idx, 'DI_Breaker')
-                self._add_tag(tag_name, f['DI_Breaker'], f"{f['Name']} - Автомат захисту ({f['Location']})")
-            
-            if f.get('DO_Run'):
-                tag_name = self._create_tag_name('Fan', idx, 'DO_Run')
-                self._add_tag(tag_name, f['DO_Run'], f"{f['Name']} - Пуск ({f['Location']})")
-        
+        """Побудувати таблицю тегів з усіх механізмів (прохід run_mechanism_pass)"""
+        self.tags = self._mech_output('tags')[0]
         print(f"✅ Створено {len(self.tags)} тегів для таблиці PLC Tags")
     
-    def generate_plc_tags_excel(self) -> pd.DataFrame:
+    def tag_identities(self) -> Dict[str, Tuple[str, int, str]]:
+        """Ім'я тега -> (аркуш, Slot, сигнал): стабільна ідентичність для дельти тегів"""
+        return self._mech_output('tags')[1]
+    
+    def iter_tags(self) -> Iterator[Dict[str, object]]:
+        """Теги всіх механізмів по одному (для потокового експорту tag_export)"""
+        yield from self._mech_output('tags')[0]
+    
+    def generate_plc_tags_excel(self) -> Tuple['pd.DataFrame', 'pd.DataFrame']:
         """Генерація Excel файлу з таблицею тегів (формат TIA Portal)"""
-        df_tags = pd.DataFrame(self.tags)
+        import pandas as pd  # лише для запису xlsx
+        
+        df_tags = pd.DataFrame(self.tags, columns=list(TAG_COLUMNS))
         
         # Другий аркуш - властивості таблиці
-        df_props = pd.DataFrame([{
-            'Path': 'IO_tags',
-            'BelongsToUnit': '',
-            'Accessibility': ''
-        }])
+        df_props = pd.DataFrame([TAG_TABLE_PROPERTIES])
         
         return df_tags, df_props
     
+    @property
+    def mech_types(self) -> Dict[str, MechType]:
+        """Реєстр типів механізмів (сигнали DI_/DO_ — з UDT_*.scl у udt_dir)"""
+        if self._mech_types is None:
+            self._mech_types = load_registry(self.udt_dir)
+        return self._mech_types
+    
+    def _mech_groups(self) -> List[Tuple[MechType, list]]:
+        """(дескриптор, механізми) у порядку типів MECH_TYPE_SPECS"""
+        return [(self.mech_types[sheet], mechs) for sheet, mechs in self._mechs_by_sheet().items()]
+    
+    def run_mechanism_pass(self) -> Dict[str, object]:
+        """Один прохід по механізмах для всіх артефактів MECH_PASS_WRITERS
+        
+        Кожен тип сортується за TypedIdx один раз; для кожного механізму
+        заповнені сигнали (сигнал, адреса, ім'я тега) обчислюються один раз
+        і передаються всім приймачам. Результат кешується до наступного
+        load_excel() — після ручної зміни записів викличте прохід знову.
+        """
+        writers = [writer(self) for writer in MECH_PASS_WRITERS]
+        groups = [(desc, sorted(mechs, key=lambda m: m['TypedIdx']))
+                  for desc, mechs in self._mech_groups() if mechs]
+        for w in writers:
+            w.begin(groups)
+        for desc, mechs in groups:
+            wired = desc.wired(mechs)
+            for w in writers:
+                w.type_begin(desc, mechs, wired)
+            for m in mechs:
+                idx = m['TypedIdx']
+                signals = [(s, m.get(s.column), self._create_tag_name(desc.array, idx, s.column))
+                           for s in wired if m.get(s.column)]
+                for w in writers:
+                    w.mech(desc, m, signals)
+            for w in writers:
+                w.type_end(desc, mechs)
+        self._mech_outputs = {w.artifact: w.end() for w in writers}
+        return self._mech_outputs
+    
+    def _mech_output(self, artifact: str):
+        if self._mech_outputs is None:
+            self.run_mechanism_pass()
+        return self._mech_outputs[artifact]
+    
     def generate_db_mechs(self) -> str:
-        """Генерація DB_Mechs.scl (БЕЗ ЗМІН)"""
-        max_redlers = max([r['TypedIdx'] for r in self.redlers], default=-1) + 1 if self.redlers else 0
-        max_norias = max([n['TypedIdx'] for n in self.norias], default=-1) + 1 if self.norias else 0
-        max_gates = max([g['TypedIdx'] for g in self.gates], default=-1) + 1 if self.gates else 0
-        max_fans = max([f['TypedIdx'] for f in self.fans], default=-1) + 1 if self.fans else 0
-        
-        code = self._get_header("DB_Mechs - Масиви механізмів")
-        code += '''
-DATA_BLOCK "DB_Mechs"
-{ S7_Optimized_Access := 'TRUE' }
-VERSION : 1.0
-
-VAR
-    // ===================================================================
-    // Базова шина механізмів (усі слоти 0..255)
-    // ===================================================================
-    Mechs : ARRAY [0..255] OF "UDT_BaseMechanism";
+        """Генерація DB_Mechs.scl (масиви за TypedIdx; прохід run_mechanism_pass)"""
+        return self._mech_output('DB_Mechs.scl')
     
-'''
-        
-        if max_redlers > 0:
-            code += f'''    // Редлери: {len(self.redlers)} шт, масив [0..{max_redlers-1}]
-    Redler : ARRAY [0..{max_redlers-1}] OF "UDT_Redler";
+    def generate_fc_init_mechs(self) -> str:
+        """Генерація FC_InitMechs.scl (мапінг слот -> тип/TypedIdx; прохід run_mechanism_pass)"""
+        return self._mech_output('FC_InitMechs.scl')
     
-'''
-        
-        if max_norias > 0:
-            code += f'''    // Норії: {len(self.norias)} шт, масив [0..{max_norias-1}]
-    Noria : ARRAY [0..{max_norias-1}] OF "UDT_Noria";
+    def device_runner_dispatch_stats(self) -> List[Dict[str, int]]:
+        """Ітерацій циклів FC_DeviceRunner за скан: loop-розкладка vs щільна"""
+        stats = []
+        for desc, mechs in self._mech_groups():
+            if not mechs:
+                continue
+            slots = [m['Slot'] for m in mechs]
+            stats.append({
+                'type': desc.sheet,
+                'mechs': len(mechs),
+                'loop_iterations': max(slots) - min(slots) + 1,
+                'dense_iterations': len(mechs),
+            })
+        return stats
     
-'''
+    def print_dispatch_report(self):
+        """Звіт: скільки ітерацій за скан економить щільна диспетчеризація"""
+        stats = self.device_runner_dispatch_stats()
+        if not stats:
+            return
+        loop_total = sum(s['loop_iterations'] for s in stats)
+        dense_total = sum(s['dense_iterations'] for s in stats)
+        print(f"🔁 FC_DeviceRunner ({self.runner_layout}): ітерацій за скан loop={loop_total}, "
+              f"dense={dense_total}, економія {loop_total - dense_total}")
+        for s in stats:
+            print(f"   - {s['type']}: {s['loop_iterations']} -> {s['dense_iterations']} "
+                  f"(-{s['loop_iterations'] - s['dense_iterations']})")
+    
+    def generate_fc_device_runner(self) -> str:
+        """Генерація FC_DeviceRunner.scl (прохід run_mechanism_pass)
         
-        if max_gates > 0:
-            code += f'''    // Засувки: {len(self.gates)} шт, масив [0..{max_gates-1}]
-    Gate : ARRAY [0..{max_gates-1}] OF "UDT_Gate2P";
+        runner_layout='loop'  : FOR slot := min..max з перевіркою DeviceType (як раніше)
+        runner_layout='dense' : прямі виклики лише для реальних механізмів
+                                (мапінг той самий, що у FC_InitMechs)
+        """
+        return self._mech_output('FC_DeviceRunner.scl')
     
-'''
+    def _signal_addresses(self, prefix: str) -> Iterator[str]:
+        """Заповнені адреси сигналів DI_/DO_ усіх механізмів (за дескрипторами UDT)"""
+        for desc, mechs in self._mech_groups():
+            signals = desc.inputs if prefix == 'DI_' else desc.outputs
+            for m in mechs:
+                for s in signals:
+                    address = m.get(s.column)
+                    if address:
+                        yield address
+    
+    def _hal_image_plan(self, prefix: str, area: str) -> dict:
+        """План пакетного доступу до образу процесу (hal_mode='packed')
+        
+        Біти сигналів DI_/DO_ групуються по байтах; два сусідні зайняті байти
+        об'єднуються у WORD (%IWn = IBn старший байт, IBn+1 — молодший).
+        """
+        used = {}  # байт -> множина бітів
+        for address in self._signal_addresses(prefix):
+            parsed = parse_io_address(address)
+            if parsed and parsed[0] == area:
+                used.setdefault(parsed[1], set()).add(parsed[2])
+        
+        groups = []
+        bits = {}
+        byte_list = sorted(used)
+        i = 0
+        while i < len(byte_list):
+            b = byte_list[i]
+            if i + 1 < len(byte_list) and byte_list[i + 1] == b + 1:
+                temp = f'img_{area}W{b}'
+                groups.append({'temp': temp, 'type': 'WORD', 'address': f'%{area}W{b}',
+                               'used_bits': len(used[b]) + len(used[b + 1]), 'size': 16})
+                for bit in used[b]:
+                    bits[(b, bit)] = f'#{temp}.%X{8 + bit}'
+                for bit in used[b + 1]:
+                    bits[(b + 1, bit)] = f'#{temp}.%X{bit}'
+                i += 2
+            else:
+                temp = f'img_{area}B{b}'
+                groups.append({'temp': temp, 'type': 'BYTE', 'address': f'%{area}B{b}',
+                               'used_bits': len(used[b]), 'size': 8})
+                for bit in used[b]:
+                    bits[(b, bit)] = f'#{temp}.%X{bit}'
+                i += 1
+        return {'groups': groups, 'bits': bits}
+    
+    def _hal_bit(self, plan: dict, address) -> str:
+        """Зріз біта з тимчасової змінної образу (None — доступ лише символьний)"""
+        if not plan:
+            return None
+        parsed = parse_io_address(address)
+        if not parsed:
+            return None
+        return plan['bits'].get((parsed[1], parsed[2]))
+    
+    def _hal_in(self, tag_name: str, address) -> str:
+        """Джерело для DI: символьний тег або біт пакетно прочитаного образу"""
+        return self._hal_bit(self._hal_read_plan, address) or f'"{tag_name}"'
+    
+    def _hal_out(self, tag_name: str, address) -> str:
+        """Приймач для DO: символьний тег або біт образу, що записується пакетно"""
+        return self._hal_bit(self._hal_write_plan, address) or f'"{tag_name}"'
+    
+    def hal_statement_stats(self) -> Dict[str, Dict[str, int]]:
+        """Кількість операторів та звернень до образу процесу: symbolic vs packed"""
+        stats = {}
+        for name, prefix, area in (('FC_HAL_Read', 'DI_', 'I'), ('FC_HAL_Write', 'DO_', 'Q')):
+            plan = self._hal_image_plan(prefix, area)
+            signals = 0
+            fallback = 0
+            for address in self._signal_addresses(prefix):
+                signals += 1
+                if not self._hal_bit(plan, address):
+                    fallback += 1
+            groups = plan['groups']
+            if area == 'I':
+                image_ops = len(groups)
+            else:
+                # read-modify-write, якщо байт/слово належить генератору не повністю
+                image_ops = len(groups) + sum(1 for g in groups if g['used_bits'] < g['size'])
+            stats[name] = {
+                'signals': signals,
+                'symbolic_statements': signals,
+                'symbolic_image_accesses': signals,
+                'packed_statements': signals + image_ops,
+                'packed_image_accesses': image_ops + fallback,
+                'groups': len(groups),
+            }
+        return stats
+    
+    def print_hal_report(self):
+        """Звіт: оператори/звернення до образу процесу до і після пакетного HAL"""
+        for name, st in self.hal_statement_stats().items():
+            if not st['signals']:
+                continue
+            print(f"📦 {name} ({self.hal_mode}): сигналів {st['signals']}, "
+                  f"операторів {st['symbolic_statements']} -> {st['packed_statements']}, "
+                  f"звернень до образу {st['symbolic_image_accesses']} -> {st['packed_image_accesses']} "
+                  f"({st['groups']} BYTE/WORD)")
+    
+    def _hal_temp_section(self, plan: dict) -> str:
+        """VAR_TEMP з байтами/словами образу процесу"""
+        if not plan or not plan['groups']:
+            return ''
+        code = '\nVAR_TEMP\n'
+        for g in plan['groups']:
+            code += f"    {g['temp']} : {g['type']};\n"
+        code += 'END_VAR\n'
+        return code
+    
+    def generate_fc_hal_read(self) -> str:
+        """Генерація FC_HAL_Read.scl - з СИМВОЛЬНИМИ ІМЕНАМИ (прохід run_mechanism_pass)
         
-        if max_fans > 0:
-            code += f'''    // Вентилятори: {len(self.fans)} шт, масив [0..{max_fans-1}]
-    Fan : ARRAY [0..{max_fans-1}] OF "UDT_Fan";
+        hal_mode='packed': образ процесу читається цілими BYTE/WORD,
+        сигнали розпаковуються зрізами .%Xn (нерозпізнані адреси — символьно).
+        """
+        return self._mech_output('FC_HAL_Read.scl')
     
-'''
+    def generate_fc_hal_write(self) -> str:
+        """Генерація FC_HAL_Write.scl - з СИМВОЛЬНИМИ ІМЕНАМИ (прохід run_mechanism_pass)
         
-        code += '''END_VAR
+        hal_mode='packed': виходи збираються у BYTE/WORD і пишуться в образ
+        одним зверненням; частково зайняті байти — read-modify-write.
+        """
+        return self._mech_output('FC_HAL_Write.scl')
+    
+    def db_mechs_footprint(self) -> dict:
+        """Оцінка пам'яті DB_Mechs за розмірами UDT з UDT_*.scl
+        
+        Рахується стандартна (не оптимізована) розкладка S7, а DB_Mechs
+        оголошено з S7_Optimized_Access := 'TRUE' — фактичний розмір визначає
+        TIA, тож цифри лише орієнтир для порівняння 'sheet' vs 'compact'.
+        'sheet' — масиви за TypedIdx з Excel (max+1), 'compact' — після ущільнення.
+        """
+        calc = LayoutCalculator(load_udts(self.udt_dir))
+        rows = [{
+            'array': 'Mechs',
+            'udt': 'UDT_BaseMechanism',
+            'elem_size': calc.udt_size('UDT_BaseMechanism'),
+            'used': sum(len(m) for m in self._mechs_by_sheet().values()),
+            'sheet_elems': self.MECHS_SLOTS,
+            'compact_elems': self.MECHS_SLOTS,
+        }]
+        for desc, mechs in self._mech_groups():
+            mapping = self.typed_idx_map.get(desc.sheet)
+            if mapping:
+                sheet_elems = max(mapping) + 1
+            else:
+                sheet_elems = max([m['TypedIdx'] for m in mechs], default=-1) + 1
+            rows.append({
+                'array': desc.array,
+                'udt': desc.udt,
+                'elem_size': calc.udt_size(desc.udt),
+                'used': len(mechs),
+                'sheet_elems': sheet_elems,
+                'compact_elems': len(mechs),
+            })
+        for row in rows:
+            row['sheet_bytes'] = calc.array_size(row['udt'], row['sheet_elems'])
+            row['compact_bytes'] = calc.array_size(row['udt'], row['compact_elems'])
+        return {
+            'layout': 'standard',  # оцінка: DB_Mechs оптимізований, див. docstring
+            'rows': rows,
+            'sheet_bytes': sum(r['sheet_bytes'] for r in rows),
+            'compact_bytes': sum(r['compact_bytes'] for r in rows),
+        }
+    
+    def print_footprint_report(self):
+        """Звіт: пам'ять DB_Mechs до/після ущільнення TypedIdx"""
+        try:
+            fp = self.db_mechs_footprint()
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Звіт пам'яті DB_Mechs пропущено: {e}")
+            return
+        print(f"💾 DB_Mechs ≈ {format_bytes(fp['sheet_bytes'])} -> "
+              f"{format_bytes(fp['compact_bytes'])} (typed_idx={self.typed_idx})")
+        print("   ⚠️  Оцінка за стандартною розкладкою S7; DB_Mechs оптимізований — "
+              "фактичний розмір показує TIA")
+        for r in fp['rows']:
+            if not r['sheet_elems']:
+                continue
+            print(f"   - {r['array']:<6} {r['udt']:<18} {r['elem_size']:3d} B × "
+                  f"{r['sheet_elems']} -> {r['compact_elems']} (зайнято {r['used']}): "
+                  f"{r['sheet_bytes']} -> {r['compact_bytes']} B")
+    
+    def _mechs_by_sheet(self) -> Dict[str, list]:
+        """Списки механізмів, проіндексовані іменем аркуша"""
+        return self.sheets
+    
+    def mech_counts(self) -> Dict[str, int]:
+        """Кількість механізмів за аркушами: {'redlers': 2, ...} (звіти batch/run_profile)"""
+        return {sheet.lower(): len(mechs) for sheet, mechs in self.sheets.items()}
+    
+    def _sheet_hashes(self) -> Dict[str, str]:
+        """Хеші нормалізованого вмісту вхідних аркушів"""
+        hashes = {'CONFIG': _sha256(self.config)}
+        for sheet, mechs in self._mechs_by_sheet().items():
+            hashes[sheet] = _sha256(mechs)
+        if self.routes:
+            hashes['ROUTES'] = _sha256(self.routes)
+        return hashes
+    
+    def _generator_fingerprint(self) -> str:
+        """Хеш коду генератора + опцій, що впливають на вихідні файли"""
+        # усі модулі, від яких залежать writer-и (tag_export, route_index, cycle_diag, ...)
+        sources = [path.read_bytes() for path in _local_modules(Path(__file__).resolve())]
+        # сигнали HAL/тегів беруться з UDT механізмів
+        sources += [(self.udt_dir / f"{spec[3]}.scl").read_bytes() for spec in MECH_TYPE_SPECS
+                    if (self.udt_dir / f"{spec[3]}.scl").exists()]
+        if self.cycle_diag:
+            sources.append((self.udt_dir / 'Main.scl').read_bytes())
+        return _sha256({
+            'sources': [_sha256(src) for src in sources],
+            'options': {name: getattr(self, name) for name in self.OUTPUT_OPTIONS},
+        })
+    
+    def _artifact_inputs_hash(self, artifact: str) -> str:
+        """Хеш лише тих колонок, від яких залежить артефакт"""
+        columns = ARTIFACT_INPUTS[artifact]
+        exact = [c for c in columns if not c.endswith('*')]
+        prefixes = tuple(c[:-1] for c in columns if c.endswith('*'))
+        
+        projection = {}
+        for sheet, mechs in self._mechs_by_sheet().items():
+            projection[sheet] = [
+                {k: v for k, v in m.items()
+                 if k in exact or (prefixes and isinstance(k, str) and k.startswith(prefixes))}
+                for m in mechs
+            ]
+        if 'ROUTES' in columns:
+            return _sha256({'config': self.config, 'mechs': projection, 'routes': self.routes})
+        return _sha256({'config': self.config, 'mechs': projection})
+    
+    def _load_manifest(self, path: Path) -> dict:
+        """Прочитати маніфест попередньої збірки (порожній, якщо немає/битий)"""
+        try:
+            return json.loads(path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return {}
+    
+    def build_route_index(self) -> RouteIndex:
+        """Бітовий індекс слот -> маршрути з аркуша ROUTES"""
+        self.route_index = RouteIndex.from_records(self.routes)
+        return self.route_index
+    
+    def _render_route_conflicts(self) -> str:
+        """Матриця спільних слотів маршрутів (порожньо без ROUTES)"""
+        if not self.routes:
+            return ''
+        return (self.route_index or self.build_route_index()).to_csv()
+    
+    def _render_route_index(self) -> str:
+        """Індекс для preflight на стороні SCADA (route_index.RouteIndex.from_json)"""
+        if not self.routes:
+            return ''
+        return (self.route_index or self.build_route_index()).to_json()
+    
+    # ------------------------------------------------------------------
+    # FC_ManualStatusRefresh — Частина 1 FC_ManualMechCmdHandler (PLC -> SCADA)
+    # ------------------------------------------------------------------
+    def _mapped_slots(self) -> List[int]:
+        """Слоти всіх механізмів з конфігурації (за зростанням)"""
+        return sorted(m['Slot'] for mechs in self._mechs_by_sheet().values() for m in mechs)
+    
+    @staticmethod
+    def _status_refresh_body(indent: str) -> str:
+        """Оновлення StatusBySlot[i] (як у Частині 1 FC_ManualMechCmdHandler v3.3)"""
+        body = '''isMapped := ("DB_Mechs".Mechs[i].DeviceType <> "TYPE_NONE")
+            AND ("DB_Mechs".Mechs[i].TypedIndex <> UINT#16#FFFF);
 
-BEGIN
-END_DATA_BLOCK
+isLocal := LocalManualGlobal OR "DB_Mechs".Mechs[i].LocalManual;
+
+IF isMapped THEN
+    allowed := ("DB_Mechs".Mechs[i].OwnerCur = "OWNER_NONE")
+               AND (NOT isLocal)
+               AND ("DB_Mechs".Mechs[i].Enable_OK);
+ELSE
+    allowed := FALSE;
+END_IF;
+
+"DB_PlcToScada_ManualMechStatus".StatusBySlot[i].ManualAllowed := allowed;
+"DB_PlcToScada_ManualMechStatus".StatusBySlot[i].CurrentOwner  := "DB_Mechs".Mechs[i].OwnerCur;
+"DB_PlcToScada_ManualMechStatus".StatusBySlot[i].CurrentStatus := "DB_Mechs".Mechs[i].Status;
 '''
-        return code
+        return ''.join(f'{indent}{line}\n' if line else '\n' for line in body.splitlines())
     
-    def generate_fc_init_mechs(self) -> str:
-        """Генерація FC_InitMechs.scl (БЕЗ ЗМІН)"""
-        code = self._get_header("FC_InitMechs - Ініціалізація мапінгу")
-        code += '''
-FUNCTION "FC_InitMechs" : VOID
-{ S7_Optimized_Access := 'TRUE' }
+    def generate_db_manual_status_refresh(self) -> str:
+        """DB_ManualStatusRefresh: змаплені слоти та курсор round-robin (порожньо у режимі full)"""
+        slots = self._mapped_slots()
+        if not self.status_slots_per_cycle or not slots:
+            return ''
+        code = self._get_header("DB_ManualStatusRefresh - Курсор оновлення статусів для SCADA")
+        code += f'''
+DATA_BLOCK "DB_ManualStatusRefresh"
+{{ S7_Optimized_Access := 'TRUE' }}
 VERSION : 1.0
 
-VAR_TEMP
-    i : INT;
+VAR
+    // Змаплені слоти з конфігурації: {len(slots)} шт
+    MappedSlots : ARRAY[0..{len(slots) - 1}] OF UINT := [
+'''
+        rows = [', '.join(str(s) for s in slots[k:k + 16]) for k in range(0, len(slots), 16)]
+        code += ',\n'.join(f'        {row}' for row in rows) + '\n    ];\n'
+        code += '''    Cursor      : INT;     // наступний індекс у MappedSlots
+    Passes      : UDINT;   // завершених повних проходів (діагностика)
+    Initialized : BOOL;    // перший цикл — повний прохід 0..255
 END_VAR
 
 BEGIN
-    FOR i := 0 TO 255 DO
-        "DB_Mechs".Mechs[i].DeviceType := "DB_Const".TYPE_NONE;
-        "DB_Mechs".Mechs[i].TypedIndex := UINT#16#FFFF;
-    END_FOR;
-    
-'''
-        
-        if self.redlers:
-            code += "    // === REDLERS ===\n"
-            for r in self.redlers:
-                code += f'    "DB_Mechs".Mechs[{r["Slot"]}].DeviceType := "DB_Const".TYPE_REDLER;\n'
-                code += f'    "DB_Mechs".Mechs[{r["Slot"]}].TypedIndex := {r["TypedIdx"]};\n\n'
-        
-        if self.norias:
-            code += "    // === NORIAS ===\n"
-            for n in self.norias:
-                code += f'    "DB_Mechs".Mechs[{n["Slot"]}].DeviceType := "DB_Const".TYPE_NORIA;\n'
-                code += f'    "DB_Mechs".Mechs[{n["Slot"]}].TypedIndex := {n["TypedIdx"]};\n\n'
-        
-        if self.gates:
-            code += "    // === GATES ===\n"
-            for g in self.gates:
-                code += f'    "DB_Mechs".Mechs[{g["Slot"]}].DeviceType := "DB_Const".TYPE_GATE2P;\n'
-                code += f'    "DB_Mechs".Mechs[{g["Slot"]}].TypedIndex := {g["TypedIdx"]};\n\n'
-        
-        if self.fans:
-            code += "    // === FANS ===\n"
-            for f in self.fans:
-                code += f'    "DB_Mechs".Mechs[{f["Slot"]}].DeviceType := "DB_Const".TYPE_FAN;\n'
-                code += f'    "DB_Mechs".Mechs[{f["Slot"]}].TypedIndex := {f["TypedIdx"]};\n\n'
-        
-        code += '''END_FUNCTION
+END_DATA_BLOCK
 '''
         return code
     
-    def generate_fc_device_runner(self) -> str:
-        """Генерація FC_DeviceRunner.scl (БЕЗ ЗМІН)"""
-        code = self._get_header("FC_DeviceRunner - Виконання механізмів")
+    def generate_fc_manual_status_refresh(self) -> str:
+        """Генерація FC_ManualStatusRefresh.scl
+        
+        status_slots_per_cycle=0 : усі 256 слотів щоцикла (як раніше)
+        status_slots_per_cycle=N : N змаплених слотів за цикл по колу (контракт 8.11)
+                                   + слот з MailBox Req щоцикла
+        """
+        slots = self._mapped_slots()
+        per_cycle = min(self.status_slots_per_cycle, len(slots))
+        round_robin = bool(self.status_slots_per_cycle) and bool(slots)
+        
+        code = self._get_header("FC_ManualStatusRefresh - Статуси слотів для SCADA (PLC → SCADA)")
         code += '''
-FUNCTION "FC_DeviceRunner" : VOID
+FUNCTION "FC_ManualStatusRefresh" : VOID
 { S7_Optimized_Access := 'TRUE' }
 VERSION : 1.0
 
-VAR_IN_OUT
-    Mechs  : ARRAY[*] OF "UDT_BaseMechanism";
-'''
-        
-        if self.redlers:
-            code += '    Redler : ARRAY[*] OF "UDT_Redler";\n'
-        if self.norias:
-            code += '    Noria  : ARRAY[*] OF "UDT_Noria";\n'
-        if self.gates:
-            code += '    Gate   : ARRAY[*] OF "UDT_Gate2P";\n'
-        if self.fans:
-            code += '    Fan    : ARRAY[*] OF "UDT_Fan";\n'
-        
-        code += '''END_VAR
+VAR_INPUT
+    LocalManualGlobal : BOOL;
+    Slot              : UINT;   // "DB_PlcScada_MailBox".Req.Slot — оновлюється щоцикла
+END_VAR
 
 VAR_TEMP
-    slot : INT;
-    idx  : INT;
+    i        : INT;
+    k        : INT;
+    allowed  : BOOL;
+    isLocal  : BOOL;
+    isMapped : BOOL;
 END_VAR
 
 BEGIN
 '''
+        if not round_robin:
+            code += '''    // Усі слоти щоцикла (Slot входить у прохід)
+    FOR i := 0 TO 255 DO
         
-        if self.redlers:
-            min_slot = min([r['Slot'] for r in self.redlers])
-            max_slot = max([r['Slot'] for r in self.redlers])
-            code += f'''    // === REDLERS (slot {min_slot}..{max_slot}) ===
-    FOR slot := {min_slot} TO {max_slot} DO
-        IF Mechs[slot].DeviceType = "DB_Const".TYPE_REDLER THEN
-            idx := Mechs[slot].TypedIndex;
-            "FC_Redler"(R := Redler[idx], B := Mechs[slot]);
-        END_IF;
+'''
+            code += self._status_refresh_body('        ')
+            code += '''        
     END_FOR;
-    
+
+END_FUNCTION
 '''
+            return code
         
-        if self.norias:
-            min_slot = min([n['Slot'] for n in self.norias])
-            max_slot = max([n['Slot'] for n in self.norias])
-            code += f'''    // === NORIAS (slot {min_slot}..{max_slot}) ===
-    FOR slot := {min_slot} TO {max_slot} DO
-        IF Mechs[slot].DeviceType = "DB_Const".TYPE_NORIA THEN
-            idx := Mechs[slot].TypedIndex;
-            "FC_Noria"(N := Noria[idx], B := Mechs[slot]);
-        END_IF;
-    END_FOR;
+        code += '''    // =========================================================
+    // 1. Слот з MailBox Req — щоцикла (ACK не показує застарілий статус)
+    // =========================================================
+    IF Slot <= 255 THEN
+        i := UINT_TO_INT(Slot);
+        
+'''
+        code += self._status_refresh_body('        ')
+        code += '''    END_IF;
     
+    // =========================================================
+    // 2. Перший цикл — повний прохід 0..255 (включно з незмапленими)
+    // =========================================================
+    IF NOT "DB_ManualStatusRefresh".Initialized THEN
+        FOR i := 0 TO 255 DO
+            
 '''
+        code += self._status_refresh_body('            ')
+        code += f'''        END_FOR;
         
-        if self.gates:
-            min_slot = min([g['Slot'] for g in self.gates])
-            max_slot = max([g['Slot'] for g in self.gates])
-            code += f'''    // === GATES (slot {min_slot}..{max_slot}) ===
-    FOR slot := {min_slot} TO {max_slot} DO
-        IF Mechs[slot].DeviceType = "DB_Const".TYPE_GATE2P THEN
-            idx := Mechs[slot].TypedIndex;
-            "FC_Gate2P"(G := Gate[idx], B := Mechs[slot]);
-        END_IF;
-    END_FOR;
+        "DB_ManualStatusRefresh".Cursor := 0;
+        "DB_ManualStatusRefresh".Initialized := TRUE;
+        RETURN;
+    END_IF;
     
-'''
+    // =========================================================
+    // 3. Round-robin: {per_cycle} з {len(slots)} змаплених слотів за цикл
+    //    (циклів на повний прохід: {-(-len(slots) // per_cycle)})
+    // =========================================================
+    IF ("DB_ManualStatusRefresh".Cursor < 0) OR ("DB_ManualStatusRefresh".Cursor > {len(slots) - 1}) THEN
+        "DB_ManualStatusRefresh".Cursor := 0;
+    END_IF;
+    
+    FOR k := 1 TO {per_cycle} DO
+        i := UINT_TO_INT("DB_ManualStatusRefresh".MappedSlots["DB_ManualStatusRefresh".Cursor]);
         
-        if self.fans:
-            min_slot = min([f['Slot'] for f in self.fans])
-            max_slot = max([f['Slot'] for f in self.fans])
-            code += f'''    // === FANS (slot {min_slot}..{max_slot}) ===
-    FOR slot := {min_slot} TO {max_slot} DO
-        IF Mechs[slot].DeviceType = "DB_Const".TYPE_FAN THEN
-            idx := Mechs[slot].TypedIndex;
-            "FC_Fan"(F := Fan[idx], B := Mechs[slot]);
+'''
+        code += self._status_refresh_body('        ')
+        code += f'''        
+        "DB_ManualStatusRefresh".Cursor := "DB_ManualStatusRefresh".Cursor + 1;
+        IF "DB_ManualStatusRefresh".Cursor > {len(slots) - 1} THEN
+            "DB_ManualStatusRefresh".Cursor := 0;
+            "DB_ManualStatusRefresh".Passes := "DB_ManualStatusRefresh".Passes + 1;
         END_IF;
     END_FOR;
-    
-'''
-        
-        code += '''END_FUNCTION
+
+END_FUNCTION
 '''
         return code
     
-    def generate_fc_hal_read(self) -> str:
-        """Генерація FC_HAL_Read.scl - з СИМВОЛЬНИМИ ІМЕНАМИ"""
-        code = self._get_header("FC_HAL_Read - Читання HAL входів через символьні імена")
+    # ------------------------------------------------------------------
+    # FC_RouteSummary — агрегати маршрутів один раз за скан (опція route_summary)
+    # ------------------------------------------------------------------
+    def generate_udt_route_summary(self) -> str:
+        """UDT_RouteSummary: членство слот -> маршрути + прапорці для FB_RouteFSM"""
+        if not self.route_summary:
+            return ''
+        code = self._get_header("UDT_RouteSummary - Агрегати 12 маршрутів за скан")
         code += '''
-FUNCTION "FC_HAL_Read" : VOID
+TYPE "UDT_RouteSummary"
 { S7_Optimized_Access := 'TRUE' }
 VERSION : 1.0
+STRUCT
+  // --- членство (перебудова лише при зміні Commit / Rebuild) ---
+  LastCommit : UDINT;                     // HDR_Commit останньої перебудови
+  Built      : BOOL;
+  Builds     : UDINT;                     // лічильник перебудов (діагностика)
+  SlotRoutes : ARRAY[0..255] OF WORD;     // біт (RouteIdx-1): слот є у кроках маршруту
+  SlotList   : ARRAY[0..255] OF UINT;     // слоти з SlotRoutes <> 0 (один прохід за скан)
+  SlotCount  : INT;
+  HasSteps   : WORD;                      // біт (RouteIdx-1): RC_StepCount > 0
 
-VAR_IN_OUT
+  // --- маски поточного скану (біт RouteIdx-1) ---
+  AnyFaultMask : WORD;                    // хоч один слот з FLTCode <> 0
+  AnyLocalMask : WORD;                    // LocalManualGlobal або хоч один LocalManual
+  NotIdleMask  : WORD;                    // хоч один слот не в STS_IDLE
+  OwnedMask    : WORD;                    // хоч один слот з OwnerCur = (OWNER_ROUTE, RouteIdx)
+
+  // --- входи FB_RouteFSM (Sum* при UseSummary := TRUE) ---
+  AnyFault : ARRAY[1..12] OF BOOL;
+  AnyLocal : ARRAY[1..12] OF BOOL;
+  AllIdle  : ARRAY[1..12] OF BOOL;
+  OwnsAny  : ARRAY[1..12] OF BOOL;
+END_STRUCT;
+END_TYPE
 '''
-        
-        if self.redlers:
-            code += '    Redler : ARRAY[*] OF "UDT_Redler";\n'
-        if self.norias:
-            code += '    Noria  : ARRAY[*] OF "UDT_Noria";\n'
-        if self.gates:
-            code += '    Gate   : ARRAY[*] OF "UDT_Gate2P";\n'
-        if self.fans:
-            code += '    Fan    : ARRAY[*] OF "UDT_Fan";\n'
-        
-        code += '''END_VAR
+        return code
+    
+    def generate_db_route_summary(self) -> str:
+        """DB_RouteSummary: екземпляр UDT_RouteSummary для FC_RouteSummary"""
+        if not self.route_summary:
+            return ''
+        code = self._get_header("DB_RouteSummary - Агрегати маршрутів (FC_RouteSummary)")
+        code += '''
+DATA_BLOCK "DB_RouteSummary"
+{ S7_Optimized_Access := 'TRUE' }
+VERSION : 1.0
+
+VAR
+    Summary : "UDT_RouteSummary";
+END_VAR
 
 BEGIN
-'''
-        
-        # === REDLERS ===
-        if self.redlers:
-            code += '    // ===================================================================\n'
-            code += '    // REDLERS\n'
-            code += '    // ===================================================================\n'
-            
-            for r in sorted(self.redlers, key=lambda x: x['TypedIdx']):
-                idx = r['TypedIdx']
-                code += f'    // {r["Name"]} (Slot {r["Slot"]}, {r["Location"]})\n'
-                
-                if r.get('DI_Speed'):
-                    tag_name = self._create_tag_name('Redler', idx, 'DI_Speed')
-                    code += f'    Redler[{idx}].DI_Speed_OK    := "{tag_name}";\n'
-                
-                if r.get('DI_Breaker'):
-                    tag_name = self._create_tag_name('Redler', idx, 'DI_Breaker')
-                    code += f'    Redler[{idx}].DI_Breaker_OK  := "{tag_name}";\n'
-                
-                if r.get('DI_Overflow'):
-                    tag_name = self._create_tag_name('Redler', idx, 'DI_Overflow')
-                    code += f'    Redler[{idx}].DI_Overflow_OK := "{tag_name}";\n'
-                
-                code += '\n'
-        
-        # === NORIAS ===
-        if self.norias:
-            code += '    // ===================================================================\n'
-            code += '    // NORIAS\n'
-            code += '    // ===================================================================\n'
-            
-            for n in sorted(self.norias, key=lambda x: x['TypedIdx']):
-                idx = n['TypedIdx']
-                code += f'    // {n["Name"]} (Slot {n["Slot"]}, {n["Location"]})\n'
-                
-                if n.get('DI_Speed'):
-                    tag_name = self._create_tag_name('Noria', idx, 'DI_Speed')
-                    code += f'    Noria[{idx}].DI_Speed_OK      := "{tag_name}";\n'
-                
-                if n.get('DI_Breaker'):
-                    tag_name = self._create_tag_name('Noria', idx, 'DI_Breaker')
-                    code += f'    Noria[{idx}].DI_Breaker_OK    := "{tag_name}";\n'
-                
-                if n.get('DI_UpperLevel'):
-                    tag_name = self._create_tag_name('Noria', idx, 'DI_UpperLevel')
-                    code += f'    Noria[{idx}].DI_UpperLevel_OK := "{tag_name}";\n'
-                
-                if n.get('DI_LowerLevel'):
-                    tag_name = self._create_tag_name('Noria', idx, 'DI_LowerLevel')
-                    code += f'    Noria[{idx}].DI_LowerLevel_OK := "{tag_name}";\n'
-                
-                code += '\n'
-        
-        # === GATES ===
-        if self.gates:
-            code += '    // ===================================================================\n'
-            code += '    // GATES\n'
-            code += '    // ===================================================================\n'
-            
-            for g in sorted(self.gates, key=lambda x: x['TypedIdx']):
-                idx = g['TypedIdx']
-                code += f'    // {g["Name"]} (Slot {g["Slot"]}, {g["Location"]})\n'
-                
-                if g.get('DI_Opened'):
-                    tag_name = self._create_tag_name('Gate', idx, 'DI_Opened')
-                    code += f'    Gate[{idx}].DI_Opened_OK := "{tag_name}";\n'
-                
-                if g.get('DI_Closed'):
-                    tag_name = self._create_tag_name('Gate', idx, 'DI_Closed')
-                    code += f'    Gate[{idx}].DI_Closed_OK := "{tag_name}";\n'
-                
-                code += '\n'
-        
-        # === FANS ===
-        if self.fans:
-            code += '    // ===================================================================\n'
-            code += '    // FANS\n'
-            code += '    // ===================================================================\n'
-            
-            for f in sorted(self.fans, key=lambda x: x['TypedIdx']):
-                idx = f['TypedIdx']
-                code += f'    // {f["Name"]} (Slot {f["Slot"]}, {f["Location"]})\n'
-                
-                if f.get('DI_Breaker'):
-                    tag_name = self._create_tag_name('Fan', idx, 'DI_Breaker')
-                    code += f'    Fan[{idx}].DI_Breaker_OK := "{tag_name}";\n'
-                
-                code += '\n'
-        
-        code += '''END_FUNCTION
+END_DATA_BLOCK
 '''
         return code
     
-    def generate_fc_hal_write(self) -> str:
-        """Генерація FC_HAL_Write.scl - з СИМВОЛЬНИМИ ІМЕНАМИ"""
-        code = self._get_header("FC_HAL_Write - Запис HAL виходів через символьні імена")
+    def generate_fc_route_summary(self) -> str:
+        """FC_RouteSummary: один прохід по слотах маршрутів замість циклів у 12 FB_RouteFSM
+        
+        Викликається у RoutesSupervisor перед FB_RouteFSM (після HAL_Read/Manual):
+        маршрути не змінюють Status/FLTCode/LocalManual, а owner слоту маршруту r
+        змінює лише сам маршрут r, тож прапорці лишаються дійсними до кінця скану.
+        """
+        if not self.route_summary:
+            return ''
+        code = self._get_header("FC_RouteSummary - anyFault/anyLocal/allIdle/owner для 12 маршрутів")
         code += '''
-FUNCTION "FC_HAL_Write" : VOID
+// Виклик (RoutesSupervisor, до FB_RouteFSM):
+//   "FC_RouteSummary"(Commit := <HDR_Commit>, LocalManualGlobal := ..., Rebuild := FALSE,
+//                     Routes := <активний BUF*_Routes>, Mechs := "DB_Mechs".Mechs,
+//                     Sum := "DB_RouteSummary".Summary);
+//   Route[r](..., UseSummary := TRUE,
+//            SumAnyFault := "DB_RouteSummary".Summary.AnyFault[r], ...);
+// Rebuild := TRUE — якщо кроки маршрутів можуть змінитись без нового Commit.
+
+FUNCTION "FC_RouteSummary" : VOID
 { S7_Optimized_Access := 'TRUE' }
 VERSION : 1.0
 
+VAR_INPUT
+    Commit            : UDINT;   // HDR_Commit: зміна -> перебудова членства
+    LocalManualGlobal : BOOL;
+    Rebuild           : BOOL;    // примусова перебудова членства
+END_VAR
+
 VAR_IN_OUT
+    Routes : ARRAY[1..12] OF "UDT_RouteCmd";
+    Mechs  : ARRAY[0..255] OF "UDT_BaseMechanism";
+    Sum    : "UDT_RouteSummary";
+END_VAR
+
+VAR_TEMP
+    r         : INT;
+    i         : INT;
+    k         : INT;
+    stepCnt   : INT;
+    slot      : UINT;
+    bit       : WORD;
+    m         : WORD;
+    faultMask : WORD;
+    localMask : WORD;
+    busyMask  : WORD;
+    ownedMask : WORD;
+END_VAR
+
+BEGIN
+    // =========================================================
+    // 1. Членство слот -> маршрути (лише при новому Commit)
+    // =========================================================
+    IF Rebuild OR (NOT Sum.Built) OR (Sum.LastCommit <> Commit) THEN
+        FOR i := 0 TO 255 DO
+            Sum.SlotRoutes[i] := 0;
+        END_FOR;
+        Sum.SlotCount := 0;
+        Sum.HasSteps := 0;
+
+        FOR r := 1 TO 12 DO
+            bit := SHL(IN := WORD#1, N := r - 1);
+
+            // та сама нормалізація, що у FB_RouteFSM
+            stepCnt := USINT_TO_INT(Routes[r].RC_StepCount);
+            IF stepCnt > 64 THEN stepCnt := 64; END_IF;
+
+            IF stepCnt > 0 THEN
+                Sum.HasSteps := Sum.HasSteps OR bit;
+
+                FOR i := 0 TO stepCnt - 1 DO
+                    slot := Routes[r].RC_Steps[i].RS_Slot;
+                    IF slot <= 255 THEN
+                        IF Sum.SlotRoutes[slot] = 0 THEN
+                            Sum.SlotList[Sum.SlotCount] := slot;
+                            Sum.SlotCount := Sum.SlotCount + 1;
+                        END_IF;
+                        Sum.SlotRoutes[slot] := Sum.SlotRoutes[slot] OR bit;
+                    END_IF;
+                END_FOR;
+            END_IF;
+        END_FOR;
+
+        Sum.LastCommit := Commit;
+        Sum.Built := TRUE;
+        Sum.Builds := Sum.Builds + 1;
+    END_IF;
+
+    // =========================================================
+    // 2. Один прохід по слотах маршрутів
+    // =========================================================
+    faultMask := 0;
+    localMask := 0;
+    busyMask := 0;
+    ownedMask := 0;
+
+    FOR k := 0 TO Sum.SlotCount - 1 DO
+        slot := Sum.SlotList[k];
+        m := Sum.SlotRoutes[slot];
+
+        IF Mechs[slot].FLTCode <> 0 THEN
+            faultMask := faultMask OR m;
+        END_IF;
+
+        IF Mechs[slot].LocalManual THEN
+            localMask := localMask OR m;
+        END_IF;
+
+        IF Mechs[slot].Status <> "STS_IDLE" THEN
+            busyMask := busyMask OR m;
+        END_IF;
+
+        IF (Mechs[slot].OwnerCur = "OWNER_ROUTE")
+           AND (Mechs[slot].OwnerCurId >= 1) AND (Mechs[slot].OwnerCurId <= 12) THEN
+            ownedMask := ownedMask OR (m AND SHL(IN := WORD#1, N := UINT_TO_INT(Mechs[slot].OwnerCurId) - 1));
+        END_IF;
+    END_FOR;
+
+    // FB_RouteFSM: anyLocal := LocalManualGlobal лише для маршрутів з кроками
+    IF LocalManualGlobal THEN
+        localMask := localMask OR Sum.HasSteps;
+    END_IF;
+
+    Sum.AnyFaultMask := faultMask;
+    Sum.AnyLocalMask := localMask;
+    Sum.NotIdleMask := busyMask;
+    Sum.OwnedMask := ownedMask;
+
+    // =========================================================
+    // 3. Прапорці для FB_RouteFSM
+    // =========================================================
+    FOR r := 1 TO 12 DO
+        bit := SHL(IN := WORD#1, N := r - 1);
+        Sum.AnyFault[r] := (faultMask AND bit) <> 0;
+        Sum.AnyLocal[r] := (localMask AND bit) <> 0;
+        Sum.AllIdle[r] := (busyMask AND bit) = 0;
+        Sum.OwnsAny[r] := (ownedMask AND bit) <> 0;
+    END_FOR;
+
+END_FUNCTION
 '''
-        
-        if self.redlers:
-            code += '    Redler : ARRAY[*] OF "UDT_Redler";\n'
-        if self.norias:
-            code += '    Noria  : ARRAY[*] OF "UDT_Noria";\n'
-        if self.gates:
-            code += '    Gate   : ARRAY[*] OF "UDT_Gate2P";\n'
-        if self.fans:
-            code += '    Fan    : ARRAY[*] OF "UDT_Fan";\n'
-        
-        code += '''END_VAR
+        return code
+    
+    def _route_summary_test_routes(self) -> Dict[int, List[int]]:
+        """Маршрути для FB_Test_RouteSummary: аркуш ROUTES або синтетичні з перших слотів"""
+        if self.routes:
+            return {r['RouteId']: list(r['Slots'][:64]) for r in self.routes
+                    if 1 <= r['RouteId'] <= 12 and r['Slots']}
+        slots = sorted(m['Slot'] for mechs in self._mechs_by_sheet().values() for m in mechs)
+        routes = {k + 1: slots[k * 3:(k + 1) * 3] for k in range(3) if slots[k * 3:(k + 1) * 3]}
+        if len(slots) > 1:
+            routes[len(routes) + 1] = [slots[0], slots[-1]]  # конфлікт зі слотом маршруту 1
+        return routes
+    
+    def generate_fb_test_route_summary(self) -> str:
+        """FB_Test_RouteSummary: FB_RouteFSM з UseSummary = еталон (два набори Mechs)"""
+        if not self.route_summary:
+            return ''
+        routes = self._route_summary_test_routes()
+        code = self._get_header("FB_Test_RouteSummary - Еквівалентність UseSummary та циклів FB_RouteFSM")
+        code += '''
+// Два набори по 12 FB_RouteFSM на копіях шини: MechsRef (UseSummary := FALSE) та
+// MechsSum (FC_RouteSummary -> UseSummary := TRUE). Кожен скан: маршрути ->
+// проста модель механізмів; стан FSM та Owner/Cmd/Status слотів мають збігатись.
+//
+// CaseId: 1 нормальний прогін, 2 FLTCode, 3 LocalManual, 4 LocalManualGlobal,
+//         5 GlobalSafetyStop, 6 RT_CMD_STOP_OP, 7 новий Commit з іншими кроками
+// FailMask: біт 0 — стан FSM, біт 1 — шина Mechs, біт 2 — жоден маршрут не дійшов до RUNNING
+
+FUNCTION_BLOCK "FB_Test_RouteSummary"
+{ S7_Optimized_Access := 'TRUE' }
+VERSION : 1.0
+
+VAR_INPUT
+    Run    : BOOL;   // TRUE = execute test
+    CaseId : INT;    // test case number
+END_VAR
+
+VAR_OUTPUT
+    Passed   : BOOL;
+    Failed   : BOOL;
+    FailMask : DWORD;
+END_VAR
+
+VAR
+    Routes   : ARRAY[1..12] OF "UDT_RouteCmd";
+    MechsRef : ARRAY[0..255] OF "UDT_BaseMechanism";
+    MechsSum : ARRAY[0..255] OF "UDT_BaseMechanism";
+    FsmRef   : ARRAY[1..12] OF "UDT_RouteFsmState";
+    FsmSum   : ARRAY[1..12] OF "UDT_RouteFsmState";
+    RouteRef : ARRAY[1..12] OF "FB_RouteFSM";
+    RouteSum : ARRAY[1..12] OF "FB_RouteFSM";
+    Sum      : "UDT_RouteSummary";
+
+    Safety  : BOOL;
+    Lmg     : BOOL;
+    Commit  : UDINT;
+    running : BOOL;
+
+    scan : INT;
+    r    : INT;
+    s    : INT;
+END_VAR
 
 BEGIN
+    Passed := FALSE;
+    Failed := FALSE;
+    FailMask := 0;
+
+    IF NOT Run THEN
+        RETURN;
+    END_IF;
+
+    // ------------------------------------------------------------------
+    // ARRANGE - шина з конфігурації, маршрути в IDLE
+    // ------------------------------------------------------------------
+    FOR s := 0 TO 255 DO
+        MechsRef[s].DeviceType := "TYPE_NONE";
+        MechsRef[s].TypedIndex := 0;
+        MechsRef[s].Enable_OK := FALSE;
+        MechsRef[s].LocalManual := FALSE;
+        MechsRef[s].Cmd := "CMD_NONE";
+        MechsRef[s].CmdParam1 := 0;
+        MechsRef[s].Force_Code := 0;
+        MechsRef[s].OwnerCur := "OWNER_NONE";
+        MechsRef[s].OwnerCurId := 0;
+        MechsRef[s].LastCmd := "CMD_NONE";
+        MechsRef[s].FLTCode := "FLT_NONE";
+        MechsRef[s].Status := "STS_IDLE";
+    END_FOR;
+
 '''
-        
-        # === REDLERS ===
-        if self.redlers:
-            code += '    // ===================================================================\n'
-            code += '    // REDLERS\n'
-            code += '    // ===================================================================\n'
-            
-            for r in sorted(self.redlers, key=lambda x: x['TypedIdx']):
-                idx = r['TypedIdx']
-                code += f'    // {r["Name"]} (Slot {r["Slot"]}, {r["Location"]})\n'
-                
-                if r.get('DO_Run'):
-                    tag_name = self._create_tag_name('Redler', idx, 'DO_Run')
-                    code += f'    "{tag_name}" := Redler[{idx}].DO_Run;\n'
-                
-                code += '\n'
-        
-        # === NORIAS ===
-        if self.norias:
-            code += '    // ===================================================================\n'
-            code += '    // NORIAS\n'
-            code += '    // ===================================================================\n'
-            
-            for n in sorted(self.norias, key=lambda x: x['TypedIdx']):
-                idx = n['TypedIdx']
-                code += f'    // {n["Name"]} (Slot {n["Slot"]}, {n["Location"]})\n'
-                
-                if n.get('DO_Run'):
-                    tag_name = self._create_tag_name('Noria', idx, 'DO_Run')
-                    code += f'    "{tag_name}" := Noria[{idx}].DO_Run;\n'
-                
-                code += '\n'
-        
-        # === GATES ===
-        if self.gates:
-            code += '    // ===================================================================\n'
-            code += '    // GATES\n'
-            code += '    // ===================================================================\n'
-            
-            for g in sorted(self.gates, key=lambda x: x['TypedIdx']):
-                idx = g['TypedIdx']
-                code += f'    // {g["Name"]} (Slot {g["Slot"]}, {g["Location"]})\n'
-                
-                if g.get('DO_Open'):
-                    tag_name = self._create_tag_name('Gate', idx, 'DO_Open')
-                    code += f'    "{tag_name}" := Gate[{idx}].DO_Open;\n'
-                
-                if g.get('DO_Close'):
-                    tag_name = self._create_tag_name('Gate', idx, 'DO_Close')
-                    code += f'    "{tag_name}" := Gate[{idx}].DO_Close;\n'
-                
-                code += '\n'
-        
-        # === FANS ===
-        if self.fans:
-            code += '    // ===================================================================\n'
-            code += '    // FANS\n'
-            code += '    // ===================================================================\n'
-            
-            for f in sorted(self.fans, key=lambda x: x['TypedIdx']):
-                idx = f['TypedIdx']
-                code += f'    // {f["Name"]} (Slot {f["Slot"]}, {f["Location"]})\n'
-                
-                if f.get('DO_Run'):
-                    tag_name = self._create_tag_name('Fan', idx, 'DO_Run')
-                    code += f'    "{tag_name}" := Fan[{idx}].DO_Run;\n'
-                
-                code += '\n'
-        
-        code += '''END_FUNCTION
+        for desc, mechs in self._mech_groups():
+            if not mechs:
+                continue
+            code += f'    // {desc.sheet}\n'
+            for m in sorted(mechs, key=lambda x: x['Slot']):
+                code += (f'    MechsRef[{m["Slot"]}].DeviceType := "{desc.type_const}"; '
+                         f'MechsRef[{m["Slot"]}].TypedIndex := {m["TypedIdx"]}; '
+                         f'MechsRef[{m["Slot"]}].Enable_OK := TRUE;\n')
+        code += '''
+    MechsSum := MechsRef;
+
+    FOR r := 1 TO 12 DO
+        Routes[r].RC_Cmd := "RT_CMD_NONE";
+        Routes[r].RC_StepCount := 0;
+        FsmRef[r].RF_State := 0;
+        FsmRef[r].RF_ResultCode := 0;
+        FsmRef[r].RF_ActiveStep := 0;
+        FsmRef[r].RF_StepSts := 0;
+        FsmRef[r].RF_AbortLatched := 0;
+        FsmSum[r] := FsmRef[r];
+    END_FOR;
+
+'''
+        for route_id, slots in sorted(routes.items()):
+            code += f'    // маршрут {route_id}: слоти {", ".join(str(s) for s in slots)}\n'
+            code += f'    Routes[{route_id}].RC_StepCount := {len(slots)};\n'
+            for i, slot in enumerate(slots):
+                code += (f'    Routes[{route_id}].RC_Steps[{i}].RS_Slot := {slot}; '
+                         f'Routes[{route_id}].RC_Steps[{i}].RS_Action := "RS_ACT_START"; '
+                         f'Routes[{route_id}].RC_Steps[{i}].RS_Wait := "RS_WAIT_RUNNING"; '
+                         f'Routes[{route_id}].RC_Steps[{i}].RS_TimeoutMs := 0;\n')
+        first = sorted(routes)[0] if routes else 1
+        event_slot = routes[first][0] if routes else 0
+        code += f'''
+    Safety := FALSE;
+    Lmg := FALSE;
+    Commit := Commit + 1;
+    running := FALSE;
+
+    // ------------------------------------------------------------------
+    // ACT + ASSERT - 200 сканів, дві хвилі START
+    // ------------------------------------------------------------------
+    FOR scan := 0 TO 199 DO
+        // ---- команди SCADA ----
+        IF (scan = 1) OR (scan = 102) THEN
+            FOR r := 1 TO 12 DO
+                Routes[r].RC_Cmd := "RT_CMD_START";
+            END_FOR;
+        ELSIF scan = 100 THEN
+            FOR r := 1 TO 12 DO
+                Routes[r].RC_Cmd := "RT_CMD_NONE";
+            END_FOR;
+        END_IF;
+
+        // ---- подія тест-кейсу (у RUNNING першої та другої хвилі) ----
+        CASE CaseId OF
+            1:  // нормальний прогін — без подій
+                ;
+            2:  // FLTCode на першому слоті маршруту {first}
+                IF (scan = 4) OR (scan = 106) THEN
+                    MechsRef[{event_slot}].FLTCode := "FLT_BREAKER";
+                    MechsSum[{event_slot}].FLTCode := "FLT_BREAKER";
+                ELSIF scan = 100 THEN
+                    MechsRef[{event_slot}].FLTCode := "FLT_NONE";
+                    MechsSum[{event_slot}].FLTCode := "FLT_NONE";
+                END_IF;
+            3:  // LocalManual на першому слоті маршруту {first}
+                IF (scan = 4) OR (scan = 106) THEN
+                    MechsRef[{event_slot}].LocalManual := TRUE;
+                    MechsSum[{event_slot}].LocalManual := TRUE;
+                ELSIF (scan = 100) OR (scan = 110) THEN
+                    MechsRef[{event_slot}].LocalManual := FALSE;
+                    MechsSum[{event_slot}].LocalManual := FALSE;
+                END_IF;
+            4:  // LocalManualGlobal
+                Lmg := ((scan >= 4) AND (scan < 10)) OR ((scan >= 106) AND (scan < 108));
+            5:  // GlobalSafetyStop
+                Safety := (scan = 4) OR (scan = 5) OR (scan = 106);
+            6:  // оператор зупиняє всі маршрути
+                IF (scan = 4) OR (scan = 106) THEN
+                    FOR r := 1 TO 12 DO
+                        Routes[r].RC_Cmd := "RT_CMD_STOP_OP";
+                    END_FOR;
+                END_IF;
+            7:  // новий Commit: маршрут {first} без останнього кроку
+                IF (scan = 101) AND (Routes[{first}].RC_StepCount > 1) THEN
+                    Routes[{first}].RC_StepCount := Routes[{first}].RC_StepCount - 1;
+                    Commit := Commit + 1;
+                END_IF;
+            ELSE
+                ;
+        END_CASE;
+
+        // ---- RoutesSupervisor: еталон та UseSummary ----
+        "FC_RouteSummary"(Commit := Commit,
+                          LocalManualGlobal := Lmg,
+                          Rebuild := FALSE,
+                          Routes := Routes,
+                          Mechs := MechsSum,
+                          Sum := Sum);
+
+        FOR r := 1 TO 12 DO
+            RouteRef[r](RouteIdx := INT_TO_USINT(r),
+                        Cmd := Routes[r],
+                        GlobalSafetyStop := Safety,
+                        LocalManualGlobal := Lmg,
+                        UseSummary := FALSE,
+                        Mechs := MechsRef,
+                        Fsm := FsmRef[r]);
+
+            RouteSum[r](RouteIdx := INT_TO_USINT(r),
+                        Cmd := Routes[r],
+                        GlobalSafetyStop := Safety,
+                        LocalManualGlobal := Lmg,
+                        UseSummary := TRUE,
+                        SumAnyFault := Sum.AnyFault[r],
+                        SumAnyLocal := Sum.AnyLocal[r],
+                        SumAllIdle := Sum.AllIdle[r],
+                        SumOwnsAny := Sum.OwnsAny[r],
+                        Mechs := MechsSum,
+                        Fsm := FsmSum[r]);
+
+            IF FsmRef[r].RF_State = "ROUTE_STS_RUNNING" THEN
+                running := TRUE;
+            END_IF;
+        END_FOR;
+
+        // ---- ASSERT шини (Cmd від арбітра — до моделі механізмів) ----
+        FOR s := 0 TO 255 DO
+            IF (MechsRef[s].OwnerCur <> MechsSum[s].OwnerCur)
+               OR (MechsRef[s].OwnerCurId <> MechsSum[s].OwnerCurId)
+               OR (MechsRef[s].Cmd <> MechsSum[s].Cmd)
+               OR (MechsRef[s].Status <> MechsSum[s].Status) THEN
+                FailMask := FailMask OR DW#16#2;
+            END_IF;
+        END_FOR;
+
+        // ---- модель механізмів: START -> RUNNING, STOP -> IDLE ----
+        FOR s := 0 TO 255 DO
+            IF (MechsRef[s].Cmd = "CMD_START") AND (MechsRef[s].FLTCode = 0) THEN
+                MechsRef[s].Status := "STS_RUNNING";
+            ELSIF MechsRef[s].Cmd = "CMD_STOP" THEN
+                MechsRef[s].Status := "STS_IDLE";
+            END_IF;
+            MechsRef[s].Cmd := "CMD_NONE";
+
+            IF (MechsSum[s].Cmd = "CMD_START") AND (MechsSum[s].FLTCode = 0) THEN
+                MechsSum[s].Status := "STS_RUNNING";
+            ELSIF MechsSum[s].Cmd = "CMD_STOP" THEN
+                MechsSum[s].Status := "STS_IDLE";
+            END_IF;
+            MechsSum[s].Cmd := "CMD_NONE";
+        END_FOR;
+
+        // ---- ASSERT стану FSM ----
+        FOR r := 1 TO 12 DO
+            IF (FsmRef[r].RF_State <> FsmSum[r].RF_State)
+               OR (FsmRef[r].RF_ResultCode <> FsmSum[r].RF_ResultCode)
+               OR (FsmRef[r].RF_ActiveStep <> FsmSum[r].RF_ActiveStep)
+               OR (FsmRef[r].RF_StepSts <> FsmSum[r].RF_StepSts)
+               OR (FsmRef[r].RF_AbortLatched <> FsmSum[r].RF_AbortLatched) THEN
+                FailMask := FailMask OR DW#16#1;
+            END_IF;
+        END_FOR;
+    END_FOR;
+
+    IF NOT running THEN
+        FailMask := FailMask OR DW#16#4;
+    END_IF;
+
+    Passed := (FailMask = 0);
+    Failed := NOT Passed;
+
+END_FUNCTION_BLOCK
 '''
         return code
+
+    # ------------------------------------------------------------------
+    # Діагностика часу циклу (опція cycle_diag; аналіз знімка — cycle_diag.py)
+    # ------------------------------------------------------------------
+    def _cycle_diag(self) -> Tuple[str, List[str]]:
+        """(Main.scl з RUNTIME навколо викликів, записи DB_CycleDiag) з Main кореня репозиторію"""
+        if self._cycle_diag_plan is None:
+            from cycle_diag import instrument_main  # NumPy (db_layout) лише з --cycle-diag
+            main_path = self.udt_dir / 'Main.scl'
+            if not main_path.exists():
+                raise ValueError(f"❌ --cycle-diag: не знайдено {main_path}")
+            self._cycle_diag_plan = instrument_main(main_path.read_text(encoding='utf-8-sig'),
+                                                    main_path.name)
+        return self._cycle_diag_plan
+
+    def generate_udt_cycle_diag(self) -> str:
+        """UDT_CycleDiagStat: min/max/avg і гістограма одного вимірюваного виклику"""
+        if not self.cycle_diag:
+            return ''
+        from cycle_diag import udt_source
+        return self._get_header("UDT_CycleDiagStat - Статистика часу виклику") + udt_source()
+
+    def generate_db_cycle_diag(self) -> str:
+        """DB_CycleDiag: Period, Body + запис на кожен виклик верхнього рівня Main"""
+        if not self.cycle_diag:
+            return ''
+        from cycle_diag import db_source
+        _, entries = self._cycle_diag()
+        return self._get_header("DB_CycleDiag - Час циклу OB1 по викликах Main") + db_source(entries)
+
+    def generate_fc_cycle_diag_update(self) -> str:
+        """FC_CycleDiagUpdate: один вимір -> статистика запису DB_CycleDiag"""
+        if not self.cycle_diag:
+            return ''
+        from cycle_diag import fc_source
+        return self._get_header("FC_CycleDiagUpdate - Оновлення статистики часу") + fc_source()
+
+    def generate_main_cycle_diag(self) -> str:
+        """Main.scl з вимірюванням викликів (замість Main з кореня репозиторію)"""
+        if not self.cycle_diag:
+            return ''
+        main, entries = self._cycle_diag()
+        print(f"⏱️  Main з вимірюванням: {', '.join(entries)}")
+        return self._get_header("Main - OB1 з вимірюванням часу викликів (DB_CycleDiag)") + main
+
+    def _render_tags(self, fmt: str) -> bytes:
+        """Таблиця тегів потоком з iter_tags() (порожньо, якщо формат не вибрано)"""
+        if fmt not in self.tag_formats:
+            return b''
+        return render_tags(self.iter_tags(), fmt)
+    
+    def _render_plc_tags_xlsx(self) -> bytes:
+        """Таблиця тегів TIA Portal як вміст .xlsx (openpyxl write-only)"""
+        return self._render_tags('xlsx')
     
-    def generate_all(self, output_dir: str = "./generated"):
-        """Генерувати всі файли"""
+    def _render_plc_tags_xml(self) -> bytes:
+        """Таблиця тегів у форматі TIA Openness (SW.Tags.PlcTagTable)"""
+        return self._render_tags('xml')
+    
+    def _render_plc_tags_csv(self) -> bytes:
+        return self._render_tags('csv')
+    
+    def generate_all(self, output_dir: str = "./generated", incremental: bool = True):
+        """Генерувати всі файли
+        
+        incremental=True: артефакт перегенеровується лише якщо змінились його
+        вхідні колонки (або файл зник/був змінений вручну), і перезаписується
+        лише якщо змінився його вміст. Стан збірки — у .build_manifest.json.
+        Файли з попереднього маніфесту, яких ця збірка не створює (вимкнена
+        опція: --cycle-diag, --route-summary, формат тегів, ...), видаляються.
+        """
         output_path = Path(output_dir)
-        output_path.mkdir(exist_ok=True)
+        output_path.mkdir(parents=True, exist_ok=True)
         
         print(f"\n📝 Генерація файлів у {output_path}...\n")
         
-        # Побудувати таблицю тегів
-        self.build_tags_table()
-        
-        files_created = []
-        
-        # Основні DB/FC
-        self._write_file(output_path / "DB_Mechs.scl", self.generate_db_mechs(), files_created)
-        self._write_file(output_path / "FC_InitMechs.scl", self.generate_fc_init_mechs(), files_created)
-        self._write_file(output_path / "FC_DeviceRunner.scl", self.generate_fc_device_runner(), files_created)
+        manifest_path = output_path / self.MANIFEST_NAME
+        previous_manifest = self._load_manifest(manifest_path)
+        old_manifest = previous_manifest if incremental else {}
+        generator = self._generator_fingerprint()
+        if old_manifest.get('generator') != generator:
+            old_manifest = {}  # інший генератор/опції — повна збірка
         
-        # HAL з символьними іменами
-        self._write_file(output_path / "FC_HAL_Read.scl", self.generate_fc_hal_read(), files_created)
-        self._write_file(output_path / "FC_HAL_Write.scl", self.generate_fc_hal_write(), files_created)
+        sheets = self._sheet_hashes()
+        changed_sheets = [name for name, h in sheets.items()
+                          if old_manifest.get('sheets', {}).get(name) != h]
+        if old_manifest and changed_sheets:
+            print(f"🔄 Змінені аркуші: {', '.join(changed_sheets)}")
         
-        # Таблиця тегів для TIA Portal
-        df_tags, df_props = self.generate_plc_tags_excel()
-        tags_path = output_path / "PLC_Tags.xlsx"
-        with pd.ExcelWriter(tags_path, engine='openpyxl') as writer:
-            df_tags.to_excel(writer, sheet_name='PLC Tags', index=False)
-            df_props.to_excel(writer, sheet_name='TagTable Properties', index=False)
-        files_created.append("PLC_Tags.xlsx")
+        # Побудувати таблицю тегів
+        with self._phase('build_tags_table'):
+            self.build_tags_table()
+        with self._phase('reports'):
+            self.print_dispatch_report()
+            self.print_hal_report()
+            self.print_footprint_report()
+        if self.routes:
+            with self._phase('build_route_index'):
+                self.build_route_index()
+            print_route_report(self.route_index)
+        
+        artifacts = [
+            # Основні DB/FC
+            ("DB_Mechs.scl", self.generate_db_mechs),
+            ("FC_InitMechs.scl", self.generate_fc_init_mechs),
+            ("FC_DeviceRunner.scl", self.generate_fc_device_runner),
+            # HAL з символьними іменами
+            ("FC_HAL_Read.scl", self.generate_fc_hal_read),
+            ("FC_HAL_Write.scl", self.generate_fc_hal_write),
+            # Статуси для SCADA (Частина 1 FC_ManualMechCmdHandler)
+            ("FC_ManualStatusRefresh.scl", self.generate_fc_manual_status_refresh),
+            ("DB_ManualStatusRefresh.scl", self.generate_db_manual_status_refresh),
+            # Таблиця тегів для TIA Portal (формати — --tags-format)
+            ("PLC_Tags.xlsx", self._render_plc_tags_xlsx),
+            ("PLC_Tags.xml", self._render_plc_tags_xml),
+            ("PLC_Tags.csv", self._render_plc_tags_csv),
+            # Індекс конфліктів маршрутів (лише якщо є аркуш ROUTES)
+            ("Route_Conflicts.csv", self._render_route_conflicts),
+            ("Route_Index.json", self._render_route_index),
+            # Агрегати маршрутів за скан (лише з --route-summary)
+            ("UDT_RouteSummary.scl", self.generate_udt_route_summary),
+            ("DB_RouteSummary.scl", self.generate_db_route_summary),
+            ("FC_RouteSummary.scl", self.generate_fc_route_summary),
+            ("FB_Test_RouteSummary.scl", self.generate_fb_test_route_summary),
+            # Вимірювання часу викликів Main (лише з --cycle-diag)
+            ("UDT_CycleDiagStat.scl", self.generate_udt_cycle_diag),
+            ("DB_CycleDiag.scl", self.generate_db_cycle_diag),
+            ("FC_CycleDiagUpdate.scl", self.generate_fc_cycle_diag_update),
+            ("Main.scl", self.generate_main_cycle_diag),
+        ]
+        
+        new_manifest = {'generator': generator, 'sheets': sheets, 'artifacts': {}}
+        files_created = []
+        files_skipped = []
+        self.artifact_stats = {}
+        
+        for name, render in artifacts:
+            with self._phase(f'artifact:{name}'):
+                record = self._build_artifact(output_path / name, render,
+                                              self._artifact_inputs_hash(name),
+                                              old_manifest.get('artifacts', {}).get(name),
+                                              files_created, files_skipped)
+            if record:
+                new_manifest['artifacts'][name] = record
+        
+        # Артефакти попередньої збірки, яких ця збірка вже не створює
+        files_removed = []
+        previous_artifacts = previous_manifest.get('artifacts', {})
+        for name in sorted(set(previous_artifacts) - set(new_manifest['artifacts'])):
+            stale = output_path / name
+            if not stale.exists():
+                continue
+            if _sha256(stale.read_bytes()) != previous_artifacts[name].get('sha256'):
+                print(f"⚠️  {name}: більше не генерується, але змінений вручну — залишено")
+                continue
+            stale.unlink()
+            files_removed.append(name)
+            self.artifact_stats[name] = {'status': 'removed', 'bytes': 0}
+        
+        manifest_path.write_text(json.dumps(new_manifest, indent=2, sort_keys=True) + '\n',
+                                 encoding='utf-8')
+        
+        with self._phase('tags_snapshot'):
+            self.update_tags_snapshot(output_path)
         
         print(f"\n✅ Згенеровано {len(files_created)} файлів:")
         for f in files_created:
             print(f"   ✓ {f}")
+        if files_skipped:
+            print(f"⏭️  Без змін {len(files_skipped)} файлів:")
+            for f in files_skipped:
+                print(f"   = {f}")
+        if files_removed:
+            print(f"🗑️  Видалено {len(files_removed)} застарілих файлів:")
+            for f in files_removed:
+                print(f"   - {f}")
         
         print(f"\n📂 Файли збережено у: {output_path.absolute()}")
+        
+        if self.cycle_budget_ms is not None:
+            with self._phase('check_cycle_budget'):
+                self.check_cycle_budget(output_path)
     
-    def _write_file(self, path: Path, content: str, files_list: List[str]):
-        """Записати файл та додати до списку"""
-        if content:
-            path.write_text(content, encoding='utf-8')
-            files_list.append(path.name)
+    def update_tags_snapshot(self, output_path: Path):
+        """Знімок тегів цієї збірки; з tags_delta — спершу дельта відносно попереднього"""
+        snapshot_path = output_path / TAGS_SNAPSHOT_NAME
+        identities = self.tag_identities()
+        if self.tags_delta:
+            baseline = Path(self.tags_baseline) if self.tags_baseline else snapshot_path
+            previous = load_snapshot(baseline)
+            if previous is None:
+                print(f"⚠️  Дельта тегів: немає знімка {baseline} — імпортуйте повну таблицю PLC_Tags")
+            else:
+                delta = diff_tags(previous[0], self.tags, previous[1], identities)
+                print_delta(delta)
+                for name in write_delta(delta, output_path, self.tag_formats):
+                    print(f"   ✓ {name}")
+        snapshot_path.write_text(json.dumps(snapshot_data(self.tags, identities), indent=1,
+                                            ensure_ascii=False) + '\n', encoding='utf-8')
+    
+    def check_cycle_budget(self, output_path: Path):
+        """Статична оцінка циклу (OB Main + згенеровані FC); ValueError при перевищенні бюджету"""
+        estimate = estimate_scan(output_path, self.cpu, scl_dir=self.udt_dir)
+        print_estimate(estimate, self.cycle_budget_ms)
+        check_budget(estimate, self.cycle_budget_ms)
+        return estimate
+    
+    def _build_artifact(self, path: Path, render, inputs: str, previous: dict,
+                        files_created: List[str], files_skipped: List[str]) -> dict:
+        """Перегенерувати/записати артефакт лише за потреби; повертає запис маніфесту"""
+        on_disk = path.read_bytes() if path.exists() else None
+        on_disk_hash = _sha256(on_disk) if on_disk is not None else None
+        
+        # Входи не змінились і файл той самий, що записали минулого разу
+        if previous and previous.get('inputs') == inputs and previous.get('sha256') == on_disk_hash:
+            files_skipped.append(path.name)
+            self.artifact_stats[path.name] = {'status': 'skipped', 'bytes': len(on_disk)}
+            return previous
+        
+        content = render()
+        if not content:
+            return {}
+        if isinstance(content, str):
+            content = content.encode('utf-8')
+        
+        if content == on_disk:
+            files_skipped.append(path.name)
+            self.artifact_stats[path.name] = {'status': 'unchanged', 'bytes': len(content)}
+        else:
+            path.write_bytes(content)
+            files_created.append(path.name)
+            self.artifact_stats[path.name] = {'status': 'written', 'bytes': len(content)}
+        
+        return {'inputs': inputs, 'sha256': _sha256(content)}
 
 
 # ============================================================================
 # Використання
 # ============================================================================
-if __name__ == "__main__":
+def add_generator_arguments(parser: argparse.ArgumentParser):
+    """Спільні опції генератора (для generate_plc_config.py та batch_generate.py)"""
+    parser.add_argument('--deterministic', action='store_true',
+                        help="без мітки часу у заголовках (стабільний вміст для VCS/TIA)")
+    parser.add_argument('--full', action='store_true',
+                        help="ігнорувати маніфест і перегенерувати всі файли")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="не використовувати знімок конфігурації (.plc_cache/)")
+    parser.add_argument('--dense-runner', action='store_true',
+                        help="FC_DeviceRunner з прямими викликами замість FOR по слотах")
+    parser.add_argument('--packed-hal', action='store_true',
+                        help="FC_HAL_Read/Write з доступом до образу процесу цілими BYTE/WORD")
+    parser.add_argument('--compact-typed-idx', action='store_true',
+                        help="перенумерувати TypedIdx щільно (0..N-1); змінює імена тегів")
+    parser.add_argument('--status-slots-per-cycle', type=int, default=0, metavar='N',
+                        help="FC_ManualStatusRefresh: N змаплених слотів за цикл по колу "
+                             "(0 — усі 256 щоцикла; контракт 8.11: 32)")
+    parser.add_argument('--tags-format', action='append', choices=TAG_FORMATS, default=None,
+                        help="формат таблиці тегів (можна кілька; за замовчуванням xlsx): "
+                             "xlsx — імпорт PLC Tags, xml — TIA Openness, csv")
+    parser.add_argument('--tags-delta', action='store_true',
+                        help="таблиці доданих/змінених/видалених тегів + PLC_Tags_Renames.csv "
+                             "відносно попередньої збірки")
+    parser.add_argument('--tags-baseline', default=None, metavar='PATH',
+                        help="знімок .tags_snapshot.json для --tags-delta (останній імпортований у TIA)")
+    parser.add_argument('--route-summary', action='store_true',
+                        help="FC_RouteSummary (агрегати 12 маршрутів за скан) + FB_Test_RouteSummary")
+    parser.add_argument('--cycle-budget', type=float, default=None, metavar='MS',
+                        help="оцінити час циклу за згенерованим SCL і зупинити збірку при перевищенні")
+    parser.add_argument('--cpu', default=DEFAULT_CPU, choices=sorted(CPU_TABLES),
+                        help=f"таблиця часу CPU для --cycle-budget (за замовчуванням {DEFAULT_CPU})")
+    parser.add_argument('--cycle-diag', action='store_true',
+                        help="Main.scl з RUNTIME навколо кожного виклику + DB_CycleDiag "
+                             "(min/max/avg і гістограма; звіт — cycle_diag.py)")
+
+
+def generator_options(args: argparse.Namespace) -> dict:
+    """Аргументи конструктора PLCCodeGenerator з розібраних опцій"""
+    return {
+        'deterministic': args.deterministic,
+        'use_cache': not args.no_cache,
+        'runner_layout': 'dense' if args.dense_runner else 'loop',
+        'hal_mode': 'packed' if args.packed_hal else 'symbolic',
+        'typed_idx': 'compact' if args.compact_typed_idx else 'sheet',
+        'route_summary': args.route_summary,
+        'status_slots_per_cycle': args.status_slots_per_cycle,
+        'tag_formats': tuple(args.tags_format or ('xlsx',)),
+        'tags_delta': args.tags_delta,
+        'tags_baseline': args.tags_baseline,
+        'cycle_budget_ms': args.cycle_budget,
+        'cpu': args.cpu,
+        'cycle_diag': args.cycle_diag,
+    }
+
+
+def parse_args(argv=None):
+    """Аргументи командного рядка"""
+    parser = argparse.ArgumentParser(description="PLC Code Generator (TIA Portal SCL + PLC Tags)")
+    parser.add_argument('excel', nargs='?', default='elevator_config.xlsx',
+                        help="Excel конфігурація (за замовчуванням elevator_config.xlsx)")
+    parser.add_argument('-o', '--output', default='./generated',
+                        help="каталог для згенерованих файлів")
+    add_generator_arguments(parser)
+    parser.add_argument('--profile', action='store_true',
+                        help=f"час і пам'ять (tracemalloc) кожної фази; звіт у <output>/{REPORT_NAME}")
+    parser.add_argument('--report', default=None, metavar='PATH',
+                        help="записати JSON-звіт запуску (фази, лічильники, байти артефактів)")
+    parser.add_argument('--profile-dump', default=None, metavar='DIR',
+                        help="cProfile + tracemalloc найповільнішої фази у DIR (вмикає --profile)")
+    parser.add_argument('--watch', action='store_true',
+                        help="лишатися в пам'яті й перегенеровувати змінені артефакти після "
+                             "кожного збереження книги (Ctrl+C — вихід)")
+    parser.add_argument('--watch-interval', type=float, default=DEFAULT_INTERVAL, metavar='SEC',
+                        help=f"період опитування файлу в --watch (за замовчуванням {DEFAULT_INTERVAL})")
+    return parser.parse_args(argv)
+
+
+def write_run_report(path: Path, profiler: PhaseProfiler, generator, status: str, error: str,
+                     output: str):
+    """JSON-звіт запуску (для графіків вартості генерації в CI)"""
+    report = build_report(profiler, generator, status, error, {'output': str(output)})
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2, ensure_ascii=False) + '\n', encoding='utf-8')
+    print(f"📄 Звіт запуску: {path}")
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    if args.watch:
+        try:
+            generator = PLCCodeGenerator(args.excel, **generator_options(args))
+        except ValueError as e:
+            print(f"\n❌ {e}")
+            return 1
+        return WatchSession(generator, args.output, args.watch_interval, full=args.full).run()
+    profiling = args.profile or args.profile_dump is not None
+    profiler = PhaseProfiler(memory=profiling, dump_dir=args.profile_dump) \
+        if profiling or args.report else None
+    generator = None
+    status, error = 'ok', ''
     try:
-        generator = PLCCodeGenerator("elevator_config.xlsx")
-        generator.load_excel()
-        generator.validate_excel()
-        generator.generate_all("./generated")
+        generator = PLCCodeGenerator(args.excel, **generator_options(args))
+        generator.profiler = profiler
+        with generator._phase('load_excel'):
+            generator.load_excel()
+        with generator._phase('validate_excel'):
+            generator.validate_excel()
+        generator.generate_all(args.output, incremental=not args.full)
         
         print("\n" + "="*70)
         print("🎉 Генерація завершена успішно!")
@@ -697,14 +1972,33 @@ if __name__ == "__main__":
         print("   - FC_HAL_Read")
         print("   - FC_DeviceRunner")
         print("   - FC_HAL_Write")
+        print("4. Імпортуйте FC_ManualStatusRefresh (+ DB_ManualStatusRefresh у round-robin):")
+        print("   FC_ManualMechCmdHandler (v3.4+) викликає його — без нього проєкт не компілюється")
         
     except FileNotFoundError as e:
-        print(f"\n❌ Помилка: файл 'elevator_config.xlsx' не знайдено")
+        status, error = 'failed', f"файл не знайдено: {e}"
+        print(f"\n❌ Помилка: файл '{e.filename or args.excel}' не знайдено")
         
     except ValueError as e:
+        status, error = 'invalid', str(e)
         print(f"\n❌ Помилка валідації: {e}")
         
     except Exception as e:
+        status, error = 'failed', f"{type(e).__name__}: {e}"
         print(f"\n❌ Несподівана помилка: {e}")
         import traceback
         traceback.print_exc()
+    
+    if profiler is not None:
+        if profiling:
+            print_profile(profiler)
+            for path in profiler.dump_slowest():
+                print(f"🔬 Профіль найповільнішої фази: {path}")
+        profiler.stop()
+        report_path = Path(args.report) if args.report else Path(args.output) / REPORT_NAME
+        write_run_report(report_path, profiler, generator, status, error, args.output)
+    return 0 if status == 'ok' else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
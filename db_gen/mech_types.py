@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Реєстр типів механізмів (дескриптори), похідний від визначень UDT
+
+Набір сигналів DI_/DO_ кожного типу береться з BOOL-полів його UDT
+(UDT_Redler, UDT_Noria, UDT_Gate2P, UDT_Fan):
+- поле DI_<X>_OK <- колонка Excel DI_<X>
+- поле DO_<X>    <- колонка Excel DO_<X>
+
+Порядок сигналів = порядок полів у UDT. Колонки DI_/DO_ аркуша без поля в
+UDT (напр. DI_UpperLevel норій) лишаються фізичними адресами: тег у PLC Tags
+є, у HAL не мапляться (MechType.tag_only). Статична частина дескриптора
+(аркуш, масив у DB_Mechs, FC, константа типу) — MECH_TYPE_SPECS; з неї
+беруться аркуші завантажувача (config_loader), генератора і VirtualPlc.
+
+Новий тип механізму:
+- рядок у MECH_TYPE_SPECS + UDT_<Тип>.scl з полями DI_*_OK / DO_*
+- FC_<Тип>.scl (логіка механізму в PLC) і константа TYPE_* у DB_Const
+- аркуш Excel з колонками Slot, TypedIdx, Name, Location, Enabled, DI_*, DO_*
+- для vplc_* (віртуальний PLC) — ще Python-модель FC у vplc_mechs
+
+Використання:
+    python mech_types.py ..      # дескриптори за UDT_*.scl каталогу
+"""
+
+import sys
+import argparse
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from udt_layout import Field, load_udts
+
+# аркуш, назва (укр.), масив у DB_Mechs, UDT, FC, параметр FC, константа DB_Const,
+# підписи сигналів, що відрізняються від SIGNAL_LABELS
+MECH_TYPE_SPECS = (
+    ('REDLERS', 'Редлери', 'Redler', 'UDT_Redler', 'FC_Redler', 'R', 'TYPE_REDLER', {}),
+    ('NORIAS', 'Норії', 'Noria', 'UDT_Noria', 'FC_Noria', 'N', 'TYPE_NORIA', {}),
+    ('GATES', 'Засувки', 'Gate', 'UDT_Gate2P', 'FC_Gate2P', 'G', 'TYPE_GATE2P', {}),
+    ('FANS', 'Вентилятори', 'Fan', 'UDT_Fan', 'FC_Fan', 'F', 'TYPE_FAN', {'DO_Run': 'Пуск'}),
+)
+
+# Аркуші з механізмами (порядок = порядок типів у згенерованому коді)
+MECH_SHEETS = tuple(spec[0] for spec in MECH_TYPE_SPECS)
+
+# Колонка сигналу -> підпис у коментарі тега (невідомі — ім'я колонки)
+SIGNAL_LABELS = {
+    'DI_Speed': 'Тахо-датчик',
+    'DI_Breaker': 'Автомат захисту',
+    'DI_Overflow': 'Переповнення',
+    'DI_UpperLevel': 'Верхній рівень',
+    'DI_LowerLevel': 'Нижній рівень',
+    'DI_Alingment': 'Сходження стрічки',
+    'DI_Opened': 'Відкрита',
+    'DI_Closed': 'Закрита',
+    'DI_Feedback': 'Зворотний зв\'язок',
+    'DO_Run': 'Контактор пуску',
+    'DO_Open': 'Відкрити',
+    'DO_Close': 'Закрити',
+}
+
+SIGNAL_PREFIXES = ('DI_', 'DO_')
+
+
+def signal_column(member: str) -> Optional[str]:
+    """'DI_Speed_OK' -> 'DI_Speed', 'DO_Run' -> 'DO_Run'; None — поле не є сигналом HAL"""
+    if member.startswith('DI_'):
+        return member[:-3] if member.endswith('_OK') else member
+    if member.startswith('DO_'):
+        return member
+    return None
+
+
+class Signal:
+    """Сигнал HAL: колонка Excel <-> поле UDT"""
+
+    __slots__ = ('column', 'member', 'label')
+
+    def __init__(self, column: str, member: str, label: str):
+        self.column = column    # DI_Speed (ім'я тега: Redler_1_DI_Speed)
+        self.member = member    # DI_Speed_OK (Redler[i].DI_Speed_OK); None — лише тег
+        self.label = label      # підпис у коментарі тега
+
+    @property
+    def is_input(self) -> bool:
+        return self.column.startswith('DI_')
+
+    def __repr__(self) -> str:
+        return f"Signal({self.column!r} -> {self.member!r})"
+
+
+class MechType:
+    """Дескриптор типу механізму"""
+
+    __slots__ = ('sheet', 'title', 'array', 'udt', 'fc', 'param', 'type_const', 'signals')
+
+    def __init__(self, sheet: str, title: str, array: str, udt: str, fc: str, param: str,
+                 type_const: str, signals: Tuple[Signal, ...]):
+        self.sheet = sheet              # REDLERS (аркуш Excel, мітка секцій коду)
+        self.title = title              # Редлери
+        self.array = array              # Redler (масив DB_Mechs, префікс імені тега)
+        self.udt = udt                  # UDT_Redler
+        self.fc = fc                    # FC_Redler
+        self.param = param              # R (параметр FC з елементом масиву)
+        self.type_const = type_const    # TYPE_REDLER ("DB_Const")
+        self.signals = signals
+
+    @property
+    def inputs(self) -> Tuple[Signal, ...]:
+        return tuple(s for s in self.signals if s.is_input)
+
+    @property
+    def outputs(self) -> Tuple[Signal, ...]:
+        return tuple(s for s in self.signals if not s.is_input)
+
+    @property
+    def columns(self) -> Tuple[str, ...]:
+        return tuple(s.column for s in self.signals)
+
+    def wired(self, mechs: Iterable) -> Tuple[Signal, ...]:
+        """Сигнали, заповнені хоча б в одного механізму аркуша"""
+        mechs = list(mechs)
+        return tuple(s for s in self.signals if any(m.get(s.column) for m in mechs))
+
+    def orphan_columns(self, mechs: Iterable) -> Dict[str, int]:
+        """Колонки DI_/DO_ аркуша без поля в UDT -> кількість заповнених адрес"""
+        known = set(self.columns)
+        orphans = {}
+        for m in mechs:
+            for key in m.keys():
+                if isinstance(key, str) and key.startswith(SIGNAL_PREFIXES) and key not in known:
+                    orphans[key] = orphans.get(key, 0) + (1 if m.get(key) else 0)
+        return orphans
+
+    def tag_only(self, mechs: Iterable) -> Tuple[Signal, ...]:
+        """Заповнені колонки DI_/DO_ без поля в UDT: лише тег PLC Tags (без HAL), member = None"""
+        return tuple(Signal(column, None, SIGNAL_LABELS.get(column, column))
+                     for column, used in self.orphan_columns(mechs).items() if used)
+
+    def __repr__(self) -> str:
+        return f"MechType({self.sheet}, {self.udt}, {len(self.signals)} сигналів)"
+
+
+def _signals(fields: List[Field], labels: Dict[str, str]) -> Tuple[Signal, ...]:
+    signals = []
+    for field in fields:
+        column = signal_column(field.name) if field.type == 'BOOL' else None
+        if column:
+            signals.append(Signal(column, field.name,
+                                  labels.get(column) or SIGNAL_LABELS.get(column, column)))
+    return tuple(signals)
+
+
+def build_registry(udts: Dict[str, List[Field]]) -> Dict[str, MechType]:
+    """Аркуш -> дескриптор (порядок MECH_TYPE_SPECS = порядок типів у коді)"""
+    registry = {}
+    for sheet, title, array, udt, fc, param, type_const, labels in MECH_TYPE_SPECS:
+        if udt not in udts:
+            raise ValueError(f"❌ {sheet}: не знайдено визначення {udt} (UDT_*.scl)")
+        signals = _signals(udts[udt], labels)
+        if not signals:
+            raise ValueError(f"❌ {udt}: немає BOOL-полів DI_*/DO_* для HAL")
+        registry[sheet] = MechType(sheet, title, array, udt, fc, param, type_const, signals)
+    return registry
+
+
+def load_registry(directory) -> Dict[str, MechType]:
+    """Реєстр за файлами UDT_*.scl каталогу"""
+    return build_registry(load_udts(directory))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Дескриптори типів механізмів з UDT_*.scl")
+    parser.add_argument('directory', nargs='?', default=str(Path(__file__).resolve().parent.parent))
+    args = parser.parse_args(argv)
+    try:
+        registry = load_registry(args.directory)
+    except ValueError as e:
+        print(e)
+        return 1
+    for desc in registry.values():
+        print(f"🔧 {desc.sheet} ({desc.title}): {desc.udt}, \"{desc.fc}\"({desc.param} := "
+              f"{desc.array}[i]), \"DB_Const\".{desc.type_const}")
+        for s in desc.signals:
+            print(f"   {'DI' if s.is_input else 'DO'} {s.column:<16} -> {s.member:<18} {s.label}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
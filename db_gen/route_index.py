@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Індекс "слот -> маршрути" та матриця конфліктів 12 паралельних маршрутів
+
+FB_RouteFSM відхиляє старт з ROUTE_REJ_BY_OWNER, якщо хоч один слот маршруту
+вже зайнятий. Два маршрути зі спільним слотом не можуть працювати одночасно,
+тож SCADA може не відправляти коміт, який гарантовано буде відхилено.
+
+- slot_routes[slot]  — бітова маска маршрутів (біт RouteId-1), що містять слот
+- route_slots[id]    — бітова маска слотів маршруту (ціле на 256 біт)
+- conflicts[id]      — маска маршрутів, що ділять з ним хоч один слот
+- can_run_concurrently(a, b) / preflight(id, active) — O(1) бітові операції
+
+Використання:
+    python route_index.py elevator_config.xlsx
+    python route_index.py generated/Route_Index.json --check 1 2
+"""
+
+import io
+import csv
+import sys
+import json
+import argparse
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+MAX_ROUTES = 12    # DB_ScadaToPlc_RouteCmd: BUF*_Routes[1..12]
+MAX_STEPS = 64     # UDT_RouteCmd.RC_Steps[0..63]
+SLOTS = 256        # DB_Mechs.Mechs[0..255]
+
+
+def _bits(mask: int) -> Iterable[int]:
+    """Номери встановлених бітів за зростанням"""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class RouteIndex:
+    """Бітові індекси маршрутів (будується один раз, запити — O(1))"""
+
+    __slots__ = ('names', 'route_slots', 'slot_routes', 'conflicts', 'max_routes')
+
+    def __init__(self, routes: Dict[int, Iterable[int]], names: Dict[int, str] = None,
+                 max_routes: int = MAX_ROUTES):
+        self.max_routes = max_routes
+        self.names = dict(names or {})
+        self.route_slots = [0] * (max_routes + 1)   # [0] не використовується (RouteId з 1)
+        self.slot_routes = [0] * SLOTS
+        for route_id, slots in routes.items():
+            if not 1 <= route_id <= max_routes:
+                raise ValueError(f"❌ RouteId {route_id} поза межами 1..{max_routes}")
+            for slot in slots:
+                if not 0 <= slot < SLOTS:
+                    raise ValueError(f"❌ Маршрут {route_id}: слот {slot} поза межами 0..{SLOTS - 1}")
+                self.route_slots[route_id] |= 1 << slot
+                self.slot_routes[slot] |= 1 << (route_id - 1)
+
+        # Конфлікти: об'єднання масок маршрутів по всіх слотах маршруту
+        self.conflicts = [0] * (max_routes + 1)
+        for slot_mask in self.slot_routes:
+            if slot_mask & (slot_mask - 1):   # слот у двох і більше маршрутах
+                for bit in _bits(slot_mask):
+                    self.conflicts[bit + 1] |= slot_mask & ~(1 << bit)
+
+    @classmethod
+    def from_records(cls, routes) -> 'RouteIndex':
+        """З config_loader.RouteRecord (аркуш ROUTES)"""
+        return cls({r['RouteId']: r['Slots'] for r in routes},
+                   {r['RouteId']: r['Name'] for r in routes})
+
+    @classmethod
+    def from_excel(cls, excel_path, use_cache: bool = True) -> 'RouteIndex':
+        from config_loader import load_config
+        return cls.from_records(load_config(excel_path, use_cache=use_cache).routes)
+
+    @classmethod
+    def from_json(cls, path) -> 'RouteIndex':
+        """З Route_Index.json, згенерованого генератором"""
+        data = json.loads(Path(path).read_text(encoding='utf-8'))
+        routes = {int(k): v['slots'] for k, v in data['routes'].items()}
+        names = {int(k): v['name'] for k, v in data['routes'].items()}
+        return cls(routes, names, data.get('max_routes', MAX_ROUTES))
+
+    # --- запити ---
+    @property
+    def route_ids(self) -> List[int]:
+        return [r for r in range(1, self.max_routes + 1) if self.route_slots[r]]
+
+    def slots(self, route_id: int) -> List[int]:
+        return list(_bits(self.route_slots[route_id]))
+
+    def routes_for_slot(self, slot: int) -> List[int]:
+        return [bit + 1 for bit in _bits(self.slot_routes[slot])]
+
+    def can_run_concurrently(self, a: int, b: int) -> bool:
+        """Чи можуть маршрути a і b працювати одночасно (немає спільних слотів)"""
+        return a != b and not (self.conflicts[a] >> (b - 1)) & 1
+
+    def preflight(self, route_id: int, active: Iterable[int] = (), active_mask: int = None) -> List[int]:
+        """Активні маршрути, що заблокують старт route_id (порожньо — можна комітити)
+
+        active_mask — готова маска активних маршрутів (біт RouteId-1), щоб не
+        збирати її щоразу на стороні SCADA.
+        """
+        if active_mask is None:
+            active_mask = 0
+            for other in active:
+                active_mask |= 1 << (other - 1)
+        blocking = self.conflicts[route_id] & active_mask
+        return [bit + 1 for bit in _bits(blocking)]
+
+    def shared_slots(self, a: int, b: int) -> List[int]:
+        return list(_bits(self.route_slots[a] & self.route_slots[b]))
+
+    def conflict_pairs(self) -> List[Tuple[int, int, List[int]]]:
+        """[(a, b, спільні слоти)] для a < b"""
+        pairs = []
+        for a in self.route_ids:
+            for bit in _bits(self.conflicts[a] >> a):
+                b = a + 1 + bit
+                pairs.append((a, b, self.shared_slots(a, b)))
+        return pairs
+
+    # --- експорт ---
+    def matrix(self) -> List[List[int]]:
+        """Кількість спільних слотів для кожної пари (діагональ — розмір маршруту)"""
+        ids = self.route_ids
+        return [[bin(self.route_slots[a] & self.route_slots[b]).count('1') for b in ids] for a in ids]
+
+    def to_csv(self) -> str:
+        ids = self.route_ids
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator='\n')
+        writer.writerow(['RouteId', 'Name'] + [str(r) for r in ids])
+        for a, row in zip(ids, self.matrix()):
+            writer.writerow([a, self.names.get(a, '')] +
+                            ['-' if a == b else n for b, n in zip(ids, row)])
+        return buffer.getvalue()
+
+    def to_dict(self) -> dict:
+        return {
+            'max_routes': self.max_routes,
+            'routes': {str(r): {'name': self.names.get(r, ''), 'slots': self.slots(r),
+                                'conflicts': [bit + 1 for bit in _bits(self.conflicts[r])]}
+                       for r in self.route_ids},
+            'slot_routes': {str(s): self.routes_for_slot(s)
+                            for s in range(SLOTS) if self.slot_routes[s]},
+            'conflict_mask': {str(r): self.conflicts[r] for r in self.route_ids},
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), indent=2, ensure_ascii=False) + '\n'
+
+
+def validate_routes(routes, mapped_slots: Iterable[int]) -> List[str]:
+    """Помилки аркуша ROUTES: RouteId 1..12 без дублів, слоти змаплені, без повторів, <= 64"""
+    errors = []
+    mapped = set(mapped_slots)
+    seen = {}
+    for r in routes:
+        route_id = r['RouteId']
+        label = f"маршрут {route_id} '{r['Name']}'"
+        if not isinstance(route_id, int) or not 1 <= route_id <= MAX_ROUTES:
+            errors.append(f"❌ ROUTES: {label}: RouteId має бути 1..{MAX_ROUTES}")
+            continue
+        if route_id in seen:
+            errors.append(f"❌ ROUTES: дублікат RouteId {route_id} ('{seen[route_id]}' та '{r['Name']}')")
+        seen[route_id] = r['Name']
+        slots = r['Slots']
+        if not slots:
+            errors.append(f"❌ ROUTES: {label}: порожній список слотів")
+        if len(slots) > MAX_STEPS:
+            errors.append(f"❌ ROUTES: {label}: {len(slots)} слотів, максимум {MAX_STEPS} кроків")
+        duplicates = sorted({s for s in slots if slots.count(s) > 1})
+        if duplicates:
+            errors.append(f"❌ ROUTES: {label}: повтор слотів {duplicates}")
+        unmapped = [s for s in slots if s not in mapped]
+        if unmapped:
+            errors.append(f"❌ ROUTES: {label}: слоти без увімкненого механізму {unmapped}")
+    return errors
+
+
+def print_report(index: RouteIndex):
+    pairs = index.conflict_pairs()
+    print(f"🛤️  Маршрути: {len(index.route_ids)}, конфліктних пар: {len(pairs)}")
+    for a, b, shared in pairs:
+        print(f"   - {a} '{index.names.get(a, '')}' × {b} '{index.names.get(b, '')}': слоти {shared}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Індекс конфліктів маршрутів (аркуш ROUTES)")
+    parser.add_argument('source', nargs='?', default='elevator_config.xlsx',
+                        help="elevator_config.xlsx або згенерований Route_Index.json")
+    parser.add_argument('--check', nargs=2, type=int, metavar=('A', 'B'),
+                        help="чи можуть маршрути A і B працювати одночасно")
+    parser.add_argument('--csv', action='store_true', help="вивести матрицю конфліктів (CSV)")
+    args = parser.parse_args(argv)
+
+    source = Path(args.source)
+    index = RouteIndex.from_json(source) if source.suffix == '.json' else RouteIndex.from_excel(source)
+    print_report(index)
+    if args.csv:
+        print(index.to_csv(), end='')
+    if args.check:
+        a, b = args.check
+        ok = index.can_run_concurrently(a, b)
+        print(f"{'✅' if ok else '❌'} Маршрути {a} і {b}: "
+              f"{'можуть працювати одночасно' if ok else f'спільні слоти {index.shared_slots(a, b)}'}")
+        return 0 if ok else 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
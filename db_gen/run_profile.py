@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Профіль фаз генератора та структурований звіт запуску (JSON для CI)
+
+- PhaseProfiler.phase(name) — час фази (perf_counter); з memory=True також
+  пік і приріст пам'яті Python (tracemalloc, з накладними витратами)
+- з dump_dir кожна фаза профілюється cProfile, а для найповільнішої
+  записуються <фаза>.prof (pstats / snakeviz), <фаза>.txt (топ функцій)
+  та <фаза>.alloc.txt (топ рядків-алокаторів tracemalloc)
+- звіт: фази, кількість записів за типами, тегів, байтів на артефакт
+
+Використання:
+    python generate_plc_config.py --profile                      # + generated/run_report.json
+    python generate_plc_config.py --report build/report.json
+    python generate_plc_config.py --profile-dump build/profile
+"""
+
+import io
+import re
+import time
+import pstats
+import cProfile
+import tracemalloc
+import contextlib
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, List, Optional
+
+REPORT_VERSION = 1
+REPORT_NAME = 'run_report.json'
+TOP_STATS = 25
+
+
+class Phase:
+    """Виміри однієї фази"""
+
+    __slots__ = ('name', 'seconds', 'peak_bytes', 'alloc_bytes', 'profile', 'snapshots')
+
+    def __init__(self, name: str):
+        self.name = name
+        self.seconds = 0.0
+        self.peak_bytes = None      # пік трасованої пам'яті під час фази
+        self.alloc_bytes = None     # приріст утримуваної пам'яті після фази
+        self.profile = None         # cProfile.Profile (лише з dump_dir)
+        self.snapshots = None       # (до, після) tracemalloc (лише з dump_dir)
+
+    def to_dict(self) -> dict:
+        record = {'name': self.name, 'seconds': round(self.seconds, 6)}
+        if self.peak_bytes is not None:
+            record['peak_bytes'] = self.peak_bytes
+            record['alloc_bytes'] = self.alloc_bytes
+        return record
+
+
+class PhaseProfiler:
+    """Вимірювання фаз; без memory/dump_dir — лише perf_counter"""
+
+    def __init__(self, memory: bool = False, dump_dir=None):
+        self.memory = memory or dump_dir is not None
+        self.dump_dir = Path(dump_dir) if dump_dir else None
+        self.phases: List[Phase] = []
+        self.started = time.perf_counter()
+        self.started_at = datetime.now().isoformat(timespec='seconds')
+        self._own_tracemalloc = False
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._own_tracemalloc = True
+
+    @contextlib.contextmanager
+    def phase(self, name: str):
+        record = Phase(name)
+        self.phases.append(record)
+        before = None
+        if self.memory:
+            tracemalloc.reset_peak()
+            start_current = tracemalloc.get_traced_memory()[0]
+            if self.dump_dir:
+                before = tracemalloc.take_snapshot()
+        if self.dump_dir:
+            record.profile = cProfile.Profile()
+            record.profile.enable()
+        started = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record.seconds = time.perf_counter() - started
+            if record.profile is not None:
+                record.profile.disable()
+            if self.memory:
+                current, peak = tracemalloc.get_traced_memory()
+                record.peak_bytes = max(peak - start_current, 0)
+                record.alloc_bytes = current - start_current
+                if before is not None:
+                    record.snapshots = (before, tracemalloc.take_snapshot())
+
+    def stop(self):
+        if self._own_tracemalloc:
+            tracemalloc.stop()
+            self._own_tracemalloc = False
+
+    @property
+    def total_seconds(self) -> float:
+        return time.perf_counter() - self.started
+
+    def slowest(self) -> Optional[Phase]:
+        return max(self.phases, key=lambda p: p.seconds, default=None)
+
+    def dump_slowest(self) -> List[Path]:
+        """Записати cProfile / tracemalloc найповільнішої фази; повертає шляхи"""
+        phase = self.slowest()
+        if self.dump_dir is None or phase is None or phase.profile is None:
+            return []
+        self.dump_dir.mkdir(parents=True, exist_ok=True)
+        stem = re.sub(r'[^\w.-]+', '_', phase.name)
+        paths = []
+
+        prof_path = self.dump_dir / f"{stem}.prof"
+        phase.profile.dump_stats(str(prof_path))
+        paths.append(prof_path)
+
+        text = io.StringIO()
+        stats = pstats.Stats(phase.profile, stream=text)
+        stats.sort_stats('cumulative').print_stats(TOP_STATS)
+        txt_path = self.dump_dir / f"{stem}.txt"
+        txt_path.write_text(text.getvalue(), encoding='utf-8')
+        paths.append(txt_path)
+
+        if phase.snapshots:
+            before, after = phase.snapshots
+            lines = [f"# {phase.name}: топ {TOP_STATS} рядків за приростом пам'яті"]
+            for stat in after.compare_to(before, 'lineno')[:TOP_STATS]:
+                lines.append(str(stat))
+            alloc_path = self.dump_dir / f"{stem}.alloc.txt"
+            alloc_path.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+            paths.append(alloc_path)
+        return paths
+
+    def phases_dict(self) -> List[dict]:
+        return [p.to_dict() for p in self.phases]
+
+
+def build_report(profiler: PhaseProfiler, generator=None, status: str = 'ok', error: str = '',
+                 extra: Dict[str, object] = None) -> dict:
+    """Звіт запуску: фази, лічильники та артефакти генератора (якщо він створений)"""
+    slowest = profiler.slowest()
+    report = {
+        'version': REPORT_VERSION,
+        'started': profiler.started_at,
+        'status': status,
+        'error': error,
+        'seconds': round(profiler.total_seconds, 6),
+        'memory_profiled': profiler.memory,
+        'phases': profiler.phases_dict(),
+        'slowest_phase': slowest.name if slowest else None,
+    }
+    if generator is not None:
+        report.update({
+            'excel': str(generator.excel_path),
+            'options': {name: getattr(generator, name) for name in generator.OUTPUT_OPTIONS},
+            'counts': dict(generator.mech_counts(), routes=len(generator.routes)),
+            'tags': len(generator.tags),
+            'artifacts': generator.artifact_stats,
+            'bytes_written': sum(a['bytes'] for a in generator.artifact_stats.values()
+                                 if a['status'] == 'written'),
+        })
+    report.update(extra or {})
+    return report
+
+
+def print_profile(profiler: PhaseProfiler, limit: int = 15):
+    """Таблиця фаз за спаданням часу"""
+    total = profiler.total_seconds
+    print(f"\n🔬 Профіль фаз (усього {total * 1000:.1f} мс"
+          + (", з tracemalloc" if profiler.memory else "") + ")")
+    print(f"   {'Фаза':<40} {'мс':>9} {'%':>6}" + (f" {'пік, КБ':>10} {'приріст, КБ':>12}"
+                                                 if profiler.memory else ""))
+    for phase in sorted(profiler.phases, key=lambda p: -p.seconds)[:limit]:
+        share = phase.seconds / total * 100 if total else 0.0
+        row = f"   {phase.name:<40} {phase.seconds * 1000:>9.2f} {share:>6.1f}"
+        if phase.peak_bytes is not None:
+            row += f" {phase.peak_bytes / 1024:>10.1f} {phase.alloc_bytes / 1024:>12.1f}"
+        print(row)
+    if len(profiler.phases) > limit:
+        print(f"   ... ще {len(profiler.phases) - limit} фаз")
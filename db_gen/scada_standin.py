@@ -0,0 +1,559 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SCADA-дублер (asyncio) проти віртуального PLC маршрутів
+
+Протоколи, як їх бачить SCADA:
+- маршрути: DB_ScadaToPlc_RouteCmd — запис у неактивний BUF<1-ActiveBuf>_Routes,
+  перемикання HDR_ActiveBuf, HDR_Commit += 1; очікування
+  DB_PlcToScada_RouteStatus.ACK_CommitApplied >= коміт
+- ручні команди: DB_PlcScada_MailBox — Req.Slot/Cmd/Param1, Req.Commit += 1;
+  очікування Ack.AckCommit = коміт (один слот на всіх операторів)
+
+PLC — vplc_routes.RouteEngine (FB_RouteFSM + FC_ArbiterMech + модель механізмів)
+та порт Частини 2 FC_ManualMechCmdHandler; порядок скану як в OB1 (контракт 2.2):
+Manual -> RoutesSupervisor -> механізми. Клієнти — asyncio-задачі на віртуальному
+часі PLC: між сканами кожен клієнт виконується до наступного await plc.sleep(),
+тож результат детермінований від seed і не залежить від швидкості машини.
+
+Звіт: затримка коміт -> ACK (p50/p90/p99/max), перезаписані коміти (SCADA
+записала новий до того, як PLC взяв попередній), тайм-аути, завантаження MailBox.
+--sweep показує, на скількох операторах одно-слотовий MailBox насичується.
+
+Використання:
+    python scada_standin.py --route-clients 4 --manual-clients 8 --seconds 600
+    python scada_standin.py --mailbox overwrite --sweep 1,2,4,8,16,32
+"""
+
+import sys
+import json
+import heapq
+import random
+import asyncio
+import argparse
+from typing import Dict, List, Optional, Sequence
+
+from vplc_routes import (MAX_ROUTES, SLOTS, UNMAPPED_INDEX, CyclicDriver, MechBus, RouteCmd,
+                         RouteStatus, arbiter_mech, make_engine)
+
+UDINT_MODULO = 1 << 32
+MAILBOX_POLICIES = ('wait', 'overwrite')
+
+
+def commit_reached(ack: int, commit: int) -> bool:
+    """ack >= commit для лічильника UDINT з переповненням"""
+    return (ack - commit) % UDINT_MODULO < UDINT_MODULO // 2
+
+
+def percentiles(values: Sequence[float], points: Sequence[int] = (50, 90, 99)) -> Dict[str, float]:
+    """Перцентилі (nearest-rank) + max; порожньо — нулі"""
+    if not values:
+        return {**{f'p{p}': 0.0 for p in points}, 'max': 0.0, 'count': 0}
+    ordered = sorted(values)
+    out = {f'p{p}': float(ordered[max(0, -(-p * len(ordered) // 100) - 1)]) for p in points}
+    out['max'] = float(ordered[-1])
+    out['count'] = len(ordered)
+    return out
+
+
+# ============================================================================
+# DB обміну SCADA <-> PLC
+# ============================================================================
+class RouteCmdDB:
+    """DB_ScadaToPlc_RouteCmd"""
+
+    __slots__ = ('HDR_ActiveBuf', 'HDR_Commit', 'BUF0_Routes', 'BUF1_Routes')
+
+    def __init__(self, routes: int = MAX_ROUTES):
+        self.HDR_ActiveBuf = 0
+        self.HDR_Commit = 0
+        self.BUF0_Routes = [RouteCmd() for _ in range(routes)]
+        self.BUF1_Routes = [RouteCmd() for _ in range(routes)]
+
+    def buffer(self, index: int) -> List[RouteCmd]:
+        return self.BUF1_Routes if index else self.BUF0_Routes
+
+
+class RouteStatusDB:
+    """DB_PlcToScada_RouteStatus"""
+
+    __slots__ = ('ACK_CommitApplied', 'RoutesSts')
+
+    def __init__(self, routes: int = MAX_ROUTES):
+        self.ACK_CommitApplied = 0
+        self.RoutesSts = [RouteStatus() for _ in range(routes)]
+
+
+class MailBoxReq:
+    """UDT_MailBox_Req"""
+
+    __slots__ = ('Slot', 'Cmd', 'Param1', 'Commit')
+
+    def __init__(self):
+        self.Slot = 0
+        self.Cmd = 0
+        self.Param1 = 0
+        self.Commit = 0
+
+
+class MailBoxAck:
+    """UDT_MailBox_Ack"""
+
+    __slots__ = ('AckCommit', 'AckOk', 'RejectCode', 'Slot')
+
+    def __init__(self):
+        self.AckCommit = 0
+        self.AckOk = False
+        self.RejectCode = 0
+        self.Slot = 0
+
+
+class MailBoxDB:
+    """DB_PlcScada_MailBox"""
+
+    __slots__ = ('Ack', 'Req')
+
+    def __init__(self):
+        self.Ack = MailBoxAck()
+        self.Req = MailBoxReq()
+
+
+def manual_mailbox(bus: MechBus, c, local_manual_global: bool, mailbox: MailBoxDB) -> bool:
+    """Частина 2 FC_ManualMechCmdHandler: обробити Req, якщо Commit новий"""
+    req = mailbox.Req
+    ack = mailbox.Ack
+    commit_in = req.Commit
+    if commit_in == ack.AckCommit:
+        return False
+    slot = req.Slot
+
+    def done(ok: bool, reject: int) -> bool:
+        ack.AckCommit = commit_in
+        ack.AckOk = ok
+        ack.RejectCode = reject
+        ack.Slot = slot
+        return True
+
+    if slot >= SLOTS or bus.DeviceType[slot] == c.TYPE_NONE or bus.TypedIndex[slot] == UNMAPPED_INDEX:
+        return done(False, c.MAN_REJ_SLOT_UNMAPPED)
+
+    is_local = local_manual_global or bus.LocalManual[slot]
+
+    # Meta-команди (не йдуть в механізм)
+    if req.Cmd == c.CMD_SET_FORCE:
+        bus.set('Force_Code', slot, req.Param1)
+        bus.set('LastCmd', slot, c.CMD_SET_FORCE)
+        return done(True, c.MAN_REJ_OK)
+
+    if req.Cmd == c.CMD_RELEASE_OWNER:
+        if bus.Status[slot] != c.STS_IDLE:
+            return done(False, c.MAN_REJ_NOT_IDLE)
+        ok = arbiter_mech(bus, slot, c, local_manual_global, c.OWNER_SCADA, 0,
+                          c.CMD_NONE, 0, True, False)
+        if ok:
+            bus.set('LastCmd', slot, c.CMD_RELEASE_OWNER)
+        return done(ok, c.MAN_REJ_OK if ok else c.MAN_REJ_ARBITER_FAIL)
+
+    # Команди механізму (через арбітр)
+    reject = c.MAN_REJ_OK
+    if req.Cmd == c.CMD_NONE:
+        reject = c.MAN_REJ_CMD_INVALID
+    elif is_local:
+        reject = c.MAN_REJ_LOCAL_MANUAL
+    elif not bus.Enable_OK[slot]:
+        reject = c.MAN_REJ_NOT_ENABLED
+    elif bus.OwnerCur[slot] not in (c.OWNER_NONE, c.OWNER_SCADA):
+        reject = c.MAN_REJ_OWNER_BUSY
+    if reject != c.MAN_REJ_OK:
+        return done(False, reject)
+
+    ok = arbiter_mech(bus, slot, c, local_manual_global, c.OWNER_SCADA, 0,
+                      req.Cmd, req.Param1, False, False)
+    return done(ok, c.MAN_REJ_OK if ok else c.MAN_REJ_ARBITER_FAIL)
+
+
+# ============================================================================
+# Віртуальний PLC з віртуальним часом для asyncio
+# ============================================================================
+class PlcService:
+    """OB1 віртуального PLC + планувальник віртуального часу для клієнтів
+
+    Клієнти чекають лише через sleep(); scan-цикл просуває час, будить
+    клієнтів і віддає керування, доки всі знову не заснуть.
+    """
+
+    MAX_YIELDS = 10000  # захист від клієнта, що чекає не на віртуальному часі
+
+    def __init__(self, engine=None, cycle_ms: int = 10):
+        self.engine = engine or make_engine(cycle_ms=cycle_ms)
+        self.c = self.engine.c
+        self.cycle_ms = self.engine.clock.cycle_ms
+        self.route_cmd = RouteCmdDB(len(self.engine.routes))
+        self.route_status = RouteStatusDB(len(self.engine.routes))
+        self.mailbox = MailBoxDB()
+        self.now = 0            # монотонний віртуальний час, мс
+        self.scans = 0
+        self.mailbox_busy_scans = 0  # сканів, на початку яких Req чекав на обробку
+        self._timers = []       # (wake_ms, seq, future)
+        self._seq = 0
+        self._clients = 0
+
+    # --- віртуальний час ---
+    def sleep(self, ms: float) -> 'asyncio.Future':
+        """Заснути щонайменше на ms віртуального часу (мінімум до наступного скану)"""
+        future = asyncio.get_running_loop().create_future()
+        self._seq += 1
+        heapq.heappush(self._timers, (self.now + max(ms, 0), self._seq, future))
+        return future
+
+    def spawn(self, coro) -> 'asyncio.Task':
+        """Запустити клієнта (враховується у визначенні спокою)"""
+        self._clients += 1
+        task = asyncio.get_running_loop().create_task(coro)
+        task.add_done_callback(self._client_done)
+        return task
+
+    def _client_done(self, task):
+        self._clients -= 1
+
+    async def _settle(self):
+        """Віддавати керування, доки кожен живий клієнт не чекає на sleep()"""
+        for _ in range(self.MAX_YIELDS):
+            waiting = sum(1 for _, _, f in self._timers if not f.done())
+            if waiting >= self._clients:
+                return
+            await asyncio.sleep(0)
+        raise RuntimeError("❌ Клієнт SCADA чекає не на віртуальному часі (лише await plc.sleep())")
+
+    # --- OB1 ---
+    def scan(self):
+        """Manual (MailBox) -> RoutesSupervisor (буфер + ACK) -> FB_RouteFSM -> механізми"""
+        engine = self.engine
+        mailbox = self.mailbox
+        if mailbox.Req.Commit != mailbox.Ack.AckCommit:
+            self.mailbox_busy_scans += 1
+        manual_mailbox(engine.bus, self.c, engine.local_manual_global, mailbox)
+
+        hdr = self.route_cmd
+        status = self.route_status
+        if hdr.HDR_Commit != status.ACK_CommitApplied:
+            for idx, (src, cmd) in enumerate(zip(hdr.buffer(hdr.HDR_ActiveBuf), engine.cmds), 1):
+                if src.RC_Steps is not cmd.RC_Steps:
+                    engine.command(idx, src.RC_Cmd, src.RC_Steps)
+                elif src.RC_Cmd != cmd.RC_Cmd:
+                    engine.command(idx, src.RC_Cmd)
+            status.ACK_CommitApplied = hdr.HDR_Commit
+
+        engine.scan()
+        for sts, route in zip(status.RoutesSts, engine.routes):
+            sts.RS_State = route.Sts.RS_State
+            sts.RS_ResultCode = route.Sts.RS_ResultCode
+            sts.RS_ActiveStep = route.Sts.RS_ActiveStep
+            sts.RS_StepSts = route.Sts.RS_StepSts
+        self.scans += 1
+        self.now += self.cycle_ms
+
+    async def run(self, duration_ms: int):
+        """Сканувати duration_ms віртуального часу, будячи клієнтів між сканами"""
+        await self._settle()
+        end = self.now + duration_ms
+        while self.now < end:
+            self.scan()
+            while self._timers and self._timers[0][0] <= self.now:
+                future = heapq.heappop(self._timers)[2]
+                if not future.done():
+                    future.set_result(None)
+            await self._settle()
+
+
+# ============================================================================
+# SCADA: запис протоколів та статистика
+# ============================================================================
+class ProtocolStats:
+    """Коміти одного протоколу: затримки, перезаписи, тайм-аути"""
+
+    def __init__(self):
+        self.commits = 0
+        self.acked = 0
+        self.overwritten = 0
+        self.timeouts = 0
+        self.in_flight = 0   # без результату на кінець прогону
+        self.ack_lost = 0    # виконано, але Ack перезаписано до опитування клієнта
+        self.latency_ms = []
+        self.queue_ms = []
+        self.rejects = {}
+
+    def to_dict(self, seconds: float) -> dict:
+        return {
+            'commits': self.commits,
+            'acked': self.acked,
+            'overwritten': self.overwritten,
+            'timeouts': self.timeouts,
+            'ack_lost': self.ack_lost,
+            'in_flight': self.in_flight,
+            'commits_per_s': round(self.commits / seconds, 3) if seconds else 0.0,
+            'latency_ms': percentiles(self.latency_ms),
+            'queue_ms': percentiles(self.queue_ms),
+            'rejects': dict(sorted(self.rejects.items())),
+        }
+
+
+class Scada:
+    """Один сервер SCADA: спільні записи в DB PLC для всіх клієнтів"""
+
+    def __init__(self, plc: PlcService, poll_ms: int = 20, timeout_ms: int = 5000,
+                 mailbox_policy: str = 'wait'):
+        if mailbox_policy not in MAILBOX_POLICIES:
+            raise ValueError(f"❌ Невідома політика MailBox: {mailbox_policy}")
+        self.plc = plc
+        self.poll_ms = poll_ms
+        self.timeout_ms = timeout_ms
+        self.mailbox_policy = mailbox_policy
+        self.routes = ProtocolStats()
+        self.manual = ProtocolStats()
+        self._pending_route_commit = None  # коміт, ще не взятий PLC (для обліку перезапису)
+        self._manual_overwritten = set()   # Req.Commit, перезаписані до обробки
+
+    # --- маршрути: double buffer ---
+    def commit_routes(self, changes: Dict[int, RouteCmd]) -> int:
+        """Записати зміни у неактивний буфер, перемкнути HDR_ActiveBuf, HDR_Commit += 1"""
+        hdr = self.plc.route_cmd
+        status = self.plc.route_status
+        if self._pending_route_commit is not None and \
+                not commit_reached(status.ACK_CommitApplied, self._pending_route_commit):
+            self.routes.overwritten += 1  # PLC ще не взяв попередній — він зіллється з цим
+        active = hdr.buffer(hdr.HDR_ActiveBuf)
+        target = hdr.buffer(1 - hdr.HDR_ActiveBuf)
+        for idx, src in enumerate(active, 1):
+            new = changes.get(idx, src)
+            dst = target[idx - 1]
+            dst.RC_Cmd = new.RC_Cmd
+            dst.RC_Steps = new.RC_Steps
+            dst.RC_StepCount = new.RC_StepCount
+        hdr.HDR_ActiveBuf = 1 - hdr.HDR_ActiveBuf
+        hdr.HDR_Commit = (hdr.HDR_Commit + 1) % UDINT_MODULO
+        self._pending_route_commit = hdr.HDR_Commit
+        self.routes.commits += 1
+        return hdr.HDR_Commit
+
+    async def route_command(self, route_idx: int, rc_cmd: int, steps=None):
+        """Коміт команди маршруту та очікування ACK_CommitApplied"""
+        plc = self.plc
+        active = plc.route_cmd.buffer(plc.route_cmd.HDR_ActiveBuf)[route_idx - 1]
+        cmd = RouteCmd(rc_cmd)
+        cmd.RC_Steps = active.RC_Steps if steps is None else list(steps)
+        cmd.RC_StepCount = len(cmd.RC_Steps)
+        started = plc.now
+        commit = self.commit_routes({route_idx: cmd})
+        self.routes.in_flight += 1
+        while True:
+            await plc.sleep(self.poll_ms)
+            if commit_reached(plc.route_status.ACK_CommitApplied, commit):
+                self.routes.in_flight -= 1
+                self.routes.acked += 1
+                self.routes.latency_ms.append(plc.now - started)
+                return True
+            if plc.now - started >= self.timeout_ms:
+                self.routes.in_flight -= 1
+                self.routes.timeouts += 1
+                return False
+
+    # --- MailBox ---
+    async def manual_command(self, slot: int, cmd: int, param1: int = 0) -> Optional[bool]:
+        """Ручна команда через MailBox; None — перезаписана іншим клієнтом або тайм-аут"""
+        plc = self.plc
+        mailbox = plc.mailbox
+        clicked = plc.now
+        if self.mailbox_policy == 'wait':
+            # черга на стороні SCADA: писати лише коли попередній запит підтверджено
+            while mailbox.Req.Commit != mailbox.Ack.AckCommit:
+                if plc.now - clicked >= self.timeout_ms:
+                    self.manual.timeouts += 1
+                    return None
+                await plc.sleep(self.poll_ms)
+        elif mailbox.Req.Commit != mailbox.Ack.AckCommit:
+            self.manual.overwritten += 1  # попередній запит ще не оброблено — губиться
+            self._manual_overwritten.add(mailbox.Req.Commit)
+
+        written = plc.now
+        mailbox.Req.Slot = slot
+        mailbox.Req.Cmd = cmd
+        mailbox.Req.Param1 = param1
+        mailbox.Req.Commit = (mailbox.Req.Commit + 1) % UDINT_MODULO
+        commit = mailbox.Req.Commit
+        self.manual.commits += 1
+        self.manual.queue_ms.append(written - clicked)
+        self.manual.in_flight += 1
+
+        while True:
+            await plc.sleep(self.poll_ms)
+            ack = mailbox.Ack
+            if ack.AckCommit == commit:
+                self.manual.in_flight -= 1
+                self.manual.acked += 1
+                self.manual.latency_ms.append(plc.now - clicked)
+                if not ack.AckOk:
+                    self.manual.rejects[ack.RejectCode] = self.manual.rejects.get(ack.RejectCode, 0) + 1
+                return ack.AckOk
+            if mailbox.Req.Commit != commit:
+                self.manual.in_flight -= 1
+                if commit in self._manual_overwritten:
+                    self._manual_overwritten.discard(commit)  # облік — у клієнта, що перезаписав
+                else:
+                    self.manual.ack_lost += 1  # PLC виконав, але Ack уже про інший коміт
+                return None
+            if plc.now - written >= self.timeout_ms:
+                self.manual.in_flight -= 1
+                self.manual.timeouts += 1
+                return None
+
+
+# ============================================================================
+# Навантаження: клієнти-оператори
+# ============================================================================
+async def route_client(scada: Scada, route_ids: List[int], plans: Dict[int, list],
+                       rng: random.Random, think_ms: float, stop_op_rate: float = 0.1):
+    """Оператор маршрутів: START -> (іноді STOP_OP) -> NONE після фіналу"""
+    plc = scada.plc
+    c = plc.c
+    final = (c.ROUTE_STS_DONE, c.ROUTE_STS_REJECTED, c.ROUTE_STS_ABORTED)
+    while True:
+        await plc.sleep(rng.expovariate(1.0 / think_ms))
+        route_idx = rng.choice(route_ids)
+        sts = plc.route_status.RoutesSts[route_idx - 1]
+        active = plc.route_cmd.buffer(plc.route_cmd.HDR_ActiveBuf)[route_idx - 1]
+        if sts.RS_State == c.ROUTE_STS_IDLE and active.RC_Cmd != c.RT_CMD_START:
+            await scada.route_command(route_idx, c.RT_CMD_START, plans[route_idx])
+        elif sts.RS_State in final and active.RC_Cmd != c.RT_CMD_NONE:
+            await scada.route_command(route_idx, c.RT_CMD_NONE)
+        elif sts.RS_State == c.ROUTE_STS_RUNNING and rng.random() < stop_op_rate:
+            await scada.route_command(route_idx, c.RT_CMD_STOP_OP)
+
+
+async def manual_client(scada: Scada, slots: List[int], rng: random.Random, think_ms: float):
+    """Оператор ручного керування: START / STOP / RELEASE_OWNER на випадковому слоті"""
+    plc = scada.plc
+    c = plc.c
+    while True:
+        await plc.sleep(rng.expovariate(1.0 / think_ms))
+        roll = rng.random()
+        cmd = c.CMD_START if roll < 0.4 else c.CMD_STOP if roll < 0.8 else c.CMD_RELEASE_OWNER
+        await scada.manual_command(rng.choice(slots), cmd)
+
+
+async def _simulate(route_clients: int, manual_clients: int, seconds: float, seed: int,
+                    cycle_ms: int, poll_ms: int, timeout_ms: int, mailbox_policy: str,
+                    route_think_ms: float, manual_think_ms: float) -> dict:
+    plc = PlcService(cycle_ms=cycle_ms)
+    scada = Scada(plc, poll_ms, timeout_ms, mailbox_policy)
+    rng = random.Random(seed)
+    routes = len(plc.engine.routes)
+    driver = CyclicDriver(plc.engine)  # маршрут k — власні слоти, START по черзі, STOP у зворотному
+    plans = {k + 1: plan for k, plan in enumerate(driver.plans)}
+    slots = plc.engine.bus.mapped(plc.c)
+
+    tasks = []
+    for k in range(route_clients):
+        own = [r for r in range(1, routes + 1) if (r - 1) % route_clients == k] or [k % routes + 1]
+        tasks.append(plc.spawn(route_client(scada, own, plans, random.Random(rng.random()),
+                                            route_think_ms)))
+    for _ in range(manual_clients):
+        tasks.append(plc.spawn(manual_client(scada, slots, random.Random(rng.random()),
+                                             manual_think_ms)))
+    try:
+        await plc.run(int(seconds * 1000))
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    return {
+        'route_clients': route_clients,
+        'manual_clients': manual_clients,
+        'seconds': seconds,
+        'scans': plc.scans,
+        'cycle_ms': cycle_ms,
+        'poll_ms': poll_ms,
+        'mailbox_policy': mailbox_policy,
+        'mailbox_busy': round(plc.mailbox_busy_scans / plc.scans, 4) if plc.scans else 0.0,
+        'routes': scada.routes.to_dict(seconds),
+        'manual': scada.manual.to_dict(seconds),
+    }
+
+
+def simulate(route_clients: int = 4, manual_clients: int = 4, seconds: float = 600, seed: int = 0,
+             cycle_ms: int = 10, poll_ms: int = 20, timeout_ms: int = 5000,
+             mailbox_policy: str = 'wait', route_think_ms: float = 5000,
+             manual_think_ms: float = 2000) -> dict:
+    """Прогнати навантаження seconds віртуальних секунд; звіт як dict"""
+    return asyncio.run(_simulate(route_clients, manual_clients, seconds, seed, cycle_ms, poll_ms,
+                                 timeout_ms, mailbox_policy, route_think_ms, manual_think_ms))
+
+
+def print_report(r: dict):
+    print(f"📡 SCADA-дублер: {r['route_clients']} клієнтів маршрутів, {r['manual_clients']} операторів "
+          f"MailBox ({r['mailbox_policy']}), {r['seconds']} с PLC ({r['scans']} сканів по {r['cycle_ms']} мс, "
+          f"опитування {r['poll_ms']} мс)")
+    for key, label in (('routes', 'Маршрути (HDR_Commit -> ACK_CommitApplied)'),
+                       ('manual', 'MailBox (Req.Commit -> Ack.AckCommit)')):
+        s = r[key]
+        lat = s['latency_ms']
+        print(f"   {label}: {s['commits']} комітів ({s['commits_per_s']}/с), ACK {s['acked']}, "
+              f"перезаписано {s['overwritten']}, втрачено ACK {s['ack_lost']}, тайм-аутів {s['timeouts']}, "
+              f"в дорозі {s['in_flight']}")
+        print(f"      затримка, мс: p50 {lat['p50']:.0f}  p90 {lat['p90']:.0f}  p99 {lat['p99']:.0f}  "
+              f"max {lat['max']:.0f}")
+        if key == 'manual':
+            q = s['queue_ms']
+            print(f"      черга SCADA, мс: p50 {q['p50']:.0f}  p99 {q['p99']:.0f}  max {q['max']:.0f}; "
+                  f"MailBox зайнятий {r['mailbox_busy'] * 100:.1f}% сканів")
+            if s['rejects']:
+                print(f"      відмови MAN_REJ_*: {s['rejects']}")
+
+
+def print_sweep(results: List[dict]):
+    print("📈 Насичення MailBox (оператори -> затримка / втрати):")
+    print("   операторів   комітів/с   p50 мс   p99 мс   зайнятий   перезаписано   втрачено ACK   тайм-аутів")
+    for r in results:
+        s = r['manual']
+        print(f"   {r['manual_clients']:>10}   {s['commits_per_s']:>9}   {s['latency_ms']['p50']:>6.0f}   "
+              f"{s['latency_ms']['p99']:>6.0f}   {r['mailbox_busy'] * 100:>7.1f}%   "
+              f"{s['overwritten']:>12}   {s['ack_lost']:>12}   {s['timeouts']:>10}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="SCADA-дублер (asyncio) для віртуального PLC маршрутів")
+    parser.add_argument('--route-clients', type=int, default=4)
+    parser.add_argument('--manual-clients', type=int, default=4)
+    parser.add_argument('--seconds', type=float, default=600, help="віртуальних секунд PLC")
+    parser.add_argument('--cycle-ms', type=int, default=10, help="цикл OB1 (контракт 8.11: 10-20 мс)")
+    parser.add_argument('--poll-ms', type=int, default=20, help="період опитування PLC зі SCADA")
+    parser.add_argument('--timeout-ms', type=int, default=5000)
+    parser.add_argument('--mailbox', choices=MAILBOX_POLICIES, default='wait',
+                        help="wait — черга на SCADA; overwrite — писати Req не чекаючи ACK")
+    parser.add_argument('--route-think-ms', type=float, default=5000)
+    parser.add_argument('--manual-think-ms', type=float, default=2000)
+    parser.add_argument('--sweep', default=None, metavar='N,N,...',
+                        help="прогнати для кількох значень --manual-clients")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', action='store_true', help="звіт у JSON")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    counts = [int(n) for n in args.sweep.split(',')] if args.sweep else [args.manual_clients]
+    results = [simulate(args.route_clients, n, args.seconds, args.seed, args.cycle_ms, args.poll_ms,
+                        args.timeout_ms, args.mailbox, args.route_think_ms, args.manual_think_ms)
+               for n in counts]
+    if args.json:
+        print(json.dumps(results if args.sweep else results[0], indent=2, ensure_ascii=False))
+    elif args.sweep:
+        print_sweep(results)
+    else:
+        print_report(results[0])
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,417 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Статична оцінка часу циклу PLC за текстом SCL (контракт 8.11: цикл 10-20 мс)
+
+Дерево з scl_parser.py обходиться від OB "Main" (та додаткових коренів):
+- FOR з константними межами множить тіло на кількість ітерацій
+- IF/CASE — найгірша гілка (умови рахуються всі)
+- виклик FC/FB з бібліотеки = накладні виклику + параметри + тіло блока
+- операції класифікуються (біт / слово / множення / індекс / присвоєння /
+  ітерація / виклик / параметр) і множаться на таблицю часу CPU
+
+Таблиці CPU побудовані з часів виконання з даташитів Siemens (біт, слово,
+фіксована кома); індексація, ітерація та виклик — кратні часу слова.
+Це груба верхня оцінка, а не заміна вимірюванню в TIA (OB1 cycle time).
+
+Використання:
+    python scan_cost.py                         # Main.scl + generated/, CPU 1511
+    python scan_cost.py --cpu 1214C --budget 10
+    python scan_cost.py --root FC_ManualMechCmdHandler --root "FB_RouteFSM*12"
+"""
+
+import sys
+import argparse
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from scl_parser import (Assign, BinOp, Block, Call, CallStmt, Case, For, If, Index, Jump,
+                        Literal, Member, Name, Node, Range, Region, Repeat, UnOp, While,
+                        load_blocks)
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+
+
+def _cpu_table(bit: float, word: float, fixed: float) -> Dict[str, float]:
+    """Час класів операцій (нс) з даташитних часів біт/слово/фіксована кома"""
+    return {
+        'bit': bit,
+        'word': word,
+        'mul': fixed,
+        'index': 3 * word,    # обчислення адреси елемента масиву за змінним індексом
+        'assign': word,
+        'iter': 2 * word,     # інкремент + порівняння FOR
+        'call': 20 * word,    # накладні виклику FC/FB (стек, блоки параметрів)
+        'param': word,
+    }
+
+
+# Час виконання інструкцій (нс): біт / слово / фіксована кома
+CPU_TABLES = {
+    '1214C': _cpu_table(85, 1700, 1700),
+    '1511': _cpu_table(60, 72, 96),
+    '1513': _cpu_table(40, 48, 64),
+    '1515': _cpu_table(30, 36, 48),
+    '1516': _cpu_table(10, 12, 16),
+    '1518': _cpu_table(1, 2, 2),
+}
+DEFAULT_CPU = '1511'
+
+# Межі циклів, які не виводяться з тексту (ім'я змінної -> максимум ітерацій)
+DEFAULT_LOOP_HINTS = {
+    'stepCnt': 64,   # FB_RouteFSM: RC_StepCount обмежено 0..64
+}
+
+OP_CLASSES = ('bit', 'word', 'mul', 'index', 'assign', 'iter', 'call', 'param')
+
+
+class Cost:
+    """Лічильники операцій (загальні та по блоках) на найгіршому шляху"""
+
+    __slots__ = ('ops', 'self_ops', 'calls')
+
+    def __init__(self):
+        self.ops = dict.fromkeys(OP_CLASSES, 0)
+        self.self_ops = {}   # блок -> {клас: кількість} (власні операції блока)
+        self.calls = {}      # блок -> викликів за скан
+
+    def count(self, block: str, op: str, n: float = 1):
+        self.ops[op] += n
+        own = self.self_ops.get(block)
+        if own is None:
+            own = self.self_ops[block] = dict.fromkeys(OP_CLASSES, 0)
+        own[op] += n
+
+    def add(self, other: 'Cost', times: float = 1):
+        if times == 0:
+            return
+        for op, n in other.ops.items():
+            self.ops[op] += n * times
+        for block, ops in other.self_ops.items():
+            own = self.self_ops.get(block)
+            if own is None:
+                own = self.self_ops[block] = dict.fromkeys(OP_CLASSES, 0)
+            for op, n in ops.items():
+                own[op] += n * times
+        for block, n in other.calls.items():
+            self.calls[block] = self.calls.get(block, 0) + n * times
+
+    def ns(self, table: Dict[str, float], ops: Dict[str, float] = None) -> float:
+        ops = self.ops if ops is None else ops
+        return sum(n * table[op] for op, n in ops.items())
+
+
+class BlockEstimate:
+    """Рядок звіту: внесок блока в цикл"""
+
+    __slots__ = ('name', 'calls', 'assigns', 'iterations', 'made_calls', 'ns')
+
+    def __init__(self, name: str, calls: float, ops: Dict[str, float], table: Dict[str, float]):
+        self.name = name
+        self.calls = calls
+        self.assigns = ops['assign']
+        self.iterations = ops['iter']
+        self.made_calls = ops['call']
+        self.ns = sum(n * table[op] for op, n in ops.items())
+
+    @property
+    def ms(self) -> float:
+        return self.ns / 1e6
+
+
+class ScanEstimate:
+    """Оцінка одного скану: загальний час + розбивка по блоках"""
+
+    def __init__(self, cpu: str, cost: Cost, roots: List[Tuple[str, int]], warnings: List[str]):
+        self.cpu = cpu
+        self.cost = cost
+        self.roots = roots
+        self.warnings = warnings
+        table = CPU_TABLES[cpu]
+        calls = dict(cost.calls)
+        for name, count in roots:
+            calls[name] = calls.get(name, 0) + count
+        self.blocks = sorted((BlockEstimate(name, calls.get(name, 0), ops, table)
+                              for name, ops in cost.self_ops.items()),
+                             key=lambda b: -b.ns)
+        self.ns = cost.ns(table)
+
+    @property
+    def ms(self) -> float:
+        return self.ns / 1e6
+
+    def to_dict(self) -> dict:
+        return {
+            'cpu': self.cpu,
+            'cycle_ms': round(self.ms, 4),
+            'ops': {op: n for op, n in self.cost.ops.items()},
+            'blocks': [{'name': b.name, 'calls': b.calls, 'assigns': b.assigns,
+                        'iterations': b.iterations, 'fc_calls': b.made_calls,
+                        'ms': round(b.ms, 4)} for b in self.blocks],
+            'warnings': list(self.warnings),
+        }
+
+
+class ScanCostModel:
+    """Обхід дерева SCL з підрахунком операцій (кеш вартості блоків)"""
+
+    def __init__(self, blocks: Dict[str, Block], cpu: str = DEFAULT_CPU,
+                 constants: Dict[str, float] = None, loop_hints: Dict[str, int] = None,
+                 default_trips: int = 1):
+        if cpu not in CPU_TABLES:
+            raise ValueError(f"❌ Невідомий CPU: {cpu} (є: {', '.join(CPU_TABLES)})")
+        self.blocks = blocks
+        self.cpu = cpu
+        self.table = CPU_TABLES[cpu]
+        self.constants = dict(constants or {})
+        self.loop_hints = dict(DEFAULT_LOOP_HINTS, **(loop_hints or {}))
+        self.default_trips = default_trips
+        self.warnings = []
+        self._memo = {}
+        self._active = set()
+        self._block = None  # блок, що аналізується (для власних операцій і констант)
+
+    # --- блоки ---
+    def block_cost(self, name: str) -> Cost:
+        """Вартість одного виконання блока (разом з викликаними блоками)"""
+        if name in self._memo:
+            return self._memo[name]
+        if name in self._active:
+            self.warnings.append(f"рекурсивний виклик {name} — не враховано")
+            return Cost()
+        block = self.blocks[name]
+        self._active.add(name)
+        outer = self._block
+        self._block = block
+        try:
+            cost = self.stmts_cost(block.body)
+        finally:
+            self._block = outer
+            self._active.discard(name)
+        self._memo[name] = cost
+        return cost
+
+    def estimate(self, roots: Iterable[Tuple[str, int]] = (('Main', 1),)) -> ScanEstimate:
+        roots = list(roots)
+        total = Cost()
+        for name, count in roots:
+            if name not in self.blocks:
+                raise ValueError(f"❌ Блок {name} не знайдено серед *.scl")
+            total.add(self.block_cost(name), count)
+        return ScanEstimate(self.cpu, total, roots, self.warnings)
+
+    # --- оператори ---
+    def stmts_cost(self, stmts: List[Node]) -> Cost:
+        cost = Cost()
+        for stmt in stmts:
+            cost.add(self.stmt_cost(stmt))
+        return cost
+
+    def _worst(self, options: List[Cost]) -> Cost:
+        best = None
+        best_ns = -1.0
+        for option in options:
+            ns = option.ns(self.table)
+            if ns > best_ns:
+                best, best_ns = option, ns
+        return best or Cost()
+
+    def stmt_cost(self, stmt: Node) -> Cost:
+        cost = Cost()
+        own = self._block.name
+        if isinstance(stmt, Assign):
+            self.expr_cost(stmt.target, cost)
+            self.expr_cost(stmt.value, cost)
+            cost.count(own, 'assign')
+        elif isinstance(stmt, CallStmt):
+            self.expr_cost(stmt.call, cost)
+        elif isinstance(stmt, If):
+            for cond, _ in stmt.branches:
+                self.expr_cost(cond, cost)
+                cost.count(own, 'word')   # умовний перехід
+            bodies = [self.stmts_cost(body) for _, body in stmt.branches]
+            bodies.append(self.stmts_cost(stmt.else_body))
+            cost.add(self._worst(bodies))
+        elif isinstance(stmt, Case):
+            self.expr_cost(stmt.selector, cost)
+            labels = sum(len(labels) for labels, _ in stmt.branches)
+            cost.count(own, 'word', labels)  # порівняння з мітками
+            bodies = [self.stmts_cost(body) for _, body in stmt.branches]
+            bodies.append(self.stmts_cost(stmt.else_body))
+            cost.add(self._worst(bodies))
+        elif isinstance(stmt, For):
+            trips = self.for_trips(stmt)
+            self.expr_cost(stmt.start, cost)
+            self.expr_cost(stmt.end, cost)
+            cost.count(own, 'assign')
+            body = self.stmts_cost(stmt.body)
+            body.count(own, 'iter')
+            cost.add(body, trips)
+        elif isinstance(stmt, (While, Repeat)):
+            trips = self.default_trips
+            self.warnings.append(f"{own}:{stmt.line}: {type(stmt).__name__.upper()} — "
+                                 f"прийнято {trips} ітерацій")
+            body = self.stmts_cost(stmt.body)
+            self.expr_cost(stmt.cond, body)
+            body.count(own, 'iter')
+            cost.add(body, trips)
+        elif isinstance(stmt, Jump):
+            cost.count(own, 'word')
+        elif isinstance(stmt, Region):
+            cost.add(self.stmts_cost(stmt.body))
+        return cost
+
+    # --- вирази ---
+    def expr_cost(self, node: Node, cost: Cost):
+        own = self._block.name
+        if isinstance(node, (Literal, Name)):
+            return
+        if isinstance(node, Member):
+            self.expr_cost(node.base, cost)
+        elif isinstance(node, Index):
+            self.expr_cost(node.base, cost)
+            for index in node.indices:
+                if not isinstance(index, Literal):
+                    cost.count(own, 'index')
+                    self.expr_cost(index, cost)
+        elif isinstance(node, BinOp):
+            self.expr_cost(node.left, cost)
+            self.expr_cost(node.right, cost)
+            if node.op in ('AND', 'OR', 'XOR'):
+                word = isinstance(node.left, Literal) or isinstance(node.right, Literal)
+                cost.count(own, 'word' if word else 'bit')
+            elif node.op in ('*', '/', 'MOD', '**'):
+                cost.count(own, 'mul')
+            else:
+                cost.count(own, 'word')
+        elif isinstance(node, UnOp):
+            self.expr_cost(node.operand, cost)
+            cost.count(own, 'bit' if node.op == 'NOT' else 'word')
+        elif isinstance(node, Call):
+            for _, _, arg in node.args:
+                self.expr_cost(arg, cost)
+                cost.count(own, 'param')
+            if node.name in self.blocks:
+                cost.count(own, 'call')
+                cost.calls[node.name] = cost.calls.get(node.name, 0) + 1
+                cost.add(self.block_cost(node.name))
+            else:
+                cost.count(own, 'word')  # системна інструкція / перетворення типу
+        elif isinstance(node, Range):
+            self.expr_cost(node.lo, cost)
+            self.expr_cost(node.hi, cost)
+
+    # --- межі циклів ---
+    def value_of(self, node: Node) -> Optional[float]:
+        """Значення константного виразу (літерали, VAR CONSTANT, константи PLC, підказки)"""
+        if isinstance(node, Literal):
+            value = node.value
+            return None if isinstance(value, bool) else value
+        if isinstance(node, Name):
+            local = self._block.constants() if self._block else {}
+            for table in (local, self.constants, self.loop_hints):
+                if node.name in table:
+                    return table[node.name]
+            return None
+        if isinstance(node, UnOp) and node.op == '-':
+            value = self.value_of(node.operand)
+            return None if value is None else -value
+        if isinstance(node, BinOp) and node.op in ('+', '-', '*', '/'):
+            left, right = self.value_of(node.left), self.value_of(node.right)
+            if left is None or right is None:
+                return None
+            if node.op == '+':
+                return left + right
+            if node.op == '-':
+                return left - right
+            if node.op == '*':
+                return left * right
+            return left // right if right else None
+        if isinstance(node, Call) and len(node.args) == 1 and '_TO_' in node.name.upper():
+            return self.value_of(node.args[0][2])  # USINT_TO_INT(x) тощо
+        return None
+
+    def for_trips(self, stmt: For) -> int:
+        start = self.value_of(stmt.start)
+        end = self.value_of(stmt.end)
+        step = self.value_of(stmt.step) if stmt.step is not None else 1
+        if start is None or end is None or not step:
+            self.warnings.append(f"{self._block.name}:{stmt.line}: межі FOR не константні — "
+                                 f"прийнято {self.default_trips} ітерацій")
+            return self.default_trips
+        trips = int((end - start) // step) + 1
+        return max(trips, 0)
+
+
+def parse_root(text: str) -> Tuple[str, int]:
+    """'FB_RouteFSM*12' -> ('FB_RouteFSM', 12)"""
+    name, _, count = text.partition('*')
+    return name.strip().strip('"'), int(count) if count else 1
+
+
+def estimate_scan(generated_dir=None, cpu: str = DEFAULT_CPU, roots=None,
+                  scl_dir=None, constants: Dict[str, float] = None,
+                  loop_hints: Dict[str, int] = None) -> ScanEstimate:
+    """Оцінка скану: ручні блоки з scl_dir (корінь репозиторію) + згенеровані поверх них
+
+    roots — [(блок, викликів за скан)]; за замовчуванням OB Main, а якщо його
+    немає — FC_HAL_Read, FC_DeviceRunner, FC_HAL_Write (порядок OB1).
+    """
+    blocks = load_blocks(scl_dir or REPO_DIR, generated_dir)
+    if roots is None:
+        roots = [('Main', 1)] if 'Main' in blocks else \
+            [(name, 1) for name in ('FC_HAL_Read', 'FC_DeviceRunner', 'FC_HAL_Write') if name in blocks]
+    model = ScanCostModel(blocks, cpu, constants=constants, loop_hints=loop_hints)
+    return model.estimate(roots)
+
+
+def check_budget(estimate: ScanEstimate, budget_ms: float):
+    """ValueError, якщо оцінка циклу перевищує бюджет"""
+    if estimate.ms > budget_ms:
+        top = ', '.join(f"{b.name} {b.ms:.2f} мс" for b in estimate.blocks[:3])
+        raise ValueError(f"❌ Оцінка часу циклу {estimate.ms:.2f} мс (CPU {estimate.cpu}) "
+                         f"перевищує бюджет {budget_ms:g} мс; найдорожчі: {top}")
+
+
+def print_estimate(estimate: ScanEstimate, budget_ms: float = None):
+    """Звіт у стилі генератора"""
+    print(f"\n⏱️  Оцінка часу циклу (CPU {estimate.cpu}): {estimate.ms:.3f} мс"
+          + (f" з бюджету {budget_ms:g} мс" if budget_ms else ""))
+    ops = estimate.cost.ops
+    print(f"   ітерацій: {ops['iter']:g}, викликів: {ops['call']:g}, присвоєнь: {ops['assign']:g}")
+    print(f"   {'Блок':<28} {'викл./скан':>10} {'присв.':>8} {'ітер.':>7} {'мс':>9}")
+    for b in estimate.blocks:
+        print(f"   {b.name:<28} {b.calls:>10g} {b.assigns:>8g} {b.iterations:>7g} {b.ms:>9.4f}")
+    for warning in estimate.warnings:
+        print(f"   ⚠️  {warning}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Статична оцінка часу циклу PLC за SCL")
+    parser.add_argument('generated', nargs='?', default='generated',
+                        help="каталог згенерованих SCL (перекривають блоки з кореня репозиторію)")
+    parser.add_argument('--scl-dir', default=None, help="каталог ручних SCL (за замовчуванням ..)")
+    parser.add_argument('--cpu', default=DEFAULT_CPU, choices=sorted(CPU_TABLES))
+    parser.add_argument('--root', action='append', default=None,
+                        help="корінь обходу NAME або NAME*N (за замовчуванням Main)")
+    parser.add_argument('--budget', type=float, default=None, help="бюджет циклу, мс")
+    parser.add_argument('--all-cpus', action='store_true', help="порівняти всі CPU")
+    args = parser.parse_args(argv)
+
+    roots = [parse_root(r) for r in args.root] if args.root else None
+    cpus = sorted(CPU_TABLES) if args.all_cpus else [args.cpu]
+    status = 0
+    for cpu in cpus:
+        estimate = estimate_scan(args.generated, cpu, roots, scl_dir=args.scl_dir)
+        print_estimate(estimate, args.budget)
+        if args.budget is not None:
+            try:
+                check_budget(estimate, args.budget)
+            except ValueError as e:
+                print(e)
+                status = 1
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
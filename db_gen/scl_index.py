@@ -0,0 +1,513 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Індекс SCL-проєкту: блоки, змінні, UDT/DB, граф викликів, читання/запис полів
+
+- кожен *.scl розбирається один раз (scl_parser / udt_layout / db_layout);
+  записи файлів зберігаються у .plc_cache/scl_index.pickle за SHA-256 файлу,
+  незмінені файли не розбираються повторно
+- шляхи доступу нормалізуються: "DB_Mechs".Mechs[slot].OwnerCur -> DB_Mechs.Mechs[].OwnerCur
+- запис/читання через параметри VAR_IN_OUT / VAR_OUTPUT / VAR_INPUT
+  підставляються у викликача: M.OwnerCur у FC_ArbiterMech стає
+  DB_Mechs.Mechs[].OwnerCur у FC_ManualMechCmdHandler (через FC_ArbiterMech)
+- невикористані поля UDT — за типами змінних та полів DB
+
+Використання:
+    python scl_index.py --writers "Mechs[].OwnerCur"
+    python scl_index.py --callers FC_ArbiterMech
+    python scl_index.py --unused-fields
+    python scl_index.py .. generated --readers Status --block FB_RouteFSM
+"""
+
+import re
+import sys
+import time
+import pickle
+import argparse
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from config_loader import CACHE_DIR_NAME, file_sha256
+from db_layout import parse_db_source
+from scl_parser import (Assign, CallStmt, Call, Case, For, If, Index, Member, Name, Node, Region,
+                        Repeat, SclSyntaxError, While, parse_source)
+from udt_layout import parse_udt_source
+
+INDEX_CACHE_NAME = 'scl_index.pickle'
+INDEX_VERSION = 1
+
+_PARAM_SECTIONS = ('VAR_INPUT', 'VAR_OUTPUT', 'VAR_IN_OUT')
+_ARRAY_RE = re.compile(r'^ARRAY\s*\[.*?\]\s*OF\s+(.+)$', re.IGNORECASE | re.DOTALL)
+
+
+class BlockInfo:
+    """Запис блока в індексі (лише прості типи — серіалізується в pickle)"""
+
+    __slots__ = ('kind', 'name', 'file', 'line', 'vars', 'calls', 'reads', 'writes')
+
+    def __init__(self, kind: str, name: str, file: str, line: int):
+        self.kind = kind
+        self.name = name
+        self.file = file
+        self.line = line
+        self.vars = {}      # ім'я -> (секція, тип)
+        self.calls = []     # [(блок, рядок, [(параметр, ':=' | '=>', шлях | None)])]
+        self.reads = []     # [(шлях, рядок)]
+        self.writes = []    # [(шлях, рядок)]
+
+    def params(self) -> Dict[str, str]:
+        return {name: section for name, (section, _) in self.vars.items() if section in _PARAM_SECTIONS}
+
+    def __repr__(self) -> str:
+        return f"BlockInfo({self.kind} {self.name}, {self.file}:{self.line})"
+
+
+# ============================================================================
+# Шляхи доступу
+# ============================================================================
+def access_path(node: Node) -> Optional[str]:
+    """Name/Member/Index -> 'a.b[].c' (індекси відкинуто); None для інших виразів"""
+    if isinstance(node, Name):
+        return node.name
+    if isinstance(node, Member):
+        base = access_path(node.base)
+        return None if base is None else f"{base}.{node.field}"
+    if isinstance(node, Index):
+        base = access_path(node.base)
+        return None if base is None else f"{base}[]"
+    return None
+
+
+def normalize_query(text: str) -> str:
+    """'"DB_Mechs".Mechs[slot].OwnerCur' / '#M.OwnerCur' -> 'DB_Mechs.Mechs[].OwnerCur' / 'M.OwnerCur'"""
+    text = re.sub(r'\[[^\]]*\]', '[]', text.strip())
+    return text.replace('"', '').replace('#', '')
+
+
+def path_matches(path: str, query: str, covering: bool = False) -> bool:
+    """Збіг за сегментами: шлях закінчується запитом
+
+    covering — також доступ до цілої структури, що містить поле запиту: шлях
+    дорівнює початку запиту або закінчується елементом масиву з нього
+    ("...Mechs[]" покриває "Mechs[].OwnerCur").
+    """
+    segs = path.split('.')
+    want = query.split('.')
+    if len(segs) >= len(want) and segs[-len(want):] == want:
+        return True
+    if covering:
+        for k in range(len(want) - 1, 0, -1):
+            if segs == want[:k] or (want[k - 1].endswith('[]') and segs[-k:] == want[:k]):
+                return True
+    return False
+
+
+def _substitute(path: str, param: str, actual: str) -> Optional[str]:
+    """Шлях у викликаному блоці -> шлях у викликача, якщо він починається з параметра"""
+    head, _, rest = path.partition('.')
+    name = head.split('[', 1)[0]
+    if name != param:
+        return None
+    result = actual + head[len(name):]
+    return f"{result}.{rest}" if rest else result
+
+
+class _Collector:
+    """Обхід тіла блока: читання, записи, виклики"""
+
+    def __init__(self, info: BlockInfo):
+        self.info = info
+
+    def statements(self, body: list):
+        for stmt in body:
+            self.statement(stmt)
+
+    def statement(self, stmt: Node):
+        if isinstance(stmt, Assign):
+            self.target(stmt.target, stmt.line)
+            self.expr(stmt.value)
+        elif isinstance(stmt, CallStmt):
+            self.call(stmt.call)
+        elif isinstance(stmt, If):
+            for cond, body in stmt.branches:
+                self.expr(cond)
+                self.statements(body)
+            self.statements(stmt.else_body)
+        elif isinstance(stmt, Case):
+            self.expr(stmt.selector)
+            for labels, body in stmt.branches:
+                for label in labels:
+                    self.expr(label)
+                self.statements(body)
+            self.statements(stmt.else_body)
+        elif isinstance(stmt, For):
+            self.target(stmt.var, stmt.line)
+            for part in (stmt.start, stmt.end, stmt.step):
+                if part is not None:
+                    self.expr(part)
+            self.statements(stmt.body)
+        elif isinstance(stmt, (While, Repeat)):
+            self.expr(stmt.cond)
+            self.statements(stmt.body)
+        elif isinstance(stmt, Region):
+            self.statements(stmt.body)
+
+    def target(self, node: Node, line: int):
+        path = access_path(node)
+        if path is not None:
+            self.info.writes.append((path, line))
+        self.indices(node)
+
+    def indices(self, node: Node):
+        """Індекси l-value — це читання"""
+        while isinstance(node, (Member, Index)):
+            if isinstance(node, Index):
+                for index in node.indices:
+                    self.expr(index)
+            node = node.base
+
+    def expr(self, node: Node):
+        if isinstance(node, Call):
+            self.call(node)
+            return
+        path = access_path(node)
+        if path is not None:
+            if not (isinstance(node, Name) and node.scope == 'absolute'):
+                self.info.reads.append((path, node.line))
+            self.indices(node)
+            return
+        for child in node.children():
+            self.expr(child)
+
+    def call(self, call: Call):
+        callee = call.name
+        if call.scope == 'local' or (call.scope == 'plain' and call.name in self.info.vars):
+            # екземпляр FB: #inst(...) -> тип екземпляра
+            callee = self.info.vars.get(call.name, ('', call.name))[1].strip('"')
+        bindings = []
+        for param, op, value in call.args:
+            path = access_path(value) if param is not None else None
+            if path is None:
+                self.expr(value)
+            else:
+                self.indices(value)
+            bindings.append((param, op, path))
+        self.info.calls.append((callee, call.line, bindings))
+
+
+def index_source(text: str, file: str) -> Tuple[List[BlockInfo], Dict[str, Dict[str, str]], List[str]]:
+    """Текст *.scl -> (блоки, типи {UDT/DB: {поле: тип}}, помилки розбору)"""
+    types = {}
+    for owner, fields in list(parse_udt_source(text).items()) + list(parse_db_source(text).items()):
+        _register_fields(types, owner, fields)
+    blocks = []
+    errors = []
+    try:
+        parsed = parse_source(text, file)
+    except SclSyntaxError as e:
+        return blocks, types, [str(e)]
+    for block in parsed:
+        info = BlockInfo(block.kind, block.name, file, block.line)
+        for var in block.vars:
+            section = var.section.split()[0]
+            info.vars[var.name] = (section, var.type)
+        _Collector(info).statements(block.body)
+        blocks.append(info)
+    return blocks, types, errors
+
+
+def _register_fields(types: dict, owner: str, fields):
+    """Поля UDT/DB; вкладений STRUCT реєструється як тип 'Власник.поле'"""
+    entry = types.setdefault(owner, {})
+    for field in fields:
+        if isinstance(field.type, list):
+            nested = f"{owner}.{field.name}"
+            _register_fields(types, nested, field.type)
+            entry[field.name] = f'"{nested}"'
+        elif isinstance(field.type, tuple) and isinstance(field.type[3], list):
+            nested = f"{owner}.{field.name}"
+            _register_fields(types, nested, field.type[3])
+            entry[field.name] = f'ARRAY[{field.type[1]}..{field.type[2]}] OF "{nested}"'
+        else:
+            entry[field.name] = _type_text(field.type)
+
+
+def _type_text(type_) -> str:
+    """Тип поля udt_layout -> текст як у декларації SCL (UDT у лапках)"""
+    if isinstance(type_, tuple):
+        return f"ARRAY[{type_[1]}..{type_[2]}] OF {_type_text(type_[3])}"
+    return type_ if type_.upper() == type_ else f'"{type_}"'
+
+
+# ============================================================================
+# Індекс
+# ============================================================================
+class SclIndex:
+    """Індекс *.scl каталогів (пізніші каталоги перекривають блоки попередніх)"""
+
+    def __init__(self, directories: Iterable, use_cache: bool = True):
+        self.directories = [Path(d) for d in directories if d is not None]
+        self.blocks = {}        # ім'я -> BlockInfo
+        self.types = {}         # UDT/DB -> {поле: тип}
+        self.udts = set()
+        self.errors = []
+        self.parsed = 0
+        self.cached = 0
+        for directory in self.directories:
+            self._load_directory(directory, use_cache)
+        self._effective = {}
+        self._callers = {}
+        for block in self.blocks.values():
+            for callee, line, _ in block.calls:
+                self._callers.setdefault(callee, []).append((block.name, line))
+
+    # --- збірка з кешем ---
+    def _load_directory(self, directory: Path, use_cache: bool):
+        cache_path = directory / CACHE_DIR_NAME / INDEX_CACHE_NAME
+        cache = self._read_cache(cache_path) if use_cache else {}
+        fresh = {}
+        for path in sorted(directory.glob('*.scl')):
+            digest = file_sha256(path)
+            record = cache.get(path.name)
+            if record is not None and record[0] == digest:
+                self.cached += 1
+            else:
+                text = path.read_text(encoding='utf-8-sig')
+                record = (digest,) + index_source(text, path.name)
+                self.parsed += 1
+            fresh[path.name] = record
+            _, blocks, types, errors = record
+            for block in blocks:
+                self.blocks[block.name] = block
+            self.types.update(types)
+            if path.name.startswith('UDT_'):
+                self.udts.update(name for name in types if '.' not in name)
+            self.errors.extend(errors)
+        if use_cache and (self.parsed or set(fresh) != set(cache)):
+            self._write_cache(cache_path, fresh)
+
+    @staticmethod
+    def _read_cache(path: Path) -> dict:
+        try:
+            with open(path, 'rb') as f:
+                data = pickle.load(f)
+        except Exception:
+            return {}  # відсутній/битий кеш — розбираємо файли
+        if not isinstance(data, dict) or data.get('version') != INDEX_VERSION:
+            return {}
+        return data.get('files', {})
+
+    @staticmethod
+    def _write_cache(path: Path, files: dict):
+        try:
+            path.parent.mkdir(exist_ok=True)
+            tmp = path.with_suffix('.tmp')
+            with open(tmp, 'wb') as f:
+                pickle.dump({'version': INDEX_VERSION, 'files': files}, f,
+                            protocol=pickle.HIGHEST_PROTOCOL)
+            tmp.replace(path)
+        except OSError:
+            pass  # каталог лише для читання — працюємо без кешу
+
+    # --- граф викликів ---
+    def callers(self, name: str) -> List[Tuple[str, int]]:
+        return sorted(self._callers.get(name.strip('"'), []))
+
+    def callees(self, name: str) -> List[Tuple[str, int]]:
+        block = self.block(name)
+        return [(callee, line) for callee, line, _ in block.calls]
+
+    def block(self, name: str) -> BlockInfo:
+        name = name.strip('"')
+        if name not in self.blocks:
+            raise ValueError(f"❌ Блок '{name}' не знайдено в індексі")
+        return self.blocks[name]
+
+    # --- читання / запис з підстановкою параметрів ---
+    def effective(self, name: str, kind: str) -> List[Tuple[str, int, str]]:
+        """[(шлях, рядок, через)] — власні доступи блока + доступи викликаних через параметри
+
+        kind — 'reads' або 'writes'; 'через' — ланцюжок викликаних блоків ('' для власних).
+        """
+        key = (name, kind)
+        if key in self._effective:
+            return self._effective[key] or []
+        self._effective[key] = None     # рекурсія у графі викликів
+        block = self.blocks[name]
+        result = [(path, line, '') for path, line in getattr(block, kind)]
+        for callee, line, bindings in block.calls:
+            target = self.blocks.get(callee)
+            params = target.params() if target is not None else {}
+            for param, op, actual in bindings:
+                if actual is None:
+                    continue
+                if target is None or param not in params:
+                    # системна інструкція / невідомий блок: := читає, => пише
+                    if (op == '=>') == (kind == 'writes'):
+                        result.append((actual, line, callee))
+                    continue
+                section = params[param]
+                if kind == 'writes' and section == 'VAR_INPUT':
+                    continue        # вхід — копія значення
+                if kind == 'reads' and section == 'VAR_OUTPUT':
+                    continue
+                for inner, _, via in self.effective(callee, kind):
+                    outer = _substitute(inner, param, actual)
+                    if outer is not None:
+                        result.append((outer, line, callee + (f" → {via}" if via else '')))
+        self._effective[key] = result
+        return result
+
+    def accesses(self, query: str, kind: str) -> List[Tuple[str, str, int, str]]:
+        """[(блок, шлях, рядок, через)] — хто читає/пише поле (запит як у SCL або нормалізований)"""
+        query = normalize_query(query)
+        found = []
+        for name in sorted(self.blocks):
+            seen = set()
+            for path, line, via in self.effective(name, kind):
+                if path_matches(path, query, covering=kind == 'writes') and (path, line, via) not in seen:
+                    seen.add((path, line, via))
+                    found.append((name, path, line, via))
+        return found
+
+    def writers(self, query: str):
+        return self.accesses(query, 'writes')
+
+    def readers(self, query: str):
+        return self.accesses(query, 'reads')
+
+    # --- типи ---
+    def _resolve_type(self, text: str) -> Tuple[str, int]:
+        """Текст типу -> (ім'я типу без лапок, кількість рівнів ARRAY)"""
+        depth = 0
+        text = text.strip()
+        while True:
+            m = _ARRAY_RE.match(text)
+            if not m:
+                break
+            depth += 1
+            text = m.group(1).strip()
+        return text.strip('"'), depth
+
+    def field_uses(self) -> set:
+        """{(тип, поле)} усіх доступів проєкту (включно з копіюванням цілих структур)"""
+        used = set()
+        for block in self.blocks.values():
+            paths = [p for p, _ in block.reads] + [p for p, _ in block.writes]
+            for _, _, bindings in block.calls:
+                paths.extend(actual for _, _, actual in bindings if actual is not None)
+            for path in paths:
+                self._mark_path(block, path, used)
+        return used
+
+    def _mark_path(self, block: BlockInfo, path: str, used: set):
+        segs = path.split('.')
+        root = segs[0].split('[', 1)[0]
+        if root in block.vars:
+            type_, depth = self._resolve_type(block.vars[root][1])
+        elif root in self.types:
+            type_, depth = root, 0
+        else:
+            return
+        depth -= segs[0].count('[]')
+        for seg in segs[1:]:
+            fields = self.types.get(type_)
+            name = seg.split('[', 1)[0]
+            if depth > 0 or fields is None or name not in fields:
+                return
+            used.add((type_, name))
+            type_, depth = self._resolve_type(fields[name])
+            depth -= seg.count('[]')
+        if depth <= 0:
+            self._mark_all(type_, used)    # структура цілком (присвоєння / параметр)
+
+    def _mark_all(self, type_: str, used: set, seen: set = None):
+        seen = seen if seen is not None else set()
+        if type_ in seen or type_ not in self.types:
+            return
+        seen.add(type_)
+        for field, text in self.types[type_].items():
+            used.add((type_, field))
+            self._mark_all(self._resolve_type(text)[0], used, seen)
+
+    def unused_fields(self, udt: str = None) -> List[Tuple[str, str]]:
+        """[(UDT, поле)], до яких жоден блок не звертається"""
+        used = self.field_uses()
+        names = [udt.strip('"')] if udt else sorted(self.udts)
+        result = []
+        for name in names:
+            if name not in self.types:
+                raise ValueError(f"❌ UDT '{name}' не знайдено в індексі")
+            for owner in sorted(t for t in self.types if t == name or t.startswith(name + '.')):
+                result.extend((owner, field) for field in self.types[owner] if (owner, field) not in used)
+        return result
+
+
+# ============================================================================
+# CLI
+# ============================================================================
+def print_accesses(title: str, rows):
+    print(f"{title}: {len(rows)}")
+    for block, path, line, via in rows:
+        suffix = f"  (через {via})" if via else ''
+        print(f"   - {block}:{line}  {path}{suffix}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Індекс SCL: виклики, читання/запис полів, невикористані поля UDT")
+    parser.add_argument('directories', nargs='*', default=['..', 'generated'],
+                        help="каталоги *.scl (за замовчуванням .. та generated)")
+    parser.add_argument('--writers', action='append', default=[], metavar='PATH', help="хто пише поле")
+    parser.add_argument('--readers', action='append', default=[], metavar='PATH', help="хто читає поле")
+    parser.add_argument('--callers', action='append', default=[], metavar='BLOCK', help="хто викликає блок")
+    parser.add_argument('--callees', action='append', default=[], metavar='BLOCK', help="кого викликає блок")
+    parser.add_argument('--unused-fields', nargs='?', const='', default=None, metavar='UDT',
+                        help="невикористані поля UDT (усіх або одного)")
+    parser.add_argument('--block', action='append', default=[], metavar='BLOCK', help="змінні та виклики блока")
+    parser.add_argument('--no-cache', action='store_true')
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    index = SclIndex([d for d in args.directories if Path(d).is_dir()], use_cache=not args.no_cache)
+    built = time.perf_counter()
+    print(f"📇 Індекс SCL: {len(index.blocks)} блоків, {len(index.types)} UDT/DB/STRUCT "
+          f"(розібрано {index.parsed}, з кешу {index.cached}; {(built - started) * 1000:.1f} мс)")
+    for error in index.errors:
+        print(f"   ⚠️  {error}")
+
+    try:
+        for query in args.writers:
+            print_accesses(f"✏️  Пишуть {normalize_query(query)}", index.writers(query))
+        for query in args.readers:
+            print_accesses(f"👁️  Читають {normalize_query(query)}", index.readers(query))
+        for name in args.callers:
+            rows = index.callers(name)
+            print(f"📞 Викликають {name}: {len(rows)}")
+            for caller, line in rows:
+                print(f"   - {caller}:{line}")
+        for name in args.callees:
+            rows = index.callees(name)
+            print(f"📞 {name} викликає: {len(rows)}")
+            for callee, line in rows:
+                print(f"   - {callee} (рядок {line})")
+        for name in args.block:
+            block = index.block(name)
+            print(f"📄 {block.kind} \"{block.name}\" ({block.file}:{block.line}): "
+                  f"{len(block.vars)} змінних, {len(block.calls)} викликів, "
+                  f"{len(block.reads)} читань, {len(block.writes)} записів")
+            for var, (section, type_) in block.vars.items():
+                print(f"   {section:<11} {var} : {type_}")
+        if args.unused_fields is not None:
+            rows = index.unused_fields(args.unused_fields or None)
+            print(f"🕳️  Невикористані поля UDT: {len(rows)}")
+            for owner, field in rows:
+                print(f"   - {owner}.{field}")
+    except ValueError as e:
+        print(e)
+        return 1
+    print(f"⚡ Запити: {(time.perf_counter() - built) * 1000:.1f} мс")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,867 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Розбір SCL (TIA Portal) у дерево: лексер + рекурсивний спуск
+
+Підтримується те, що є в цьому репозиторії (ручні та згенеровані блоки):
+- FUNCTION / FUNCTION_BLOCK / ORGANIZATION_BLOCK (декларації VAR_* + тіло)
+- DATA_BLOCK / TYPE пропускаються (розмітку UDT рахує udt_layout.py)
+- оператори: :=, виклики, IF/ELSIF/ELSE, CASE, FOR/WHILE/REPEAT,
+  RETURN/EXIT/CONTINUE, REGION
+- вирази з пріоритетами SCL, доступ #local / "Global" / %IW0 / a.b[i, j] / w.%X3
+
+Використання:
+    python scl_parser.py ../FC_Redler.scl      # статистика вузлів дерева
+"""
+
+import re
+import sys
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+
+class SclSyntaxError(ValueError):
+    """Помилка розбору SCL (з файлом і рядком)"""
+
+
+# ============================================================================
+# Лексер
+# ============================================================================
+_TOKEN_RE = re.compile(r'''
+    (?P<ws>[ \t\r\n﻿]+)
+  | (?P<comment>//[^\n]*|\(\*.*?\*\)|/\*.*?\*/)
+  | (?P<attr>\{[^}]*\})
+  | (?P<str>'(?:[^']|'')*')
+  | (?P<qid>"[^"]*")
+  | (?P<time>\b(?:LTIME|TIME_OF_DAY|TIME|TOD|LTOD|DATE_AND_TIME|DATE|LDT|DT|LT|T|D)\#[0-9A-Za-z_:.\-]+)
+  | (?P<num>(?:[A-Za-z]\w*\#)(?:\d+\#[0-9A-Fa-f_]+|-?\d[\d_]*(?:\.\d+)?(?:[eE][+-]?\d+)?|TRUE|FALSE)
+           |\d+\#[0-9A-Fa-f_]+
+           |\d[\d_]*(?:\.\d+)?(?:[eE][+-]?\d+)?)
+  | (?P<local>\#[A-Za-z_]\w*)
+  | (?P<addr>%[A-Za-z]+\d+(?:\.\d+)?)
+  | (?P<id>[A-Za-z_]\w*)
+  | (?P<op>:=|=>|<>|<=|>=|\.\.|\*\*|[-+*/=<>()\[\],;:.&])
+''', re.VERBOSE | re.DOTALL | re.IGNORECASE)
+
+
+class Token:
+    __slots__ = ('kind', 'text', 'line')
+
+    def __init__(self, kind: str, text: str, line: int):
+        self.kind = kind    # id / qid / local / addr / num / time / str / op / eof
+        self.text = text
+        self.line = line
+
+    @property
+    def upper(self) -> str:
+        return self.text.upper() if self.kind == 'id' else ''
+
+    def __repr__(self) -> str:
+        return f"Token({self.kind}, {self.text!r}, line {self.line})"
+
+
+def tokenize(text: str, source: str = '<scl>') -> List[Token]:
+    """Текст SCL -> токени (коментарі та атрибути { ... } відкидаються)"""
+    tokens = []
+    pos = 0
+    line = 1
+    size = len(text)
+    while pos < size:
+        m = _TOKEN_RE.match(text, pos)
+        if not m:
+            raise SclSyntaxError(f"❌ {source}:{line}: невідомий символ {text[pos]!r}")
+        kind = m.lastgroup
+        value = m.group()
+        if kind not in ('ws', 'comment', 'attr'):
+            tokens.append(Token(kind, value, line))
+        line += value.count('\n')
+        pos = m.end()
+    tokens.append(Token('eof', '', line))
+    return tokens
+
+
+# ============================================================================
+# Дерево
+# ============================================================================
+class Node:
+    """Вузол дерева; _fields — дочірні атрибути (вузли або списки вузлів)"""
+
+    __slots__ = ('line',)
+    _fields = ()
+
+    def children(self) -> Iterator['Node']:
+        for name in self._fields:
+            value = getattr(self, name)
+            if isinstance(value, Node):
+                yield value
+            elif isinstance(value, (list, tuple)):
+                for item in value:
+                    if isinstance(item, Node):
+                        yield item
+                    elif isinstance(item, (list, tuple)):
+                        for sub in item:
+                            if isinstance(sub, Node):
+                                yield sub
+                            elif isinstance(sub, (list, tuple)):
+                                yield from (n for n in sub if isinstance(n, Node))
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(line {self.line})"
+
+
+def walk(node: Node) -> Iterator[Node]:
+    """Усі вузли піддерева (у порядку обходу в глибину)"""
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        yield current
+        stack.extend(reversed(list(current.children())))
+
+
+# --- вирази ---
+class Literal(Node):
+    __slots__ = ('text',)
+
+    def __init__(self, text: str, line: int):
+        self.text = text
+        self.line = line
+
+    @property
+    def value(self):
+        """Числове/логічне значення (None для часу, рядків тощо)"""
+        return literal_value(self.text)
+
+
+class Name(Node):
+    """Ім'я: scope 'local' (#x), 'global' ("x"), 'absolute' (%IW0) або 'plain' (x)"""
+
+    __slots__ = ('name', 'scope')
+
+    def __init__(self, name: str, scope: str, line: int):
+        self.name = name
+        self.scope = scope
+        self.line = line
+
+
+class Member(Node):
+    __slots__ = ('base', 'field')
+    _fields = ('base',)
+
+    def __init__(self, base: Node, field: str, line: int):
+        self.base = base
+        self.field = field
+        self.line = line
+
+
+class Index(Node):
+    __slots__ = ('base', 'indices')
+    _fields = ('base', 'indices')
+
+    def __init__(self, base: Node, indices: List[Node], line: int):
+        self.base = base
+        self.indices = indices
+        self.line = line
+
+
+class Call(Node):
+    """Виклик FC/FB/інструкції; args — [(параметр | None, ':=' | '=>' | None, вираз)]
+
+    target — вузол екземпляра (Member/Index) для scope == 'instance', інакше None
+    """
+
+    __slots__ = ('name', 'scope', 'args', 'target')
+    _fields = ('args',)
+
+    def __init__(self, name: str, scope: str, args: list, line: int, target: Node = None):
+        self.name = name
+        self.scope = scope
+        self.args = args
+        self.line = line
+        self.target = target
+
+    def children(self):
+        for _, _, expr in self.args:
+            yield expr
+
+
+class BinOp(Node):
+    __slots__ = ('op', 'left', 'right')
+    _fields = ('left', 'right')
+
+    def __init__(self, op: str, left: Node, right: Node, line: int):
+        self.op = op
+        self.left = left
+        self.right = right
+        self.line = line
+
+
+class UnOp(Node):
+    __slots__ = ('op', 'operand')
+    _fields = ('operand',)
+
+    def __init__(self, op: str, operand: Node, line: int):
+        self.op = op
+        self.operand = operand
+        self.line = line
+
+
+class Range(Node):
+    """Мітка CASE виду lo..hi"""
+
+    __slots__ = ('lo', 'hi')
+    _fields = ('lo', 'hi')
+
+    def __init__(self, lo: Node, hi: Node, line: int):
+        self.lo = lo
+        self.hi = hi
+        self.line = line
+
+
+# --- оператори ---
+class Assign(Node):
+    __slots__ = ('target', 'value')
+    _fields = ('target', 'value')
+
+    def __init__(self, target: Node, value: Node, line: int):
+        self.target = target
+        self.value = value
+        self.line = line
+
+
+class CallStmt(Node):
+    __slots__ = ('call',)
+    _fields = ('call',)
+
+    def __init__(self, call: Call, line: int):
+        self.call = call
+        self.line = line
+
+
+class If(Node):
+    """branches — [(умова, [оператори])], else_body — [оператори]"""
+
+    __slots__ = ('branches', 'else_body')
+    _fields = ('branches', 'else_body')
+
+    def __init__(self, branches: list, else_body: list, line: int):
+        self.branches = branches
+        self.else_body = else_body
+        self.line = line
+
+
+class Case(Node):
+    """branches — [([мітки], [оператори])], else_body — [оператори]"""
+
+    __slots__ = ('selector', 'branches', 'else_body')
+    _fields = ('selector', 'branches', 'else_body')
+
+    def __init__(self, selector: Node, branches: list, else_body: list, line: int):
+        self.selector = selector
+        self.branches = branches
+        self.else_body = else_body
+        self.line = line
+
+
+class For(Node):
+    __slots__ = ('var', 'start', 'end', 'step', 'body')
+    _fields = ('var', 'start', 'end', 'step', 'body')
+
+    def __init__(self, var: Node, start: Node, end: Node, step: Optional[Node], body: list, line: int):
+        self.var = var
+        self.start = start
+        self.end = end
+        self.step = step
+        self.body = body
+        self.line = line
+
+
+class While(Node):
+    __slots__ = ('cond', 'body')
+    _fields = ('cond', 'body')
+
+    def __init__(self, cond: Node, body: list, line: int):
+        self.cond = cond
+        self.body = body
+        self.line = line
+
+
+class Repeat(Node):
+    __slots__ = ('body', 'cond')
+    _fields = ('body', 'cond')
+
+    def __init__(self, body: list, cond: Node, line: int):
+        self.body = body
+        self.cond = cond
+        self.line = line
+
+
+class Jump(Node):
+    """RETURN / EXIT / CONTINUE"""
+
+    __slots__ = ('kind',)
+
+    def __init__(self, kind: str, line: int):
+        self.kind = kind
+        self.line = line
+
+
+class Region(Node):
+    __slots__ = ('name', 'body')
+    _fields = ('body',)
+
+    def __init__(self, name: str, body: list, line: int):
+        self.name = name
+        self.body = body
+        self.line = line
+
+
+# --- блок ---
+class VarDecl:
+    """Оголошення змінної: секція (VAR_INPUT, VAR_TEMP, VAR CONSTANT ...), тип (текст), ініціалізатор"""
+
+    __slots__ = ('section', 'name', 'type', 'init', 'line')
+
+    def __init__(self, section: str, name: str, type_: str, init: Optional[Node], line: int):
+        self.section = section
+        self.name = name
+        self.type = type_
+        self.init = init
+        self.line = line
+
+    def __repr__(self) -> str:
+        return f"VarDecl({self.section} {self.name} : {self.type})"
+
+
+class Block(Node):
+    """FUNCTION / FUNCTION_BLOCK / ORGANIZATION_BLOCK"""
+
+    __slots__ = ('kind', 'name', 'return_type', 'vars', 'body', 'source')
+    _fields = ('body',)
+
+    def __init__(self, kind: str, name: str, return_type: Optional[str], vars_: List[VarDecl],
+                 body: list, source: str, line: int):
+        self.kind = kind
+        self.name = name
+        self.return_type = return_type
+        self.vars = vars_
+        self.body = body
+        self.source = source
+        self.line = line
+
+    def var(self, name: str) -> Optional[VarDecl]:
+        for decl in self.vars:
+            if decl.name == name:
+                return decl
+        return None
+
+    def constants(self) -> Dict[str, object]:
+        """VAR CONSTANT з числовими значеннями"""
+        return {d.name: d.init.value for d in self.vars
+                if d.section == 'VAR CONSTANT' and isinstance(d.init, Literal)
+                and d.init.value is not None}
+
+    def __repr__(self) -> str:
+        return f"Block({self.kind} {self.name!r}, {len(self.body)} stmts)"
+
+
+def literal_value(text: str):
+    """'16#FF' -> 255, 'UINT#16#FFFF' -> 65535, 'TRUE' -> True, 'INT#-1' -> -1; інакше None"""
+    upper = text.upper()
+    if upper in ('TRUE', 'FALSE'):
+        return upper == 'TRUE'
+    parts = upper.split('#')
+    if len(parts) >= 2 and not parts[0][:1].isdigit():
+        if parts[0] in ('T', 'TIME', 'LT', 'LTIME', 'TOD', 'TIME_OF_DAY', 'D', 'DATE',
+                        'DT', 'DATE_AND_TIME', 'LTOD', 'LDT'):
+            return None
+        parts = parts[1:]  # типізований літерал: UINT#...
+    try:
+        if len(parts) == 2:
+            return int(parts[1].replace('_', ''), int(parts[0]))
+        if len(parts) == 1:
+            value = parts[0].replace('_', '')
+            if value in ('TRUE', 'FALSE'):
+                return value == 'TRUE'
+            return float(value) if ('.' in value or 'E' in value) else int(value)
+    except ValueError:
+        return None
+    return None
+
+
+# ============================================================================
+# Парсер
+# ============================================================================
+_BLOCK_KINDS = {
+    'FUNCTION': 'END_FUNCTION',
+    'FUNCTION_BLOCK': 'END_FUNCTION_BLOCK',
+    'ORGANIZATION_BLOCK': 'END_ORGANIZATION_BLOCK',
+}
+_SKIPPED_KINDS = {'DATA_BLOCK': 'END_DATA_BLOCK', 'TYPE': 'END_TYPE'}
+_VAR_SECTIONS = ('VAR_INPUT', 'VAR_OUTPUT', 'VAR_IN_OUT', 'VAR_TEMP', 'VAR_STAT', 'VAR')
+_VAR_MODIFIERS = ('CONSTANT', 'RETAIN', 'NON_RETAIN', 'DB_SPECIFIC')
+
+# Пріоритети бінарних операторів SCL (менше — слабше)
+_BINARY = [
+    ('OR',),
+    ('XOR',),
+    ('AND', '&'),
+    ('=', '<>'),
+    ('<', '>', '<=', '>='),
+    ('+', '-'),
+    ('*', '/', 'MOD'),
+    ('**',),
+]
+
+# Ключові слова, що завершують список операторів
+_STMT_END = {'END_IF', 'ELSIF', 'ELSE', 'END_CASE', 'END_FOR', 'END_WHILE', 'UNTIL',
+             'END_REPEAT', 'END_REGION', 'END_FUNCTION', 'END_FUNCTION_BLOCK',
+             'END_ORGANIZATION_BLOCK'}
+
+
+class Parser:
+    def __init__(self, tokens: List[Token], source: str = '<scl>'):
+        self.tokens = tokens
+        self.pos = 0
+        self.source = source
+
+    # --- допоміжні ---
+    @property
+    def tok(self) -> Token:
+        return self.tokens[self.pos]
+
+    def peek(self, offset: int = 1) -> Token:
+        return self.tokens[min(self.pos + offset, len(self.tokens) - 1)]
+
+    def error(self, message: str, tok: Token = None):
+        tok = tok or self.tok
+        raise SclSyntaxError(f"❌ {self.source}:{tok.line}: {message} (знайдено {tok.text!r})")
+
+    def advance(self) -> Token:
+        tok = self.tokens[self.pos]
+        if tok.kind != 'eof':
+            self.pos += 1
+        return tok
+
+    def is_kw(self, *words: str) -> bool:
+        return self.tok.kind == 'id' and self.tok.upper in words
+
+    def is_op(self, *ops: str) -> bool:
+        return self.tok.kind == 'op' and self.tok.text in ops
+
+    def expect_kw(self, word: str) -> Token:
+        if not self.is_kw(word):
+            self.error(f"очікувалось {word}")
+        return self.advance()
+
+    def expect_op(self, op: str) -> Token:
+        if not self.is_op(op):
+            self.error(f"очікувалось '{op}'")
+        return self.advance()
+
+    def skip_semicolons(self):
+        while self.is_op(';'):
+            self.advance()
+
+    # --- файл ---
+    def parse_file(self) -> List[Block]:
+        blocks = []
+        while self.tok.kind != 'eof':
+            word = self.tok.upper
+            if word in _BLOCK_KINDS:
+                blocks.append(self.parse_block())
+            elif word in _SKIPPED_KINDS:
+                end = _SKIPPED_KINDS[word]
+                while not self.is_kw(end):
+                    if self.tok.kind == 'eof':
+                        self.error(f"очікувалось {end}")
+                    self.advance()
+                self.advance()
+            else:
+                self.advance()  # сміття між блоками (наприклад, BOM, заголовки)
+        return blocks
+
+    def parse_block(self) -> Block:
+        head = self.advance()
+        kind = head.upper
+        end = _BLOCK_KINDS[kind]
+        name_tok = self.advance()
+        if name_tok.kind not in ('qid', 'id'):
+            self.error("очікувалось ім'я блоку", name_tok)
+        name = name_tok.text.strip('"')
+        return_type = None
+        if kind == 'FUNCTION' and self.is_op(':'):
+            self.advance()
+            return_type = self.advance().text.strip('"')
+
+        vars_ = []
+        # заголовок: TITLE, VERSION, AUTHOR ... до секцій змінних або BEGIN
+        while not self.is_kw('BEGIN', end):
+            if self.tok.kind == 'eof':
+                self.error("очікувалось BEGIN")
+            if self.tok.kind == 'id' and self.tok.upper in _VAR_SECTIONS:
+                vars_.extend(self.parse_var_section())
+            else:
+                self.advance()
+        body = []
+        if self.is_kw('BEGIN'):
+            self.advance()
+            body = self.parse_statements()
+        self.expect_kw(end)
+        return Block(kind, name, return_type, vars_, body, self.source, head.line)
+
+    def type_text(self) -> str:
+        """Текст типу до ';' / ':=' (з вкладеними STRUCT ... END_STRUCT)"""
+        parts = []
+        depth = 0
+        while True:
+            tok = self.tok
+            if tok.kind == 'eof':
+                self.error("незавершене оголошення типу")
+            if depth == 0 and (self.is_op(';', ':=') or (tok.kind == 'id' and (
+                    tok.upper in _VAR_SECTIONS or tok.upper in ('BEGIN', 'END_VAR')))):
+                break
+            if tok.upper == 'STRUCT':
+                depth += 1
+            elif tok.upper == 'END_STRUCT':
+                depth -= 1
+            parts.append(tok.text)
+            self.advance()
+        text = ' '.join(parts)
+        return re.sub(r'\s*([\[\]\.,:])\s*', r'\1', text).replace('OF', ' OF ').replace('  ', ' ').strip()
+
+    def parse_var_section(self) -> List[VarDecl]:
+        section = self.advance().upper
+        while self.is_kw(*_VAR_MODIFIERS):
+            section = f"{section} {self.advance().upper}"
+        decls = []
+        while not self.is_kw('END_VAR'):
+            if self.tok.kind == 'eof':
+                self.error("очікувалось END_VAR")
+            if self.is_op(';'):
+                self.advance()
+                continue
+            line = self.tok.line
+            names = [self.advance().text.lstrip('#')]
+            while self.is_op(','):
+                self.advance()
+                names.append(self.advance().text.lstrip('#'))
+            self.expect_op(':')
+            type_ = self.type_text()
+            init = None
+            if self.is_op(':='):
+                self.advance()
+                init = self.parse_expr()
+                while not self.is_op(';') and not self.is_kw('END_VAR'):
+                    self.advance()  # ініціалізатори масивів [1, 2, 3(0)] не потрібні аналізу
+            for name in names:
+                decls.append(VarDecl(section, name, type_, init, line))
+        self.advance()
+        return decls
+
+    # --- оператори ---
+    def parse_statements(self) -> list:
+        stmts = []
+        while True:
+            self.skip_semicolons()
+            tok = self.tok
+            if tok.kind == 'eof' or (tok.kind == 'id' and tok.upper in _STMT_END):
+                return stmts
+            stmts.append(self.parse_statement())
+
+    def parse_statement(self) -> Node:
+        tok = self.tok
+        word = tok.upper
+        if word == 'IF':
+            return self.parse_if()
+        if word == 'CASE':
+            return self.parse_case()
+        if word == 'FOR':
+            return self.parse_for()
+        if word == 'WHILE':
+            self.advance()
+            cond = self.parse_expr()
+            self.expect_kw('DO')
+            body = self.parse_statements()
+            self.expect_kw('END_WHILE')
+            return While(cond, body, tok.line)
+        if word == 'REPEAT':
+            self.advance()
+            body = self.parse_statements()
+            self.expect_kw('UNTIL')
+            cond = self.parse_expr()
+            self.expect_kw('END_REPEAT')
+            return Repeat(body, cond, tok.line)
+        if word in ('RETURN', 'EXIT', 'CONTINUE'):
+            self.advance()
+            return Jump(word, tok.line)
+        if word == 'REGION':
+            self.advance()
+            name_parts = []
+            while self.tok.line == tok.line and self.tok.kind != 'eof':
+                name_parts.append(self.advance().text)
+            body = self.parse_statements()
+            self.expect_kw('END_REGION')
+            return Region(' '.join(name_parts).strip('"'), body, tok.line)
+
+        target = self.parse_postfix()
+        if self.is_op(':='):
+            self.advance()
+            value = self.parse_expr()
+            return Assign(target, value, tok.line)
+        if isinstance(target, Call):
+            return CallStmt(target, tok.line)
+        self.error("очікувався оператор")
+
+    def parse_if(self) -> If:
+        line = self.advance().line
+        branches = []
+        cond = self.parse_expr()
+        self.expect_kw('THEN')
+        branches.append((cond, self.parse_statements()))
+        else_body = []
+        while True:
+            if self.is_kw('ELSIF'):
+                self.advance()
+                cond = self.parse_expr()
+                self.expect_kw('THEN')
+                branches.append((cond, self.parse_statements()))
+            elif self.is_kw('ELSE'):
+                self.advance()
+                else_body = self.parse_statements()
+            else:
+                break
+        self.expect_kw('END_IF')
+        return If(branches, else_body, line)
+
+    def _at_case_label(self) -> bool:
+        """Чи починається з поточного токена мітка CASE (значення ... ':')"""
+        i = self.pos
+        while True:
+            tok = self.tokens[i]
+            if tok.kind == 'op' and tok.text == ':':
+                return True
+            if tok.kind == 'eof' or (tok.kind == 'op' and tok.text in (';', ':=', '(')):
+                return False
+            if tok.kind == 'id' and tok.upper in _STMT_END:
+                return False
+            i += 1
+
+    def parse_case(self) -> Case:
+        line = self.advance().line
+        selector = self.parse_expr()
+        self.expect_kw('OF')
+        branches = []
+        else_body = []
+        while True:
+            self.skip_semicolons()
+            if self.is_kw('ELSE'):
+                self.advance()
+                if self.is_op(':'):
+                    self.advance()
+                else_body = self.parse_statements()
+                continue
+            if self.is_kw('END_CASE'):
+                self.advance()
+                return Case(selector, branches, else_body, line)
+            if not self._at_case_label():
+                self.error("очікувалась мітка CASE")
+            labels = []
+            while True:
+                lo = self.parse_expr()
+                if self.is_op('..'):
+                    self.advance()
+                    lo = Range(lo, self.parse_expr(), lo.line)
+                labels.append(lo)
+                if self.is_op(','):
+                    self.advance()
+                    continue
+                break
+            self.expect_op(':')
+            body = []
+            while True:
+                self.skip_semicolons()
+                if self.is_kw('ELSE', 'END_CASE') or self._at_case_label() and not self.is_kw(
+                        'IF', 'CASE', 'FOR', 'WHILE', 'REPEAT', 'REGION'):
+                    break
+                if self.tok.kind == 'eof':
+                    self.error("очікувалось END_CASE")
+                body.append(self.parse_statement())
+            branches.append((labels, body))
+
+    def parse_for(self) -> For:
+        line = self.advance().line
+        var = self.parse_primary()
+        self.expect_op(':=')
+        start = self.parse_expr()
+        self.expect_kw('TO')
+        end = self.parse_expr()
+        step = None
+        if self.is_kw('BY'):
+            self.advance()
+            step = self.parse_expr()
+        self.expect_kw('DO')
+        body = self.parse_statements()
+        self.expect_kw('END_FOR')
+        return For(var, start, end, step, body, line)
+
+    # --- вирази ---
+    def parse_expr(self, level: int = 0) -> Node:
+        if level == len(_BINARY):
+            return self.parse_unary()
+        left = self.parse_expr(level + 1)
+        ops = _BINARY[level]
+        while (self.tok.kind == 'op' and self.tok.text in ops) or \
+                (self.tok.kind == 'id' and self.tok.upper in ops):
+            tok = self.advance()
+            op = tok.upper if tok.kind == 'id' else tok.text
+            if op == '&':
+                op = 'AND'
+            right = self.parse_expr(level + 1)
+            left = BinOp(op, left, right, tok.line)
+        return left
+
+    def parse_unary(self) -> Node:
+        if self.is_kw('NOT') or self.is_op('-', '+'):
+            tok = self.advance()
+            op = tok.upper or tok.text
+            return UnOp(op, self.parse_unary(), tok.line)
+        return self.parse_postfix()
+
+    def parse_postfix(self) -> Node:
+        node = self.parse_primary()
+        while True:
+            if self.is_op('.') and self.peek().kind in ('id', 'qid', 'num', 'local', 'addr'):
+                self.advance()
+                field = self.advance().text.strip('"').lstrip('#')
+                node = Member(node, field, node.line)
+            elif self.is_op('['):
+                self.advance()
+                indices = [self.parse_expr()]
+                while self.is_op(','):
+                    self.advance()
+                    indices.append(self.parse_expr())
+                self.expect_op(']')
+                node = Index(node, indices, node.line)
+            elif self.is_op('(') and isinstance(node, Name):
+                node = Call(node.name, node.scope, self.parse_args(), node.line)
+            elif self.is_op('(') and isinstance(node, (Member, Index)):
+                # виклик мультиекземпляра / екземпляра з DB: "DB_X".inst(...)
+                node = Call(expr_text(node), 'instance', self.parse_args(), node.line, node)
+            else:
+                return node
+
+    def parse_args(self) -> list:
+        self.expect_op('(')
+        args = []
+        while not self.is_op(')'):
+            if self.tok.kind in ('id', 'local', 'qid') and self.peek().kind == 'op' \
+                    and self.peek().text in (':=', '=>'):
+                param = self.advance().text.lstrip('#').strip('"')
+                op = self.advance().text
+                args.append((param, op, self.parse_expr()))
+            else:
+                args.append((None, None, self.parse_expr()))
+            if self.is_op(','):
+                self.advance()
+            elif not self.is_op(')'):
+                self.error("очікувалось ',' або ')'")
+        self.advance()
+        return args
+
+    def parse_primary(self) -> Node:
+        tok = self.tok
+        if tok.kind in ('num', 'time', 'str'):
+            self.advance()
+            return Literal(tok.text, tok.line)
+        if tok.kind == 'local':
+            self.advance()
+            return Name(tok.text[1:], 'local', tok.line)
+        if tok.kind == 'qid':
+            self.advance()
+            return Name(tok.text.strip('"'), 'global', tok.line)
+        if tok.kind == 'addr':
+            self.advance()
+            return Name(tok.text, 'absolute', tok.line)
+        if tok.kind == 'id':
+            if tok.upper in ('TRUE', 'FALSE'):
+                self.advance()
+                return Literal(tok.upper, tok.line)
+            self.advance()
+            return Name(tok.text, 'plain', tok.line)
+        if self.is_op('('):
+            self.advance()
+            node = self.parse_expr()
+            self.expect_op(')')
+            return node
+        self.error("очікувався вираз")
+
+
+def expr_text(node: Node) -> str:
+    """Текстове представлення l-value/виразу (для звітів та ключів)"""
+    if isinstance(node, Name):
+        if node.scope == 'global':
+            return f'"{node.name}"'
+        return node.name
+    if isinstance(node, Member):
+        return f"{expr_text(node.base)}.{node.field}"
+    if isinstance(node, Index):
+        return f"{expr_text(node.base)}[{', '.join(expr_text(i) for i in node.indices)}]"
+    if isinstance(node, Literal):
+        return node.text
+    if isinstance(node, Call):
+        return f"{node.name}(...)"
+    if isinstance(node, BinOp):
+        return f"({expr_text(node.left)} {node.op} {expr_text(node.right)})"
+    if isinstance(node, UnOp):
+        return f"{node.op} {expr_text(node.operand)}"
+    if isinstance(node, Range):
+        return f"{expr_text(node.lo)}..{expr_text(node.hi)}"
+    return type(node).__name__
+
+
+def parse_source(text: str, source: str = '<scl>') -> List[Block]:
+    """Розібрати текст SCL; повертає блоки FUNCTION/FUNCTION_BLOCK/ORGANIZATION_BLOCK"""
+    return Parser(tokenize(text, source), source).parse_file()
+
+
+def parse_file(path) -> List[Block]:
+    path = Path(path)
+    return parse_source(path.read_text(encoding='utf-8-sig'), path.name)
+
+
+def load_blocks(*directories) -> Dict[str, Block]:
+    """Блоки з *.scl каталогів (пізніші каталоги перекривають попередні)"""
+    blocks = {}
+    for directory in directories:
+        if directory is None:
+            continue
+        for path in sorted(Path(directory).glob('*.scl')):
+            for block in parse_file(path):
+                blocks[block.name] = block
+    return blocks
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        print("Використання: python scl_parser.py FILE.scl [FILE.scl ...]")
+        return 2
+    status = 0
+    for name in argv:
+        try:
+            blocks = parse_file(name)
+        except SclSyntaxError as e:
+            print(e)
+            status = 1
+            continue
+        for block in blocks:
+            counts = {}
+            for node in walk(block):
+                counts[type(node).__name__] = counts.get(type(node).__name__, 0) + 1
+            summary = ', '.join(f"{k}={v}" for k, v in sorted(counts.items()) if k != 'Block')
+            print(f"📄 {block.kind} \"{block.name}\": {len(block.vars)} змінних; {summary}")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
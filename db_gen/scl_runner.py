@@ -0,0 +1,1215 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Офлайн-виконання тестових FB (FB_Test_*) без PLC/PLCSIM: транспіляція SCL -> Python
+
+- блоки FUNCTION / FUNCTION_BLOCK розбираються scl_parser і транслюються у
+  Python-функції (FC: VAR_INPUT/VAR_IN_OUT — параметри, VAR_OUTPUT/VAR_IN_OUT
+  повертаються словником; FB: екземпляр — об'єкт з полями інтерфейсу)
+- мультиекземпляри FB у VAR (і ARRAY[..] OF "FB_X"): виклик inst(...) / arr[i](...)
+- UDT/DB (UDT_*.scl, DB_*.scl) -> класи з __slots__; присвоєння структур — копія,
+  VAR_IN_OUT структури — за посиланням, елементарні — copy-in/copy-out
+- цілі типи переповнюються за шириною цілі присвоєння (INT, UDINT, DWORD ...),
+  "/" і MOD над цілими — з відкиданням дробової частини, як у S7
+- підмножина SCL: IF/ELSIF, CASE (мітки-константи, діапазони), FOR/WHILE/REPEAT,
+  EXIT/CONTINUE/RETURN, REGION, VAR CONSTANT, типізовані літерали (UINT#16#FFFF),
+  T#... (мс), глобальні константи "X" / X / "DB_Const".X з Constant.xlsx,
+  TIME_TCK() (віртуальний годинник, --tck), *_TO_*, ABS/MIN/MAX/LIMIT/SEL/SHL/SHR
+- індекс поза межами ARRAY — помилка кейса з рядком SCL (у PLC — помилка доступу)
+- скомпільовані блоки кешуються у .plc_cache/scl_runner.pickle за SHA-256 файлу
+  (і розкладок UDT/DB); константи — за SHA-256 Constant.xlsx
+- FC, які генерує generate_plc_config і яких немає на диску
+  (FC_ManualStatusRefresh), беруться з генератора у режимі "усі слоти щоцикла"
+
+Кейси тесту — мітки CASE CaseId OF у тілі FB; кожен кейс — новий екземпляр FB
+і нові DB (ізоляція), Run := TRUE, один виклик. Кейс, що не виставив ні Passed,
+ні Failed (ELSE RETURN), — пропущений.
+
+Використання:
+    python scl_runner.py                          # усі FB_Test_* (корінь + generated/)
+    python scl_runner.py --block FB_Test_ArbiterMech --case 8 --case 9
+    python scl_runner.py --tck 2147483000         # TIME_TCK перед переповненням
+    python scl_runner.py --show-python FC_ArbiterMech
+    python scl_runner.py .. generated --report tests.json
+"""
+
+import re
+import sys
+import time
+import pickle
+import marshal
+import keyword
+import argparse
+import hashlib
+from functools import partial
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from config_loader import CACHE_DIR_NAME, file_sha256
+from db_layout import parse_db_source
+from scl_parser import (Assign, Call, CallStmt, Case, For, If, Index, Jump, Literal, Member, Name,
+                        Range, Region, Repeat, SclSyntaxError, UnOp, BinOp, While, literal_value,
+                        parse_source, walk)
+from udt_layout import _ARRAY_RE, _parse_type, parse_udt_source
+from vplc_core import DEFAULT_CONSTANTS, REPO_DIR, VirtualClock, load_constants
+
+RUNNER_CACHE_NAME = 'scl_runner.pickle'
+RUNNER_VERSION = 2
+
+TEST_PREFIX = 'FB_Test_'
+TEST_INPUTS = ('Run', 'CaseId')
+TEST_OUTPUTS = ('Passed', 'Failed', 'FailMask')
+
+# Глобальні імена-псевдоніми простору констант: "DB_Const".X == X
+CONST_NAMESPACES = ('DB_Const',)
+
+# FC, що існують лише як вихід генератора: ім'я -> метод PLCCodeGenerator
+GENERATED_BLOCKS = {'FC_ManualStatusRefresh': 'generate_fc_manual_status_refresh'}
+GENERATOR_SOURCE = Path(__file__).resolve().parent / 'generate_plc_config.py'
+
+# Цілі типи S7: ширина в бітах, знаковість
+INT_TYPES = {
+    'SINT': (8, True), 'USINT': (8, False), 'BYTE': (8, False), 'CHAR': (8, False),
+    'INT': (16, True), 'UINT': (16, False), 'WORD': (16, False),
+    'DINT': (32, True), 'UDINT': (32, False), 'DWORD': (32, False), 'TIME': (32, True),
+    'LINT': (64, True), 'ULINT': (64, False), 'LWORD': (64, False),
+}
+REAL_TYPES = ('REAL', 'LREAL')
+ANY_INT = 'ANY_INT'    # результат арифметики / константа: ширина невідома
+ANY = 'ANY'            # результат виклику FC/поле FB-екземпляра
+
+_INT_LITERAL_RE = re.compile(r'^-?\d+$')
+_TIME_PART_RE = re.compile(r'(\d+(?:\.\d+)?)(MS|D|H|M|S)')
+_TIME_UNITS_MS = {'D': 86400000, 'H': 3600000, 'M': 60000, 'S': 1000, 'MS': 1}
+_CONVERSION_RE = re.compile(r'^([A-Z]+)_TO_([A-Z]+)$')
+
+
+class SclRunnerError(ValueError):
+    """Конструкція SCL поза підтримуваною підмножиною / невідоме ім'я"""
+
+
+# ============================================================================
+# Середовище виконання (спільний простір імен скомпільованих блоків)
+# ============================================================================
+def _wrapper(bits: int, signed: bool):
+    mask = (1 << bits) - 1
+    if signed:
+        half = 1 << (bits - 1)
+        return lambda v: ((int(v) + half) & mask) - half
+    return lambda v: int(v) & mask
+
+
+_WRAP = {name: _wrapper(*spec) for name, spec in INT_TYPES.items()}
+
+
+def wrap_int(value: int, type_: str) -> int:
+    """Значення після присвоєння змінній цілого типу S7 (з переповненням)"""
+    return _WRAP[type_](value)
+
+
+def _div(a, b):
+    if isinstance(a, float) or isinstance(b, float):
+        return a / b
+    if b == 0:
+        raise ZeroDivisionError("ділення на 0")
+    q = abs(a) // abs(b)
+    return q if (a < 0) == (b < 0) else -q
+
+
+def _mod(a, b):
+    if b == 0:
+        raise ZeroDivisionError("MOD 0")
+    return a - _div(a, b) * b
+
+
+def _ix(i, lo, n):
+    j = i - lo
+    if 0 <= j < n:
+        return j
+    raise IndexError(f"індекс {i} поза межами [{lo}..{lo + n - 1}]")
+
+
+def _cp(value):
+    """Копія значення при присвоєнні (структури, масиви)"""
+    if isinstance(value, list):
+        return [_cp(item) for item in value]
+    copy = getattr(value, '_copy', None)
+    return copy() if copy is not None else value
+
+
+def _not(value):
+    return (not value) if isinstance(value, bool) else ~value
+
+
+def _runtime_namespace(clock) -> dict:
+    ns = {f'_c_{name}': fn for name, fn in _WRAP.items()}
+    ns.update({'_div': _div, '_mod': _mod, '_ix': _ix, '_cp': _cp, '_not': _not,
+               '_round': round, '_clock': clock})
+    return ns
+
+
+def _ident(name: str) -> str:
+    return re.sub(r'\W', '_', name)
+
+
+def _attr(name: str) -> str:
+    """Ім'я поля як атрибут Python (ключові слова Python — з '_' в кінці)"""
+    return name + '_' if keyword.iskeyword(name) else name
+
+
+def time_literal_ms(text: str) -> int:
+    """T#1m30s -> 90000, TIME#-250ms -> -250"""
+    body = text.split('#', 1)[1].upper().replace('_', '')
+    sign = -1 if body.startswith('-') else 1
+    body = body.lstrip('+-')
+    total = 0.0
+    for value, unit in _TIME_PART_RE.findall(body):
+        total += float(value) * _TIME_UNITS_MS[unit]
+    if _TIME_PART_RE.sub('', body):
+        raise SclRunnerError(f"❌ Непідтримуваний літерал часу {text}")
+    return sign * int(total)
+
+
+# ============================================================================
+# Типи UDT/DB
+# ============================================================================
+class TypeEnv:
+    """UDT та DB каталогів (пізніші каталоги перекривають попередні) + класи Python"""
+
+    def __init__(self, directories: List[Path]):
+        self.udts = {}
+        self.dbs = {}
+        hashes = []
+        for directory in directories:
+            for path in sorted(directory.glob('*.scl')):
+                if path.name.startswith('UDT_'):
+                    self.udts.update(parse_udt_source(path.read_text(encoding='utf-8-sig')))
+                elif path.name.startswith('DB_'):
+                    self.dbs.update(parse_db_source(path.read_text(encoding='utf-8-sig')))
+                else:
+                    continue
+                hashes.append(f"{path.name}:{file_sha256(path)}")
+        self.digest = hashlib.sha256('\n'.join(hashes).encode()).hexdigest()
+        self._fields = {}       # id(список полів) -> {ІМ'Я: Field}
+        self._anonymous = {}    # id(вкладена STRUCT) -> ім'я класу
+
+    def parse(self, text: str, where: str):
+        """Текст типу з оголошення змінної -> тип (як у udt_layout)"""
+        if text.upper().startswith('STRUCT'):
+            raise SclRunnerError(f"❌ {where}: вкладена STRUCT у змінній блока не підтримується")
+        type_ = _parse_type(text)
+        self.check(type_, where)
+        return type_
+
+    def check(self, type_, where: str):
+        if isinstance(type_, tuple):
+            self.check(type_[3], where)
+        elif isinstance(type_, str) and not self.is_elementary(type_) and type_ not in self.udts:
+            raise SclRunnerError(f"❌ {where}: тип {type_!r} не підтримується")
+
+    @staticmethod
+    def is_elementary(type_) -> bool:
+        return isinstance(type_, str) and (type_ == 'BOOL' or type_ in INT_TYPES or
+                                           type_ in REAL_TYPES or type_.startswith('STRING'))
+
+    def fields(self, type_) -> Optional[Dict[str, object]]:
+        """Поля структури (UDT, DB, вкладена STRUCT) за ім'ям у верхньому регістрі"""
+        if isinstance(type_, list):
+            fields = type_
+        elif isinstance(type_, str) and type_ in self.udts:
+            fields = self.udts[type_]
+        elif isinstance(type_, tuple) and type_[0] == 'DB':
+            fields = self.dbs[type_[1]]
+        else:
+            return None
+        key = id(fields)
+        if key not in self._fields:
+            self._fields[key] = {f.name.upper(): f for f in fields}
+        return self._fields[key]
+
+    def default(self, type_) -> str:
+        """Вираз Python для нового значення типу (нулі, як у новому DB)"""
+        if type_ == 'BOOL':
+            return 'False'
+        if type_ in INT_TYPES:
+            return '0'
+        if type_ in REAL_TYPES:
+            return '0.0'
+        if isinstance(type_, str) and type_.startswith('STRING'):
+            return "''"
+        if isinstance(type_, tuple):
+            if type_[0] == 'ARRAY':
+                count = type_[2] - type_[1] + 1
+                elem = type_[3]
+                if self.is_elementary(elem):
+                    return f'[{self.default(elem)}] * {count}'
+                return f'[{self.default(elem)} for _ in range({count})]'
+            if type_[0] == 'FB':
+                return f'I_{_ident(type_[1])}()'
+        if isinstance(type_, list):
+            return f'{self._anonymous[id(type_)]}()'
+        if type_ in self.udts:
+            return f'T_{_ident(type_)}()'
+        raise SclRunnerError(f"❌ Тип {type_!r} не підтримується")
+
+    def source(self) -> str:
+        """Класи Python для всіх UDT і DB"""
+        lines = []
+        for name, fields in self.udts.items():
+            self._emit_class(lines, f'T_{_ident(name)}', fields)
+        for name, fields in self.dbs.items():
+            self._emit_class(lines, f'T_{_ident(name)}', fields)
+        return '\n'.join(lines) + '\n'
+
+    def _emit_class(self, lines: List[str], cls: str, fields):
+        for f in fields:
+            if isinstance(f.type, list):
+                self._anonymous[id(f.type)] = f'{cls}__{_ident(f.name)}'
+                self._emit_class(lines, self._anonymous[id(f.type)], f.type)
+        emit_struct_class(lines, cls, [(_attr(f.name), self.default(f.type)) for f in fields])
+
+
+def emit_struct_class(lines: List[str], cls: str, fields: List[tuple]):
+    """class з __slots__, __init__ (значення за замовчуванням) і _copy (глибока копія)"""
+    names = ', '.join(repr(name) for name, _ in fields)
+    lines.append(f'class {cls}:')
+    lines.append(f'    __slots__ = ({names}{"," if len(fields) == 1 else ""})')
+    lines.append('    def __init__(self):')
+    lines.extend(f'        self.{name} = {default}' for name, default in fields)
+    if not fields:
+        lines.append('        pass')
+    lines.append('    def _copy(self):')
+    lines.append(f'        o = {cls}.__new__({cls})')
+    for name, default in fields:
+        simple = default in ('False', '0', '0.0', "''")
+        lines.append(f'        o.{name} = self.{name}' if simple else f'        o.{name} = _cp(self.{name})')
+    lines.append('        return o')
+    lines.append('')
+
+
+# ============================================================================
+# Компіляція блока
+# ============================================================================
+class CompiledBlock:
+    """Блок після трансляції (лише прості типи — серіалізується в pickle)"""
+
+    __slots__ = ('name', 'kind', 'file', 'line', 'source', 'code', 'line_map', 'calls',
+                 'constants', 'dbs', 'cases', 'interface', 'error')
+
+    def __init__(self, name: str, kind: str, file: str, line: int):
+        self.name = name
+        self.kind = kind
+        self.file = file
+        self.line = line
+        self.source = ''        # Python-текст
+        self.code = b''         # marshal code object
+        self.line_map = []      # рядок Python (з 1) -> рядок SCL
+        self.calls = set()      # FC/FB, що викликаються
+        self.constants = set()  # глобальні константи
+        self.dbs = set()        # глобальні DB
+        self.cases = []         # мітки CASE CaseId OF (для FB_Test_*)
+        self.interface = {}     # ім'я -> секція (VAR_INPUT, VAR_OUTPUT ...)
+        self.error = None
+
+    def state(self) -> dict:
+        """Запис для кешу (без посилань на клас — модуль може бути __main__)"""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_state(cls, state: dict) -> 'CompiledBlock':
+        block = cls.__new__(cls)
+        for name in cls.__slots__:
+            setattr(block, name, state[name])
+        return block
+
+    def scl_line(self, py_line: int) -> int:
+        if 0 < py_line <= len(self.line_map):
+            return self.line_map[py_line - 1]
+        return self.line
+
+    def __repr__(self) -> str:
+        return f"CompiledBlock({self.kind} {self.name!r}{', error' if self.error else ''})"
+
+
+class _Var:
+    __slots__ = ('name', 'type', 'section', 'constant', 'code', 'init')
+
+    def __init__(self, name, type_, section, constant, code, init):
+        self.name = name
+        self.type = type_
+        self.section = section
+        self.constant = constant
+        self.code = code
+        self.init = init
+
+
+_INSTANCE_SECTIONS = ('VAR_INPUT', 'VAR_OUTPUT', 'VAR_IN_OUT', 'VAR', 'VAR_STAT')
+_COMPARE = {'=': '==', '<>': '!=', '<': '<', '>': '>', '<=': '<=', '>=': '>='}
+_ARITH = {'+': '+', '-': '-', '*': '*', '**': '**'}
+_BITWISE = {'AND': '&', 'OR': '|', 'XOR': '^'}
+
+
+class BlockCompiler:
+    """Трансляція одного FUNCTION / FUNCTION_BLOCK у текст Python"""
+
+    def __init__(self, block, env: TypeEnv):
+        self.block = block
+        self.env = env
+        self.fb = block.kind == 'FUNCTION_BLOCK'
+        self.result = CompiledBlock(block.name, block.kind, block.source, block.line)
+        self.vars = {}
+        self.lines = []          # (відступ, текст, рядок SCL)
+        self.pending = []        # оператори, винесені з виразу (виклики FC)
+        self.seq = 0
+        self.loops = 0
+        self.line = block.line
+        self.ret_type = None
+        if block.kind == 'FUNCTION' and block.return_type and block.return_type.upper() != 'VOID':
+            self.ret_type = env.parse(block.return_type, self.where(block.line))
+        self._declare()
+
+    def where(self, line: int = None) -> str:
+        return f"{self.block.source}:{line or self.line}"
+
+    def fail(self, message: str):
+        raise SclRunnerError(f"❌ {self.where()}: {message}")
+
+    # --- оголошення ---
+    def _declare(self):
+        for decl in self.block.vars:
+            words = decl.section.split()
+            section, constant = words[0], 'CONSTANT' in words
+            if section == 'VAR_TEMP' or not self.fb:
+                instance = False
+            else:
+                instance = section in _INSTANCE_SECTIONS and not constant
+            type_ = self._var_type(decl)
+            code = f'fb.{_attr(decl.name)}' if instance else f'v_{decl.name.upper()}'
+            self.vars[decl.name.upper()] = _Var(decl.name, type_, section, constant, code, decl.init)
+            if section in ('VAR_INPUT', 'VAR_OUTPUT', 'VAR_IN_OUT'):
+                self.result.interface[decl.name] = section
+
+    def _var_type(self, decl):
+        text = decl.type.strip()
+        m = _ARRAY_RE.match(text)
+        elem = m.group(3).strip() if m else text
+        name = elem.strip('"')
+        if elem.startswith('"') and name not in self.env.udts:
+            # мультиекземпляр FB (або масив мультиекземплярів)
+            return ('ARRAY', int(m.group(1)), int(m.group(2)), ('FB', name)) if m else ('FB', name)
+        return self.env.parse(text, self.where(decl.line))
+
+    # --- вихід ---
+    def emit(self, indent: int, text: str):
+        self.lines.append((indent, text, self.line))
+
+    def flush_pending(self, indent: int):
+        for text in self.pending:
+            self.emit(indent, text)
+        self.pending = []
+
+    def tmp(self, prefix: str) -> str:
+        self.seq += 1
+        return f'_{prefix}{self.seq}'
+
+    def compile(self) -> CompiledBlock:
+        block = self.block
+        name = _ident(block.name)
+        if self.fb:
+            self._emit_instance_class(name)
+            self.emit(0, f'def B_{name}(fb):')
+        else:
+            params = [v for v in self.vars.values() if v.section in ('VAR_INPUT', 'VAR_IN_OUT')]
+            args = ', '.join(f'{v.code}={self._param_default(v.type)}' for v in params)
+            self.emit(0, f'def B_{name}({args}):')
+        self._emit_prologue()
+        self.emit_body(block.body, 1)
+        self.emit(1, self.return_stmt())
+
+        text_lines = []
+        for indent, text, line in self.lines:
+            text_lines.append('    ' * indent + text)
+            self.result.line_map.append(line)
+        self.result.source = '\n'.join(text_lines) + '\n'
+        self.result.code = marshal.dumps(compile(self.result.source, f'<scl:{block.name}>', 'exec'))
+        self.result.cases = self._case_ids()
+        return self.result
+
+    def _param_default(self, type_) -> str:
+        return self.env.default(type_) if self.env.is_elementary(type_) else 'None'
+
+    def _emit_instance_class(self, name: str):
+        fields = []
+        for var in self.vars.values():
+            if var.code.startswith('fb.'):
+                fields.append((var.code[3:], self._initial(var)))
+        lines = []
+        emit_struct_class(lines, f'I_{name}', fields)
+        for text in lines:
+            self.emit(0, text)
+
+    def _initial(self, var: _Var) -> str:
+        if var.init is None:
+            return self.env.default(var.type)
+        code, type_ = self.expr(var.init)
+        if self.pending:
+            self.fail(f"ініціалізатор {var.name} з викликом не підтримується")
+        return self.coerce(code, type_, var.type)
+
+    def _emit_prologue(self):
+        """Вхідні параметри -> тип параметра; TEMP/OUTPUT FC і константи -> початкові значення"""
+        for var in self.vars.values():
+            elementary = self.env.is_elementary(var.type)
+            if var.section in ('VAR_INPUT', 'VAR_IN_OUT'):
+                if elementary:
+                    self.emit(1, f'{var.code} = {self.coerce(var.code, ANY, var.type)}')
+                elif var.section == 'VAR_INPUT':
+                    # структура-вхід — копія (FB: присвоєна викликачем, FC: None — не передано)
+                    default = f'{self.env.default(var.type)} if {var.code} is None else '
+                    self.emit(1, f'{var.code} = {"" if self.fb else default}_cp({var.code})')
+                elif not self.fb:
+                    self.emit(1, f'if {var.code} is None:')
+                    self.emit(2, f'{var.code} = {self.env.default(var.type)}')
+            elif not var.code.startswith('fb.'):
+                value = self._initial(var) if var.constant else self.env.default(var.type)
+                self.emit(1, f'{var.code} = {value}')
+        if self.ret_type is not None:
+            self.emit(1, f'_ret = {self.env.default(self.ret_type)}')
+
+    def return_stmt(self) -> str:
+        if self.fb:
+            return 'return'
+        outs = ', '.join(f'{v.name.upper()!r}: {v.code}' for v in self.vars.values()
+                         if v.section in ('VAR_OUTPUT', 'VAR_IN_OUT'))
+        ret = '_ret' if self.ret_type is not None else 'None'
+        return f'return {ret}, {{{outs}}}'
+
+    def _case_ids(self) -> List[int]:
+        ids = set()
+        for node in walk(self.block):
+            if isinstance(node, Case) and isinstance(node.selector, Name) \
+                    and node.selector.name.upper() == 'CASEID':
+                for labels, _ in node.branches:
+                    for label in labels:
+                        if isinstance(label, Range) and isinstance(label.lo, Literal) \
+                                and isinstance(label.hi, Literal):
+                            ids.update(range(label.lo.value, label.hi.value + 1))
+                        elif isinstance(label, Literal) and isinstance(label.value, int):
+                            ids.add(label.value)
+        return sorted(ids)
+
+    # --- оператори ---
+    def emit_body(self, stmts: list, indent: int):
+        start = len(self.lines)
+        for stmt in stmts:
+            self.statement(stmt, indent)
+        if len(self.lines) == start:
+            self.emit(indent, 'pass')
+
+    def statement(self, stmt, indent: int):
+        self.line = stmt.line
+        if isinstance(stmt, Assign):
+            target, ttype = self.lvalue(stmt.target)
+            value, vtype = self.expr(stmt.value)
+            self.flush_pending(indent)
+            self.emit(indent, f'{target} = {self.coerce(value, vtype, ttype)}')
+        elif isinstance(stmt, CallStmt):
+            self.call(stmt.call)  # результат вбудованої функції без присвоєння відкидається
+            self.flush_pending(indent)
+        elif isinstance(stmt, If):
+            self.emit_if(stmt.branches, stmt.else_body, indent)
+        elif isinstance(stmt, Case):
+            self.emit_case(stmt, indent)
+        elif isinstance(stmt, For):
+            self.emit_for(stmt, indent)
+        elif isinstance(stmt, While):
+            cond, _ = self.expr(stmt.cond)
+            if self.pending:
+                self.emit(indent, 'while True:')
+                self.flush_pending(indent + 1)
+                self.emit(indent + 1, f'if not {cond}:')
+                self.emit(indent + 2, 'break')
+            else:
+                self.emit(indent, f'while {cond}:')
+            self.loop_body(stmt.body, indent + 1)
+        elif isinstance(stmt, Repeat):
+            self.emit(indent, 'while True:')
+            self.loop_body(stmt.body, indent + 1)
+            self.line = stmt.cond.line
+            cond, _ = self.expr(stmt.cond)
+            self.flush_pending(indent + 1)
+            self.emit(indent + 1, f'if {cond}:')
+            self.emit(indent + 2, 'break')
+        elif isinstance(stmt, Jump):
+            if stmt.kind == 'RETURN':
+                self.emit(indent, self.return_stmt())
+            elif not self.loops:
+                self.fail(f"{stmt.kind} поза циклом")
+            else:
+                self.emit(indent, 'break' if stmt.kind == 'EXIT' else 'continue')
+        elif isinstance(stmt, Region):
+            for sub in stmt.body:
+                self.statement(sub, indent)
+        else:
+            self.fail(f"оператор {type(stmt).__name__} не підтримується")
+
+    def loop_body(self, body: list, indent: int):
+        self.loops += 1
+        self.emit_body(body, indent)
+        self.loops -= 1
+
+    def emit_if(self, branches: list, else_body: list, indent: int):
+        for i, (cond, body) in enumerate(branches):
+            self.line = cond.line
+            code, _ = self.expr(cond)
+            if i == 0:
+                self.flush_pending(indent)
+                self.emit(indent, f'if {code}:')
+            elif not self.pending:
+                self.emit(indent, f'elif {code}:')
+            else:
+                # виклик FC в умові ELSIF — лише якщо попередні умови хибні
+                self.pending = []
+                self.emit(indent, 'else:')
+                self.emit_if(branches[i:], else_body, indent + 1)
+                return
+            self.emit_body(body, indent + 1)
+        if else_body:
+            self.emit(indent, 'else:')
+            self.emit_body(else_body, indent + 1)
+
+    def emit_case(self, stmt: Case, indent: int):
+        selector, _ = self.expr(stmt.selector)
+        self.flush_pending(indent)
+        var = self.tmp('s')
+        self.emit(indent, f'{var} = {selector}')
+        for i, (labels, body) in enumerate(stmt.branches):
+            tests = []
+            for label in labels:
+                if isinstance(label, Range):
+                    lo, _ = self.expr(label.lo)
+                    hi, _ = self.expr(label.hi)
+                    tests.append(f'{lo} <= {var} <= {hi}')
+                else:
+                    tests.append(f'{var} == {self.expr(label)[0]}')
+            if self.pending:
+                self.fail("виклик у мітці CASE")
+            self.emit(indent, f'{"if" if i == 0 else "elif"} {" or ".join(tests)}:')
+            self.emit_body(body, indent + 1)
+        if stmt.else_body:
+            if stmt.branches:
+                self.emit(indent, 'else:')
+                self.emit_body(stmt.else_body, indent + 1)
+            else:
+                self.emit_body(stmt.else_body, indent)
+
+    def emit_for(self, stmt: For, indent: int):
+        var, vtype = self.lvalue(stmt.var)
+        start, _ = self.expr(stmt.start)
+        end, _ = self.expr(stmt.end)
+        step = '1'
+        if stmt.step is not None:
+            step, _ = self.expr(stmt.step)
+        self.flush_pending(indent)
+        if _INT_LITERAL_RE.match(step):
+            if int(step) == 0:
+                self.fail("FOR з кроком 0")
+            stop = f'{end} + 1' if int(step) > 0 else f'{end} - 1'
+            if _INT_LITERAL_RE.match(end):
+                stop = str(int(end) + (1 if int(step) > 0 else -1))
+            rng = f'range({start}, {stop})' if step == '1' else f'range({start}, {stop}, {step})'
+        else:
+            tmp = self.tmp('step')
+            self.emit(indent, f'{tmp} = {step}')
+            rng = f'range({start}, {end} + (1 if {tmp} > 0 else -1), {tmp})'
+        self.emit(indent, f'for {var} in {rng}:')
+        self.loop_body(stmt.body, indent + 1)
+
+    # --- вирази ---
+    def lvalue(self, node):
+        if isinstance(node, Name):
+            var = self.vars.get(node.name.upper())
+            if var is not None:
+                if var.constant:
+                    self.fail(f"присвоєння константі {var.name}")
+                return var.code, var.type
+            if self.ret_type is not None and node.name.upper() == self.block.name.upper():
+                return '_ret', self.ret_type
+            if node.scope in ('global', 'plain') and node.name in self.env.dbs:
+                self.fail(f"присвоєння DB \"{node.name}\" цілком не підтримується")
+            self.fail(f"невідома змінна {node.name}")
+        if isinstance(node, (Member, Index)):
+            code, type_ = self.expr(node)
+            if code.startswith('K_'):
+                self.fail(f"присвоєння константі {node.field}")
+            return code, type_
+        self.fail("очікувалась змінна")
+
+    def expr(self, node):
+        """Вираз -> (код Python, тип)"""
+        if isinstance(node, Literal):
+            return self.literal(node)
+        if isinstance(node, Name):
+            return self.name(node)
+        if isinstance(node, Member):
+            return self.member(node)
+        if isinstance(node, Index):
+            base, btype = self.expr(node.base)
+            if not (isinstance(btype, tuple) and btype[0] == 'ARRAY'):
+                self.fail(f"індексація не масиву {node.base!r}")
+            if len(node.indices) != 1:
+                self.fail("багатовимірні масиви не підтримуються")
+            index, _ = self.expr(node.indices[0])
+            lo, hi = btype[1], btype[2]
+            if _INT_LITERAL_RE.match(index):
+                value = int(index)
+                if not lo <= value <= hi:
+                    self.fail(f"індекс {value} поза межами [{lo}..{hi}]")
+                return f'{base}[{value - lo}]', btype[3]
+            return f'{base}[_ix({index}, {lo}, {hi - lo + 1})]', btype[3]
+        if isinstance(node, Call):
+            return self.call(node)
+        if isinstance(node, UnOp):
+            operand, otype = self.expr(node.operand)
+            if node.op == 'NOT':
+                if otype == 'BOOL':
+                    return f'(not {operand})', 'BOOL'
+                if otype in INT_TYPES:
+                    return f'_c_{otype}(~{operand})', otype
+                return f'_not({operand})', otype
+            if node.op == '-':
+                return f'(-{operand})', otype if otype in REAL_TYPES else ANY_INT
+            return operand, otype
+        if isinstance(node, BinOp):
+            return self.binop(node)
+        self.fail(f"вираз {type(node).__name__} не підтримується")
+
+    def literal(self, node: Literal):
+        text = node.text
+        upper = text.upper()
+        if upper.startswith(("T#", "TIME#")):
+            return str(time_literal_ms(text)), 'TIME'
+        if text.startswith("'"):
+            return repr(text[1:-1].replace("$'", "'").replace('$$', '$')), 'STRING'
+        value = literal_value(text)
+        if value is None:
+            self.fail(f"літерал {text} не підтримується")
+        if isinstance(value, bool):
+            return ('True' if value else 'False'), 'BOOL'
+        if isinstance(value, float):
+            return repr(value), 'REAL'
+        prefix = upper.split('#', 1)[0] if '#' in upper and not upper[0].isdigit() else None
+        if prefix in INT_TYPES:
+            return str(wrap_int(value, prefix)), prefix
+        if prefix in REAL_TYPES:
+            return repr(float(value)), prefix
+        return str(value), ANY_INT
+
+    def name(self, node: Name):
+        key = node.name.upper()
+        if node.scope == 'absolute':
+            self.fail(f"абсолютна адреса {node.name} не підтримується")
+        if node.scope in ('local', 'plain'):
+            var = self.vars.get(key)
+            if var is not None:
+                return var.code, var.type
+            if self.ret_type is not None and key == self.block.name.upper():
+                return '_ret', self.ret_type
+            if node.scope == 'local':
+                self.fail(f"невідома змінна #{node.name}")
+        if node.name in self.env.dbs:
+            self.result.dbs.add(node.name)
+            return f'D_{_ident(node.name)}', ('DB', node.name)
+        return self.constant(node.name)
+
+    def constant(self, name: str):
+        self.result.constants.add(name)
+        return f'K_{_ident(name)}', ANY_INT
+
+    def member(self, node: Member):
+        base = node.base
+        if isinstance(base, Name) and base.scope == 'global' and base.name in CONST_NAMESPACES \
+                and base.name not in self.env.dbs:
+            return self.constant(node.field)
+        code, btype = self.expr(base)
+        if isinstance(btype, tuple) and btype[0] == 'FB':
+            return f'{code}.{_attr(node.field)}', ANY
+        fields = self.env.fields(btype)
+        if fields is None:
+            self.fail(f"доступ до поля {node.field} не структури")
+        field = fields.get(node.field.upper())
+        if field is None:
+            owner = btype[1] if isinstance(btype, tuple) else btype if isinstance(btype, str) else 'STRUCT'
+            self.fail(f"{owner} не має поля {node.field}")
+        return f'{code}.{_attr(field.name)}', field.type
+
+    def binop(self, node: BinOp):
+        left, ltype = self.expr(node.left)
+        right, rtype = self.expr(node.right)
+        op = node.op
+        if op in _COMPARE:
+            return f'({left} {_COMPARE[op]} {right})', 'BOOL'
+        if op in _BITWISE:
+            if ltype == 'BOOL' and rtype == 'BOOL':
+                return f'({left} {_BITWISE[op]} {right})', 'BOOL'
+            return f'({left} {_BITWISE[op]} {right})', ANY_INT if 'BOOL' not in (ltype, rtype) else ANY
+        real = ltype in REAL_TYPES or rtype in REAL_TYPES
+        rtype_out = (ltype if ltype in REAL_TYPES else rtype) if real else ANY_INT
+        if op in _ARITH:
+            return f'({left} {_ARITH[op]} {right})', rtype_out
+        if op == '/':
+            return (f'({left} / {right})' if real else f'_div({left}, {right})'), rtype_out
+        if op == 'MOD':
+            return f'_mod({left}, {right})', ANY_INT
+        self.fail(f"оператор {op} не підтримується")
+
+    def coerce(self, code: str, src, dst) -> str:
+        """Значення після присвоєння змінній типу dst"""
+        if dst == 'BOOL':
+            return code if src == 'BOOL' else f'bool({code})'
+        if dst in INT_TYPES:
+            if src == dst:
+                return code
+            if _INT_LITERAL_RE.match(code):
+                return str(wrap_int(int(code), dst))
+            if src in REAL_TYPES:
+                return f'_c_{dst}(_round({code}))'
+            return f'_c_{dst}({code})'
+        if dst in REAL_TYPES:
+            return code if src in REAL_TYPES else f'float({code})'
+        if self.env.is_elementary(dst):
+            return code
+        return f'_cp({code})'
+
+    # --- виклики ---
+    def call(self, call: Call):
+        upper = call.name.upper()
+        if call.scope != 'global':
+            var = self.vars.get(upper)
+            if var is not None and isinstance(var.type, tuple) and var.type[0] == 'FB':
+                return self.instance_call(call, var.code, var.type[1])
+            builtin = self.builtin(call, upper)
+            if builtin is not None:
+                return builtin
+        if call.scope == 'instance':
+            code, type_ = self.expr(call.target)
+            if isinstance(type_, tuple) and type_[0] == 'FB':
+                return self.instance_call(call, code, type_[1])
+            self.fail(f"виклик екземпляра {call.name} не підтримується")
+        self.result.calls.add(call.name)
+        name = _ident(call.name)
+        ret, outs = self.tmp('r'), self.tmp('o')
+        args = []
+        writeback = []
+        for param, op, arg in call.args:
+            if param is None:
+                self.fail(f"виклик {call.name}: параметри без імен не підтримуються")
+            if op == '=>':
+                target, ttype = self.lvalue(arg)
+                writeback.append(f'{target} = {self.coerce(f"{outs}[{param.upper()!r}]", ANY, ttype)}')
+                continue
+            code, type_ = self.expr(arg)
+            args.append(f'v_{param.upper()}={code}')
+            if isinstance(arg, (Name, Member, Index)) and self.env.is_elementary(type_) \
+                    and code.startswith(('v_', 'fb.', 'D_')):
+                key = repr(param.upper())
+                writeback.append(f'if {key} in {outs}: {code} = '
+                                 f'{self.coerce(f"{outs}[{key}]", ANY, type_)}')
+        self.pending.append(f'{ret}, {outs} = B_{name}({", ".join(args)})')
+        self.pending.extend(writeback)
+        return ret, ANY
+
+    def instance_call(self, call: Call, code: str, fb: str):
+        """Виклик мультиекземпляра: code — вираз екземпляра (змінна або елемент масиву)"""
+        self.result.calls.add(fb)
+        inst = self.tmp('i')
+        self.pending.append(f'{inst} = {code}')
+        after = []
+        for param, op, arg in call.args:
+            if param is None:
+                self.fail(f"виклик {call.name}: параметри без імен не підтримуються")
+            if op == '=>':
+                target, ttype = self.lvalue(arg)
+                after.append(f'{target} = {self.coerce(f"{inst}.{_attr(param)}", ANY, ttype)}')
+            else:
+                value, _ = self.expr(arg)
+                self.pending.append(f'{inst}.{_attr(param)} = {value}')
+        self.pending.append(f'B_{_ident(fb)}({inst})')
+        self.pending.extend(after)
+        return 'None', ANY
+
+    def _args(self, call: Call, names: tuple) -> List[str]:
+        named = {p.upper(): a for p, _, a in call.args if p is not None}
+        positional = [a for p, _, a in call.args if p is None]
+        values = []
+        for i, name in enumerate(names):
+            arg = named.get(name, positional[i] if i < len(positional) else None)
+            if arg is None:
+                self.fail(f"{call.name}: бракує параметра {name}")
+            values.append(self.expr(arg))
+        return values
+
+    def builtin(self, call: Call, upper: str):
+        if upper == 'TIME_TCK':
+            return '_clock.now', 'DINT'
+        m = _CONVERSION_RE.match(upper)
+        if m and (m.group(1) in INT_TYPES or m.group(1) in REAL_TYPES or m.group(1) == 'BOOL'):
+            (code, src), = self._args(call, ('IN',))
+            return self.coerce(code, src, m.group(2)), m.group(2)
+        if upper in ('ABS', 'TRUNC', 'ROUND'):
+            (code, src), = self._args(call, ('IN',))
+            if upper == 'ABS':
+                return f'abs({code})', src if src in REAL_TYPES else ANY_INT
+            return (f'int({code})' if upper == 'TRUNC' else f'_round({code})'), 'DINT'
+        if upper in ('MIN', 'MAX'):
+            names = tuple(f'IN{i + 1}' for i in range(len(call.args)))
+            values = self._args(call, names)
+            return f'{upper.lower()}({", ".join(c for c, _ in values)})', values[0][1]
+        if upper == 'LIMIT':
+            (mn, _), (value, vtype), (mx, _) = self._args(call, ('MN', 'IN', 'MX'))
+            return f'min(max({value}, {mn}), {mx})', vtype
+        if upper == 'SEL':
+            (g, _), (in0, t0), (in1, _) = self._args(call, ('G', 'IN0', 'IN1'))
+            return f'({in1} if {g} else {in0})', t0
+        if upper in ('SHL', 'SHR'):
+            (value, vtype), (n, _) = self._args(call, ('IN', 'N'))
+            code = f'({value} << {n})' if upper == 'SHL' else f'({value} >> {n})'
+            return (self.coerce(code, ANY, vtype) if vtype in INT_TYPES else code), vtype
+        return None
+
+
+def compile_source(text: str, file: str, env: TypeEnv) -> List[CompiledBlock]:
+    """Усі FUNCTION / FUNCTION_BLOCK тексту; помилка блока — у CompiledBlock.error"""
+    try:
+        blocks = parse_source(text, file)
+    except SclSyntaxError as e:
+        failed = CompiledBlock(f'<{file}>', 'FILE', file, 0)
+        failed.error = str(e)
+        return [failed]
+    compiled = []
+    for block in blocks:
+        if block.kind == 'ORGANIZATION_BLOCK':
+            continue
+        try:
+            compiled.append(BlockCompiler(block, env).compile())
+        except SclRunnerError as e:
+            failed = CompiledBlock(block.name, block.kind, file, block.line)
+            failed.error = str(e)
+            compiled.append(failed)
+    return compiled
+
+
+# ============================================================================
+# Набір тестів
+# ============================================================================
+class CaseResult:
+    __slots__ = ('case', 'status', 'passed', 'failed', 'fail_mask', 'error')
+
+    def __init__(self, case: int, status: str, passed: bool = False, failed: bool = False,
+                 fail_mask: int = 0, error: str = ''):
+        self.case = case
+        self.status = status      # passed / failed / skipped / error
+        self.passed = passed
+        self.failed = failed
+        self.fail_mask = fail_mask
+        self.error = error
+
+    def to_dict(self) -> dict:
+        return {'case': self.case, 'status': self.status, 'passed': self.passed,
+                'failed': self.failed, 'fail_mask': self.fail_mask, 'error': self.error}
+
+
+class SclTestSuite:
+    """Скомпільовані блоки каталогів + запуск FB_Test_* по всіх CaseId"""
+
+    def __init__(self, directories=None, constants_path=None, use_cache: bool = True,
+                 tck_start: int = 0):
+        if directories is None:
+            directories = [REPO_DIR, Path(__file__).resolve().parent / 'generated']
+        self.directories = [Path(d) for d in directories if Path(d).is_dir()]
+        if not self.directories:
+            raise ValueError("❌ Жодного каталогу з *.scl")
+        self.constants_path = Path(constants_path) if constants_path else DEFAULT_CONSTANTS
+        self.use_cache = use_cache
+        self.cache_path = self.directories[0] / CACHE_DIR_NAME / RUNNER_CACHE_NAME
+        self.clock = VirtualClock(tck_start)
+        self.tck_start = self.clock.now
+        self.compiled = 0
+        self.cached = 0
+        self.env = TypeEnv(self.directories)
+        self.blocks: Dict[str, CompiledBlock] = {}
+        cache = self._read_cache() if use_cache else {}
+        self._fresh = {'files': {}}
+        self._load_blocks(cache)
+        self.constants = self._load_constants(cache)
+        if use_cache and (self.compiled or self._fresh.get('constants') != cache.get('constants')
+                          or set(self._fresh['files']) != set(cache.get('files', {}))):
+            self._write_cache()
+        self.ns = self._link()
+
+    # --- кеш ---
+    def _cache_key(self) -> str:
+        return f"{RUNNER_VERSION}:{sys.implementation.cache_tag}:{self.env.digest}"
+
+    def _read_cache(self) -> dict:
+        try:
+            with open(self.cache_path, 'rb') as f:
+                data = pickle.load(f)
+        except Exception:
+            return {}  # відсутній/битий кеш — компілюємо
+        if not isinstance(data, dict) or data.get('key') != self._cache_key():
+            return {}
+        return data
+
+    def _write_cache(self):
+        try:
+            self.cache_path.parent.mkdir(exist_ok=True)
+            tmp = self.cache_path.with_suffix('.tmp')
+            with open(tmp, 'wb') as f:
+                pickle.dump(dict(self._fresh, key=self._cache_key()), f,
+                            protocol=pickle.HIGHEST_PROTOCOL)
+            tmp.replace(self.cache_path)
+        except OSError:
+            pass  # каталог лише для читання — працюємо без кешу
+
+    def _cached_compile(self, cache: dict, key: str, file: str, digest: str,
+                        text_fn) -> List[CompiledBlock]:
+        """Блоки файлу з кешу (key — повний шлях: однакові імена у різних каталогах)"""
+        record = cache.get('files', {}).get(key)
+        if record is not None and record[0] == digest:
+            self.cached += 1
+            blocks = [CompiledBlock.from_state(state) for state in record[1]]
+        else:
+            blocks = compile_source(text_fn(), file, self.env)
+            self.compiled += 1
+        self._fresh['files'][key] = (digest, [block.state() for block in blocks])
+        return blocks
+
+    def _load_blocks(self, cache: dict):
+        for directory in self.directories:
+            for path in sorted(directory.glob('*.scl')):
+                if path.name.startswith(('UDT_', 'DB_')):
+                    continue
+                read = partial(path.read_text, encoding='utf-8-sig')
+                blocks = self._cached_compile(cache, str(path.resolve()), path.name,
+                                              file_sha256(path), read)
+                for block in blocks:
+                    self.blocks[block.name] = block
+        missing = [name for name in GENERATED_BLOCKS if name not in self.blocks]
+        if missing:
+            digest = file_sha256(GENERATOR_SOURCE)
+            for name in missing:
+                for block in self._cached_compile(cache, f'generator:{name}', f'{name}.scl',
+                                                  digest, partial(generated_block_source, name)):
+                    self.blocks[block.name] = block
+
+    def _load_constants(self, cache: dict) -> dict:
+        if not self.constants_path.exists():
+            raise ValueError(f"❌ Файл констант не знайдено: {self.constants_path}")
+        digest = file_sha256(self.constants_path)
+        record = cache.get('constants')
+        if record is not None and record[0] == digest:
+            constants = record[1]
+        else:
+            constants = dict(load_constants(self.constants_path))
+        self._fresh['constants'] = (digest, constants)
+        return constants
+
+    # --- зв'язування ---
+    def _link(self) -> dict:
+        ns = _runtime_namespace(self.clock)
+        exec(compile(self.env.source(), '<scl:types>', 'exec'), ns)
+        for name, value in self.constants.items():
+            ns[f'K_{_ident(name)}'] = value
+        for block in self.blocks.values():
+            if block.error is None:
+                exec(marshal.loads(block.code), ns)
+        return ns
+
+    def closure(self, name: str) -> List[CompiledBlock]:
+        """Блок і всі, які він викликає (транзитивно); ValueError — якщо чогось бракує"""
+        order = []
+        seen = set()
+        stack = [name]
+        while stack:
+            current = stack.pop()
+            if current in seen:
+                continue
+            seen.add(current)
+            block = self.blocks.get(current)
+            if block is None:
+                raise ValueError(f"❌ Блок {current} не знайдено")
+            if block.error:
+                raise ValueError(block.error)
+            order.append(block)
+            stack.extend(sorted(block.calls))
+        for block in order:
+            for const in sorted(block.constants):
+                if const not in self.constants:
+                    raise ValueError(f"❌ {block.file}: {const} — немає ні DB, ні константи "
+                                     f"у {self.constants_path.name}")
+        return order
+
+    def tests(self) -> List[str]:
+        return sorted(name for name, block in self.blocks.items()
+                      if name.startswith(TEST_PREFIX) and block.kind == 'FUNCTION_BLOCK')
+
+    def _check_interface(self, block: CompiledBlock):
+        for name in TEST_INPUTS:
+            if block.interface.get(name) != 'VAR_INPUT':
+                raise ValueError(f"❌ {block.name}: немає VAR_INPUT {name}")
+        for name in TEST_OUTPUTS:
+            if block.interface.get(name) != 'VAR_OUTPUT':
+                raise ValueError(f"❌ {block.name}: немає VAR_OUTPUT {name}")
+
+    def run_test(self, name: str, cases: Optional[List[int]] = None) -> dict:
+        """Усі кейси одного FB_Test_*: {'block', 'cases': [CaseResult], 'error'}"""
+        try:
+            blocks = self.closure(name)
+            self._check_interface(blocks[0])
+        except ValueError as e:
+            return {'block': name, 'cases': [], 'error': str(e)}
+        test = blocks[0]
+        dbs = sorted({db for block in blocks for db in block.dbs})
+        fn = self.ns[f'B_{_ident(name)}']
+        make = self.ns[f'I_{_ident(name)}']
+        results = [self.run_case(fn, make, dbs, case)
+                   for case in (test.cases if cases is None else cases)]
+        return {'block': name, 'cases': results, 'error': None}
+
+    def run_case(self, fn, make, dbs: List[str], case: int) -> CaseResult:
+        ns = self.ns
+        for db in dbs:
+            ns[f'D_{_ident(db)}'] = ns[f'T_{_ident(db)}']()
+        self.clock.now = self.tck_start
+        fb = make()
+        fb.Run = True
+        fb.CaseId = case
+        try:
+            fn(fb)
+        except Exception as e:  # помилка виконання SCL (індекс, ділення на 0 ...) — результат кейса
+            return CaseResult(case, 'error', error=f"{type(e).__name__}: {e} ({self._where(e)})")
+        if fb.Failed or fb.FailMask:
+            status = 'failed'
+        elif fb.Passed:
+            status = 'passed'
+        else:
+            status = 'skipped'
+        return CaseResult(case, status, fb.Passed, fb.Failed, fb.FailMask)
+
+    def _where(self, exc: Exception) -> str:
+        """Рядок SCL, де виникла помилка (найглибший кадр скомпільованого блока)"""
+        where = '?'
+        tb = exc.__traceback__
+        while tb is not None:
+            filename = tb.tb_frame.f_code.co_filename
+            if filename.startswith('<scl:') and filename != '<scl:types>':
+                block = self.blocks.get(filename[5:-1])
+                if block is not None:
+                    where = f"{block.file}:{block.scl_line(tb.tb_lineno)}"
+            tb = tb.tb_next
+        return where
+
+    def run(self, names: Optional[List[str]] = None, cases: Optional[List[int]] = None) -> List[dict]:
+        return [self.run_test(name, cases) for name in (names or self.tests())]
+
+
+def generated_block_source(name: str) -> str:
+    """Текст блока, який створює generate_plc_config (без книги: усі слоти щоцикла)"""
+    from generate_plc_config import PLCCodeGenerator
+    return getattr(PLCCodeGenerator('', deterministic=True), GENERATED_BLOCKS[name])()
+
+
+# ============================================================================
+# Звіт
+# ============================================================================
+def format_mask(mask: int) -> str:
+    return f"16#{mask:04X}" if mask <= 0xFFFF else f"16#{mask:08X}"
+
+
+_STATUS_ICONS = {'passed': '✅', 'failed': '❌', 'skipped': '⏭️ ', 'error': '💥'}
+
+
+def print_results(results: List[dict], failed_only: bool = False):
+    for result in results:
+        cases = result['cases']
+        print(f"\n🧪 {result['block']} ({len(cases)} кейсів)")
+        if result['error']:
+            print(f"   💥 {result['error']}")
+            continue
+        print(f"   {'CaseId':>6}  {'Passed':<6}  {'Failed':<6}  FailMask")
+        for r in cases:
+            if failed_only and r.status in ('passed', 'skipped'):
+                continue
+            line = (f"{_STATUS_ICONS[r.status]} {r.case:>5}  {str(r.passed).upper():<6}  "
+                    f"{str(r.failed).upper():<6}  {format_mask(r.fail_mask)}")
+            if r.fail_mask:
+                bits = [str(b) for b in range(32) if r.fail_mask >> b & 1]
+                line += f"  (біти {', '.join(bits)})"
+            if r.error:
+                line += f"  {r.error}"
+            print(line)
+        counts = {s: sum(1 for r in cases if r.status == s) for s in _STATUS_ICONS}
+        print(f"   ✅ {counts['passed']}  ❌ {counts['failed']}  💥 {counts['error']}"
+              f"  ⏭️  {counts['skipped']}")
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Офлайн-запуск FB_Test_* (SCL -> Python)")
+    parser.add_argument('dirs', nargs='*', default=None,
+                        help="Каталоги *.scl (за замовчуванням: корінь репозиторію та db_gen/generated)")
+    parser.add_argument('--block', action='append', default=None, metavar='NAME',
+                        help="Лише цей FB_Test_* (можна кілька)")
+    parser.add_argument('--case', action='append', type=int, default=None, metavar='N',
+                        help="Лише цей CaseId (можна кілька)")
+    parser.add_argument('--constants', default=None, metavar='PATH',
+                        help="Constant.xlsx (за замовчуванням — у корені репозиторію)")
+    parser.add_argument('--tck', type=int, default=0, metavar='MS',
+                        help="Значення TIME_TCK() під час кейса (за замовчуванням 0)")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Компілювати все заново (без .plc_cache/scl_runner.pickle)")
+    parser.add_argument('--failed-only', action='store_true',
+                        help="Друкувати лише провалені кейси та помилки")
+    parser.add_argument('--show-python', default=None, metavar='BLOCK',
+                        help="Надрукувати транспільований Python блока і вийти")
+    parser.add_argument('--report', default=None, metavar='PATH', help="JSON-звіт")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    started = time.perf_counter()
+    try:
+        suite = SclTestSuite(args.dirs or None, args.constants, use_cache=not args.no_cache,
+                             tck_start=args.tck)
+    except ValueError as e:
+        print(e)
+        return 2
+    if args.show_python:
+        block = suite.blocks.get(args.show_python)
+        if block is None:
+            print(f"❌ Блок {args.show_python} не знайдено")
+            return 2
+        print(block.error or block.source)
+        return 0
+    results = suite.run(args.block, args.case)
+    print_results(results, args.failed_only)
+
+    total = sum(len(r['cases']) for r in results)
+    bad = sum(1 for r in results for c in r['cases'] if c.status in ('failed', 'error'))
+    broken = sum(1 for r in results if r['error'])
+    print(f"\n⏱️  {total} кейсів у {len(results)} тестах за "
+          f"{(time.perf_counter() - started) * 1000:.0f} мс "
+          f"(скомпільовано файлів: {suite.compiled}, з кешу: {suite.cached})")
+    if args.report:
+        import json
+        report = [{'block': r['block'], 'error': r['error'],
+                   'cases': [c.to_dict() for c in r['cases']]} for r in results]
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"💾 Звіт: {args.report}")
+    return 1 if bad or broken else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Дельта таблиці тегів між збірками (інкрементальний імпорт у TIA Portal)
+
+Кожна збірка зберігає знімок тегів (.tags_snapshot.json) з ідентичністю
+кожного тега — (аркуш, Slot, сигнал). Порівняння з попереднім знімком:
+- перейменовані — та сама ідентичність, інше ім'я (змістився TypedIdx)
+- змінені — те саме ім'я (після перейменування) з іншою адресою/коментарем
+- додані / видалені — решта
+
+Порядок імпорту дельти в TIA Portal:
+1. видалити теги з PLC_Tags_Removed.*
+2. перейменувати за PLC_Tags_Renames.csv (по кроках; цикли розірвано тимчасовими іменами)
+3. імпортувати PLC_Tags_Added.* та PLC_Tags_Changed.*
+
+Використання:
+    python tag_delta.py old/.tags_snapshot.json new/.tags_snapshot.json
+"""
+
+import io
+import csv
+import sys
+import json
+import argparse
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from tag_export import TAG_COLUMNS, TAG_FILE_NAMES, render_tags
+
+SNAPSHOT_VERSION = 1
+TAGS_SNAPSHOT_NAME = '.tags_snapshot.json'
+DELTA_TABLES = ('Added', 'Changed', 'Removed')
+RENAMES_NAME = 'PLC_Tags_Renames.csv'
+TEMP_SUFFIX = '__ren'
+
+Identity = Tuple[str, int, str]   # (аркуш, Slot, сигнал)
+
+
+def delta_file_name(table: str, fmt: str) -> str:
+    """('Added', 'xlsx') -> 'PLC_Tags_Added.xlsx'"""
+    stem, _, ext = TAG_FILE_NAMES[fmt].rpartition('.')
+    return f"{stem}_{table}.{ext}"
+
+
+class TagDelta:
+    """Різниця двох списків тегів"""
+
+    __slots__ = ('added', 'changed', 'removed', 'renames')
+
+    def __init__(self):
+        self.added: List[dict] = []
+        self.changed: List[Tuple[dict, dict]] = []     # (старий, новий)
+        self.removed: List[dict] = []
+        self.renames: Dict[str, str] = {}              # старе ім'я -> нове
+
+    @property
+    def is_empty(self) -> bool:
+        return not (self.added or self.changed or self.removed or self.renames)
+
+    def rename_steps(self) -> List[Tuple[str, str]]:
+        """Кроки перейменування в безпечному порядку
+
+        Ціль кроку не може бути іменем, яке ще не перейменоване (A->B, B->C:
+        спочатку B->C). Цикли (A->B, B->A) розриваються тимчасовим іменем.
+        """
+        pending = dict(self.renames)
+        steps = []
+        while pending:
+            ready = [old for old, new in pending.items() if new not in pending]
+            if ready:
+                for old in sorted(ready):
+                    steps.append((old, pending.pop(old)))
+                continue
+            old = min(pending)                  # цикл: old -> тимчасове ім'я
+            temp = old + TEMP_SUFFIX
+            steps.append((old, temp))
+            pending[temp] = pending.pop(old)
+        return steps
+
+    def summary(self) -> Dict[str, int]:
+        return {'added': len(self.added), 'changed': len(self.changed),
+                'removed': len(self.removed), 'renamed': len(self.renames)}
+
+
+def _differs(old: dict, new: dict) -> bool:
+    return any(old.get(c, '') != new.get(c, '') for c in TAG_COLUMNS if c != 'Name')
+
+
+def diff_tags(old_tags: Iterable[dict], new_tags: Iterable[dict],
+              old_ids: Dict[str, Identity], new_ids: Dict[str, Identity]) -> TagDelta:
+    """Порівняти теги: спершу за ідентичністю (перейменування), потім за іменем"""
+    old = {t['Name']: t for t in old_tags}
+    new = {t['Name']: t for t in new_tags}
+    delta = TagDelta()
+
+    old_by_id = {old_ids[name]: name for name in old if name in old_ids}
+    matched_old, matched_new = set(), set()
+    for name, tag in new.items():
+        ident = new_ids.get(name)
+        previous = old_by_id.get(ident) if ident is not None else None
+        if previous is None:
+            continue
+        matched_old.add(previous)
+        matched_new.add(name)
+        if previous != name:
+            delta.renames[previous] = name
+        if _differs(old[previous], tag):
+            delta.changed.append((old[previous], tag))
+
+    # без ідентичності (або механізм перемістився в інший слот) — за іменем
+    for name, tag in new.items():
+        if name in matched_new:
+            continue
+        if name in old and name not in matched_old:
+            matched_old.add(name)
+            if _differs(old[name], tag):
+                delta.changed.append((old[name], tag))
+        else:
+            delta.added.append(tag)
+    delta.removed = [tag for name, tag in old.items() if name not in matched_old]
+    return delta
+
+
+# ============================================================================
+# Знімок і файли дельти
+# ============================================================================
+def snapshot_data(tags: Iterable[dict], identities: Dict[str, Identity]) -> dict:
+    return {
+        'version': SNAPSHOT_VERSION,
+        'tags': [dict({c: t.get(c, '') for c in TAG_COLUMNS},
+                      Identity=list(identities[t['Name']]) if t['Name'] in identities else None)
+                 for t in tags],
+    }
+
+
+def load_snapshot(path) -> Optional[Tuple[List[dict], Dict[str, Identity]]]:
+    """(теги, ідентичності) зі знімка; None, якщо знімка немає або він іншої версії"""
+    try:
+        data = json.loads(Path(path).read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict) or data.get('version') != SNAPSHOT_VERSION:
+        return None
+    tags, identities = [], {}
+    for entry in data['tags']:
+        ident = entry.pop('Identity', None)
+        if ident:
+            identities[entry['Name']] = tuple(ident)
+        tags.append(entry)
+    return tags, identities
+
+
+def render_renames(delta: TagDelta) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\r\n')
+    writer.writerow(['Step', 'OldName', 'NewName'])
+    for step, (old, new) in enumerate(delta.rename_steps(), 1):
+        writer.writerow([step, old, new])
+    return ('\ufeff' + buffer.getvalue()).encode('utf-8')
+
+
+def write_delta(delta: TagDelta, output_dir: Path, formats: Iterable[str]) -> List[str]:
+    """Записати таблиці дельти (застарілі файли дельти видаляються); повертає імена файлів"""
+    output_dir = Path(output_dir)
+    formats = list(formats)
+    tables = {
+        'Added': delta.added,
+        'Changed': [new for _, new in delta.changed],
+        'Removed': delta.removed,
+    }
+    written = []
+    for table in DELTA_TABLES:
+        for fmt in TAG_FILE_NAMES:
+            path = output_dir / delta_file_name(table, fmt)
+            if fmt in formats and tables[table]:
+                path.write_bytes(render_tags(tables[table], fmt))
+                written.append(path.name)
+            elif path.exists():
+                path.unlink()
+    renames_path = output_dir / RENAMES_NAME
+    if delta.renames:
+        renames_path.write_bytes(render_renames(delta))
+        written.append(RENAMES_NAME)
+    elif renames_path.exists():
+        renames_path.unlink()
+    return written
+
+
+def print_delta(delta: TagDelta, limit: int = 10):
+    s = delta.summary()
+    print(f"🔀 Дельта тегів: +{s['added']} ~{s['changed']} -{s['removed']}, "
+          f"перейменовано {s['renamed']}")
+    for old, new in delta.rename_steps()[:limit]:
+        print(f"   ↪ {old} -> {new}")
+    for old, new in delta.changed[:limit]:
+        fields = [c for c in TAG_COLUMNS if c != 'Name' and old.get(c, '') != new.get(c, '')]
+        print(f"   ~ {new['Name']}: {', '.join(fields)}")
+    for tag in delta.added[:limit]:
+        print(f"   + {tag['Name']} ({tag['Logical Address']})")
+    for tag in delta.removed[:limit]:
+        print(f"   - {tag['Name']} ({tag['Logical Address']})")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Дельта тегів між двома знімками .tags_snapshot.json")
+    parser.add_argument('old')
+    parser.add_argument('new')
+    parser.add_argument('--limit', type=int, default=50)
+    args = parser.parse_args(argv)
+    loaded = [load_snapshot(args.old), load_snapshot(args.new)]
+    for path, data in zip((args.old, args.new), loaded):
+        if data is None:
+            print(f"❌ Не вдалося прочитати знімок тегів: {path}")
+            return 2
+    (old_tags, old_ids), (new_tags, new_ids) = loaded
+    delta = diff_tags(old_tags, new_tags, old_ids, new_ids)
+    print_delta(delta, args.limit)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
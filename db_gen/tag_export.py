@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Потоковий експорт таблиці тегів PLC (TIA Portal) без pandas
+
+Теги споживаються з ітератора (PLCCodeGenerator.iter_tags) рядок за рядком:
+- xlsx — openpyxl write-only (аркуші 'PLC Tags' + 'TagTable Properties',
+  ті самі колонки, що й імпорт PLC Tags у TIA Portal)
+- xml  — TIA Openness SW.Tags.PlcTagTable (імпорт через Openness /
+  TIA Add-In), без табличного рушія
+- csv  — ті самі колонки, UTF-8 з BOM (Excel відкриває кирилицю коректно)
+
+Пам'ять не залежить від кількості тегів (крім буфера результату).
+"""
+
+import io
+import csv
+from typing import BinaryIO, Dict, Iterable
+from xml.sax.saxutils import escape
+
+TAG_COLUMNS = ('Name', 'Path', 'Data Type', 'Logical Address', 'Comment',
+               'Hmi Visible', 'Hmi Accessible', 'Hmi Writeable', 'Typeobject ID', 'Version ID')
+TAG_TABLE = 'IO_tags'
+TAG_TABLE_PROPERTIES = {'Path': TAG_TABLE, 'BelongsToUnit': '', 'Accessibility': ''}
+
+TAG_FORMATS = ('xlsx', 'xml', 'csv')
+TAG_FILE_NAMES = {fmt: f"PLC_Tags.{fmt}" for fmt in TAG_FORMATS}
+
+XML_ENGINEERING_VERSION = 'V17'
+XML_CULTURE = 'uk-UA'
+
+
+def write_tags_xlsx(tags: Iterable[Dict[str, object]], stream: BinaryIO) -> int:
+    """Таблиця тегів у .xlsx (write-only: рядки не тримаються в пам'яті); повертає кількість тегів"""
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet('PLC Tags')
+    ws.append(TAG_COLUMNS)
+    count = 0
+    for tag in tags:
+        ws.append([None if tag.get(c, '') == '' else tag[c] for c in TAG_COLUMNS])
+        count += 1
+    props = wb.create_sheet('TagTable Properties')
+    props.append(list(TAG_TABLE_PROPERTIES))
+    props.append([v or None for v in TAG_TABLE_PROPERTIES.values()])
+    wb.save(stream)
+    return count
+
+
+def _csv_value(value) -> str:
+    if isinstance(value, bool):
+        return 'TRUE' if value else 'FALSE'
+    return '' if value is None else str(value)
+
+
+def write_tags_csv(tags: Iterable[Dict[str, object]], stream: BinaryIO) -> int:
+    """Таблиця тегів у CSV (UTF-8 з BOM, розділювач ',')"""
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='', write_through=True)
+    writer = csv.writer(text, lineterminator='\r\n')
+    writer.writerow(TAG_COLUMNS)
+    count = 0
+    for tag in tags:
+        writer.writerow([_csv_value(tag.get(c, '')) for c in TAG_COLUMNS])
+        count += 1
+    text.detach()   # потік лишається відкритим для викликача
+    return count
+
+
+def _xml_bool(value) -> str:
+    return 'true' if value is True or str(value).upper() == 'TRUE' else 'false'
+
+
+def write_tags_xml(tags: Iterable[Dict[str, object]], stream: BinaryIO, table: str = TAG_TABLE,
+                   version: str = XML_ENGINEERING_VERSION, culture: str = XML_CULTURE) -> int:
+    """Таблиця тегів у форматі TIA Openness (SW.Tags.PlcTagTable)"""
+    ids = iter(range(1, 1 << 31))
+
+    def next_id() -> str:
+        return format(next(ids), 'X')   # TIA нумерує ID у шістнадцятковому вигляді
+
+    def w(text: str):
+        stream.write(text.encode('utf-8'))
+
+    w('<?xml version="1.0" encoding="utf-8"?>\n<Document>\n')
+    w(f'  <Engineering version="{escape(version)}" />\n')
+    w('  <SW.Tags.PlcTagTable ID="0">\n')
+    w(f'    <AttributeList>\n      <Name>{escape(table)}</Name>\n    </AttributeList>\n')
+    w('    <ObjectList>\n')
+    count = 0
+    for tag in tags:
+        w(f'      <SW.Tags.PlcTag ID="{next_id()}" CompositionName="Tags">\n'
+          '        <AttributeList>\n'
+          f'          <DataTypeName>{escape(str(tag["Data Type"]))}</DataTypeName>\n'
+          f'          <ExternalAccessible>{_xml_bool(tag.get("Hmi Accessible"))}</ExternalAccessible>\n'
+          f'          <ExternalVisible>{_xml_bool(tag.get("Hmi Visible"))}</ExternalVisible>\n'
+          f'          <ExternalWritable>{_xml_bool(tag.get("Hmi Writeable"))}</ExternalWritable>\n'
+          f'          <LogicalAddress>{escape(str(tag["Logical Address"]))}</LogicalAddress>\n'
+          f'          <Name>{escape(str(tag["Name"]))}</Name>\n'
+          '        </AttributeList>\n')
+        if tag.get('Comment'):
+            w('        <ObjectList>\n'
+              f'          <MultilingualText ID="{next_id()}" CompositionName="Comment">\n'
+              '            <ObjectList>\n'
+              f'              <MultilingualTextItem ID="{next_id()}" CompositionName="Items">\n'
+              '                <AttributeList>\n'
+              f'                  <Culture>{escape(culture)}</Culture>\n'
+              f'                  <Text>{escape(str(tag["Comment"]))}</Text>\n'
+              '                </AttributeList>\n'
+              '              </MultilingualTextItem>\n'
+              '            </ObjectList>\n'
+              '          </MultilingualText>\n'
+              '        </ObjectList>\n')
+        w('      </SW.Tags.PlcTag>\n')
+        count += 1
+    w('    </ObjectList>\n  </SW.Tags.PlcTagTable>\n</Document>\n')
+    return count
+
+
+TAG_WRITERS = {
+    'xlsx': write_tags_xlsx,
+    'xml': write_tags_xml,
+    'csv': write_tags_csv,
+}
+
+
+def render_tags(tags: Iterable[Dict[str, object]], fmt: str) -> bytes:
+    """Вміст файлу тегів заданого формату"""
+    if fmt not in TAG_WRITERS:
+        raise ValueError(f"❌ Невідомий формат таблиці тегів: {fmt}")
+    buffer = io.BytesIO()
+    TAG_WRITERS[fmt](tags, buffer)
+    return buffer.getvalue()
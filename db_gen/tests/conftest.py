@@ -0,0 +1,11 @@
+# -*- coding: utf-8 -*-
+"""Спільне для тестів db_gen: модулі генератора імпортуються як з каталогу db_gen"""
+
+import sys
+from pathlib import Path
+
+DB_GEN = Path(__file__).resolve().parent.parent
+REPO = DB_GEN.parent
+CONFIG_XLSX = DB_GEN / 'elevator_config.xlsx'
+
+sys.path.insert(0, str(DB_GEN))
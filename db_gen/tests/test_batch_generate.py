@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-
+"""Пакетна генерація: вихідні дерева конфігурацій не вкладаються одне в одне"""
+
+from pathlib import Path
+
+from batch_generate import main, plan_outputs
+
+
+def test_configs_in_one_directory_get_sibling_outputs(tmp_path):
+    configs = [tmp_path / 'plc1' / 'elevator_config.xlsx',
+               tmp_path / 'plc2' / 'elevator_config.xlsx',
+               tmp_path / 'plc2' / 'elevator_config_line3.xlsx']
+    plan = plan_outputs(configs, Path('out'))
+
+    assert plan[configs[0]] == Path('out/plc1')
+    assert plan[configs[1]] == Path('out/plc2/elevator_config')
+    assert plan[configs[2]] == Path('out/plc2/elevator_config_line3')
+
+
+def test_tags_baseline_rejected_for_many_configs(tmp_path):
+    for name in ('elevator_config.xlsx', 'elevator_config_line3.xlsx'):
+        (tmp_path / name).write_bytes(b'')
+    assert main([str(tmp_path), '-o', str(tmp_path / 'out'), '--tags-baseline', 'tags.json']) == 2
+    assert not (tmp_path / 'out').exists()
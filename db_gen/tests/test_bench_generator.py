@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""Бенчмарк генератора: синтетичні книги, прогін набору, порівняння з базовою лінією"""
+
+import random
+
+import pytest
+
+from bench_generator import (BENCH_VERSION, LAYOUTS, compare_baseline, plan_slots, run_suite,
+                             synthesize_workbook)
+from generate_plc_config import PLCCodeGenerator
+from mech_types import MECH_SHEETS
+
+
+@pytest.mark.parametrize('layout', LAYOUTS)
+def test_plan_slots_unique_and_covers_all_types(layout):
+    for total in (4, 64, 256):
+        plan = plan_slots(total, layout, random.Random(1))
+        slots = [slot for _, slot in plan]
+        assert len(plan) == total
+        assert len(set(slots)) == total
+        assert all(0 <= slot < PLCCodeGenerator.MECHS_SLOTS for slot in slots)
+        assert {sheet for sheet, _ in plan} == set(MECH_SHEETS)
+
+
+def test_plan_slots_rejects_bad_input():
+    with pytest.raises(ValueError):
+        plan_slots(257, 'blocks', random.Random(1))
+    with pytest.raises(ValueError):
+        plan_slots(16, 'diagonal', random.Random(1))
+
+
+def test_synthetic_workbook_passes_validation(tmp_path):
+    excel = synthesize_workbook(tmp_path / 'elevator_config.xlsx', 64, 'sparse', seed=2)
+    gen = PLCCodeGenerator(str(excel), deterministic=True, use_cache=False)
+    gen.load_excel()
+    gen.validate_excel()
+
+    assert sum(len(mechs) for mechs in gen.sheets.values()) == 64
+    assert len(gen.routes) == 12
+
+
+def test_suite_reports_every_stage():
+    results = run_suite(sizes=[16], layouts=['blocks'], repeat=1, plcs=0)
+    stages = results['cases']['blocks_16']
+
+    for stage in ('load_excel', 'load_excel_cached', 'run_mechanism_pass',
+                  'generate_fc_hal_read', 'write_plc_tags_xlsx'):
+        assert stages[stage]['min_ms'] >= 0
+    assert results['version'] == BENCH_VERSION
+
+
+def test_baseline_comparison_ignores_noise():
+    def result(ms):
+        return {'version': BENCH_VERSION, 'cases': {'blocks_16': {
+            'load_excel': {'min_ms': ms[0]}, 'validate_excel': {'min_ms': ms[1]}}}}
+
+    regressions, improvements = compare_baseline(result([20.0, 0.2]), result([10.0, 0.1]),
+                                                 tolerance=0.2, min_delta_ms=1.0)
+    assert [r.split(':')[0] for r in regressions] == ['blocks_16/load_excel']
+    assert improvements == []
+
+    regressions, improvements = compare_baseline(result([5.0, 0.1]), result([10.0, 0.1]))
+    assert regressions == [] and len(improvements) == 1
+
+    with pytest.raises(ValueError):
+        compare_baseline(result([1.0, 1.0]), {'version': BENCH_VERSION + 1})
@@ -0,0 +1,17 @@
+# -*- coding: utf-8 -*-
+"""Ущільнення TypedIdx: нумерація за порядком рядків аркуша"""
+
+from conftest import CONFIG_XLSX
+from generate_plc_config import PLCCodeGenerator
+
+
+def test_compact_follows_sheet_order():
+    gen = PLCCodeGenerator(str(CONFIG_XLSX), deterministic=True, use_cache=False)
+    gen.load_excel()
+    first, second = gen.sheets['REDLERS'][:2]
+    first['TypedIdx'], second['TypedIdx'] = 7, 3
+
+    gen.compact_typed_idx()
+
+    assert (first['TypedIdx'], second['TypedIdx']) == (0, 1)
+    assert gen.typed_idx_map['REDLERS'] == {7: 0, 3: 1}
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""Завантажувач без pandas: знімок у .plc_cache, інвалідація за SHA-256 книги"""
+
+import shutil
+
+import pytest
+from openpyxl import load_workbook
+
+from config_loader import load_config, parse_slot_list, snapshot_path
+from conftest import CONFIG_XLSX
+
+
+def _copy_config(tmp_path):
+    path = tmp_path / 'elevator_config.xlsx'
+    shutil.copy(CONFIG_XLSX, path)
+    return path
+
+
+def test_snapshot_reused_until_workbook_changes(tmp_path):
+    path = _copy_config(tmp_path)
+
+    first = load_config(path)
+    assert not first.from_cache
+    assert snapshot_path(path).exists()
+
+    second = load_config(path)
+    assert second.from_cache
+    assert second.sheets == first.sheets
+    assert second.routes == first.routes
+
+    wb = load_workbook(path)
+    wb['REDLERS']['C2'] = 'Редлер_нова_назва'
+    wb.save(path)
+
+    third = load_config(path)
+    assert not third.from_cache
+    assert third.sheets['REDLERS'][0]['Name'] == 'Редлер_нова_назва'
+
+
+def test_records_normalized_like_dataframe_rows(tmp_path):
+    path = _copy_config(tmp_path)
+    wb = load_workbook(path)
+    ws = wb['REDLERS']
+    ws.append([9, 1.0, 'Вимкнений', '', False, '', '', '', ''])
+    ws.append([10, '2', 'Без сигналів', None, True])
+    wb.save(path)
+
+    redlers = load_config(path, use_cache=False).sheets['REDLERS']
+
+    assert [r['Name'] for r in redlers] == ['Редлер_1', 'Редлер_2', 'Без сигналів']
+    extra = redlers[-1]
+    assert (extra['Slot'], extra['TypedIdx'], extra['Location']) == (10, 2, '')
+    assert extra.get('DI_Speed') == '' and extra['DO_Run'] == ''
+
+
+def test_slot_list_formats():
+    assert parse_slot_list('0, 50, 100') == (0, 50, 100)
+    assert parse_slot_list('0..3; 7') == (0, 1, 2, 3, 7)
+    assert parse_slot_list(5.0) == (5,)
+    assert parse_slot_list('') == ()
+    with pytest.raises(ValueError):
+        parse_slot_list('3..1')
+    with pytest.raises(ValueError):
+        parse_slot_list('A1')
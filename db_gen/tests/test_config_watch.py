@@ -0,0 +1,16 @@
+# -*- coding: utf-8 -*-
+"""Режим --watch: помилка першої збірки не зупиняє сесію"""
+
+from config_watch import WatchSession
+from conftest import CONFIG_XLSX
+from generate_plc_config import PLCCodeGenerator
+
+
+def test_first_build_generation_error_is_reported(tmp_path, capsys):
+    gen = PLCCodeGenerator(str(CONFIG_XLSX), deterministic=True,
+                           use_cache=False, cycle_budget_ms=0.001)
+    session = WatchSession(gen, str(tmp_path))
+
+    assert session.start() is False
+    assert session.builds == 0
+    assert '❌ Помилка генерації' in capsys.readouterr().out
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""Діагностика циклу: інструментований Main, FC_CycleDiagUpdate, аналіз знімка DB_CycleDiag"""
+
+import json
+
+import pytest
+
+from conftest import CONFIG_XLSX, REPO
+from cycle_diag import (BODY, BUCKET_EDGES_US, PERIOD, CycleReport, instrument_main, load_layout,
+                        main, read_snapshot, stat_entries)
+from generate_plc_config import PLCCodeGenerator
+from scl_runner import SclTestSuite
+
+MAIN = '''ORGANIZATION_BLOCK "Main"
+VERSION : 0.1
+BEGIN
+    REGION Inputs
+        "FC_Read"();
+    END_REGION
+    "FC_Run"(Count := 3,
+             Enable := TRUE);
+    IF "DB_X".On THEN
+        "FC_Read"();
+    END_IF;
+    "FC_Read"();
+END_ORGANIZATION_BLOCK
+'''
+
+
+def _generate(tmp_path):
+    gen = PLCCodeGenerator(str(CONFIG_XLSX), deterministic=True, use_cache=False, cycle_diag=True)
+    gen.load_excel()
+    gen.generate_all(tmp_path)
+    return tmp_path
+
+
+def test_instrument_top_level_calls_only():
+    text, entries = instrument_main(MAIN)
+
+    assert entries == ['FC_Read', 'FC_Run', 'FC_Read_2']        # виклик в IF не вимірюється
+    assert text.count('"FC_CycleDiagUpdate"(') == len(entries) + 2   # + Period, Body
+    lines = text.splitlines()
+    run_end = lines.index('             Enable := TRUE);')
+    assert lines[run_end + 1].strip() == '#CD_Sec := RUNTIME(#CD_Mem);'
+    assert 'CD_BodyMem : LReal;' in text
+    with pytest.raises(ValueError):
+        instrument_main(MAIN.replace('ORGANIZATION_BLOCK', 'FUNCTION_BLOCK'))
+
+
+def test_update_fc_statistics_and_reset(tmp_path):
+    suite = SclTestSuite([REPO, _generate(tmp_path)], use_cache=False)
+    ns = suite.ns
+    db = ns['D_DB_CycleDiag'] = ns['T_DB_CycleDiag']()
+    db.BucketEdgeUs = list(BUCKET_EDGES_US)      # початкові значення DB runner не переносить
+    update = ns['B_FC_CycleDiagUpdate']
+
+    for us in (300.0, 700.0, 25000.0):
+        update(v_US=us, v_RESET=False, v_STAT=db.Body)
+    stat = db.Body
+    assert (stat.LastUs, stat.MinUs, stat.MaxUs, stat.AvgUs, stat.Count) == (25000, 300, 25000, 8667, 3)
+    assert stat.Hist == [0, 1, 1, 0, 0, 0, 0, 0, 1]
+
+    update(v_US=100.0, v_RESET=True, v_STAT=db.Body)
+    assert (stat.Count, stat.MinUs, stat.MaxUs) == (1, 100, 100)
+    assert stat.Hist == [1] + [0] * len(BUCKET_EDGES_US)
+
+
+def _snapshot(layout, path, period_hist, call_avg_us):
+    image = layout.new_image()
+    for k, edge in enumerate(BUCKET_EDGES_US):
+        layout.set(image, f'BucketEdgeUs[{k}]', edge)
+    for k, n in enumerate(period_hist):
+        layout.set(image, f'{PERIOD}.Hist[{k}]', n)
+    layout.set(image, f'{PERIOD}.Count', sum(period_hist))
+    layout.set(image, f'{PERIOD}.MaxUs', 30000)
+    layout.set(image, f'{BODY}.Count', sum(period_hist))
+    layout.set(image, f'{BODY}.AvgUs', 4000)
+    for name, avg in call_avg_us.items():
+        layout.set(image, f'{name}.Count', sum(period_hist))
+        layout.set(image, f'{name}.AvgUs', avg)
+    path.write_bytes(bytes(image))
+    return path
+
+
+def test_snapshot_report_budget_and_baseline(tmp_path, capsys):
+    scl_dir = _generate(tmp_path / 'gen')
+    layout = load_layout(scl_dir)
+    entries = stat_entries(layout)
+    assert entries == [PERIOD, BODY, 'FC_HAL_Read', 'FC_DeviceRunner', 'FC_HAL_Write']
+
+    # 100 сканів у кошику 5-10 мс -> p99 = 10 мс, у межах бюджету
+    ok = _snapshot(layout, tmp_path / 'v1.bin', [0, 0, 0, 0, 0, 100, 0, 0, 0],
+                   {'FC_HAL_Read': 500, 'FC_DeviceRunner': 2000, 'FC_HAL_Write': 500})
+    report = CycleReport(read_snapshot(ok, layout), entries, str(ok))
+    assert report.cycle.name == PERIOD
+    assert report.verdict()[0] == 'ok'
+    assert report.share(report.blocks['FC_DeviceRunner']) == pytest.approx(0.5)
+
+    baseline = tmp_path / 'v1.json'
+    assert main([str(ok), '--scl-dir', str(scl_dir), '--report', str(baseline)]) == 0
+    assert json.loads(baseline.read_text(encoding='utf-8'))['blocks']['FC_HAL_Read']['avg_ms'] == 0.5
+
+    # 2 скани з 100 понад 20 мс -> p99 за бюджетом; FC_DeviceRunner з'їв запас
+    over = _snapshot(layout, tmp_path / 'v2.bin', [0, 0, 0, 0, 0, 98, 0, 0, 2],
+                     {'FC_HAL_Read': 500, 'FC_DeviceRunner': 3500, 'FC_HAL_Write': 500})
+    capsys.readouterr()
+    assert main([str(over), '--scl-dir', str(scl_dir), '--baseline', str(baseline)]) == 1
+    out = capsys.readouterr().out
+    assert "найбільше запасу з'їв FC_DeviceRunner (+1.500 мс у середньому)" in out
+    assert '❌ p99 30.00 мс перевищує 20 мс' in out
+
+    assert main([str(tmp_path / 'v1.bin'), '--scl-dir', str(tmp_path)]) == 1   # немає SCL
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""Кампанія інжекції аварій: розклади, пакування, ізоляція кейсів у пакеті"""
+
+from fault_campaign import MOTOR_ARRAYS, aggregate, make_schedule, pack_batches, run_batch
+from vplc_mechs import SLOTS
+
+SEED = 1
+HORIZON_MS = 40000
+
+
+def _run(cases):
+    job = {'cases': cases, 'seed': SEED, 'horizon_ms': HORIZON_MS, 'repair_ms': 20000,
+           'cycle_ms': 10}
+    return {r['case']: r for r in run_batch(job)['results']}
+
+
+def test_schedule_is_deterministic_and_well_formed():
+    for case in range(50):
+        sched = make_schedule(case, SEED)
+        assert sched == make_schedule(case, SEED)
+        assert 1 <= len(sched['routes']) <= 3
+        assert set(sched['mechs']) <= set(MOTOR_ARRAYS)
+        for route in sched['routes']:
+            assert 2 <= len(route['slots']) <= 6
+            assert all(0 <= s < len(sched['mechs']) for s in route['slots'])
+    assert make_schedule(3, SEED) != make_schedule(3, SEED + 1)
+
+
+def test_batches_fit_one_plc_in_order():
+    schedules = [make_schedule(case, SEED) for case in range(200)]
+    batches = pack_batches(schedules)
+
+    assert all(sum(len(s['mechs']) for s in batch) <= SLOTS for batch in batches)
+    assert [s['case'] for batch in batches for s in batch] == list(range(200))
+
+
+def test_cases_isolated_within_batch():
+    packed = _run([0, 14, 3])
+
+    for case in (0, 14):
+        assert _run([case])[case] == packed[case]
+
+
+def test_fault_aborts_route_and_releases_owners():
+    result = _run([0, 14])
+    faulted = result[0]['routes'][1]
+    clean = result[14]['routes']
+
+    assert faulted['state'] == 'ROUTE_STS_ABORTED'
+    assert faulted['trigger'].startswith('trip:')
+    assert faulted['safe_stop_ms'] is not None and faulted['owned'] == []
+    assert all(r['state'] == 'ROUTE_STS_DONE' and r['trigger'] is None for r in clean)
+
+    report = aggregate(list(result.values()))
+    assert report['routes'] == len(result[0]['routes']) + len(clean)
+    assert report['abort_reasons'] == {'ROUTE_ABRT_BY_FAULT': 1}
+    assert report['owners_locked'] == 0 and report['stuck'] == 0
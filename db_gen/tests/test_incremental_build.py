@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+"""Інкрементальна збірка: артефакт перегенеровується при зміні своїх вхідних колонок"""
+
+from conftest import CONFIG_XLSX, DB_GEN
+import generate_plc_config
+from generate_plc_config import PLCCodeGenerator
+
+
+def _generator(**options) -> PLCCodeGenerator:
+    gen = PLCCodeGenerator(str(CONFIG_XLSX), deterministic=True, use_cache=False, **options)
+    gen.load_excel()
+    return gen
+
+
+def test_dense_runner_rebuilt_on_typed_idx_swap(tmp_path):
+    _generator(runner_layout='dense').generate_all(tmp_path)
+    before = (tmp_path / 'FC_DeviceRunner.scl').read_text(encoding='utf-8')
+
+    gen = _generator(runner_layout='dense')
+    first, second = gen.sheets['REDLERS'][:2]
+    first['TypedIdx'], second['TypedIdx'] = second['TypedIdx'], first['TypedIdx']
+    gen.generate_all(tmp_path)
+
+    assert gen.artifact_stats['FC_DeviceRunner.scl']['status'] == 'written'
+    after = (tmp_path / 'FC_DeviceRunner.scl').read_text(encoding='utf-8')
+    assert after != before
+    assert f'Redler[{second["TypedIdx"]}], B := Mechs[{second["Slot"]}])' in after
+
+
+def test_fingerprint_covers_writer_modules():
+    modules = {p.name for p in generate_plc_config._local_modules(DB_GEN / 'generate_plc_config.py')}
+    for name in ('tag_export.py', 'cycle_diag.py', 'udt_layout.py', 'route_index.py', 'mech_types.py'):
+        assert name in modules
+
+
+def test_artifacts_of_disabled_options_removed(tmp_path):
+    _generator(status_slots_per_cycle=32, tag_formats=('xlsx', 'csv')).generate_all(tmp_path)
+    assert (tmp_path / 'DB_ManualStatusRefresh.scl').exists()
+
+    gen = _generator()
+    gen.generate_all(tmp_path)
+
+    for name in ('DB_ManualStatusRefresh.scl', 'PLC_Tags.csv'):
+        assert not (tmp_path / name).exists()
+        assert gen.artifact_stats[name]['status'] == 'removed'
+    assert (tmp_path / 'PLC_Tags.xlsx').exists()
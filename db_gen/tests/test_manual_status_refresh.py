@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""FC_ManualStatusRefresh: вікно round-robin по змаплених слотах + слот MailBox щоцикла"""
+
+from conftest import CONFIG_XLSX, REPO
+from generate_plc_config import PLCCodeGenerator
+from scl_runner import SclTestSuite
+
+PER_CYCLE = 2
+
+
+def _suite(tmp_path):
+    gen = PLCCodeGenerator(str(CONFIG_XLSX), deterministic=True, use_cache=False,
+                           status_slots_per_cycle=PER_CYCLE)
+    gen.load_excel()
+    gen.generate_all(tmp_path)
+    suite = SclTestSuite([REPO, tmp_path], use_cache=False)
+    ns = suite.ns
+    for db in ('DB_Mechs', 'DB_PlcToScada_ManualMechStatus', 'DB_ManualStatusRefresh'):
+        ns[f'D_{db}'] = ns[f'T_{db}']()
+    # початкові значення DB runner не переносить — MappedSlots як у згенерованому DB
+    ns['D_DB_ManualStatusRefresh'].MappedSlots = list(gen._mapped_slots())
+    return suite, gen._mapped_slots()
+
+
+def _set_status(ns, value):
+    for mech in ns['D_DB_Mechs'].Mechs:
+        mech.Status = value
+
+
+def _refreshed(ns, value):
+    return [i for i, s in enumerate(ns['D_DB_PlcToScada_ManualMechStatus'].StatusBySlot)
+            if s.CurrentStatus == value]
+
+
+def test_round_robin_window_and_mailbox_slot(tmp_path):
+    suite, mapped = _suite(tmp_path)
+    ns = suite.ns
+    refresh = ns['B_FC_ManualStatusRefresh']
+
+    # перший цикл — повний прохід 0..255
+    _set_status(ns, 1)
+    refresh(v_LOCALMANUALGLOBAL=False, v_SLOT=300)
+    assert len(_refreshed(ns, 1)) == 256
+    assert ns['D_DB_ManualStatusRefresh'].Initialized
+
+    # далі — PER_CYCLE змаплених слотів по колу + слот з MailBox Req
+    _set_status(ns, 2)
+    refresh(v_LOCALMANUALGLOBAL=False, v_SLOT=200)
+    assert _refreshed(ns, 2) == sorted(mapped[:PER_CYCLE] + [200])
+
+    refresh(v_LOCALMANUALGLOBAL=False, v_SLOT=300)
+    assert _refreshed(ns, 2) == sorted(mapped[:2 * PER_CYCLE] + [200])
+
+    cycles = -(-len(mapped) // PER_CYCLE)
+    for _ in range(cycles - 2):
+        refresh(v_LOCALMANUALGLOBAL=False, v_SLOT=300)
+    assert _refreshed(ns, 2) == sorted(set(mapped) | {200})
+    assert ns['D_DB_ManualStatusRefresh'].Passes == 1
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""Пакетний HAL: біти групуються у BYTE/WORD образу процесу"""
+
+from conftest import CONFIG_XLSX
+from generate_plc_config import PLCCodeGenerator
+
+
+def _generator(hal_mode: str = 'packed') -> PLCCodeGenerator:
+    gen = PLCCodeGenerator(str(CONFIG_XLSX), deterministic=True, use_cache=False,
+                           hal_mode=hal_mode)
+    gen.load_excel()
+    return gen
+
+
+def test_adjacent_bytes_merge_into_word():
+    gen = _generator()
+    gen.sheets['FANS'][0]['DI_Breaker'] = '%I0.0'
+    gen.sheets['REDLERS'][0]['DI_Speed'] = '%I1.0'
+    gen.sheets['GATES'][0]['DI_Opened'] = '%I5.0'
+
+    plan = gen._hal_image_plan('DI_', 'I')
+    groups = {g['address']: g['type'] for g in plan['groups']}
+
+    assert groups['%IW0'] == 'WORD'
+    assert groups['%IB5'] == 'BYTE'
+    assert '%IB0' not in groups and '%IB1' not in groups
+    # %IWn: байт n — старший (%X8..15), байт n+1 — молодший (%X0..7)
+    assert plan['bits'][(0, 0)] == '#img_IW0.%X8'
+    assert plan['bits'][(1, 0)] == '#img_IW0.%X0'
+    assert plan['bits'][(5, 0)] == '#img_IB5.%X0'
+
+
+def test_hal_read_reads_each_group_once():
+    text = _generator().generate_fc_hal_read()
+
+    assert text.count('%IW0;') == 1
+    assert 'Redler[0].DI_Speed_OK    := #img_IW0.%X0;' in text
+    assert '"' not in text.split('BEGIN', 1)[1].replace('"UDT_', '')
+
+
+def test_partial_output_bytes_are_read_modify_write():
+    text = _generator().generate_fc_hal_write()
+    body = text.split('BEGIN', 1)[1]
+
+    read = body.index('#img_QB4 := %QB4;')
+    write = body.index('%QB4 := #img_QB4;')
+    assert read < body.index('#img_QB4.%X0 := Noria[0].DO_Run;') < write
+
+
+def test_unparsed_address_stays_symbolic():
+    gen = _generator()
+    gen.sheets['REDLERS'][0]['DI_Speed'] = 'DB10.DBX0.0'
+
+    stats = gen.hal_statement_stats()['FC_HAL_Read']
+    text = gen.generate_fc_hal_read()
+
+    assert stats['packed_image_accesses'] == stats['groups'] + 1
+    assert '#img_IW0.%X0' not in text
+    assert 'Redler[0].DI_Speed_OK    := "' in text
+
+
+def test_symbolic_mode_has_no_image_temps():
+    text = _generator('symbolic').generate_fc_hal_read()
+
+    assert 'VAR_TEMP' not in text
+    assert '%IW' not in text and '%IB' not in text
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""Індекс маршрутів: матриця конфліктів, preflight, перевірка аркуша ROUTES"""
+
+import pytest
+
+from route_index import RouteIndex, validate_routes
+
+ROUTES = {1: [0, 50, 100], 2: [1, 51, 101], 3: [150, 0], 4: [50, 101], 12: [200]}
+
+
+def test_conflict_matrix_is_symmetric():
+    index = RouteIndex(ROUTES)
+    matrix = index.matrix()
+
+    assert all(matrix[i][j] == matrix[j][i]
+               for i in range(len(matrix)) for j in range(len(matrix)))
+    for a in index.route_ids:
+        for b in index.route_ids:
+            assert index.can_run_concurrently(a, b) == index.can_run_concurrently(b, a)
+            assert ((index.conflicts[a] >> (b - 1)) & 1) == ((index.conflicts[b] >> (a - 1)) & 1)
+
+
+def test_conflicts_follow_shared_slots():
+    index = RouteIndex(ROUTES)
+
+    assert index.conflict_pairs() == [(1, 3, [0]), (1, 4, [50]), (2, 4, [101])]
+    assert index.routes_for_slot(0) == [1, 3]
+    assert not index.can_run_concurrently(1, 1)
+    assert index.can_run_concurrently(1, 2)
+    assert index.can_run_concurrently(12, 1)
+
+
+def test_preflight_reports_blocking_active_routes():
+    index = RouteIndex(ROUTES)
+
+    assert index.preflight(1, active=[2, 3, 4]) == [3, 4]
+    assert index.preflight(1, active_mask=0b10) == []
+    assert index.preflight(12, active=[1, 2, 3, 4]) == []
+
+
+def test_json_round_trip(tmp_path):
+    index = RouteIndex(ROUTES, {1: 'Силос 1'})
+    path = tmp_path / 'Route_Index.json'
+    path.write_text(index.to_json(), encoding='utf-8')
+
+    loaded = RouteIndex.from_json(path)
+
+    assert loaded.conflicts == index.conflicts
+    assert loaded.slot_routes == index.slot_routes
+    assert loaded.names[1] == 'Силос 1'
+
+
+def test_out_of_range_route_rejected():
+    with pytest.raises(ValueError):
+        RouteIndex({13: [0]})
+    with pytest.raises(ValueError):
+        RouteIndex({1: [256]})
+
+
+def test_validate_routes_errors():
+    routes = [
+        {'RouteId': 1, 'Name': 'A', 'Slots': (0, 50)},
+        {'RouteId': 1, 'Name': 'B', 'Slots': (0, 0)},
+        {'RouteId': 13, 'Name': 'C', 'Slots': (0,)},
+        {'RouteId': 2, 'Name': 'D', 'Slots': (7,)},
+    ]
+
+    errors = validate_routes(routes, mapped_slots=[0, 50])
+
+    assert len(errors) == 4
+    assert any('дублікат RouteId 1' in e for e in errors)
+    assert any('повтор слотів [0]' in e for e in errors)
+    assert any('RouteId має бути 1..12' in e for e in errors)
+    assert any('без увімкненого механізму [7]' in e for e in errors)
+    assert validate_routes(routes[:1], mapped_slots=[0, 50]) == []
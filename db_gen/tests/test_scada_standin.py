@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""SCADA-дублер: double buffer маршрутів, MailBox, облік комітів"""
+
+import asyncio
+
+from scada_standin import PlcService, Scada, commit_reached, percentiles, simulate
+from vplc_routes import RouteCmd
+
+
+def test_commit_reached_wraps_udint():
+    assert commit_reached(5, 5)
+    assert commit_reached(6, 5)
+    assert not commit_reached(4, 5)
+    assert commit_reached(1, 0xFFFFFFFF)
+    assert not commit_reached(0xFFFFFFFF, 1)
+
+
+def test_percentiles_nearest_rank():
+    stats = percentiles(list(range(1, 101)))
+    assert (stats['p50'], stats['p90'], stats['p99'], stats['max']) == (50, 90, 99, 100)
+    assert percentiles([])['count'] == 0
+
+
+def test_commit_writes_inactive_buffer_and_flips():
+    plc = PlcService()
+    scada = Scada(plc)
+    hdr = plc.route_cmd
+    keep = hdr.BUF0_Routes[1]
+    keep.RC_Cmd = plc.c.RT_CMD_START
+
+    commit = scada.commit_routes({1: RouteCmd(plc.c.RT_CMD_STOP_OP)})
+
+    assert (commit, hdr.HDR_Commit, hdr.HDR_ActiveBuf) == (1, 1, 1)
+    assert hdr.BUF1_Routes[0].RC_Cmd == plc.c.RT_CMD_STOP_OP
+    assert hdr.BUF1_Routes[1].RC_Cmd == plc.c.RT_CMD_START   # незмінені — з активного буфера
+    assert hdr.BUF0_Routes[0].RC_Cmd != plc.c.RT_CMD_STOP_OP  # активний буфер не чіпали
+
+    scada.commit_routes({})   # PLC ще не взяв коміт 1
+    assert scada.routes.overwritten == 1
+    plc.scan()
+    assert plc.route_status.ACK_CommitApplied == 2
+
+
+def test_route_and_mailbox_round_trip():
+    plc = PlcService(cycle_ms=10)
+    scada = Scada(plc, poll_ms=20)
+    c = plc.c
+    slot = plc.engine.bus.mapped(c)[0]
+    results = {}
+
+    async def client():
+        results['route'] = await scada.route_command(1, c.RT_CMD_NONE)
+        results['manual'] = await scada.manual_command(slot, c.CMD_START)
+        results['unmapped'] = await scada.manual_command(300, c.CMD_START)
+
+    async def run():
+        plc.spawn(client())
+        await plc.run(1000)
+
+    asyncio.run(run())
+
+    assert results == {'route': True, 'manual': True, 'unmapped': False}
+    assert scada.routes.latency_ms == [20]
+    assert scada.manual.rejects == {c.MAN_REJ_SLOT_UNMAPPED: 1}
+    assert plc.mailbox.Ack.RejectCode == c.MAN_REJ_SLOT_UNMAPPED
+
+
+def test_simulation_is_deterministic_and_accounts_every_commit():
+    for policy in ('wait', 'overwrite'):
+        first = simulate(2, 8, seconds=20, seed=3, mailbox_policy=policy, manual_think_ms=100)
+        again = simulate(2, 8, seconds=20, seed=3, mailbox_policy=policy, manual_think_ms=100)
+        assert first == again
+
+        manual = first['manual']
+        assert manual['timeouts'] == 0
+        assert manual['commits'] == (manual['acked'] + manual['overwritten'] + manual['ack_lost']
+                                     + manual['in_flight'])
+        assert (manual['overwritten'] > 0) == (policy == 'overwrite')
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""Індекс SCL: граф викликів, запис через параметри, невикористані поля, кеш"""
+
+from conftest import REPO
+from scl_index import SclIndex, normalize_query
+
+UDT = '''TYPE "UDT_T"
+VERSION : 0.1
+   STRUCT
+      A : BOOL;
+      B : INT;
+   END_STRUCT;
+END_TYPE
+
+TYPE "UDT_U"
+VERSION : 0.1
+   STRUCT
+      Used : INT;
+      Unused : INT;
+   END_STRUCT;
+END_TYPE
+'''
+
+DB = '''DATA_BLOCK "DB_X"
+{ S7_Optimized_Access := 'TRUE' }
+VERSION : 0.1
+NON_RETAIN
+   VAR
+      Items : ARRAY[0..3] OF "UDT_T";
+      Other : "UDT_U";
+   END_VAR
+BEGIN
+END_DATA_BLOCK
+'''
+
+FC_SET = '''FUNCTION "FC_Set" : VOID
+VAR_IN_OUT
+    M : "UDT_T";
+END_VAR
+BEGIN
+    IF M.B > 0 THEN
+        M.A := TRUE;
+    END_IF;
+END_FUNCTION
+'''
+
+FC_MAIN = '''FUNCTION "FC_Main" : VOID
+VAR_TEMP
+    i : INT;
+END_VAR
+BEGIN
+    FOR i := 0 TO "DB_X".Other.Used DO
+        "FC_Set"(M := "DB_X".Items[i]);
+    END_FOR;
+END_FUNCTION
+'''
+
+
+def _project(tmp_path):
+    for name, text in (('UDT_T.scl', UDT), ('DB_X.scl', DB), ('FC_Set.scl', FC_SET),
+                       ('FC_Main.scl', FC_MAIN)):
+        (tmp_path / name).write_text(text, encoding='utf-8')
+    return tmp_path
+
+
+def test_access_through_parameters(tmp_path):
+    index = SclIndex([_project(tmp_path)], use_cache=False)
+
+    assert index.callers('"FC_Set"') == [('FC_Main', 7)]
+    writers = index.writers('"DB_X".Items[slot].A')
+    assert [(block, path, via) for block, path, _, via in writers] == \
+        [('FC_Main', 'DB_X.Items[].A', 'FC_Set')]
+    assert [block for block, *_ in index.writers('M.A')] == ['FC_Set']
+    assert [block for block, *_ in index.readers('Items[].B')] == ['FC_Main']
+    # Items[i] передано цілком — усі поля UDT_T вважаються використаними
+    assert index.unused_fields() == [('UDT_U', 'Unused')]
+
+
+def test_unchanged_files_come_from_cache(tmp_path):
+    project = _project(tmp_path)
+    first = SclIndex([project])
+    assert (first.parsed, first.cached) == (4, 0)
+
+    (project / 'FC_Main.scl').write_text(FC_MAIN.replace('FOR i := 0', 'FOR i := 1'), encoding='utf-8')
+    second = SclIndex([project])
+
+    assert (second.parsed, second.cached) == (1, 3)
+    assert second.callers('FC_Set') == first.callers('FC_Set')
+
+
+def test_repo_arbiter_writes_reach_mechs_bus():
+    index = SclIndex([REPO], use_cache=False)
+
+    writers = {block for block, _, _, via in index.writers('"DB_Mechs".Mechs[i].OwnerCur')
+               if 'FC_ArbiterMech' in via}
+    assert 'FC_ManualMechCmdHandler' in writers
+    assert normalize_query('#M.OwnerCur') == 'M.OwnerCur'
@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+"""Офлайн-запуск FB_Test_*: репозиторій зелений, провал кейса -> ненульовий код виходу"""
+
+from conftest import CONFIG_XLSX, DB_GEN, REPO
+from generate_plc_config import PLCCodeGenerator
+from scl_runner import main
+
+
+def test_repo_tests_pass():
+    assert main([str(REPO), str(DB_GEN / 'generated'), '--no-cache', '--failed-only']) == 0
+
+
+def test_failed_case_exits_nonzero(tmp_path):
+    source = (REPO / 'FB_Test_ArbiterMech.scl').read_text(encoding='utf-8-sig')
+    broken = source.replace('Exp_CmdParam1 := 7;', 'Exp_CmdParam1 := 8;', 1)
+    assert broken != source
+    (tmp_path / 'FB_Test_ArbiterMech.scl').write_text(broken, encoding='utf-8')
+    dirs = [str(REPO), str(DB_GEN / 'generated'), str(tmp_path)]
+    assert main(dirs + ['--no-cache', '--block', 'FB_Test_ArbiterMech', '--failed-only']) == 1
+
+
+def test_generated_route_summary_test_passes(tmp_path, capsys):
+    gen = PLCCodeGenerator(str(CONFIG_XLSX), deterministic=True,
+                           use_cache=False, route_summary=True)
+    gen.load_excel()
+    gen.generate_all(tmp_path)
+    capsys.readouterr()
+    dirs = [str(REPO), str(tmp_path)]
+    assert main(dirs + ['--no-cache', '--block', 'FB_Test_RouteSummary']) == 0
+    assert '(7 кейсів)' in capsys.readouterr().out
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""Дельта тегів: додані / змінені / видалені / перейменовані, порядок перейменувань"""
+
+import csv
+import io
+
+from conftest import CONFIG_XLSX
+from generate_plc_config import PLCCodeGenerator
+from tag_delta import RENAMES_NAME, TEMP_SUFFIX, TagDelta, delta_file_name, diff_tags, load_snapshot
+
+
+def _tag(name: str, address: str, comment: str = '') -> dict:
+    return {'Name': name, 'Path': 'IO_tags', 'Data Type': 'Bool', 'Logical Address': address,
+            'Comment': comment}
+
+
+def test_diff_add_change_remove_rename():
+    old = [_tag('Redler_1_DI_Speed', '%I1.0'), _tag('Redler_2_DI_Speed', '%I1.3'),
+           _tag('Fan_1_DO_Run', '%Q1.0'), _tag('Spare_1', '%I9.0')]
+    new = [_tag('Redler_1_DI_Speed', '%I1.3'),            # слот 1 став Redler_1
+           _tag('Fan_1_DO_Run', '%Q1.0', 'новий коментар'),
+           _tag('Spare_1', '%I9.1'),                     # без ідентичності — за іменем
+           _tag('Noria_3_DO_Run', '%Q4.2')]
+    old_ids = {'Redler_1_DI_Speed': ('REDLERS', 0, 'DI_Speed'),
+               'Redler_2_DI_Speed': ('REDLERS', 1, 'DI_Speed'),
+               'Fan_1_DO_Run': ('FANS', 150, 'DO_Run')}
+    new_ids = {'Redler_1_DI_Speed': ('REDLERS', 1, 'DI_Speed'),
+               'Fan_1_DO_Run': ('FANS', 150, 'DO_Run'),
+               'Noria_3_DO_Run': ('NORIAS', 52, 'DO_Run')}
+
+    delta = diff_tags(old, new, old_ids, new_ids)
+
+    assert delta.renames == {'Redler_2_DI_Speed': 'Redler_1_DI_Speed'}
+    assert sorted(n['Name'] for _, n in delta.changed) == ['Fan_1_DO_Run', 'Spare_1']
+    assert [t['Name'] for t in delta.added] == ['Noria_3_DO_Run']
+    assert [t['Name'] for t in delta.removed] == ['Redler_1_DI_Speed']   # механізм слоту 0
+    assert delta.summary() == {'added': 1, 'changed': 2, 'removed': 1, 'renamed': 1}
+    assert diff_tags(new, new, new_ids, new_ids).is_empty
+
+
+def test_rename_steps_order_chains_and_break_cycles():
+    delta = TagDelta()
+    delta.renames = {'A': 'B', 'B': 'C', 'X': 'Y', 'Y': 'X'}
+
+    steps = delta.rename_steps()
+
+    assert steps.index(('B', 'C')) < steps.index(('A', 'B'))
+    assert ('X', 'X' + TEMP_SUFFIX) in steps
+    names = {'A', 'B', 'X', 'Y'}
+    for old, new in steps:        # жоден крок не створює дубль імені
+        assert new not in names
+        names.remove(old)
+        names.add(new)
+    assert names == {'B', 'C', 'X', 'Y'}
+
+
+def test_rebuild_writes_delta_tables(tmp_path, capsys):
+    def build(mutate=None):
+        gen = PLCCodeGenerator(str(CONFIG_XLSX), deterministic=True, use_cache=False,
+                               tag_formats=('csv',), tags_delta=True)
+        gen.load_excel()
+        if mutate:
+            mutate(gen)
+        gen.generate_all(tmp_path)
+
+    def mutate(gen):
+        first, second = gen.sheets['REDLERS'][:2]
+        first['TypedIdx'], second['TypedIdx'] = second['TypedIdx'], first['TypedIdx']
+        gen.sheets['NORIAS'][0]['DI_Speed'] = '%I7.7'
+
+    build()
+    assert '⚠️  Дельта тегів: немає знімка' in capsys.readouterr().out
+    build(mutate)
+
+    with open(tmp_path / RENAMES_NAME, encoding='utf-8-sig', newline='') as f:
+        steps = [(r['OldName'], r['NewName']) for r in csv.DictReader(f)]
+    assert len(steps) == 12                 # 4 сигнали двох редлерів, цикл через тимчасове ім'я
+    assert ('Redler_1_DO_Run', 'Redler_1_DO_Run' + TEMP_SUFFIX) in steps
+
+    changed = (tmp_path / delta_file_name('Changed', 'csv')).read_text(encoding='utf-8-sig')
+    rows = list(csv.reader(io.StringIO(changed)))
+    assert [(r[0], r[3]) for r in rows[1:]] == [('Noria_1_DI_Speed', '%I7.7')]
+    assert not (tmp_path / delta_file_name('Added', 'csv')).exists()
+    assert not (tmp_path / delta_file_name('Removed', 'csv')).exists()
+
+    tags, identities = load_snapshot(tmp_path / '.tags_snapshot.json')
+    assert identities['Redler_1_DI_Speed'] == ('REDLERS', 1, 'DI_Speed')
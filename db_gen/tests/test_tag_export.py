@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""Експорт тегів: xlsx / TIA Openness XML / CSV з одного потоку тегів"""
+
+import io
+import csv
+import xml.etree.ElementTree as ET
+
+import pytest
+from openpyxl import load_workbook
+
+from conftest import CONFIG_XLSX
+from generate_plc_config import PLCCodeGenerator
+from tag_export import TAG_COLUMNS, TAG_FILE_NAMES, render_tags
+
+
+def _tags():
+    yield {'Name': 'Redler_1_DI_Speed', 'Path': 'IO_tags', 'Data Type': 'Bool',
+           'Logical Address': '%I1.0', 'Comment': 'Редлер_1 & <швидкість>',
+           'Hmi Visible': True, 'Hmi Accessible': True, 'Hmi Writeable': False,
+           'Typeobject ID': '', 'Version ID': ''}
+    yield {'Name': 'Fan_1_DO_Run', 'Path': 'IO_tags', 'Data Type': 'Bool',
+           'Logical Address': '%Q1.0', 'Comment': '',
+           'Hmi Visible': True, 'Hmi Accessible': True, 'Hmi Writeable': True,
+           'Typeobject ID': '', 'Version ID': ''}
+
+
+def test_csv_columns_and_values():
+    data = render_tags(_tags(), 'csv')
+    assert data.startswith('\ufeff'.encode('utf-8'))
+
+    rows = list(csv.reader(io.StringIO(data.decode('utf-8-sig'))))
+    assert tuple(rows[0]) == TAG_COLUMNS
+    assert rows[1][:5] == ['Redler_1_DI_Speed', 'IO_tags', 'Bool', '%I1.0', 'Редлер_1 & <швидкість>']
+    assert rows[1][5:8] == ['TRUE', 'TRUE', 'FALSE']
+    assert len(rows) == 3
+
+
+def test_xml_is_openness_tag_table():
+    root = ET.fromstring(render_tags(_tags(), 'xml'))
+    table = root.find('SW.Tags.PlcTagTable')
+    tags = table.findall('ObjectList/SW.Tags.PlcTag')
+
+    assert table.find('AttributeList/Name').text == 'IO_tags'
+    assert [t.find('AttributeList/Name').text for t in tags] == ['Redler_1_DI_Speed', 'Fan_1_DO_Run']
+    assert tags[0].find('AttributeList/LogicalAddress').text == '%I1.0'
+    assert tags[0].find('AttributeList/ExternalWritable').text == 'false'
+    assert tags[0].find('.//MultilingualTextItem/AttributeList/Text').text == 'Редлер_1 & <швидкість>'
+    assert tags[1].find('ObjectList') is None   # без коментаря — без MultilingualText
+    ids = [e.get('ID') for e in root.iter() if e.get('ID') not in (None, '0')]
+    assert len(ids) == len(set(ids))
+
+
+def test_xlsx_matches_csv():
+    wb = load_workbook(io.BytesIO(render_tags(_tags(), 'xlsx')))
+    rows = [[cell if cell is not None else '' for cell in row]
+            for row in wb['PLC Tags'].iter_rows(values_only=True)]
+
+    assert tuple(rows[0]) == TAG_COLUMNS
+    assert [r[0] for r in rows[1:]] == ['Redler_1_DI_Speed', 'Fan_1_DO_Run']
+    assert wb['TagTable Properties']['A2'].value == 'IO_tags'
+
+
+def test_unknown_format_rejected():
+    with pytest.raises(ValueError):
+        render_tags(_tags(), 'json')
+
+
+def test_generated_formats_list_the_same_tags(tmp_path):
+    gen = PLCCodeGenerator(str(CONFIG_XLSX), deterministic=True, use_cache=False,
+                           tag_formats=('xlsx', 'xml', 'csv'))
+    gen.load_excel()
+    gen.generate_all(tmp_path)
+    expected = [tag['Name'] for tag in gen.iter_tags()]
+
+    csv_rows = list(csv.reader(io.StringIO(
+        (tmp_path / TAG_FILE_NAMES['csv']).read_text(encoding='utf-8-sig'))))
+    xml_root = ET.parse(tmp_path / TAG_FILE_NAMES['xml']).getroot()
+    wb = load_workbook(tmp_path / TAG_FILE_NAMES['xlsx'], read_only=True)
+
+    assert expected
+    assert [r[0] for r in csv_rows[1:]] == expected
+    assert [e.text for e in xml_root.iter('Name')][1:] == expected
+    assert [r[0] for r in wb['PLC Tags'].iter_rows(min_row=2, values_only=True)] == expected
+    wb.close()
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""Трейс VirtualPlc: відтворення іншою моделлю та помилки читання"""
+
+from pathlib import Path
+
+from vplc_core import load_constants
+from vplc_mechs import SimplePlant, VirtualPlc, soak
+from vplc_trace import TraceReader, TraceReplayer, TraceWriter, main
+
+
+def _record(path: Path, scans: int = 3000) -> Path:
+    plc = VirtualPlc.synthetic(8)
+    plc.make_healthy()
+    with TraceWriter(path, plc, chunk=256) as writer:
+        soak(plc, scans, plant=SimplePlant(plc), after_scan=writer.record)
+    return path
+
+
+def test_replay_with_changed_constants_diverges(tmp_path):
+    reader = TraceReader(_record(tmp_path / 'soak.vtrace'))
+    assert TraceReplayer(reader).run()['diverged_scans'] == 0
+
+    # засувка "не доїжджає" — FLT_GATE_MOVE_TIMEOUT
+    changed = load_constants().with_overrides(TimeoutMs_Gate_Move=10)
+    assert changed.TimeoutMs_Gate_Move == 10
+    assert load_constants().TimeoutMs_Gate_Move != 10
+    report = TraceReplayer(reader, constants=changed).run()
+    assert report['diverged_scans'] > 0
+    assert report['counts']['FLTCode'] > 0
+
+
+def test_missing_or_corrupt_trace_is_clean_error(tmp_path, capsys):
+    assert main(['replay', str(tmp_path / 'missing.vtrace')]) == 2
+
+    trace = _record(tmp_path / 'soak.vtrace', scans=600)
+    cut = tmp_path / 'cut.vtrace'
+    cut.write_bytes(trace.read_bytes()[:6000])
+    assert main(['replay', str(cut)]) == 2
+
+    garbage = tmp_path / 'garbage.vtrace'
+    garbage.write_bytes(b'VPLCTRC1' + (5).to_bytes(8, 'little') + (4).to_bytes(8, 'little') + b'{bad')
+    assert main(['info', str(garbage)]) == 2
+    assert capsys.readouterr().out.count('❌') == 3
+
+
+def test_replay_cli_set_overrides_constant(tmp_path, capsys):
+    trace = str(_record(tmp_path / 'soak.vtrace', scans=600))
+    assert main(['replay', trace]) == 0
+    assert main(['replay', trace, '--set', 'TimeoutMs_Gate_Move=10']) == 1
+    assert main(['replay', trace, '--set', 'NoSuchConstant=1']) == 2
+    assert 'NoSuchConstant' in capsys.readouterr().out
+
+
+def test_constants_item_assignment_updates_attribute():
+    c = load_constants().with_overrides()
+    c['TimeoutMs_Fan_Feedback'] = 1
+    assert c.TimeoutMs_Fan_Feedback == 1
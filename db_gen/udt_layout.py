@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Розмір UDT/DB у пам'яті PLC за визначеннями UDT_*.scl
+
+Розкладка — стандартний (не оптимізований) доступ S7:
+- BOOL займають по біту, сусідні BOOL пакуються в один байт
+- BYTE/CHAR/SINT/USINT — байтове вирівнювання
+- 2-, 4- та 8-байтові типи, STRUCT, UDT, ARRAY — з парної адреси
+- розмір STRUCT/UDT/ARRAY доповнюється до парного числа байтів
+
+Для оптимізованих блоків S7-1500 TIA сам переставляє поля, тому цифри
+тут — орієнтир (нижня межа для BOOL-полів).
+
+Використання:
+    python udt_layout.py ..              # розміри всіх UDT у каталозі
+    python udt_layout.py .. --slots 256  # + перевірка "RAM для 256 слотів"
+"""
+
+import re
+import sys
+import argparse
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# Розмір елементарних типів у байтах (BOOL — окремо, у бітах)
+ELEMENTARY_SIZES = {
+    'BYTE': 1, 'CHAR': 1, 'SINT': 1, 'USINT': 1,
+    'WORD': 2, 'INT': 2, 'UINT': 2, 'DATE': 2, 'S5TIME': 2, 'WCHAR': 2,
+    'DWORD': 4, 'DINT': 4, 'UDINT': 4, 'REAL': 4, 'TIME': 4,
+    'TOD': 4, 'TIME_OF_DAY': 4,
+    'LWORD': 8, 'LINT': 8, 'ULINT': 8, 'LREAL': 8, 'LTIME': 8, 'DT': 8, 'DATE_AND_TIME': 8,
+}
+
+_TYPE_RE = re.compile(r'^\s*TYPE\s+"([^"]+)"', re.IGNORECASE)
+_FIELD_RE = re.compile(r'^\s*([A-Za-z_]\w*)\s*:\s*(.+?)\s*;?\s*$')
+_ARRAY_RE = re.compile(r'^ARRAY\s*\[\s*(-?\d+)\s*\.\.\s*(-?\d+)\s*\]\s*OF\s+(.+)$', re.IGNORECASE)
+_STRING_RE = re.compile(r'^STRING\s*(?:\[\s*(\d+)\s*\])?$', re.IGNORECASE)
+
+
+class Field:
+    """Поле STRUCT/UDT: ім'я, тип (рядок, вкладена STRUCT або ARRAY) та розміщення"""
+
+    __slots__ = ('name', 'type', 'byte', 'bit', 'size_bits')
+
+    def __init__(self, name: str, type_):
+        self.name = name
+        self.type = type_    # str | list[Field] (вкладена STRUCT) | ('ARRAY', lo, hi, elem)
+        self.byte = 0        # зміщення у байтах
+        self.bit = 0         # номер біта (для BOOL)
+        self.size_bits = 0
+
+    def __repr__(self) -> str:
+        return f"Field({self.name!r}, {self.byte}.{self.bit}, {self.size_bits} bit)"
+
+
+def _strip_comment(line: str) -> str:
+    """Прибрати // коментар (лапки в іменах типів не містять //)"""
+    pos = line.find('//')
+    return line if pos < 0 else line[:pos]
+
+
+def _parse_type(text: str):
+    """'ARRAY[0..3] OF "UDT_X"' -> ('ARRAY', 0, 3, 'UDT_X'); '"UDT_X"' -> 'UDT_X'"""
+    text = text.strip()
+    m = _ARRAY_RE.match(text)
+    if m:
+        return ('ARRAY', int(m.group(1)), int(m.group(2)), _parse_type(m.group(3)))
+    return text.strip('"') if text.startswith('"') else text.upper()
+
+
+def parse_udt_source(text: str) -> Dict[str, List[Field]]:
+    """Розібрати TYPE ... STRUCT ... END_STRUCT END_TYPE (кілька типів у тексті)"""
+    types = {}
+    name = None
+    stack = []  # вкладені STRUCT: список полів поточного рівня
+    for raw in text.replace('\t', ' ').splitlines():
+        line = _strip_comment(raw).strip()
+        if not line:
+            continue
+        m = _TYPE_RE.match(line)
+        if m:
+            name = m.group(1)
+            stack = []
+            continue
+        if name is None or line.startswith('{'):
+            continue  # атрибути блоку { S7_Optimized_Access := ... }
+        upper = line.upper().rstrip(';').strip()
+        if upper == 'STRUCT':
+            stack.append([])
+            continue
+        if upper == 'END_STRUCT':
+            fields = stack.pop()
+            if stack:
+                stack[-1][-1].type = fields  # вкладена STRUCT закрита
+            else:
+                types[name] = fields
+            continue
+        if upper == 'END_TYPE':
+            name = None
+            continue
+        m = _FIELD_RE.match(line)
+        if m and stack:
+            declared = m.group(2).split(':=')[0].strip()  # початкове значення не впливає на розмір
+            if declared.upper() == 'STRUCT':
+                stack[-1].append(Field(m.group(1), []))
+                stack.append([])
+            else:
+                stack[-1].append(Field(m.group(1), _parse_type(declared)))
+    return types
+
+
+def load_udts(directory) -> Dict[str, List[Field]]:
+    """Усі UDT з файлів UDT_*.scl каталогу"""
+    types = {}
+    for path in sorted(Path(directory).glob('UDT_*.scl')):
+        types.update(parse_udt_source(path.read_text(encoding='utf-8-sig')))
+    return types
+
+
+def _even(nbytes: int) -> int:
+    return nbytes + (nbytes & 1)
+
+
+class LayoutCalculator:
+    """Розміри та зміщення полів для набору UDT (з кешем по імені типу)"""
+
+    def __init__(self, udts: Dict[str, List[Field]]):
+        self.udts = udts
+        self._sizes = {}  # UDT -> розмір у байтах
+
+    def size_of(self, type_) -> Tuple[int, int]:
+        """(розмір у бітах, вирівнювання у байтах) для типу поля"""
+        if isinstance(type_, list):
+            return self.struct_size(type_) * 8, 2
+        if isinstance(type_, tuple):
+            _, lo, hi, elem = type_
+            count = hi - lo + 1
+            if elem == 'BOOL':
+                return _even((count + 7) // 8) * 8, 2
+            elem_bits, _ = self.size_of(elem)
+            return _even(count * (elem_bits // 8)) * 8, 2
+        if type_ == 'BOOL':
+            return 1, 0
+        if type_ in ELEMENTARY_SIZES:
+            size = ELEMENTARY_SIZES[type_]
+            return size * 8, 1 if size == 1 else 2
+        m = _STRING_RE.match(type_)
+        if m:
+            return (int(m.group(1) or 254) + 2) * 8, 2
+        if type_ in self.udts:
+            return self.udt_size(type_) * 8, 2
+        raise ValueError(f"❌ Невідомий тип '{type_}'")
+
+    def layout(self, fields: List[Field]) -> int:
+        """Розставити зміщення полів; повертає розмір STRUCT у байтах"""
+        bits = 0
+        for field in fields:
+            size_bits, align = self.size_of(field.type)
+            if align:
+                bits = (bits + 7) // 8 * 8          # до межі байта
+                if align == 2 and (bits // 8) & 1:
+                    bits += 8                       # до парної адреси
+            field.byte, field.bit, field.size_bits = bits // 8, bits % 8, size_bits
+            bits += size_bits
+        return _even((bits + 7) // 8)
+
+    def struct_size(self, fields: List[Field]) -> int:
+        return self.layout(fields)
+
+    def udt_size(self, name: str) -> int:
+        """Розмір UDT у байтах (стандартний доступ)"""
+        if name not in self._sizes:
+            if name not in self.udts:
+                raise ValueError(f"❌ UDT '{name}' не знайдено")
+            self._sizes[name] = self.layout(self.udts[name])
+        return self._sizes[name]
+
+    def array_size(self, udt: str, count: int) -> int:
+        """Розмір ARRAY[0..count-1] OF udt у байтах"""
+        if count <= 0:
+            return 0
+        return self.size_of(('ARRAY', 0, count - 1, udt))[0] // 8
+
+
+def contract_slots_footprint(calc: LayoutCalculator, slots: int = 256) -> int:
+    """Mechs : ARRAY[0..slots-1] OF UDT_BaseMechanism у байтах
+
+    Оцінка за стандартною розкладкою: у репозиторії DB_Mechs оптимізований,
+    фактичний розмір визначає TIA.
+    """
+    return calc.array_size('UDT_BaseMechanism', slots)
+
+
+def format_bytes(nbytes: int) -> str:
+    return f"{nbytes} B ({nbytes / 1024:.2f} KB)"
+
+
+def print_layout(calc: LayoutCalculator, name: str):
+    """Таблиця зміщень полів UDT"""
+    print(f"\n📐 {name}: {calc.udt_size(name)} B")
+    for field in calc.udts[name]:
+        type_name = field.type if isinstance(field.type, str) else \
+            ('STRUCT' if isinstance(field.type, list) else 'ARRAY')
+        print(f"   {field.byte:4d}.{field.bit}  {field.name:<20} {type_name:<12} "
+              f"{field.size_bits if field.size_bits < 8 else field.size_bits // 8}"
+              f"{' bit' if field.size_bits < 8 else ' B'}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Розміри UDT за визначеннями UDT_*.scl")
+    parser.add_argument('directory', nargs='?', default='..',
+                        help="каталог з UDT_*.scl (за замовчуванням ..)")
+    parser.add_argument('--slots', type=int, default=0,
+                        help="порахувати Mechs[0..N-1] OF UDT_BaseMechanism")
+    parser.add_argument('--fields', action='store_true', help="показати зміщення полів")
+    args = parser.parse_args(argv)
+
+    udts = load_udts(args.directory)
+    if not udts:
+        print(f"❌ UDT_*.scl не знайдено у {args.directory}")
+        return 2
+
+    calc = LayoutCalculator(udts)
+    print("📦 Розміри UDT (стандартний доступ S7):")
+    for name in sorted(udts):
+        print(f"   - {name:<24} {calc.udt_size(name):5d} B")
+    if args.fields:
+        for name in sorted(udts):
+            print_layout(calc, name)
+    if args.slots:
+        total = contract_slots_footprint(calc, args.slots)
+        print(f"\n💾 Mechs[0..{args.slots - 1}] OF UDT_BaseMechanism ≈ {format_bytes(total)}")
+        print("   ⚠️  Оцінка за стандартною розкладкою; для оптимізованого DB_Mechs "
+              "фактичний розмір показує TIA")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""
+Спільна основа віртуального PLC (Python-модель SCL блоків)
+
+- константи з Constant.xlsx (аркуш Constants) — ті самі імена, що у SCL
+- VirtualClock: TIME_TCK з переповненням DINT (0..2147483647 -> 0)
+- time_elapsed / elapsed_ms: точна копія FC_TimeElapsedMs (NumPy / скаляр)
+- SoA-масиви полів UDT за визначеннями UDT_*.scl
+"""
+
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+from udt_layout import Field, load_udts
+
+DINT_MAX = 2147483647
+TICK_MODULO = DINT_MAX + 1
+
+# Тип SCL -> тип NumPy (елементарні типи, що зустрічаються в UDT)
+SCL_NUMPY_TYPES = {
+    'BOOL': np.bool_,
+    'BYTE': np.uint8, 'USINT': np.uint8, 'SINT': np.int8, 'CHAR': np.uint8,
+    'WORD': np.uint16, 'UINT': np.uint16, 'INT': np.int16,
+    'DWORD': np.uint32, 'UDINT': np.uint32, 'DINT': np.int32, 'TIME': np.int32,
+    'REAL': np.float32, 'LREAL': np.float64,
+}
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_CONSTANTS = REPO_DIR / 'Constant.xlsx'
+
+
+class PlcConstants(dict):
+    """Константи PLC: c['STS_IDLE'] або c.STS_IDLE
+
+    Значення дублюються в __dict__, щоб c.NAME у гарячому циклі не проходив
+    через __getattr__; запис через c[name] = ... / update() тримає їх узгодженими.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.__dict__.update(self)
+
+    def __setitem__(self, name, value):
+        super().__setitem__(name, value)
+        self.__dict__[name] = value
+
+    def __delitem__(self, name):
+        super().__delitem__(name)
+        self.__dict__.pop(name, None)
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self.__dict__.update(self)
+
+    def with_overrides(self, **overrides) -> 'PlcConstants':
+        """Копія зі зміненими значеннями (кеш load_constants не змінюється)"""
+        unknown = sorted(set(overrides) - set(self))
+        if unknown:
+            raise ValueError(f"❌ Невідомі константи: {', '.join(unknown)}")
+        copy = PlcConstants(self)
+        copy.update(overrides)
+        return copy
+
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(f"❌ Константа {name} відсутня у Constant.xlsx") from None
+
+
+_constants_cache = {}
+
+
+def load_constants(path=None) -> PlcConstants:
+    """Прочитати аркуш Constants з Constant.xlsx (кеш на процес)"""
+    path = Path(path) if path else DEFAULT_CONSTANTS
+    key = path.resolve()
+    if key in _constants_cache:
+        return _constants_cache[key]
+
+    from openpyxl import load_workbook
+
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        if 'Constants' not in wb.sheetnames:
+            raise ValueError(f"❌ Аркуш Constants відсутній у {path}")
+        rows = wb['Constants'].iter_rows(values_only=True)
+        header = [str(h).strip() if h is not None else '' for h in next(rows, ())]
+        constants = PlcConstants()
+        for values in rows:
+            row = dict(zip(header, values))
+            name = row.get('Name')
+            if not name or row.get('Value') in (None, ''):
+                continue
+            value = str(row['Value']).strip()
+            try:
+                constants[str(name).strip()] = int(value)
+            except ValueError:
+                constants[str(name).strip()] = float(value)
+    finally:
+        wb.close()
+
+    _constants_cache[key] = constants
+    return constants
+
+
+def time_elapsed(start, now):
+    """FC_TimeElapsedMs: скільки мс минуло від start до now з урахуванням переповнення"""
+    start = np.asarray(start, dtype=np.int64)
+    now = np.asarray(now, dtype=np.int64)
+    diff = np.where(now >= start, now - start, (DINT_MAX - start) + now + 1)
+    return np.maximum(diff, 0)
+
+
+def elapsed_ms(start: int, now: int) -> int:
+    """Скалярний FC_TimeElapsedMs (для Python-моделей без NumPy)"""
+    diff = now - start if now >= start else (DINT_MAX - start) + now + 1
+    return diff if diff > 0 else 0
+
+
+class VirtualClock:
+    """Віртуальний TIME_TCK: мс, переповнення як у DINT-лічильника PLC"""
+
+    __slots__ = ('now', 'cycle_ms')
+
+    def __init__(self, start_ms: int = 0, cycle_ms: int = 10):
+        self.now = start_ms % TICK_MODULO
+        self.cycle_ms = cycle_ms
+
+    def advance(self, ms: int = None) -> int:
+        """Зсунути час на ms (за замовчуванням — на один цикл)"""
+        self.now = (self.now + (self.cycle_ms if ms is None else ms)) % TICK_MODULO
+        return self.now
+
+
+def field_dtype(field: Field):
+    """NumPy-тип для елементарного поля UDT"""
+    if not isinstance(field.type, str) or field.type not in SCL_NUMPY_TYPES:
+        raise ValueError(f"❌ Поле {field.name}: тип {field.type!r} не підтримується у SoA")
+    return SCL_NUMPY_TYPES[field.type]
+
+
+def make_soa(fields: List[Field], size: int) -> Dict[str, np.ndarray]:
+    """Struct-of-arrays: поле UDT -> масив довжини size (нулі, як у новому DB)"""
+    return {f.name: np.zeros(size, dtype=field_dtype(f)) for f in fields}
+
+
+def load_udt_fields(udt_dir=None) -> Dict[str, List[Field]]:
+    """Поля UDT з UDT_*.scl (за замовчуванням — корінь репозиторію)"""
+    udts = load_udts(udt_dir or REPO_DIR)
+    if not udts:
+        raise ValueError(f"❌ UDT_*.scl не знайдено у {udt_dir or REPO_DIR}")
+    return udts
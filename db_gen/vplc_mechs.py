@@ -0,0 +1,554 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Векторизований віртуальний PLC механізмів (FC_Redler / FC_Noria / FC_Gate2P / FC_Fan)
+
+Стан — struct-of-arrays NumPy з іменами полів UDT (як у DB_Mechs):
+    plc.mechs['Status'][slot]          # "DB_Mechs".Mechs[slot].Status
+    plc.typed['Redler']['DO_Run'][i]   # "DB_Mechs".Redler[i].DO_Run
+
+Мапінг slot -> (DeviceType, TypedIndex) береться з генератора (записи Excel)
+або зі згенерованих DB_Mechs.scl / FC_InitMechs.scl. Один виклик scan()
+просуває всі змаплені слоти на один скан OB1 (логіка FC_DeviceRunner),
+переходи Status/FLTCode/DO_*, маски Force_Code та таймаути — як у SCL.
+
+Використання:
+    python vplc_mechs.py elevator_config.xlsx --scans 200000
+    python vplc_mechs.py generated/ --plant --scans 1000000
+    python vplc_mechs.py --synthetic 256 --plant --scans 1000000
+"""
+
+import re
+import sys
+import time
+import argparse
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from mech_types import MECH_TYPE_SPECS
+from vplc_core import VirtualClock, load_constants, load_udt_fields, make_soa, time_elapsed
+
+SLOTS = 256
+UNMAPPED_INDEX = 0xFFFF
+
+# Тип механізму: (аркуш, масив у DB_Mechs, UDT, константа DeviceType) — з mech_types
+MECH_TYPES = tuple((sheet, array, udt, type_const)
+                   for sheet, _, array, udt, _, _, type_const, _ in MECH_TYPE_SPECS)
+
+_INIT_RE = re.compile(r'"DB_Mechs"\.Mechs\[(\d+)\]\.(DeviceType|TypedIndex)\s*:=\s*(?:"DB_Const"\.)?"?(\w+)"?\s*;')
+_ARRAY_RE = re.compile(r'^\s*(\w+)\s*:\s*ARRAY\s*\[\s*0\s*\.\.\s*(\d+)\s*\]\s*OF\s*"(\w+)"', re.MULTILINE)
+
+
+def _as_slice(indices: np.ndarray):
+    """Індекси з постійним кроком -> slice (вид без копії); None для порожніх"""
+    if not indices.size:
+        return None
+    if indices.size == 1:
+        return slice(int(indices[0]), int(indices[0]) + 1)
+    steps = np.diff(indices)
+    if steps[0] > 0 and np.all(steps == steps[0]):
+        return slice(int(indices[0]), int(indices[-1]) + 1, int(steps[0]))
+    return indices
+
+
+class VirtualPlc:
+    """DB_Mechs + FC_DeviceRunner у вигляді NumPy-масивів"""
+
+    def __init__(self, mapping: Dict[int, Tuple[str, int]], typed_sizes: Dict[str, int] = None,
+                 constants=None, udt_dir=None, cycle_ms: int = 10, start_ms: int = 0):
+        """mapping: slot -> (масив 'Redler'/'Noria'/'Gate'/'Fan', TypedIndex)"""
+        self.c = constants or load_constants()
+        self.clock = VirtualClock(start_ms, cycle_ms)
+        self.scans = 0
+
+        udts = load_udt_fields(udt_dir)
+        self.mechs = make_soa(udts['UDT_BaseMechanism'], SLOTS)
+        self.mechs['DeviceType'][:] = self.c.TYPE_NONE
+        self.mechs['TypedIndex'][:] = UNMAPPED_INDEX
+
+        typed_sizes = dict(typed_sizes or {})
+        self.typed = {}
+        self.slots = {}  # масив -> слоти цього типу (порядок TypedIndex)
+        self.index = {}  # масив -> TypedIndex відповідних слотів
+        for _, array, udt, type_const in MECH_TYPES:
+            entries = sorted((idx, slot) for slot, (a, idx) in mapping.items() if a == array)
+            size = max(typed_sizes.get(array, 0), max((i for i, _ in entries), default=-1) + 1)
+            self.typed[array] = make_soa(udts[udt], size)
+            self.slots[array] = np.array([s for _, s in entries], dtype=np.intp)
+            self.index[array] = np.array([i for i, _ in entries], dtype=np.intp)
+            self.mechs['DeviceType'][self.slots[array]] = self.c[type_const]
+            self.mechs['TypedIndex'][self.slots[array]] = self.index[array]
+
+        # Слоти/індекси з постійним кроком (типова розкладка Excel) -> зрізи-види,
+        # ядро пише прямо в масиви без gather/scatter
+        self._select = {array: (_as_slice(self.slots[array]), _as_slice(self.index[array]))
+                        for array in self.slots}
+
+        # Python-моделі FC_* за масивом; новий тип у MECH_TYPE_SPECS потребує своєї моделі
+        kernels = {
+            'Redler': self._scan_redler,
+            'Noria': self._scan_noria,
+            'Gate': self._scan_gate,
+            'Fan': self._scan_fan,
+        }
+        missing = [array for _, array, _, _ in MECH_TYPES if array not in kernels]
+        if missing:
+            raise ValueError(f"❌ VirtualPlc: немає моделі FC для {', '.join(missing)}")
+        self._kernels = tuple((array, kernels[array]) for _, array, _, _ in MECH_TYPES)
+
+    # ------------------------------------------------------------------
+    # Побудова
+    # ------------------------------------------------------------------
+    @classmethod
+    def from_records(cls, sheets: Dict[str, list], **kwargs) -> 'VirtualPlc':
+        """З записів механізмів (config_loader / PLCCodeGenerator), ключ — аркуш"""
+        mapping = {}
+        for sheet, array, _, _ in MECH_TYPES:
+            for m in sheets.get(sheet, ()):
+                mapping[int(m['Slot'])] = (array, int(m['TypedIdx']))
+        return cls(mapping, **kwargs)
+
+    @classmethod
+    def from_excel(cls, excel_path, **kwargs) -> 'VirtualPlc':
+        """З elevator_config.xlsx (через знімок config_loader)"""
+        from config_loader import load_config
+        return cls.from_records(load_config(excel_path).sheets, **kwargs)
+
+    @classmethod
+    def from_generated(cls, output_dir, **kwargs) -> 'VirtualPlc':
+        """Зі згенерованих DB_Mechs.scl (розміри масивів) та FC_InitMechs.scl (мапінг)"""
+        output_dir = Path(output_dir)
+        constants = kwargs.get('constants') or load_constants()
+        kwargs['constants'] = constants
+        by_type = {constants[type_const]: array for _, array, _, type_const in MECH_TYPES}
+
+        sizes = {}
+        db_text = (output_dir / 'DB_Mechs.scl').read_text(encoding='utf-8')
+        for name, hi, _ in _ARRAY_RE.findall(db_text):
+            if name != 'Mechs':
+                sizes[name] = int(hi) + 1
+
+        device, index = {}, {}
+        init_text = (output_dir / 'FC_InitMechs.scl').read_text(encoding='utf-8')
+        for slot, field, value in _INIT_RE.findall(init_text):
+            if field == 'DeviceType':
+                device[int(slot)] = by_type.get(constants.get(value))
+            else:
+                index[int(slot)] = int(value)
+        mapping = {slot: (array, index[slot]) for slot, array in device.items()
+                   if array is not None and slot in index}
+        return cls(mapping, typed_sizes=sizes, **kwargs)
+
+    @classmethod
+    def synthetic(cls, slots: int = SLOTS, **kwargs) -> 'VirtualPlc':
+        """Повністю заповнена шина: типи по колу Redler/Noria/Gate/Fan"""
+        counters = {array: 0 for _, array, _, _ in MECH_TYPES}
+        mapping = {}
+        for slot in range(min(slots, SLOTS)):
+            array = MECH_TYPES[slot % len(MECH_TYPES)][1]
+            mapping[slot] = (array, counters[array])
+            counters[array] += 1
+        return cls(mapping, **kwargs)
+
+    # ------------------------------------------------------------------
+    # Допоміжне
+    # ------------------------------------------------------------------
+    @property
+    def mapped_slots(self) -> np.ndarray:
+        return np.sort(np.concatenate([s for s in self.slots.values()]))
+
+    def make_healthy(self):
+        """Enable_OK, без LocalManual, захисні DI у нормі (як після пусконалагодження)"""
+        mapped = self.mapped_slots
+        self.mechs['Enable_OK'][mapped] = True
+        self.mechs['LocalManual'][mapped] = False
+        for array, fields in self.typed.items():
+            for name in ('DI_Breaker_OK', 'DI_Overflow_OK', 'DI_Alingment_OK'):
+                if name in fields:
+                    fields[name][self.index[array]] = True
+
+    def set_cmd(self, slots, cmd: int, param1: int = 0):
+        """Рівнева команда арбітра у слоти (Cmd/CmdParam1)"""
+        self.mechs['Cmd'][slots] = cmd
+        self.mechs['CmdParam1'][slots] = param1
+
+    def slot_state(self, slot: int) -> Dict[str, object]:
+        """Base + typed поля одного слоту (для діагностики/тестів)"""
+        state = {name: arr[slot].item() for name, arr in self.mechs.items()}
+        for array, slots in self.slots.items():
+            hit = np.nonzero(slots == slot)[0]
+            if hit.size:
+                idx = self.index[array][hit[0]]
+                state.update({name: arr[idx].item() for name, arr in self.typed[array].items()})
+        return state
+
+    # ------------------------------------------------------------------
+    # Скан
+    # ------------------------------------------------------------------
+    def scan(self, advance: bool = True):
+        """Один скан FC_DeviceRunner для всіх змаплених слотів; потім TIME_TCK += цикл"""
+        now = self.clock.now
+        for array, kernel in self._kernels:
+            slots, idx = self._select[array]
+            if slots is None:
+                continue
+            b = {name: arr[slots] for name, arr in self.mechs.items()}
+            t = {name: arr[idx] for name, arr in self.typed[array].items()}
+            kernel(b, t, now)
+            # зрізи — це види, fancy-індекси — копії, які треба повернути
+            if not isinstance(slots, slice):
+                for name, arr in self.mechs.items():
+                    arr[slots] = b[name]
+            if not isinstance(idx, slice):
+                for name, arr in self.typed[array].items():
+                    arr[idx] = t[name]
+        self.scans += 1
+        if advance:
+            self.clock.advance()
+
+    def run(self, scans: int, plant: 'SimplePlant' = None, on_scan=None, after_scan=None):
+        """scans сканів: [plant -> DI] -> FC_DeviceRunner -> [DO -> plant]
+
+        after_scan(now) — після кожного скану з його TIME_TCK (запис трейсу)
+        """
+        for _ in range(scans):
+            if plant is not None:
+                plant.step()
+            if on_scan is not None:
+                on_scan(self)
+            now = self.clock.now
+            self.scan()
+            if after_scan is not None:
+                after_scan(now)
+
+    def _common_prefix(self, b, t, timers: Tuple[str, ...], auto_exit: bool = True):
+        """Регіони 1-3: RESET, Enable/LocalManual, LastCmd; повертає (isFault, isBlocked)"""
+        c = self.c
+        cmd = b['Cmd']
+        st = b['Status']
+
+        rst = cmd == c.CMD_RESET
+        b['FLTCode'][rst] = c.FLT_NONE
+        st[rst] = c.STS_IDLE
+        for name in timers:
+            t[name][rst] = 0
+        b['LastCmd'][rst] = cmd[rst]
+        is_fault = st == c.STS_FAULT
+
+        dis = ~b['Enable_OK']
+        loc = ~dis & b['LocalManual']
+        st[dis] = c.STS_DISABLED
+        st[loc] = c.STS_LOCAL
+        blk = dis | loc
+        b['OwnerCur'][blk] = 0
+        b['OwnerCurId'][blk] = 0
+        for name in timers:
+            t[name][blk] = 0
+        if auto_exit:
+            # Автоматичний вихід з DISABLED/LOCAL при знятті блокувань
+            st[~blk & ((st == c.STS_DISABLED) | (st == c.STS_LOCAL))] = c.STS_IDLE
+        is_blocked = (st == c.STS_DISABLED) | (st == c.STS_LOCAL)
+
+        has = cmd != c.CMD_NONE
+        b['LastCmd'][has] = cmd[has]
+        return is_fault, is_blocked
+
+    def _fault(self, b, mask, code: int):
+        b['FLTCode'][mask] = code
+        b['Status'][mask] = self.c.STS_FAULT
+
+    def _case(self, b, is_fault, is_blocked):
+        """Маски гілок CASE #B.Status (селектор обчислюється один раз)"""
+        c = self.c
+        act = ~is_fault & ~is_blocked
+        st = b['Status'].copy()
+        idle = act & (st == c.STS_IDLE)
+        starting = act & (st == c.STS_STARTING)
+        running = act & (st == c.STS_RUNNING)
+        stopping = act & (st == c.STS_STOPPING)
+        other = act & ~(idle | starting | running | stopping)
+        return idle, starting, running, stopping, other
+
+    def _scan_motor(self, b, t, now, second_di: str, second_bit: int, second_flt: int,
+                    start_timeout: int, pause_timeout: int):
+        """FC_Redler / FC_Noria (різняться другим захисним DI та таймаутами)"""
+        c = self.c
+        force = b['Force_Code']
+        force_breaker = (force & 2) != 0
+        force_second = (force & second_bit) != 0
+        force_speed = (force & 4) != 0
+        cmd = b['Cmd']
+        st = b['Status']
+
+        is_fault, is_blocked = self._common_prefix(b, t, ('StartMs', 'SpeedLostMs'))
+
+        # 4) Місцеві аварії: BREAKER > другий захист
+        act = ~is_fault & ~is_blocked
+        brk = act & ~t['DI_Breaker_OK'] & ~force_breaker
+        sec = act & ~brk & ~t[second_di] & ~force_second
+        self._fault(b, brk, c.FLT_BREAKER)
+        self._fault(b, sec, second_flt)
+        is_fault = np.where(act, st == c.STS_FAULT, is_fault)
+
+        # 5 & 6) Машина станів
+        idle, starting, running, stopping, other = self._case(b, is_fault, is_blocked)
+        speed = t['DI_Speed_OK']
+        speed_ok = speed | force_speed
+
+        go = idle & (cmd == c.CMD_START)
+        st[go] = c.STS_STARTING
+        t['StartMs'][go] = now
+
+        ok = starting & speed_ok
+        st[ok] = c.STS_RUNNING
+        t['SpeedLostMs'][ok] = 0
+        timeout = starting & ~speed_ok & (time_elapsed(t['StartMs'], now) >= start_timeout)
+        self._fault(b, timeout, c.FLT_NO_RUNFB)
+        st[starting & (cmd == c.CMD_STOP)] = c.STS_STOPPING
+
+        t['SpeedLostMs'][running & speed_ok] = 0
+        lost = running & ~speed_ok
+        t['SpeedLostMs'][lost & (t['SpeedLostMs'] == 0)] = now
+        timeout = lost & (time_elapsed(t['SpeedLostMs'], now) >= pause_timeout)
+        self._fault(b, timeout, c.FLT_NO_RUNFB)
+        st[running & (cmd == c.CMD_STOP)] = c.STS_STOPPING
+
+        stopped = stopping & ~speed
+        st[stopped] = c.STS_IDLE
+        t['StartMs'][stopped] = 0
+        t['SpeedLostMs'][stopped] = 0
+
+        st[other] = c.STS_IDLE
+
+        # 7) DO_Run — похідний від фінального Status
+        t['DO_Run'][:] = (st == c.STS_STARTING) | (st == c.STS_RUNNING)
+
+    def _scan_redler(self, b, t, now):
+        c = self.c
+        self._scan_motor(b, t, now, 'DI_Overflow_OK', 1, c.FLT_OVERFLOW,
+                         c.TimeoutMs_Redler_Start, c.TimeoutMs_Redler_SpeedPause)
+
+    def _scan_noria(self, b, t, now):
+        c = self.c
+        self._scan_motor(b, t, now, 'DI_Alingment_OK', 16, c.FLT_ALINGMENT,
+                         c.TimeoutMs_Noria_Start, c.TimeoutMs_Noria_SpeedPause)
+
+    def _scan_gate(self, b, t, now):
+        """FC_Gate2P (без автоматичного виходу з DISABLED/LOCAL — як у SCL)"""
+        c = self.c
+        force = b['Force_Code']
+        force_breaker = (force & 2) != 0
+        force_move = (force & 32) != 0
+        force_pos = (force & 64) != 0
+        cmd = b['Cmd']
+        st = b['Status']
+        p1 = b['CmdParam1']
+
+        is_fault, is_blocked = self._common_prefix(b, t, ('MoveStartMs', 'UnknownPositionMs'),
+                                                   auto_exit=False)
+        opened = t['DI_Opened_OK']
+        closed = t['DI_Closed_OK']
+        defined = opened | closed
+
+        act = ~is_fault & ~is_blocked
+        brk = act & ~t['DI_Breaker_OK'] & ~force_breaker
+        self._fault(b, brk, c.FLT_BREAKER)
+        is_fault = np.where(act, st == c.STS_FAULT, is_fault)
+
+        idle, starting, running, stopping, other = self._case(b, is_fault, is_blocked)
+        want_open = p1 == c.CMD_GATE_OPEN
+        want_close = p1 == c.CMD_GATE_CLOSED
+        valid = want_open | want_close
+        reached = (want_open & opened) | (want_close & closed)
+
+        unknown = idle & ~defined
+        t['UnknownPositionMs'][unknown & (t['UnknownPositionMs'] == 0)] = now
+        timeout = unknown & ~force_pos & \
+            (time_elapsed(t['UnknownPositionMs'], now) >= c.TimeoutMs_Gate_Position_Unknown)
+        self._fault(b, timeout, c.FLT_GATE_POS_UNKNOWN)
+        t['UnknownPositionMs'][idle & defined] = 0
+        go = idle & (cmd == c.CMD_START)
+        move = go & valid & ~reached
+        st[move] = c.STS_STARTING
+        t['MoveStartMs'][move] = now
+        st[go & ~move] = c.STS_IDLE
+
+        st[starting & want_open] = np.where(opened, c.STS_IDLE, c.STS_RUNNING)[starting & want_open]
+        st[starting & want_close] = np.where(closed, c.STS_IDLE, c.STS_RUNNING)[starting & want_close]
+        st[starting & ~valid] = c.STS_IDLE
+        st[starting & (cmd == c.CMD_STOP)] = c.STS_STOPPING
+
+        timeout = running & ~force_move & \
+            (time_elapsed(t['MoveStartMs'], now) >= c.TimeoutMs_Gate_Move)
+        self._fault(b, timeout, c.FLT_GATE_MOVE_TIMEOUT)
+        st[running & ((cmd == c.CMD_STOP) | reached)] = c.STS_STOPPING
+        st[running & ~valid] = c.STS_IDLE
+
+        done = stopping & defined
+        st[done] = c.STS_IDLE
+        t['MoveStartMs'][done] = 0
+        t['UnknownPositionMs'][done] = 0
+
+        st[other] = c.STS_IDLE
+
+        active = (st == c.STS_STARTING) | (st == c.STS_RUNNING)
+        t['DO_Open'][:] = active & want_open
+        t['DO_Close'][:] = active & want_close
+
+    def _scan_fan(self, b, t, now):
+        """FC_Fan"""
+        c = self.c
+        force = b['Force_Code']
+        force_breaker = (force & 2) != 0
+        force_feedback = (force & 8) != 0
+        cmd = b['Cmd']
+        st = b['Status']
+
+        is_fault, is_blocked = self._common_prefix(b, t, ('StartMs',))
+
+        act = ~is_fault & ~is_blocked
+        brk = act & ~t['DI_Breaker_OK'] & ~force_breaker
+        self._fault(b, brk, c.FLT_BREAKER)
+        is_fault = np.where(act, st == c.STS_FAULT, is_fault)
+
+        idle, starting, running, stopping, other = self._case(b, is_fault, is_blocked)
+        feedback = t['DI_Feedback_OK']
+        feedback_ok = feedback | force_feedback
+
+        go = idle & (cmd == c.CMD_START)
+        st[go] = c.STS_STARTING
+        t['StartMs'][go] = now
+
+        st[starting & feedback_ok] = c.STS_RUNNING
+        timeout = starting & ~feedback_ok & \
+            (time_elapsed(t['StartMs'], now) >= c.TimeoutMs_Fan_Feedback)
+        self._fault(b, timeout, c.FLT_NO_FEEDBACK)
+        st[starting & (cmd == c.CMD_STOP)] = c.STS_STOPPING
+
+        self._fault(b, running & ~feedback_ok, c.FLT_NO_FEEDBACK)
+        st[running & (cmd == c.CMD_STOP)] = c.STS_STOPPING
+
+        stopped = stopping & ~feedback
+        st[stopped] = c.STS_IDLE
+        t['StartMs'][stopped] = 0
+
+        st[other] = c.STS_IDLE
+
+        t['DO_Run'][:] = (st == c.STS_STARTING) | (st == c.STS_RUNNING)
+
+
+class SimplePlant:
+    """Найпростіша фізика заліза (аналог FB_SimRedler для всієї шини)
+
+    Мотори: швидкість/фідбек з'являється через spin_up_ms після DO_Run
+    і зникає через spin_down_ms після його зняття. Засувки: хід
+    travel_ms між кінцевиками за DO_Open/DO_Close (старт — закрита).
+    """
+
+    def __init__(self, plc: VirtualPlc, spin_up_ms: int = 1500, spin_down_ms: int = 1000,
+                 travel_ms: int = 4000):
+        self.plc = plc
+        self.spin_up_ms = spin_up_ms
+        self.spin_down_ms = spin_down_ms
+        self.travel_ms = travel_ms
+        self._on = {}
+        self._off = {}
+        for array in ('Redler', 'Noria', 'Fan'):
+            n = len(plc.typed[array]['DO_Run'])
+            self._on[array] = np.zeros(n, dtype=np.int64)
+            self._off[array] = np.full(n, spin_down_ms, dtype=np.int64)
+        self._gate_pos = np.zeros(len(plc.typed['Gate']['DO_Open']), dtype=np.int64)
+
+    def step(self):
+        dt = self.plc.clock.cycle_ms
+        for array, signal in (('Redler', 'DI_Speed_OK'), ('Noria', 'DI_Speed_OK'),
+                              ('Fan', 'DI_Feedback_OK')):
+            t = self.plc.typed[array]
+            run = t['DO_Run']
+            on, off = self._on[array], self._off[array]
+            on[:] = np.where(run, on + dt, 0)
+            off[:] = np.where(run, 0, off + dt)
+            t[signal][:] = np.where(run, on >= self.spin_up_ms, t[signal] & (off < self.spin_down_ms))
+
+        g = self.plc.typed['Gate']
+        pos = self._gate_pos
+        pos += np.where(g['DO_Open'], dt, 0) - np.where(g['DO_Close'], dt, 0)
+        np.clip(pos, 0, self.travel_ms, out=pos)
+        g['DI_Opened_OK'][:] = pos >= self.travel_ms
+        g['DI_Closed_OK'][:] = pos <= 0
+
+
+def soak(plc: VirtualPlc, scans: int, plant: Optional[SimplePlant] = None,
+         period_scans: int = 2000, after_scan=None) -> Dict[str, float]:
+    """Прогін з циклічними START/STOP усіх змаплених слотів; повертає метрики"""
+    c = plc.c
+    mapped = plc.mapped_slots
+    gates = plc.slots['Gate']
+    state = {'starts': 0}
+
+    def commander(p: VirtualPlc):
+        if p.scans % period_scans:
+            return
+        if (p.scans // period_scans) % 2 == 0:
+            # засувки по черзі відкриваються/закриваються
+            p.set_cmd(mapped, c.CMD_START)
+            p.mechs['CmdParam1'][gates] = c.CMD_GATE_OPEN if state['starts'] % 2 == 0 \
+                else c.CMD_GATE_CLOSED
+            state['starts'] += 1
+        else:
+            p.set_cmd(mapped, c.CMD_STOP)
+
+    started = time.perf_counter()
+    plc.run(scans, plant=plant, on_scan=commander, after_scan=after_scan)
+    seconds = time.perf_counter() - started
+    status = plc.mechs['Status'][mapped]
+    return {
+        'scans': scans,
+        'slots': int(mapped.size),
+        'seconds': round(seconds, 3),
+        'scans_per_second': round(scans / seconds, 1) if seconds else 0.0,
+        'slot_updates_per_second': round(scans * mapped.size / seconds, 1) if seconds else 0.0,
+        'simulated_hours': round(scans * plc.clock.cycle_ms / 3_600_000, 3),
+        'faults': int(np.count_nonzero(status == c.STS_FAULT)),
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Віртуальний PLC механізмів (NumPy)")
+    parser.add_argument('source', nargs='?', default='elevator_config.xlsx',
+                        help="elevator_config.xlsx або каталог зі згенерованими SCL")
+    parser.add_argument('--synthetic', type=int, default=0,
+                        help="замість source — N слотів, заповнених по колу всіма типами")
+    parser.add_argument('--scans', type=int, default=100000, help="кількість сканів")
+    parser.add_argument('--cycle-ms', type=int, default=10, help="час циклу OB1, мс")
+    parser.add_argument('--plant', action='store_true', help="з моделлю заліза (SimplePlant)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    if args.synthetic:
+        plc = VirtualPlc.synthetic(args.synthetic, cycle_ms=args.cycle_ms)
+    elif Path(args.source).is_dir():
+        plc = VirtualPlc.from_generated(args.source, cycle_ms=args.cycle_ms)
+    else:
+        plc = VirtualPlc.from_excel(args.source, cycle_ms=args.cycle_ms)
+
+    plc.make_healthy()
+    plant = SimplePlant(plc) if args.plant else None
+    counts = ', '.join(f"{array} {len(slots)}" for array, slots in plc.slots.items())
+    print(f"🧪 Віртуальний PLC: {plc.mapped_slots.size} слотів ({counts}), цикл {args.cycle_ms} мс")
+
+    metrics = soak(plc, args.scans, plant=plant)
+    print(f"⏱️  {metrics['scans']} сканів за {metrics['seconds']} с: "
+          f"{metrics['scans_per_second']:.0f} сканів/с, "
+          f"{metrics['slot_updates_per_second']:.0f} слот-оновлень/с "
+          f"(≈ {metrics['simulated_hours']} год роботи PLC)")
+    print(f"   Аварій наприкінці: {metrics['faults']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
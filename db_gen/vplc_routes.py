@@ -0,0 +1,900 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Віртуальний PLC маршрутів: FB_RouteFSM + FC_ArbiterMech на віртуальному TIME_TCK
+
+- MechBus: "DB_Mechs".Mechs[0..255] як Python-списки з іменами полів
+  UDT_BaseMechanism (bus.OwnerCur[slot], bus.Status[slot] ...)
+- arbiter_mech(): порт FC_ArbiterMech (LockOnly / ReleaseOwner / заборона CMD_SET_FORCE)
+- RouteFsm: порт FB_RouteFSM (фронти RC_Cmd, VALIDATING -> STARTING (атомарний lock)
+  -> RUNNING -> STOPPING у зворотному порядку -> фінал, звільнення owner)
+- RouteEngine: 12 маршрутів + модель механізмів, порядок як в OB1 (контракт 2.2):
+  маршрути -> механізми -> TIME_TCK += цикл
+
+Швидкий шлях: скан маршруту без жодної зміни (стан FSM, lastCmd, записи в шину)
+є нерухомою точкою — маршрут "засинає", доки не зміниться його вхід: команда,
+GlobalSafetyStop/LocalManualGlobal або будь-яке поле слоту з його кроків.
+Режим fast=False сканує всі маршрути щоскану (еталон для перевірки еквівалентності).
+
+summary=True: перед маршрутами рахується RouteSummary (порт згенерованого
+FC_RouteSummary) і FB_RouteFSM бере anyFault/anyLocal/allIdle/ownsAny з нього
+(UseSummary := TRUE) замість циклів по кроках.
+
+Використання:
+    python vplc_routes.py --bench 200000
+    python vplc_routes.py --property 50000 --seed 7
+    python vplc_routes.py --property 50000 --summary
+"""
+
+import sys
+import time
+import heapq
+import random
+import argparse
+from typing import Dict, List, Tuple
+
+from vplc_core import DINT_MAX, VirtualClock, elapsed_ms, load_constants, load_udt_fields
+
+SLOTS = 256
+MAX_ROUTES = 12
+MAX_STEPS = 64
+UNMAPPED_INDEX = 0xFFFF
+
+
+class MechBus:
+    """Mechs[0..255] OF UDT_BaseMechanism як struct-of-lists
+
+    Зовнішні записи (механізми, тести, SCADA) — через set(), щоб розбудити
+    маршрути, які стежать за слотом. Арбітр пише напряму і викликає mark().
+    """
+
+    def __init__(self, fields: List[str], slots: int = SLOTS):
+        self.fields = tuple(fields)
+        for name in self.fields:
+            setattr(self, name, [0] * slots)
+        self.slots = slots
+        self.changes = 0                  # лічильник реальних змін (для швидкого шляху)
+        self.dirty = set()                # слоти, змінені з останнього проходу механізмів
+        self.watchers = [() for _ in range(slots)]  # слот -> маршрути, що від нього залежать
+
+    @classmethod
+    def from_udt(cls, udt_dir=None) -> 'MechBus':
+        fields = [f.name for f in load_udt_fields(udt_dir)['UDT_BaseMechanism']]
+        bus = cls(fields)
+        bus.TypedIndex[:] = [UNMAPPED_INDEX] * bus.slots
+        return bus
+
+    @classmethod
+    def from_arrays(cls, mechs: Dict[str, object]) -> 'MechBus':
+        """З NumPy SoA (vplc_mechs.VirtualPlc.mechs) — ті самі імена полів"""
+        bus = cls(list(mechs))
+        for name, arr in mechs.items():
+            setattr(bus, name, arr.tolist())
+        return bus
+
+    def to_arrays(self, mechs: Dict[str, object]):
+        """Записати стан шини назад у NumPy SoA"""
+        for name, arr in mechs.items():
+            arr[:] = getattr(self, name)
+
+    def mark(self, slot: int):
+        self.changes += 1
+        self.dirty.add(slot)
+        for route in self.watchers[slot]:
+            route.awake = True
+
+    def set(self, field: str, slot: int, value) -> bool:
+        arr = getattr(self, field)
+        if arr[slot] == value:
+            return False
+        arr[slot] = value
+        self.mark(slot)
+        return True
+
+    def mapped(self, c) -> List[int]:
+        return [s for s in range(self.slots)
+                if self.DeviceType[s] != c.TYPE_NONE and self.TypedIndex[s] != UNMAPPED_INDEX]
+
+
+def arbiter_mech(bus: MechBus, slot: int, c, local_manual_global: bool, owner_req: int,
+                 owner_req_id: int, req_cmd: int, req_param1: int,
+                 release_owner: bool, lock_only: bool) -> bool:
+    """FC_ArbiterMech (M := Mechs[slot])"""
+    # CMD_SET_FORCE не повинен йти через арбітр
+    if req_cmd == c.CMD_SET_FORCE:
+        return False
+    if bus.DeviceType[slot] == c.TYPE_NONE or bus.TypedIndex[slot] == UNMAPPED_INDEX:
+        return False
+
+    allow = not (local_manual_global or bus.LocalManual[slot])
+    owner = bus.OwnerCur
+    owner_id = bus.OwnerCurId
+
+    if allow and release_owner:
+        if not (owner[slot] == owner_req and owner_id[slot] == owner_req_id):
+            allow = False
+        # звільняти owner можна лише в IDLE
+        if allow and bus.Status[slot] != c.STS_IDLE:
+            allow = False
+        if allow and (owner[slot] != c.OWNER_NONE or owner_id[slot] != 0):
+            owner[slot] = c.OWNER_NONE
+            owner_id[slot] = 0
+            bus.mark(slot)
+    elif allow:
+        if owner[slot] == c.OWNER_NONE and owner_req != c.OWNER_NONE:
+            if owner_req != owner[slot] or owner_req_id != owner_id[slot]:
+                owner[slot] = owner_req
+                owner_id[slot] = owner_req_id
+                bus.mark(slot)
+        if not (owner[slot] == owner_req and owner_id[slot] == owner_req_id):
+            allow = False
+        if allow and not lock_only:
+            if req_cmd == c.CMD_NONE:
+                allow = False
+            if allow and (bus.Cmd[slot] != req_cmd or bus.CmdParam1[slot] != req_param1):
+                bus.Cmd[slot] = req_cmd
+                bus.CmdParam1[slot] = req_param1
+                bus.mark(slot)
+    return allow
+
+
+class RouteStep:
+    """UDT_RouteStep"""
+
+    __slots__ = ('RS_Slot', 'RS_Action', 'RS_Wait', 'RS_TimeoutMs')
+
+    def __init__(self, RS_Slot: int = 0, RS_Action: int = 0, RS_Wait: int = 0, RS_TimeoutMs: int = 0):
+        self.RS_Slot = RS_Slot
+        self.RS_Action = RS_Action
+        self.RS_Wait = RS_Wait
+        self.RS_TimeoutMs = RS_TimeoutMs
+
+
+class RouteCmd:
+    """UDT_RouteCmd"""
+
+    __slots__ = ('RC_Cmd', 'RC_StepCount', 'RC_Steps')
+
+    def __init__(self, RC_Cmd: int = 0, steps: List[RouteStep] = None, step_count: int = None):
+        self.RC_Cmd = RC_Cmd
+        self.RC_Steps = list(steps or [])
+        self.RC_StepCount = len(self.RC_Steps) if step_count is None else step_count
+
+
+class RouteFsmState:
+    """UDT_RouteFsmState (+ статичні змінні FB: lastCmd)"""
+
+    __slots__ = ('RF_State', 'RF_ResultCode', 'RF_ActiveStep', 'RF_StepSts', 'RF_AbortLatched')
+
+    def __init__(self):
+        self.RF_State = 0
+        self.RF_ResultCode = 0
+        self.RF_ActiveStep = 0
+        self.RF_StepSts = 0
+        self.RF_AbortLatched = 0
+
+    def as_tuple(self) -> Tuple[int, ...]:
+        return (self.RF_State, self.RF_ResultCode, self.RF_ActiveStep,
+                self.RF_StepSts, self.RF_AbortLatched)
+
+
+class RouteStatus:
+    """UDT_RouteStatus (вихід Sts)"""
+
+    __slots__ = ('RS_State', 'RS_ResultCode', 'RS_ActiveStep', 'RS_StepSts')
+
+    def __init__(self):
+        self.RS_State = 0
+        self.RS_ResultCode = 0
+        self.RS_ActiveStep = 0
+        self.RS_StepSts = 0
+
+
+class RouteFsm:
+    """Екземпляр FB_RouteFSM (RouteIdx 1..12)"""
+
+    __slots__ = ('RouteIdx', 'Fsm', 'Sts', 'lastCmd', 'awake', 'c')
+
+    def __init__(self, route_idx: int, constants):
+        self.RouteIdx = route_idx
+        self.Fsm = RouteFsmState()
+        self.Sts = RouteStatus()
+        self.lastCmd = 0
+        self.awake = True
+        self.c = constants
+
+    def _arb(self, bus, slot, lmg, req_cmd, release_owner, lock_only) -> bool:
+        c = self.c
+        return arbiter_mech(bus, slot, c, lmg, c.OWNER_ROUTE, self.RouteIdx,
+                            req_cmd, 0, release_owner, lock_only)
+
+    def _release_all(self, bus, steps, step_cnt, lmg):
+        for i in range(step_cnt):
+            self._arb(bus, steps[i].RS_Slot, lmg, self.c.CMD_NONE, True, False)
+
+    def scan(self, cmd: RouteCmd, bus: MechBus, global_safety_stop: bool, local_manual_global: bool,
+             summary: Tuple[bool, bool, bool, bool] = None):
+        """summary — (SumAnyFault, SumAnyLocal, SumAllIdle, SumOwnsAny) при UseSummary = TRUE"""
+        c = self.c
+        fsm = self.Fsm
+        lmg = local_manual_global
+        safety_hit = False
+
+        # Edge detection
+        start_edge = cmd.RC_Cmd == c.RT_CMD_START and self.lastCmd != c.RT_CMD_START
+        stop_op_edge = cmd.RC_Cmd == c.RT_CMD_STOP_OP and self.lastCmd != c.RT_CMD_STOP_OP
+        self.lastCmd = cmd.RC_Cmd
+
+        # Normalize step count (0..64)
+        step_cnt = min(max(cmd.RC_StepCount, 0), MAX_STEPS)
+        steps = cmd.RC_Steps
+
+        if fsm.RF_State == 0:
+            fsm.RF_State = c.ROUTE_STS_IDLE
+
+        # anyFault/anyLocal у SCL рахуються завжди, але читаються лише в RUNNING
+        # (чисте читання шини) — тут обчислюються ліниво
+
+        # Global SAFETY STOP (найвищий пріоритет)
+        if global_safety_stop:
+            safety_hit = True
+            if summary is None or summary[3]:
+                self._release_all(bus, steps, step_cnt, lmg)
+            fsm.RF_State = c.ROUTE_STS_ABORTED
+            fsm.RF_ResultCode = c.ROUTE_ABRT_BY_SAFETY
+
+        if not safety_hit:
+            state = fsm.RF_State
+
+            if state == c.ROUTE_STS_IDLE:
+                if start_edge:
+                    fsm.RF_ResultCode = 0
+                    fsm.RF_AbortLatched = 0
+                    fsm.RF_ActiveStep = 0
+                    fsm.RF_StepSts = c.STEP_STS_IDLE
+                    fsm.RF_State = c.ROUTE_STS_VALIDATING
+
+            elif state == c.ROUTE_STS_VALIDATING:
+                if start_edge:
+                    fsm.RF_State = c.ROUTE_STS_REJECTED
+                    fsm.RF_ResultCode = c.ROUTE_REJ_DUPLICATE_START
+                elif step_cnt <= 0:
+                    fsm.RF_State = c.ROUTE_STS_REJECTED
+                    fsm.RF_ResultCode = c.ROUTE_REJ_BY_CONTRACT
+                else:
+                    for i in range(step_cnt):
+                        step = steps[i]
+                        slot = step.RS_Slot
+                        step_ok = step.RS_Action in (c.RS_ACT_START, c.RS_ACT_STOP) and \
+                            step.RS_Wait in (c.RS_WAIT_RUNNING, c.RS_WAIT_STOPPED)
+                        if not step_ok:
+                            fsm.RF_State = c.ROUTE_STS_REJECTED
+                            fsm.RF_ResultCode = c.ROUTE_REJ_BY_CONTRACT
+                            break
+                        elif bus.OwnerCur[slot] != c.OWNER_NONE:
+                            fsm.RF_State = c.ROUTE_STS_REJECTED
+                            fsm.RF_ResultCode = c.ROUTE_REJ_BY_OWNER
+                            break
+                        elif (not bus.Enable_OK[slot]) or bus.LocalManual[slot] or bus.FLTCode[slot] != 0:
+                            fsm.RF_State = c.ROUTE_STS_REJECTED
+                            fsm.RF_ResultCode = c.ROUTE_REJ_NOT_READY
+                            break
+                    if fsm.RF_State == c.ROUTE_STS_VALIDATING:
+                        fsm.RF_State = c.ROUTE_STS_STARTING
+
+            elif state == c.ROUTE_STS_STARTING:
+                # atomic lock-all via arbiter (без EXIT — лочимо всі)
+                lock_ok_all = step_cnt > 0
+                for i in range(step_cnt):
+                    if not self._arb(bus, steps[i].RS_Slot, lmg, c.CMD_NONE, False, True):
+                        lock_ok_all = False
+                if not lock_ok_all:
+                    self._release_all(bus, steps, step_cnt, lmg)
+                    fsm.RF_State = c.ROUTE_STS_REJECTED
+                    fsm.RF_ResultCode = c.ROUTE_REJ_BY_OWNER
+                else:
+                    fsm.RF_State = c.ROUTE_STS_RUNNING
+
+            elif state == c.ROUTE_STS_RUNNING:
+                any_local = False
+                any_fault = False
+                if summary is not None:
+                    any_fault, any_local = summary[0], summary[1]
+                elif not stop_op_edge:
+                    for i in range(step_cnt):
+                        slot = steps[i].RS_Slot
+                        if bus.FLTCode[slot] != 0:
+                            any_fault = True
+                        if lmg or bus.LocalManual[slot]:
+                            any_local = True
+
+                if stop_op_edge:
+                    fsm.RF_AbortLatched = c.ROUTE_ABRT_BY_OPERATOR
+                    fsm.RF_State = c.ROUTE_STS_STOPPING
+                elif any_local:
+                    fsm.RF_AbortLatched = c.ROUTE_ABRT_BY_LOCAL
+                    fsm.RF_State = c.ROUTE_STS_STOPPING
+                elif any_fault:
+                    fsm.RF_AbortLatched = c.ROUTE_ABRT_BY_FAULT
+                    fsm.RF_State = c.ROUTE_STS_STOPPING
+                else:
+                    step_idx = fsm.RF_ActiveStep
+                    if step_idx >= step_cnt:
+                        # DONE -> release owners
+                        if summary is None or summary[3]:
+                            self._release_all(bus, steps, step_cnt, lmg)
+                        fsm.RF_State = c.ROUTE_STS_DONE
+                        fsm.RF_ResultCode = c.ROUTE_DONE_OK
+                    else:
+                        step = steps[step_idx]
+                        slot = step.RS_Slot
+                        req = c.CMD_START if step.RS_Action == c.RS_ACT_START else c.CMD_STOP
+                        if not self._arb(bus, slot, lmg, req, False, False):
+                            # ownership/local змінився під час виконання
+                            fsm.RF_AbortLatched = c.ROUTE_ABRT_BY_OPERATOR
+                            fsm.RF_State = c.ROUTE_STS_STOPPING
+                        else:
+                            fsm.RF_StepSts = c.STEP_STS_WORK
+                            wait = c.STS_RUNNING if step.RS_Wait == c.RS_WAIT_RUNNING else c.STS_IDLE
+                            if bus.Status[slot] == wait:
+                                fsm.RF_ActiveStep = (fsm.RF_ActiveStep + 1) & 0xFF  # USINT
+                                fsm.RF_StepSts = c.STEP_STS_DONE
+
+            elif state == c.ROUTE_STS_STOPPING:
+                # reverse order stop via arbiter
+                for i in range(step_cnt - 1, -1, -1):
+                    self._arb(bus, steps[i].RS_Slot, lmg, c.CMD_STOP, False, False)
+                if summary is not None:
+                    all_stopped = summary[2]
+                else:
+                    all_stopped = True
+                    for i in range(step_cnt):
+                        if bus.Status[steps[i].RS_Slot] != c.STS_IDLE:
+                            all_stopped = False
+                if all_stopped:
+                    if summary is None or summary[3]:
+                        self._release_all(bus, steps, step_cnt, lmg)
+                    fsm.RF_State = c.ROUTE_STS_ABORTED
+                    if fsm.RF_AbortLatched == 0:
+                        fsm.RF_AbortLatched = c.ROUTE_ABRT_BY_OPERATOR
+                    fsm.RF_ResultCode = fsm.RF_AbortLatched
+
+            elif state in (c.ROUTE_STS_DONE, c.ROUTE_STS_REJECTED, c.ROUTE_STS_ABORTED):
+                if cmd.RC_Cmd == c.RT_CMD_NONE:
+                    fsm.RF_State = c.ROUTE_STS_IDLE
+
+            else:
+                fsm.RF_State = c.ROUTE_STS_IDLE
+
+        # Mirror outputs
+        sts = self.Sts
+        sts.RS_State = fsm.RF_State
+        sts.RS_ResultCode = fsm.RF_ResultCode
+        sts.RS_ActiveStep = fsm.RF_ActiveStep
+        sts.RS_StepSts = fsm.RF_StepSts
+
+
+class IdealMechanisms:
+    """Подієва модель механізмів на MechBus (замість FC_DeviceRunner + залізо)
+
+    Спрощений FC_Redler з ідеальним фідбеком (часи як у vplc_mechs.SimplePlant):
+    START -> STARTING -> (start_ms)
+    -> RUNNING, STOP -> STOPPING -> (stop_ms) -> IDLE; Enable/LocalManual,
+    лач FAULT і RESET — як у FC. Обробляються лише слоти, що змінились,
+    та ті, в яких спливає таймер (TIME_TCK з переповненням DINT).
+    """
+
+    def __init__(self, bus: MechBus, clock: VirtualClock, constants,
+                 start_ms: int = 1500, stop_ms: int = 1000):
+        self.bus = bus
+        self.clock = clock
+        self.c = constants
+        self.start_ms = start_ms
+        self.stop_ms = stop_ms
+        self.timer_start = [0] * bus.slots
+        self.timer_len = [0] * bus.slots
+        self._heap = []       # (unwrapped_due, slot)
+        self._unwrapped = 0   # монотонний час для черги таймерів
+
+    def _arm(self, slot: int, length: int):
+        self.timer_start[slot] = self.clock.now
+        self.timer_len[slot] = length
+        heapq.heappush(self._heap, (self._unwrapped + length, slot))
+
+    def _timer_done(self, slot: int) -> bool:
+        return elapsed_ms(self.timer_start[slot], self.clock.now) >= self.timer_len[slot]
+
+    def inject_fault(self, slot: int, code: int):
+        """Аварія заліза: FLTCode + STS_FAULT (як місцеві аварії FC)"""
+        bus = self.bus
+        bus.set('FLTCode', slot, code)
+        bus.set('Status', slot, self.c.STS_FAULT)
+
+    def local_reset(self, slot: int):
+        """Скидання з місцевого поста (RESET без арбітра)"""
+        bus = self.bus
+        bus.set('FLTCode', slot, self.c.FLT_NONE)
+        if bus.Status[slot] == self.c.STS_FAULT:
+            bus.set('Status', slot, self.c.STS_IDLE)
+
+    def step(self):
+        """Один прохід "FC_DeviceRunner" для змінених слотів і слотів з таймером"""
+        bus = self.bus
+        while self._heap and self._heap[0][0] <= self._unwrapped:
+            bus.dirty.add(heapq.heappop(self._heap)[1])
+        pending = bus.dirty
+        bus.dirty = set()
+        for slot in pending:
+            if bus.DeviceType[slot] != self.c.TYPE_NONE:
+                self._eval(slot)
+        self._unwrapped += self.clock.cycle_ms
+
+    def _eval(self, slot: int):
+        c = self.c
+        bus = self.bus
+        cmd = bus.Cmd[slot]
+        st = bus.Status[slot]
+        before = (st, bus.FLTCode[slot], bus.OwnerCur[slot], bus.OwnerCurId[slot], bus.LastCmd[slot])
+
+        if cmd == c.CMD_RESET:
+            bus.FLTCode[slot] = c.FLT_NONE
+            st = c.STS_IDLE
+            bus.LastCmd[slot] = cmd
+        is_fault = st == c.STS_FAULT
+
+        if not bus.Enable_OK[slot] or bus.LocalManual[slot]:
+            st = c.STS_DISABLED if not bus.Enable_OK[slot] else c.STS_LOCAL
+            bus.OwnerCur[slot] = 0
+            bus.OwnerCurId[slot] = 0
+        elif st in (c.STS_DISABLED, c.STS_LOCAL):
+            st = c.STS_IDLE
+        is_blocked = st in (c.STS_DISABLED, c.STS_LOCAL)
+
+        if cmd != c.CMD_NONE:
+            bus.LastCmd[slot] = cmd
+
+        if not is_fault and not is_blocked:
+            if st == c.STS_IDLE:
+                if cmd == c.CMD_START:
+                    st = c.STS_STARTING
+                    self._arm(slot, self.start_ms)
+            elif st == c.STS_STARTING:
+                if self._timer_done(slot):
+                    st = c.STS_RUNNING
+                if cmd == c.CMD_STOP:
+                    st = c.STS_STOPPING
+                    self._arm(slot, self.stop_ms)
+            elif st == c.STS_RUNNING:
+                if cmd == c.CMD_STOP:
+                    st = c.STS_STOPPING
+                    self._arm(slot, self.stop_ms)
+            elif st == c.STS_STOPPING:
+                if self._timer_done(slot):
+                    st = c.STS_IDLE
+            else:
+                st = c.STS_IDLE
+
+        bus.Status[slot] = st
+        if (st, bus.FLTCode[slot], bus.OwnerCur[slot], bus.OwnerCurId[slot], bus.LastCmd[slot]) != before:
+            bus.mark(slot)  # змінився — переоцінити і в наступному скані
+
+
+class RouteSummary:
+    """Порт згенерованого FC_RouteSummary (UDT_RouteSummary)
+
+    Членство слот -> маска маршрутів перебудовується лише при зміні Commit;
+    щоскану — один прохід по SlotList (слоти, що є хоч в одному маршруті).
+    """
+
+    __slots__ = ('c', 'routes', 'last_commit', 'built', 'builds', 'slot_routes', 'slot_list',
+                 'has_steps', 'flags')
+
+    def __init__(self, constants, routes: int = MAX_ROUTES):
+        self.c = constants
+        self.routes = routes
+        self.last_commit = 0
+        self.built = False
+        self.builds = 0
+        self.slot_routes = [0] * SLOTS
+        self.slot_list = []
+        self.has_steps = 0
+        self.flags = [(False, False, True, False)] * routes
+
+    def rebuild(self, cmds: List[RouteCmd]):
+        self.slot_routes = [0] * SLOTS
+        self.slot_list = []
+        self.has_steps = 0
+        for r, cmd in enumerate(cmds):
+            bit = 1 << r
+            count = min(max(cmd.RC_StepCount, 0), MAX_STEPS)
+            if count > 0:
+                self.has_steps |= bit
+            for i in range(count):
+                slot = cmd.RC_Steps[i].RS_Slot
+                if slot < SLOTS:
+                    if not self.slot_routes[slot]:
+                        self.slot_list.append(slot)
+                    self.slot_routes[slot] |= bit
+        self.built = True
+        self.builds += 1
+
+    def compute(self, commit: int, cmds: List[RouteCmd], bus: MechBus, local_manual_global: bool,
+                rebuild: bool = False) -> List[Tuple[bool, bool, bool, bool]]:
+        c = self.c
+        if rebuild or not self.built or self.last_commit != commit:
+            self.rebuild(cmds)
+            self.last_commit = commit
+        fault = local = busy = owned = 0
+        for slot in self.slot_list:
+            m = self.slot_routes[slot]
+            if bus.FLTCode[slot] != 0:
+                fault |= m
+            if bus.LocalManual[slot]:
+                local |= m
+            if bus.Status[slot] != c.STS_IDLE:
+                busy |= m
+            owner_id = bus.OwnerCurId[slot]
+            if bus.OwnerCur[slot] == c.OWNER_ROUTE and 1 <= owner_id <= self.routes:
+                owned |= m & (1 << (owner_id - 1))
+        if local_manual_global:
+            local |= self.has_steps
+        self.flags = [(bool(fault >> r & 1), bool(local >> r & 1), not busy >> r & 1, bool(owned >> r & 1))
+                      for r in range(self.routes)]
+        return self.flags
+
+
+class RouteEngine:
+    """12 екземплярів FB_RouteFSM + модель механізмів на віртуальному годиннику"""
+
+    def __init__(self, bus: MechBus = None, constants=None, routes: int = MAX_ROUTES,
+                 cycle_ms: int = 10, start_ms: int = 0, fast: bool = True,
+                 mechanisms: bool = True, summary: bool = False):
+        self.c = constants or load_constants()
+        self.bus = bus or MechBus.from_udt()
+        self.clock = VirtualClock(start_ms, cycle_ms)
+        self.routes = [RouteFsm(i + 1, self.c) for i in range(routes)]
+        self.cmds = [RouteCmd() for _ in range(routes)]
+        self.global_safety_stop = False
+        self.local_manual_global = False
+        self.fast = fast
+        self.mechanisms = IdealMechanisms(self.bus, self.clock, self.c) if mechanisms else None
+        self.scans = 0
+        self.route_scans = 0  # фактично виконаних FB_RouteFSM (для звіту швидкого шляху)
+        self.commit = 0       # HDR_Commit: +1 при кожній зміні кроків
+        self.summary = RouteSummary(self.c, routes) if summary else None
+
+    # --- входи ---
+    def command(self, route_idx: int, rc_cmd: int, steps: List[RouteStep] = None):
+        """Записати RC_Cmd (і, за потреби, кроки) маршруту route_idx (1..12)"""
+        route = self.routes[route_idx - 1]
+        cmd = self.cmds[route_idx - 1]
+        if steps is not None:
+            self._unwatch(route, cmd)
+            cmd.RC_Steps = list(steps)
+            cmd.RC_StepCount = len(cmd.RC_Steps)
+            self._watch(route, cmd)
+            self.commit += 1
+        cmd.RC_Cmd = rc_cmd
+        route.awake = True
+
+    def set_global(self, safety_stop: bool = None, local_manual_global: bool = None):
+        if safety_stop is not None and safety_stop != self.global_safety_stop:
+            self.global_safety_stop = safety_stop
+            self._wake_all()
+        if local_manual_global is not None and local_manual_global != self.local_manual_global:
+            self.local_manual_global = local_manual_global
+            self._wake_all()
+
+    def _wake_all(self):
+        for route in self.routes:
+            route.awake = True
+
+    def _route_slots(self, cmd: RouteCmd):
+        count = min(max(cmd.RC_StepCount, 0), MAX_STEPS, len(cmd.RC_Steps))
+        return {cmd.RC_Steps[i].RS_Slot for i in range(count)}
+
+    def _watch(self, route: RouteFsm, cmd: RouteCmd):
+        for slot in self._route_slots(cmd):
+            self.bus.watchers[slot] = self.bus.watchers[slot] + (route,)
+
+    def _unwatch(self, route: RouteFsm, cmd: RouteCmd):
+        for slot in self._route_slots(cmd):
+            self.bus.watchers[slot] = tuple(r for r in self.bus.watchers[slot] if r is not route)
+
+    # --- скан ---
+    def scan(self):
+        """FC_RoutesSupervisor (маршрути 1..12) -> FC_DeviceRunner -> TIME_TCK += цикл"""
+        bus = self.bus
+        safety = self.global_safety_stop
+        lmg = self.local_manual_global
+        fast = self.fast
+        flags = (self.summary.compute(self.commit, self.cmds, bus, lmg) if self.summary is not None
+                 else (None,) * len(self.routes))
+        for route, cmd, summary in zip(self.routes, self.cmds, flags):
+            if fast and not route.awake:
+                continue
+            before = (route.lastCmd, route.Fsm.as_tuple())
+            changes = bus.changes
+            route.awake = False
+            route.scan(cmd, bus, safety, lmg, summary)
+            self.route_scans += 1
+            if bus.changes != changes or (route.lastCmd, route.Fsm.as_tuple()) != before:
+                route.awake = True
+        if self.mechanisms is not None:
+            self.mechanisms.step()
+        self.scans += 1
+        self.clock.advance()
+
+    def run(self, scans: int, on_scan=None):
+        for _ in range(scans):
+            if on_scan is not None:
+                on_scan(self)
+            self.scan()
+
+    def snapshot(self) -> tuple:
+        """Повний стан (шина + FSM) для порівняння швидкого шляху з еталоном"""
+        bus = self.bus
+        return (tuple(tuple(getattr(bus, f)) for f in bus.fields),
+                tuple((r.lastCmd, r.Fsm.as_tuple()) for r in self.routes))
+
+
+# ============================================================================
+# Інваріанти контракту (розділ 13.2) та генератор сценаріїв
+# ============================================================================
+def check_invariants(engine: RouteEngine) -> List[Tuple[str, str]]:
+    """Перевірка I1–I7 після скану (= "перед наступним циклом PLC")
+
+    I6 перевіряється лише для маршрутів (DO_Run не входить у базову шину).
+    I7 — для RUNNING/STOPPING і слотів без LocalManual/Enable_OK=0 (FC механізму
+    сам скидає owner у LOCAL/DISABLED); STARTING — стан до атомарного lock.
+    """
+    c = engine.c
+    bus = engine.bus
+    out = []
+    active = (c.ROUTE_STS_STARTING, c.ROUTE_STS_RUNNING, c.ROUTE_STS_STOPPING)
+    route_slots = {}
+    for route, cmd in zip(engine.routes, engine.cmds):
+        if route.Fsm.RF_State in active:
+            route_slots[route.RouteIdx] = engine._route_slots(cmd)
+
+    for slot in bus.mapped(c):
+        owner = bus.OwnerCur[slot]
+        if owner not in (c.OWNER_NONE, c.OWNER_SCADA, c.OWNER_ROUTE):
+            out.append(('I1', f"slot {slot}: OwnerCur={owner}"))
+        if owner == c.OWNER_ROUTE and slot not in route_slots.get(bus.OwnerCurId[slot], ()):
+            out.append(('I2', f"slot {slot}: owner ROUTE {bus.OwnerCurId[slot]} без активного маршруту"))
+        if bus.LocalManual[slot] and (bus.Status[slot] != c.STS_LOCAL or owner != c.OWNER_NONE) \
+                and bus.Enable_OK[slot]:
+            out.append(('I3', f"slot {slot}: LocalManual, Status={bus.Status[slot]}, OwnerCur={owner}"))
+        if not bus.Enable_OK[slot] and (bus.Status[slot] != c.STS_DISABLED or owner != c.OWNER_NONE):
+            out.append(('I4', f"slot {slot}: Enable_OK=0, Status={bus.Status[slot]}, OwnerCur={owner}"))
+        if bus.Status[slot] == c.STS_FAULT and bus.FLTCode[slot] == c.FLT_NONE:
+            out.append(('I5', f"slot {slot}: FAULT без FLTCode"))
+
+    if engine.global_safety_stop:
+        for route in engine.routes:
+            if route.Fsm.RF_State != c.ROUTE_STS_ABORTED or \
+                    route.Fsm.RF_ResultCode != c.ROUTE_ABRT_BY_SAFETY:
+                out.append(('I6', f"route {route.RouteIdx}: State={route.Fsm.RF_State}"))
+
+    for route, cmd in zip(engine.routes, engine.cmds):
+        if route.Fsm.RF_State not in (c.ROUTE_STS_RUNNING, c.ROUTE_STS_STOPPING):
+            continue
+        for slot in engine._route_slots(cmd):
+            if bus.LocalManual[slot] or not bus.Enable_OK[slot] or engine.local_manual_global:
+                continue
+            if bus.OwnerCur[slot] != c.OWNER_ROUTE or bus.OwnerCurId[slot] != route.RouteIdx:
+                out.append(('I7', f"route {route.RouteIdx}: slot {slot} OwnerCur="
+                                  f"{bus.OwnerCur[slot]}/{bus.OwnerCurId[slot]}"))
+    return out
+
+
+class ScenarioDriver:
+    """Випадкові дії оператора/заліза (детерміновано від seed)"""
+
+    def __init__(self, engine: RouteEngine, seed: int = 0, rate: float = 0.05, hazards: bool = True):
+        self.engine = engine
+        self.rng = random.Random(seed)
+        self.rate = rate
+        self.hazards = hazards
+        self.mapped = engine.bus.mapped(engine.c)
+
+    def random_steps(self) -> List[RouteStep]:
+        c = self.engine.c
+        slots = self.rng.sample(self.mapped, self.rng.randint(1, min(6, len(self.mapped))))
+        steps = []
+        for slot in slots:
+            if self.rng.random() < 0.85:
+                steps.append(RouteStep(slot, c.RS_ACT_START, c.RS_WAIT_RUNNING))
+            else:
+                steps.append(RouteStep(slot, c.RS_ACT_STOP, c.RS_WAIT_STOPPED))
+        if self.rng.random() < 0.5:
+            # "імпульсний" маршрут: зупинити запущені у зворотному порядку -> DONE в IDLE
+            steps += [RouteStep(s.RS_Slot, c.RS_ACT_STOP, c.RS_WAIT_STOPPED)
+                      for s in reversed(steps) if s.RS_Action == c.RS_ACT_START]
+        if self.rng.random() < 0.02:
+            steps[0].RS_Wait = 9  # порушення контракту
+        return steps
+
+    def __call__(self, engine: RouteEngine):
+        rng = self.rng
+        c = engine.c
+        if rng.random() >= self.rate:
+            return
+        roll = rng.random()
+        route_idx = rng.randint(1, len(engine.routes))
+        route = engine.routes[route_idx - 1]
+        state = route.Fsm.RF_State
+        if roll < 0.55:
+            if state == c.ROUTE_STS_IDLE:
+                engine.command(route_idx, c.RT_CMD_START, self.random_steps())
+            elif state in (c.ROUTE_STS_DONE, c.ROUTE_STS_REJECTED, c.ROUTE_STS_ABORTED):
+                engine.command(route_idx, c.RT_CMD_NONE)
+            elif state == c.ROUTE_STS_RUNNING and rng.random() < 0.3:
+                engine.command(route_idx, c.RT_CMD_STOP_OP)
+            elif rng.random() < 0.05:
+                engine.command(route_idx, c.RT_CMD_NONE)  # повторний START -> дубль
+        elif roll < 0.75:
+            # SCADA manual через арбітр
+            slot = rng.choice(self.mapped)
+            req = rng.choice((c.CMD_START, c.CMD_STOP, c.CMD_NONE))
+            arbiter_mech(engine.bus, slot, c, engine.local_manual_global, c.OWNER_SCADA, 0,
+                         req, 0, req == c.CMD_NONE, False)
+        elif self.hazards:
+            slot = rng.choice(self.mapped)
+            bus = engine.bus
+            mech = engine.mechanisms
+            kind = rng.random()
+            if kind < 0.3:
+                mech.inject_fault(slot, c.FLT_BREAKER)
+            elif kind < 0.6:
+                mech.local_reset(slot)
+            elif kind < 0.75:
+                bus.set('LocalManual', slot, not bus.LocalManual[slot])
+            elif kind < 0.9:
+                bus.set('Enable_OK', slot, not bus.Enable_OK[slot])
+            elif kind < 0.95:
+                engine.set_global(safety_stop=not engine.global_safety_stop)
+            else:
+                engine.set_global(local_manual_global=not engine.local_manual_global)
+
+
+def make_engine(fast: bool = True, start_ms: int = 0, **kwargs) -> RouteEngine:
+    """Рушій з повністю змапленою шиною (256 слотів, типи по колу) у робочому стані"""
+    c = load_constants()
+    bus = MechBus.from_udt()
+    types = (c.TYPE_REDLER, c.TYPE_NORIA, c.TYPE_GATE2P, c.TYPE_FAN)
+    counters = [0] * len(types)
+    for slot in range(bus.slots):
+        k = slot % len(types)
+        bus.DeviceType[slot] = types[k]
+        bus.TypedIndex[slot] = counters[k]
+        counters[k] += 1
+        bus.Enable_OK[slot] = True
+    return RouteEngine(bus, c, fast=fast, start_ms=start_ms, **kwargs)
+
+
+def property_test(scans: int, seed: int = 0, start_ms: int = DINT_MAX - 60_000,
+                  check_every: int = 1, summary: bool = False) -> Dict[str, object]:
+    """Швидкий шлях (за потреби — з RouteSummary) == еталон (побітно) + порушення I1–I7"""
+    fast = make_engine(fast=True, start_ms=start_ms, summary=summary)
+    ref = make_engine(fast=False, start_ms=start_ms)
+    drive_fast = ScenarioDriver(fast, seed)
+    drive_ref = ScenarioDriver(ref, seed)
+    violations = {}
+    examples = {}
+    for n in range(scans):
+        drive_fast(fast)
+        drive_ref(ref)
+        fast.scan()
+        ref.scan()
+        if n % check_every == 0:
+            if fast.snapshot() != ref.snapshot():
+                return {'scans': n + 1, 'equivalent': False, 'violations': violations,
+                        'examples': examples}
+            seen = set()
+            for code, detail in check_invariants(fast):
+                if code not in seen:
+                    seen.add(code)
+                    violations[code] = violations.get(code, 0) + 1
+                examples.setdefault(code, f"скан {n}: {detail}")
+    return {'scans': scans, 'equivalent': True, 'violations': violations, 'examples': examples,
+            'route_scans_fast': fast.route_scans, 'route_scans_ref': ref.route_scans}
+
+
+class CyclicDriver:
+    """Навантаження для заміру: кожен маршрут циклічно START -> DONE -> NONE -> START
+
+    Маршрут i володіє власними слотами і запускає їх по черзі, а потім зупиняє у
+    зворотному порядку — у DONE всі слоти в IDLE, тож ReleaseOwner проходить.
+    """
+
+    def __init__(self, engine: RouteEngine, slots_per_route: int = 4):
+        c = engine.c
+        self.c = c
+        mapped = engine.bus.mapped(c)
+        self.plans = []
+        for k in range(len(engine.routes)):
+            slots = mapped[k * slots_per_route:(k + 1) * slots_per_route]
+            steps = [RouteStep(s, c.RS_ACT_START, c.RS_WAIT_RUNNING) for s in slots]
+            steps += [RouteStep(s, c.RS_ACT_STOP, c.RS_WAIT_STOPPED) for s in reversed(slots)]
+            self.plans.append(steps)
+        self.cycles = 0
+
+    def __call__(self, engine: RouteEngine):
+        c = self.c
+        for route, cmd in zip(engine.routes, engine.cmds):
+            if not route.awake:
+                continue  # стан не змінювався з минулого скану
+            state = route.Fsm.RF_State
+            if state == c.ROUTE_STS_IDLE:
+                if cmd.RC_Cmd != c.RT_CMD_START:
+                    engine.command(route.RouteIdx, c.RT_CMD_START, self.plans[route.RouteIdx - 1])
+            elif state >= c.ROUTE_STS_DONE and cmd.RC_Cmd != c.RT_CMD_NONE:
+                engine.command(route.RouteIdx, c.RT_CMD_NONE)
+                self.cycles += 1
+
+
+def bench(scans: int, fast: bool = True) -> Dict[str, float]:
+    """Пропускна здатність: 12 маршрутів циклічно START -> DONE -> NONE -> ..."""
+    engine = make_engine(fast=fast)
+    driver = CyclicDriver(engine)
+    started = time.perf_counter()
+    engine.run(scans, on_scan=driver)
+    seconds = time.perf_counter() - started
+    return {
+        'scans': scans,
+        'seconds': round(seconds, 3),
+        'scans_per_second': round(scans / seconds, 1) if seconds else 0.0,
+        'route_scans': engine.route_scans,
+        'route_cycles': driver.cycles,
+        'simulated_hours': round(scans * engine.clock.cycle_ms / 3_600_000, 3),
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Віртуальний PLC маршрутів (FB_RouteFSM + FC_ArbiterMech)")
+    parser.add_argument('--bench', type=int, default=0, help="скільки сканів для заміру швидкості")
+    parser.add_argument('--property', type=int, default=0,
+                        help="скільки сканів випадкового сценарію з перевіркою інваріантів")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--summary', action='store_true',
+                        help="швидкий шлях з FC_RouteSummary (UseSummary := TRUE) у --property")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    if not args.bench and not args.property:
+        args.bench = 100000
+
+    if args.bench:
+        for fast in (True, False):
+            m = bench(args.bench, fast=fast)
+            mode = 'швидкий шлях' if fast else 'еталон'
+            print(f"⏱️  {mode}: {m['scans']} сканів × 12 маршрутів за {m['seconds']} с — "
+                  f"{m['scans_per_second']:.0f} сканів/с "
+                  f"(виконано FB_RouteFSM: {m['route_scans']}, завершених маршрутів: {m['route_cycles']}, "
+                  f"≈ {m['simulated_hours']} год PLC)")
+
+    status = 0
+    if args.property:
+        r = property_test(args.property, seed=args.seed, summary=args.summary)
+        mode = 'швидкий шлях + RouteSummary' if args.summary else 'швидкий шлях'
+        if not r['equivalent']:
+            print(f"❌ {mode} розійшовся з еталоном на скані {r['scans']}")
+            return 1
+        print(f"✅ {r['scans']} сканів: {mode} == еталон "
+              f"(FB_RouteFSM: {r['route_scans_fast']} проти {r['route_scans_ref']})")
+        if r['violations']:
+            print("⚠️  Порушення інваріантів контракту 13.2 (сканів з порушенням):")
+            for code in sorted(r['violations']):
+                print(f"   - {code}: {r['violations'][code]}  напр. {r['examples'][code]}")
+            status = 1
+        else:
+            print("✅ Інваріанти I1–I7 не порушено")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
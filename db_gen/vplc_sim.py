@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""
+Симулятор заліза з аваріями (порт FB_SimRedler) для всіх типів механізмів
+
+Семантика FB_SimRedler, векторно для кожного масиву DB_Mechs:
+- фронт 0->1 DO_Run: MotorStartTck = FaultStartTck = TIME_TCK, розгін
+- фронт 1->0: MotorStopTck, вибіг
+- фідбек (DI_Speed_OK / DI_Feedback_OK): FALSE -> TRUE через StartupTime_ms,
+  TRUE -> FALSE через StopTime_ms після зняття DO_Run
+- SimFault_<X>: через FaultTime_<X>_ms від пуску (лише поки мотор працює)
+  аварія латчується; DI_<X>_OK := NOT <X>_Tripped. CMD_RESET латч не скидає —
+  лише repair() ("ремонт": SimFault := FALSE і скидання латча)
+
+Аварії за типами:
+- Redler: Breaker, Overflow, Speed (втрата тахо-сигналу)
+- Noria:  Breaker, Alingment, Speed
+- Fan:    Breaker, Feedback (втрата зворотного зв'язку)
+- Gate:   Breaker, Jam (засувку заклинило — кінцевик не досягається);
+  хід між кінцевиками — StartupTime_ms, пуск — фронт DO_Open/DO_Close
+
+Порядок як в OB1: step() перед FC_DeviceRunner (інтерфейс SimplePlant).
+"""
+
+from typing import Dict, Optional
+
+import numpy as np
+
+from vplc_core import time_elapsed
+
+DEFAULT_STARTUP_MS = 5000   # StartupTime_ms за замовчуванням FB_SimRedler
+DEFAULT_STOP_MS = 2000      # StopTime_ms
+
+# масив -> (DI фідбеку мотора або None для засувки, аварія -> поле DI або None)
+SIM_PROFILES = {
+    'Redler': ('DI_Speed_OK', {'Breaker': 'DI_Breaker_OK', 'Overflow': 'DI_Overflow_OK',
+                               'Speed': None}),
+    'Noria': ('DI_Speed_OK', {'Breaker': 'DI_Breaker_OK', 'Alingment': 'DI_Alingment_OK',
+                              'Speed': None}),
+    'Fan': ('DI_Feedback_OK', {'Breaker': 'DI_Breaker_OK', 'Feedback': None}),
+    'Gate': (None, {'Breaker': 'DI_Breaker_OK', 'Jam': None}),
+}
+# аварії без власного DI: гасять фідбек мотора / зупиняють хід засувки
+FEEDBACK_FAULTS = ('Speed', 'Feedback', 'Jam')
+
+
+class SimHardware:
+    """Екземпляри FB_Sim* для всіх змаплених механізмів VirtualPlc"""
+
+    def __init__(self, plc, startup_ms: int = DEFAULT_STARTUP_MS, stop_ms: int = DEFAULT_STOP_MS):
+        self.plc = plc
+        self.state = {}
+        for array, (_, faults) in SIM_PROFILES.items():
+            n = len(next(iter(plc.typed[array].values())))
+            self.state[array] = {
+                'StartupTime_ms': np.full(n, startup_ms, dtype=np.int64),
+                'StopTime_ms': np.full(n, stop_ms, dtype=np.int64),
+                'LastDO': np.zeros(n, dtype=np.bool_),
+                'MotorStartTck': np.zeros(n, dtype=np.int64),
+                'MotorStopTck': np.zeros(n, dtype=np.int64),
+                'FaultStartTck': np.zeros(n, dtype=np.int64),
+                'IsMotorRunning': np.zeros(n, dtype=np.bool_),
+                'IsSpinningUp': np.zeros(n, dtype=np.bool_),
+                'IsSpinningDown': np.zeros(n, dtype=np.bool_),
+                'Position': np.zeros(n, dtype=np.int64),     # засувка: мс ходу від "закрита"
+                'SimFault': {k: np.zeros(n, dtype=np.bool_) for k in faults},
+                'FaultTime': {k: np.zeros(n, dtype=np.int64) for k in faults},
+                'Tripped': {k: np.zeros(n, dtype=np.bool_) for k in faults},
+                'TripTck': {k: np.full(n, -1, dtype=np.int64) for k in faults},
+            }
+
+    def configure(self, array: str, idx: int, startup_ms: Optional[int] = None,
+                  stop_ms: Optional[int] = None, **faults: int):
+        """Входи FB: StartupTime_ms / StopTime_ms і SimFault_<X> := TRUE з FaultTime_<X>_ms"""
+        s = self.state[array]
+        if startup_ms is not None:
+            s['StartupTime_ms'][idx] = startup_ms
+        if stop_ms is not None:
+            s['StopTime_ms'][idx] = stop_ms
+        for kind, fault_ms in faults.items():
+            if kind not in s['SimFault']:
+                raise ValueError(f"❌ {array}: невідома аварія {kind} "
+                                 f"(є {', '.join(s['SimFault'])})")
+            s['SimFault'][kind][idx] = True
+            s['FaultTime'][kind][idx] = fault_ms
+
+    def repair(self, array: str, idx: int):
+        """Ремонт: SimFault_* := FALSE, латчі скинуто"""
+        s = self.state[array]
+        for kind in s['SimFault']:
+            s['SimFault'][kind][idx] = False
+            s['Tripped'][kind][idx] = False
+
+    def tripped(self, array: str) -> np.ndarray:
+        """Механізми масиву з хоча б однією латчованою аварією"""
+        trips = self.state[array]['Tripped'].values()
+        return np.logical_or.reduce(list(trips))
+
+    def step(self):
+        now = self.plc.clock.now
+        for array, (feedback, faults) in SIM_PROFILES.items():
+            t = self.plc.typed[array]
+            if not len(next(iter(t.values()))):
+                continue
+            s = self.state[array]
+            if feedback is None:
+                drive = t['DO_Open'] | t['DO_Close']
+            else:
+                drive = t['DO_Run']
+
+            # PHASE 1: фронти DO_Run
+            rise = drive & ~s['LastDO']
+            fall = ~drive & s['LastDO']
+            s['MotorStartTck'][rise] = now
+            s['FaultStartTck'][rise] = now
+            s['MotorStopTck'][fall] = now
+            s['IsMotorRunning'][rise] = True
+            s['IsMotorRunning'][fall] = False
+            s['IsSpinningUp'][:] = (s['IsSpinningUp'] | rise) & ~fall
+            s['IsSpinningDown'][:] = (s['IsSpinningDown'] & ~rise) | fall
+            s['LastDO'][:] = drive
+
+            # PHASE 3/4: латчовані аварії від FaultStartTck, поки мотор працює
+            since_start = time_elapsed(s['FaultStartTck'], now)
+            for kind in faults:
+                check = s['SimFault'][kind] & s['IsMotorRunning'] & ~s['Tripped'][kind]
+                hit = check & (since_start >= s['FaultTime'][kind])
+                s['Tripped'][kind] |= hit
+                s['TripTck'][kind][hit] = now
+            for kind, field in faults.items():
+                if field is not None:
+                    t[field][:] = ~s['Tripped'][kind]
+
+            # PHASE 2: фізика
+            if feedback is None:
+                self._gate(t, s, now)
+            else:
+                self._motor(t[feedback], s, now, faults)
+
+    def _motor(self, out: np.ndarray, s: Dict, now: int, faults):
+        up = s['IsSpinningUp'].copy()
+        down = s['IsSpinningDown'].copy() & ~up
+        up_done = up & (time_elapsed(s['MotorStartTck'], now) >= s['StartupTime_ms'])
+        down_done = down & (time_elapsed(s['MotorStopTck'], now) >= s['StopTime_ms'])
+        steady = ~up & ~down & s['IsMotorRunning']
+        out[:] = up_done | (down & ~down_done) | steady
+        s['IsSpinningUp'][up_done] = False
+        s['IsSpinningDown'][down_done] = False
+        for kind in FEEDBACK_FAULTS:
+            if kind in faults:
+                out &= ~s['Tripped'][kind]
+
+    def _gate(self, t: Dict, s: Dict, now: int):
+        dt = self.plc.clock.cycle_ms
+        travel = s['StartupTime_ms']
+        moving = ~s['Tripped']['Jam']
+        pos = s['Position']
+        pos += np.where(t['DO_Open'] & moving, dt, 0) - np.where(t['DO_Close'] & moving, dt, 0)
+        np.clip(pos, 0, travel, out=pos)
+        t['DI_Opened_OK'][:] = pos >= travel
+        t['DI_Closed_OK'][:] = pos <= 0
@@ -0,0 +1,664 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Колонковий трейс HAL I/O та стану механізмів (numpy.memmap) і його відтворення
+
+Кожен скан записує рядок:
+- TIME_TCK скану
+- DI — біти DI_*_OK усіх змаплених механізмів (Redler/Noria/Gate/Fan,
+  порядок полів UDT, у масиві — порядок TypedIndex), np.packbits
+- DO — біти DO_* так само
+- BITS — Enable_OK, LocalManual слотів (вхід FC, бітами)
+- Cmd / CmdParam1 / Force_Code — вхід FC від арбітра/SCADA
+- Status / FLTCode / OwnerCur — результат UDT_BaseMechanism
+Колонки per-slot — лише змаплені слоти (порядок номерів слотів).
+
+Формат файлу .vtrace:
+    [magic 8 | кількість сканів u64 | довжина заголовка u64 | JSON заголовка]
+    -> вирівнювання до 4096 -> блоки по chunk сканів
+Блок — структура з колонок (кожна колонка суцільна всередині блоку), тож
+скан k — блок k // chunk, рядок k % chunk: довільний доступ без читання
+попередніх блоків, сторінки підтягує ОС (memmap). Лічильник сканів
+оновлюється після кожного блоку — обірваний запис читається до останнього
+повного блоку.
+
+Відтворення: дані DI/команд подаються у VirtualPlc (Python-модель FC_*),
+після scan() DO_*/Status/FLTCode/OwnerCur порівнюються з записаними.
+Запис з PLC на пусконалагодженні — ті самі SoA plc.mechs/plc.typed,
+заповнені з образів DB_Mechs (db_layout.DbLayout.view).
+Трейс, записаний VirtualPlc, при відтворенні тією ж моделлю і тими ж
+константами збігається за побудовою — це лише перевірка формату. Розбіжності
+з'являються, коли модель інша: трейс з PLC, змінений код FC_* у vplc_mechs
+або інші константи (replay --constants змінений_Constant.xlsx або
+--set TimeoutMs_Gate_Move=3000).
+
+Використання:
+    python vplc_trace.py record soak.vtrace --synthetic 256 --plant --scans 1000000
+    python vplc_trace.py info soak.vtrace
+    python vplc_trace.py show soak.vtrace --scan 500000 --slot 12
+    python vplc_trace.py replay soak.vtrace --start 400000 --stop 500000
+    python vplc_trace.py replay soak.vtrace --constants Constant_new.xlsx
+    python vplc_trace.py replay soak.vtrace --set TimeoutMs_Gate_Move=3000
+"""
+
+import sys
+import json
+import time
+import struct
+import argparse
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from mech_types import load_registry
+from vplc_core import REPO_DIR, field_dtype, load_constants, load_udt_fields
+from vplc_mechs import SimplePlant, VirtualPlc, soak
+
+TRACE_MAGIC = b'VPLCTRC1'
+TRACE_VERSION = 1
+DEFAULT_CHUNK_SCANS = 4096
+HEADER_ALIGN = 4096
+_PREFIX = struct.Struct('<8sQQ')   # magic, кількість сканів, довжина JSON
+_SCANS_OFFSET = 8                  # зміщення лічильника сканів у префіксі
+
+TICK_COLUMN = 'TIME_TCK'
+BIT_GROUPS = ('DI', 'DO', 'BITS')
+BASE_BITS = ('Enable_OK', 'LocalManual')
+BASE_INPUTS = ('Cmd', 'CmdParam1', 'Force_Code')
+BASE_OUTPUTS = ('Status', 'FLTCode', 'OwnerCur')
+CHECKED = ('DO',) + BASE_OUTPUTS   # що порівнює відтворення
+
+
+def _align(size: int) -> int:
+    return (size + HEADER_ALIGN - 1) // HEADER_ALIGN * HEADER_ALIGN
+
+
+class TraceSchema:
+    """Колонки трейсу: мапінг слотів і розкладка бітових груп"""
+
+    def __init__(self, arrays: Dict[str, Tuple[List[int], List[int]]], typed_sizes: Dict[str, int],
+                 segments: Dict[str, List[Tuple[str, str, int, int]]], base_types: Dict[str, str],
+                 chunk: int):
+        self.arrays = arrays            # масив -> (слоти, TypedIndex), порядок TypedIndex
+        self.typed_sizes = typed_sizes
+        self.segments = segments        # група -> [(масив, поле, перший біт, кількість)]
+        self.base_types = base_types    # поле base -> dtype ('<u2')
+        self.chunk = chunk
+        self.slots = np.array(sorted(s for slots, _ in arrays.values() for s in slots), dtype=np.intp)
+        self.bits = {group: sum(seg[3] for seg in segs) for group, segs in segments.items()}
+        self._position = {int(s): i for i, s in enumerate(self.slots)}
+        self._locate = {f"{array}.{member}" if array else member: (group, start, count)
+                        for group, segs in segments.items()
+                        for array, member, start, count in segs}
+        self.dtype = np.dtype([(TICK_COLUMN, '<i4', (chunk,))] +
+                              [(group, 'u1', (chunk, max(1, (self.bits[group] + 7) // 8)))
+                               for group in BIT_GROUPS] +
+                              [(name, base_types[name], (chunk, max(1, self.slots.size)))
+                               for name in BASE_INPUTS + BASE_OUTPUTS])
+
+    @classmethod
+    def from_plc(cls, plc: VirtualPlc, chunk: int = DEFAULT_CHUNK_SCANS, udt_dir=None) -> 'TraceSchema':
+        registry = load_registry(udt_dir or REPO_DIR)
+        base = {f.name: f for f in load_udt_fields(udt_dir)['UDT_BaseMechanism']}
+        arrays = {array: (plc.slots[array].tolist(), plc.index[array].tolist()) for array in plc.slots}
+        segments = {group: [] for group in BIT_GROUPS}
+        for desc in registry.values():
+            count = len(arrays[desc.array][0])
+            if not count:
+                continue
+            for signal in desc.signals:
+                group = segments['DI' if signal.is_input else 'DO']
+                start = sum(seg[3] for seg in group)
+                group.append((desc.array, signal.member, start, count))
+        n = sum(len(slots) for slots, _ in arrays.values())
+        segments['BITS'] = [('', name, i * n, n) for i, name in enumerate(BASE_BITS)]
+        base_types = {name: np.dtype(field_dtype(base[name])).newbyteorder('<').str
+                      for name in BASE_INPUTS + BASE_OUTPUTS}
+        typed_sizes = {array: len(next(iter(fields.values()))) for array, fields in plc.typed.items()}
+        return cls(arrays, typed_sizes, segments, base_types, chunk)
+
+    @classmethod
+    def from_header(cls, header: dict) -> 'TraceSchema':
+        return cls({a: (v['slots'], v['index']) for a, v in header['arrays'].items()},
+                   header['typed_sizes'],
+                   {g: [tuple(seg) for seg in segs] for g, segs in header['segments'].items()},
+                   header['base_types'], header['chunk'])
+
+    def header(self, **meta) -> dict:
+        return dict({
+            'format': 'vplc-trace',
+            'version': TRACE_VERSION,
+            'chunk': self.chunk,
+            'arrays': {a: {'slots': s, 'index': i} for a, (s, i) in self.arrays.items()},
+            'typed_sizes': self.typed_sizes,
+            'segments': self.segments,
+            'base_types': self.base_types,
+        }, **meta)
+
+    @property
+    def mapping(self) -> Dict[int, Tuple[str, int]]:
+        return {slot: (array, idx) for array, (slots, index) in self.arrays.items()
+                for slot, idx in zip(slots, index)}
+
+    @property
+    def row_bytes(self) -> int:
+        return self.dtype.itemsize // self.chunk
+
+    def position(self, slot: int) -> int:
+        """Номер колонки слота у per-slot колонках"""
+        if slot not in self._position:
+            raise ValueError(f"❌ Слот {slot} не змаплений у трейсі")
+        return self._position[slot]
+
+    def locate(self, key: str) -> Tuple[str, int, int]:
+        """'Redler.DO_Run' / 'Enable_OK' -> (група, перший біт, кількість)"""
+        if key not in self._locate:
+            raise ValueError(f"❌ Сигнал {key} відсутній у трейсі")
+        return self._locate[key]
+
+    def slot_bits(self, slot: int) -> Dict[str, Tuple[str, int]]:
+        """Біти одного слота: ім'я поля -> (група, номер біта)"""
+        out = {}
+        for group, segs in self.segments.items():
+            for array, member, start, count in segs:
+                if array:
+                    slots = self.arrays[array][0]
+                    if slot in slots:
+                        out[member] = (group, start + slots.index(slot))
+                else:
+                    out[member] = (group, start + self.position(slot))
+        return out
+
+    def bind(self, plc: VirtualPlc) -> Dict[str, List[Tuple[np.ndarray, np.ndarray]]]:
+        """Група -> [(масив поля plc, індекси)] у порядку бітів"""
+        sources = {}
+        for group, segs in self.segments.items():
+            sources[group] = []
+            for array, member, _, _ in segs:
+                if array:
+                    sources[group].append((plc.typed[array][member], plc.index[array]))
+                else:
+                    sources[group].append((plc.mechs[member], self.slots))
+        return sources
+
+
+def _gather(sources) -> np.ndarray:
+    if not sources:
+        return np.zeros(0, dtype=np.bool_)
+    return np.concatenate([arr[idx] for arr, idx in sources])
+
+
+def _scatter(sources, bits: np.ndarray):
+    pos = 0
+    for arr, idx in sources:
+        arr[idx] = bits[pos:pos + idx.size]
+        pos += idx.size
+
+
+# ============================================================================
+# Запис
+# ============================================================================
+class TraceWriter:
+    """Запис трейсу зі стану VirtualPlc блоками по chunk сканів"""
+
+    def __init__(self, path, plc: VirtualPlc, chunk: int = DEFAULT_CHUNK_SCANS, udt_dir=None,
+                 source: str = ''):
+        self.path = Path(path)
+        self.plc = plc
+        self.schema = TraceSchema.from_plc(plc, chunk, udt_dir)
+        header = self.schema.header(cycle_ms=plc.clock.cycle_ms, source=source,
+                                    created=datetime.now().isoformat(timespec='seconds'))
+        blob = json.dumps(header, ensure_ascii=False).encode('utf-8')
+        self.data_offset = _align(_PREFIX.size + len(blob))
+        self._file = open(self.path, 'wb')
+        self._file.write(_PREFIX.pack(TRACE_MAGIC, 0, len(blob)) + blob)
+        self._file.write(b'\0' * (self.data_offset - self._file.tell()))
+        self._sources = self.schema.bind(plc)
+        self._buffer = np.zeros(1, dtype=self.schema.dtype)
+        self._columns = {name: self._buffer[name][0] for name in self.schema.dtype.names}
+        self._row = 0
+        self.scans = 0
+
+    def record(self, tick: int):
+        """Рядок з поточного стану plc (після scan()); tick — TIME_TCK цього скану"""
+        r, cols, slots = self._row, self._columns, self.schema.slots
+        cols[TICK_COLUMN][r] = tick
+        for group in BIT_GROUPS:
+            packed = np.packbits(_gather(self._sources[group]))
+            cols[group][r, :packed.size] = packed
+        for name in BASE_INPUTS + BASE_OUTPUTS:
+            cols[name][r, :slots.size] = self.plc.mechs[name][slots]
+        self._row += 1
+        self.scans += 1
+        if self._row == self.schema.chunk:
+            self._flush()
+
+    def _flush(self):
+        if not self._row:
+            return
+        self._file.write(self._buffer.tobytes())
+        end = self._file.tell()
+        self._file.seek(_SCANS_OFFSET)
+        self._file.write(struct.pack('<Q', self.scans))
+        self._file.seek(end)
+        self._file.flush()
+        self._buffer[...] = 0   # хвіст неповного блоку — нулі
+        self._row = 0
+
+    def close(self):
+        if self._file.closed:
+            return
+        self._flush()
+        self._file.close()
+
+    def __enter__(self) -> 'TraceWriter':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ============================================================================
+# Читання
+# ============================================================================
+class TraceReader:
+    """Трейс через numpy.memmap: у пам'ять потрапляють лише прочитані діапазони"""
+
+    def __init__(self, path, writable: bool = False):
+        self.path = Path(path)
+        try:
+            with open(self.path, 'rb') as f:
+                prefix = f.read(_PREFIX.size)
+                if len(prefix) < _PREFIX.size or prefix[:8] != TRACE_MAGIC:
+                    raise ValueError(f"❌ {self.path}: не трейс VirtualPlc")
+                _, self.scans, length = _PREFIX.unpack(prefix)
+                self.header = json.loads(f.read(length).decode('utf-8'))
+            size = self.path.stat().st_size
+        except OSError as e:
+            raise ValueError(f"❌ {self.path}: не вдалося прочитати трейс ({e.strerror or e})") from e
+        except (UnicodeDecodeError, json.JSONDecodeError) as e:
+            raise ValueError(f"❌ {self.path}: пошкоджений заголовок трейсу ({e})") from e
+        if not isinstance(self.header, dict) or self.header.get('version') != TRACE_VERSION:
+            version = self.header.get('version') if isinstance(self.header, dict) else None
+            raise ValueError(f"❌ {self.path}: версія трейсу {version} "
+                             f"(підтримується {TRACE_VERSION})")
+        try:
+            self.schema = TraceSchema.from_header(self.header)
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"❌ {self.path}: пошкоджений заголовок трейсу ({e!r})") from e
+        self.cycle_ms = self.header.get('cycle_ms', 10)
+        data_offset = _align(_PREFIX.size + length)
+        chunks = -(-self.scans // self.schema.chunk)
+        if data_offset + chunks * self.schema.dtype.itemsize > size:
+            raise ValueError(f"❌ {self.path}: трейс обрізаний — заголовок обіцяє {self.scans} "
+                             f"сканів, у файлі {size} Б")
+        if chunks:
+            self._mm = np.memmap(self.path, dtype=self.schema.dtype, mode='r+' if writable else 'r',
+                                 offset=data_offset, shape=(chunks,))
+        else:
+            self._mm = np.zeros(0, dtype=self.schema.dtype)
+
+    def __len__(self) -> int:
+        return self.scans
+
+    def _range(self, start: int, stop: Optional[int]) -> Tuple[int, int]:
+        stop = self.scans if stop is None else min(stop, self.scans)
+        start = max(0, start)
+        if start > stop:
+            raise ValueError(f"❌ Порожній діапазон сканів {start}..{stop}")
+        return start, stop
+
+    def blocks(self, columns, start: int = 0, stop: Optional[int] = None
+               ) -> Iterator[Tuple[int, Dict[str, np.ndarray]]]:
+        """(перший скан, {колонка: рядки}) по блоках — види memmap без копій"""
+        start, stop = self._range(start, stop)
+        chunk = self.schema.chunk
+        while start < stop:
+            k, lo = divmod(start, chunk)
+            hi = min(chunk, lo + stop - start)
+            yield start, {name: self._mm[name][k, lo:hi] for name in columns}
+            start += hi - lo
+
+    def column(self, name: str, start: int = 0, stop: Optional[int] = None) -> np.ndarray:
+        """Сирі значення колонки (бітові групи — упаковані байти)"""
+        parts = [block[name] for _, block in self.blocks((name,), start, stop)]
+        if not parts:
+            return np.zeros((0,) + self._mm.dtype[name].shape[1:], dtype=self._mm.dtype[name].base)
+        return np.concatenate(parts)
+
+    def values(self, key: str, start: int = 0, stop: Optional[int] = None) -> np.ndarray:
+        """Значення сигналу за діапазон сканів
+
+        'TIME_TCK' -> (скани,); 'Status' -> (скани, слоти); 'Redler.DO_Run',
+        'Enable_OK' -> (скани, механізми) bool
+        """
+        if key == TICK_COLUMN:
+            return self.column(key, start, stop)
+        if key in self.schema.base_types:
+            return self.column(key, start, stop)[:, :self.schema.slots.size]
+        group, first, count = self.schema.locate(key)
+        lo, hi = first // 8, (first + count + 7) // 8   # лише байти цього сигналу
+        packed = self.column(group, start, stop)[:, lo:hi]
+        bits = np.unpackbits(packed, axis=1).astype(np.bool_)
+        return bits[:, first - lo * 8:first - lo * 8 + count]
+
+    def slot_series(self, slot: int, start: int = 0, stop: Optional[int] = None
+                    ) -> Dict[str, np.ndarray]:
+        """Усі записані поля одного слота за діапазон сканів"""
+        pos = self.schema.position(slot)
+        out = {TICK_COLUMN: self.column(TICK_COLUMN, start, stop)}
+        for name in BASE_INPUTS + BASE_OUTPUTS:
+            out[name] = self.column(name, start, stop)[:, pos]
+        packed = {}
+        for member, (group, bit) in self.schema.slot_bits(slot).items():
+            if group not in packed:
+                packed[group] = self.column(group, start, stop)
+            out[member] = (packed[group][:, bit // 8] >> (7 - bit % 8)) & 1 == 1
+        return out
+
+    def scan(self, k: int) -> Dict[str, object]:
+        """Стан усіх колонок одного скану (біти розпаковані)"""
+        if not 0 <= k < self.scans:
+            raise ValueError(f"❌ Скан {k} поза трейсом (0..{self.scans - 1})")
+        chunk_no, row = divmod(k, self.schema.chunk)
+        out = {TICK_COLUMN: int(self._mm[TICK_COLUMN][chunk_no, row])}
+        for group in BIT_GROUPS:
+            out[group] = np.unpackbits(self._mm[group][chunk_no, row])[:self.schema.bits[group]] \
+                .astype(np.bool_)
+        for name in BASE_INPUTS + BASE_OUTPUTS:
+            out[name] = np.array(self._mm[name][chunk_no, row, :self.schema.slots.size])
+        return out
+
+    def close(self):
+        if isinstance(self._mm, np.memmap):
+            self._mm._mmap.close()
+        self._mm = np.zeros(0, dtype=self.schema.dtype)
+
+
+# ============================================================================
+# Відтворення
+# ============================================================================
+class Divergence:
+    """Розбіжність моделі з трейсом"""
+
+    __slots__ = ('scan', 'slot', 'field', 'recorded', 'model')
+
+    def __init__(self, scan: int, slot: int, field: str, recorded, model):
+        self.scan = scan
+        self.slot = slot
+        self.field = field
+        self.recorded = recorded
+        self.model = model
+
+    def __repr__(self) -> str:
+        return (f"Divergence(скан {self.scan}, слот {self.slot}, {self.field}: "
+                f"трейс {self.recorded}, модель {self.model})")
+
+
+class TraceReplayer:
+    """Подає входи трейсу у VirtualPlc і порівнює виходи з записаними"""
+
+    def __init__(self, reader: TraceReader, constants=None, udt_dir=None):
+        self.reader = reader
+        schema = reader.schema
+        self.plc = VirtualPlc(schema.mapping, typed_sizes=schema.typed_sizes, constants=constants,
+                              udt_dir=udt_dir, cycle_ms=reader.cycle_ms)
+        self._sources = schema.bind(self.plc)
+        # біт групи -> слот (для звіту)
+        self._bit_slots = {}
+        self._bit_fields = {}
+        for group, segs in schema.segments.items():
+            slots, fields = [], []
+            for array, member, _, count in segs:
+                slots.extend(schema.arrays[array][0] if array else schema.slots.tolist())
+                fields.extend([member] * count)
+            self._bit_slots[group] = np.array(slots, dtype=np.intp)
+            self._bit_fields[group] = fields
+
+    def _timers(self):
+        for array, fields in self.plc.typed.items():
+            for name, arr in fields.items():
+                if arr.dtype != np.bool_:
+                    yield arr, self.plc.index[array]
+
+    def seed(self, k: int):
+        """Стан моделі з запису скану k (для старту з середини трейсу)
+
+        Таймери *Ms у трейсі не записані — стають TIME_TCK скану k, тож
+        таймаути, що відлічувались до k, спрацюють не раніше, ніж у PLC
+        (можливі розбіжності у перше вікно таймауту після k).
+        """
+        state = self.reader.scan(k)
+        slots = self.reader.schema.slots
+        for name in BASE_INPUTS + BASE_OUTPUTS:
+            self.plc.mechs[name][slots] = state[name]
+        for group in BIT_GROUPS:
+            _scatter(self._sources[group], state[group])
+        for arr, idx in self._timers():
+            arr[idx] = state[TICK_COLUMN]
+
+    def run(self, start: int = 0, stop: Optional[int] = None, resync: bool = True,
+            limit: int = 1000) -> Dict[str, object]:
+        """Відтворити скани start..stop; повертає звіт із розбіжностями
+
+        resync — після розбіжності стан моделі береться з трейсу (одна
+        помилка не тягне за собою всі наступні скани).
+        """
+        reader, schema, plc = self.reader, self.reader.schema, self.plc
+        slots = schema.slots
+        n = slots.size
+        if start > 0:
+            self.seed(start - 1)
+        divergences: List[Divergence] = []
+        counts = {name: 0 for name in CHECKED}
+        diverged_scans = 0
+        scans = 0
+        started = time.perf_counter()
+        for first, block in reader.blocks(schema.dtype.names, start, stop):
+            bits = {group: np.unpackbits(block[group], axis=1)[:, :schema.bits[group]].astype(np.bool_)
+                    for group in BIT_GROUPS}
+            for r in range(block[TICK_COLUMN].shape[0]):
+                _scatter(self._sources['DI'], bits['DI'][r])
+                _scatter(self._sources['BITS'], bits['BITS'][r])
+                for name in BASE_INPUTS:
+                    plc.mechs[name][slots] = block[name][r, :n]
+                plc.clock.now = int(block[TICK_COLUMN][r])
+                plc.scan(advance=False)
+                scans += 1
+
+                hit = False
+                model_do = _gather(self._sources['DO'])
+                wrong = np.nonzero(model_do != bits['DO'][r])[0]
+                if wrong.size:
+                    hit = True
+                    counts['DO'] += int(wrong.size)
+                    for b in wrong[:max(0, limit - len(divergences))]:
+                        divergences.append(Divergence(first + r, int(self._bit_slots['DO'][b]),
+                                                      self._bit_fields['DO'][b],
+                                                      bool(bits['DO'][r][b]), bool(model_do[b])))
+                    if resync:
+                        _scatter(self._sources['DO'], bits['DO'][r])
+                for name in BASE_OUTPUTS:
+                    recorded = block[name][r, :n]
+                    model = plc.mechs[name][slots]
+                    wrong = np.nonzero(model != recorded)[0]
+                    if not wrong.size:
+                        continue
+                    hit = True
+                    counts[name] += int(wrong.size)
+                    for i in wrong[:max(0, limit - len(divergences))]:
+                        divergences.append(Divergence(first + r, int(slots[i]), name,
+                                                      int(recorded[i]), int(model[i])))
+                    if resync:
+                        plc.mechs[name][slots] = recorded
+                diverged_scans += hit
+        seconds = time.perf_counter() - started
+        return {
+            'scans': scans,
+            'seconds': round(seconds, 3),
+            'scans_per_second': round(scans / seconds, 1) if seconds else 0.0,
+            'diverged_scans': diverged_scans,
+            'counts': counts,
+            'divergences': divergences,
+        }
+
+
+# ============================================================================
+# CLI
+# ============================================================================
+def _fmt_bytes(size: int) -> str:
+    for unit in ('Б', 'КБ', 'МБ', 'ГБ'):
+        if size < 1024 or unit == 'ГБ':
+            return f"{size:.1f} {unit}" if unit != 'Б' else f"{size} {unit}"
+        size /= 1024
+
+
+def cmd_record(args) -> int:
+    if args.synthetic:
+        plc, source = VirtualPlc.synthetic(args.synthetic, cycle_ms=args.cycle_ms), \
+            f"synthetic {args.synthetic}"
+    elif Path(args.source).is_dir():
+        plc, source = VirtualPlc.from_generated(args.source, cycle_ms=args.cycle_ms), args.source
+    else:
+        plc, source = VirtualPlc.from_excel(args.source, cycle_ms=args.cycle_ms), args.source
+    plc.make_healthy()
+    plant = SimplePlant(plc) if args.plant else None
+
+    with TraceWriter(args.trace, plc, chunk=args.chunk, source=source) as writer:
+        print(f"⏺️  Запис {args.trace}: {writer.schema.slots.size} слотів, "
+              f"{writer.schema.row_bytes} Б/скан")
+        metrics = soak(plc, args.scans, plant=plant, after_scan=writer.record)
+    print(f"✅ {writer.scans} сканів за {metrics['seconds']} с "
+          f"({_fmt_bytes(Path(args.trace).stat().st_size)}), аварій наприкінці: {metrics['faults']}")
+    return 0
+
+
+def cmd_info(args) -> int:
+    reader = TraceReader(args.trace)
+    schema = reader.schema
+    h = reader.header
+    print(f"📼 {reader.path}: {len(reader)} сканів, цикл {reader.cycle_ms} мс "
+          f"(≈ {len(reader) * reader.cycle_ms / 3_600_000:.3f} год), блок {schema.chunk} сканів")
+    print(f"   Джерело: {h.get('source') or '—'}, записано {h.get('created', '—')}")
+    print(f"   Рядок: {schema.row_bytes} Б; файл {_fmt_bytes(reader.path.stat().st_size)}")
+    counts = ', '.join(f"{array} {len(slots)}" for array, (slots, _) in schema.arrays.items())
+    print(f"   Слоти: {schema.slots.size} ({counts}); біти DI {schema.bits['DI']}, "
+          f"DO {schema.bits['DO']}")
+    for group in ('DI', 'DO'):
+        for array, member, _, count in schema.segments[group]:
+            print(f"   {group} {array}.{member} x{count}")
+    if len(reader):
+        ticks = reader.values(TICK_COLUMN, 0, 1), reader.values(TICK_COLUMN, len(reader) - 1)
+        print(f"   TIME_TCK: {int(ticks[0][0])} .. {int(ticks[1][0])}")
+    return 0
+
+
+def cmd_show(args) -> int:
+    reader = TraceReader(args.trace)
+    if args.slot is None:
+        state = reader.scan(args.scan)
+        slots = reader.schema.slots
+        print(f"📼 Скан {args.scan}, TIME_TCK {state[TICK_COLUMN]}")
+        for i, slot in enumerate(slots[:args.limit]):
+            print(f"   [{slot:3d}] Status {state['Status'][i]:3d} FLTCode {state['FLTCode'][i]:3d} "
+                  f"OwnerCur {state['OwnerCur'][i]} Cmd {state['Cmd'][i]}")
+        return 0
+    series = reader.slot_series(args.slot, args.scan, args.scan + args.limit)
+    names = [n for n in series if n != TICK_COLUMN]
+    print(f"📼 Слот {args.slot}, скани {args.scan}..{args.scan + len(series[TICK_COLUMN]) - 1}")
+    print('   ' + ' '.join(f"{n:>12}" for n in [TICK_COLUMN] + names))
+    for r in range(len(series[TICK_COLUMN])):
+        print('   ' + ' '.join(f"{int(series[n][r]):>12}" for n in [TICK_COLUMN] + names))
+    return 0
+
+
+def parse_overrides(items: List[str]) -> Dict[str, float]:
+    """['NAME=VALUE', ...] -> {NAME: int/float}"""
+    overrides = {}
+    for item in items:
+        name, sep, value = item.partition('=')
+        try:
+            if not sep:
+                raise ValueError
+            overrides[name.strip()] = int(value) if value.strip().lstrip('-').isdigit() else float(value)
+        except ValueError:
+            raise ValueError(f"❌ --set {item}: очікується NAME=число") from None
+    return overrides
+
+
+def cmd_replay(args) -> int:
+    reader = TraceReader(args.trace)
+    constants = load_constants(args.constants)
+    if args.set:
+        constants = constants.with_overrides(**parse_overrides(args.set))
+    replayer = TraceReplayer(reader, constants=constants)
+    report = replayer.run(args.start, args.stop, resync=not args.no_resync, limit=args.limit)
+    print(f"▶️  Відтворено {report['scans']} сканів за {report['seconds']} с "
+          f"({report['scans_per_second']:.0f} сканів/с)")
+    if not report['diverged_scans']:
+        print("✅ Розбіжностей немає")
+        return 0
+    counts = ', '.join(f"{name} {n}" for name, n in report['counts'].items() if n)
+    print(f"❌ Розбіжності у {report['diverged_scans']} сканах: {counts}")
+    for d in report['divergences'][:args.limit]:
+        print(f"   скан {d.scan} слот {d.slot} {d.field}: трейс {d.recorded}, модель {d.model}")
+    return 1
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Трейс HAL I/O та стану механізмів (memmap)")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('record', help="записати soak VirtualPlc у трейс")
+    p.add_argument('trace')
+    p.add_argument('source', nargs='?', default='elevator_config.xlsx',
+                   help="elevator_config.xlsx або каталог зі згенерованими SCL")
+    p.add_argument('--synthetic', type=int, default=0, help="N слотів, заповнених по колу")
+    p.add_argument('--scans', type=int, default=100000)
+    p.add_argument('--cycle-ms', type=int, default=10)
+    p.add_argument('--plant', action='store_true', help="з моделлю заліза (SimplePlant)")
+    p.add_argument('--chunk', type=int, default=DEFAULT_CHUNK_SCANS, help="сканів у блоці")
+    p.set_defaults(func=cmd_record)
+
+    p = sub.add_parser('info', help="заголовок і розкладка колонок")
+    p.add_argument('trace')
+    p.set_defaults(func=cmd_info)
+
+    p = sub.add_parser('show', help="стан скану або ряд одного слота")
+    p.add_argument('trace')
+    p.add_argument('--scan', type=int, default=0)
+    p.add_argument('--slot', type=int, default=None)
+    p.add_argument('--limit', type=int, default=20)
+    p.set_defaults(func=cmd_show)
+
+    p = sub.add_parser('replay', help="відтворити через модель FC і знайти розбіжності")
+    p.add_argument('trace')
+    p.add_argument('--start', type=int, default=0)
+    p.add_argument('--stop', type=int, default=None)
+    p.add_argument('--no-resync', action='store_true',
+                   help="не брати стан з трейсу після розбіжності")
+    p.add_argument('--limit', type=int, default=50, help="скільки розбіжностей показати")
+    p.add_argument('--constants', default=None, metavar='XLSX',
+                   help="Constant.xlsx для моделі (за замовчуванням — з репозиторію)")
+    p.add_argument('--set', action='append', default=[], metavar='NAME=VALUE',
+                   help="змінити константу моделі (можна кілька разів)")
+    p.set_defaults(func=cmd_replay)
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    try:
+        return args.func(args)
+    except ValueError as e:
+        print(e)
+        return 2
+    except OSError as e:
+        print(f"❌ {e.filename or ''}: {e.strerror or e}")
+        return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())